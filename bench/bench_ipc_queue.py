@@ -18,6 +18,8 @@ from typing import Any
 
 from bench_utils import summarize
 
+from celestialflow import TaskGraph, TaskStage
+
 # =========================
 # Config
 # =========================
@@ -255,6 +257,49 @@ def run_manager_queue_case(count: int, repeat: int, mode: str) -> None:
     summarize("Manager().Queue", durations, count)
 
 
+# =========================
+# TaskGraph(process) regression
+# =========================
+
+
+def forward_payload(item: Any) -> Any:
+    return item
+
+
+def payload_checksum(item: Any) -> int:
+    return item if isinstance(item, int) else len(item)
+
+
+def run_graph_process_case(count: int, repeat: int, mode: str) -> None:
+    """
+    以 graph_mode="process" 的两节点链路复现生产者/消费者场景，
+    作为跨进程边（队列 + 计数器 + funnel 回传）的回归基准。
+    """
+    durations: list[float] = []
+
+    for _ in range(repeat):
+        producer = TaskStage("producer", forward_payload)
+        consumer = TaskStage("consumer", payload_checksum)
+        graph = TaskGraph("bench_ipc_graph_process", graph_mode="process")
+        graph.set_stages([producer, consumer])
+        graph.connect([producer], [consumer])
+
+        payloads = [make_payload(i, mode) for i in range(count)]
+
+        start = time.perf_counter()
+        graph.run({producer.get_name(): payloads})
+        duration = time.perf_counter() - start
+        durations.append(duration)
+
+        consumed = consumer.get_counts()["tasks_succeeded"]
+        if consumed != count:
+            raise RuntimeError(
+                f"TaskGraph(process): consumed={consumed}, expected={count}"
+            )
+
+    summarize("TaskGraph(process)", durations, count)
+
+
 # =========================
 # Main
 # =========================
@@ -295,6 +340,13 @@ def main() -> None:
         mode=PAYLOAD_MODE,
     )
 
+    # TaskGraph 的 process 图模式固定使用 fork 上下文，不受上面的 spawn 设置影响。
+    run_graph_process_case(
+        count=COUNT,
+        repeat=REPEAT,
+        mode=PAYLOAD_MODE,
+    )
+
 
 if __name__ == "__main__":
     # Windows/macOS 下更稳，行为也更统一
@@ -19,6 +19,8 @@ from typing import Any
 
 from bench_utils import summarize
 
+from celestialflow import TaskGraph, TaskStage
+
 # =========================
 # Config
 # =========================
@@ -410,6 +412,78 @@ def run_shared_memory_case(
     return durations
 
 
+# =========================
+# TaskGraph(process) regression
+# =========================
+
+
+def forward_payload(item: bytes) -> bytes:
+    return item
+
+
+def make_checksum_func(mode: str):
+    def payload_checksum(item: bytes) -> int:
+        return checksum_of_payload_bytes(item, mode)
+
+    return payload_checksum
+
+
+def run_graph_process_case(
+    topology_name: str,
+    producer_count: int,
+    total_count: int,
+    repeat: int,
+    mode: str,
+    transport: str = "queue",
+) -> list[float]:
+    """
+    以 graph_mode="process" 复现 SPSC / MPSC 拓扑：每个生产者是一个独立进程的
+    节点，全部汇入同一个消费者节点。任务图的扇出是广播语义，因此不覆盖 SPMC。
+    transport 对应 TaskGraph.connect 的边传输方式（'queue' 或 'shm_ring'）。
+    """
+    durations: list[float] = []
+    producer_counts = split_counts(total_count, producer_count)
+    producer_starts = prefix_starts(producer_counts)
+    target_checksum = expected_checksum(0, total_count, mode)
+
+    for _ in range(repeat):
+        producers = [
+            TaskStage(f"producer_{i}", forward_payload) for i in range(producer_count)
+        ]
+        consumer = TaskStage(
+            "consumer", make_checksum_func(mode), persist_result=True
+        )
+        graph = TaskGraph(f"bench_graph_process_{topology_name}", graph_mode="process")
+        graph.set_stages([*producers, consumer])
+        graph.connect(producers, [consumer], transport=transport)
+
+        init_tasks = {
+            producer.get_name(): [
+                make_payload(i, mode)
+                for i in range(producer_starts[idx], producer_starts[idx] + producer_counts[idx])
+            ]
+            for idx, producer in enumerate(producers)
+        }
+
+        start = time.perf_counter()
+        graph.run(init_tasks)
+        duration = time.perf_counter() - start
+        durations.append(duration)
+
+        results = [result for _, result in consumer.get_success_pairs()]
+        total_checksum = sum(results)
+        if len(results) != total_count:
+            raise RuntimeError(
+                f"TaskGraph(process)/{topology_name} consumed={len(results)}, expected={total_count}"
+            )
+        if total_checksum != target_checksum:
+            raise RuntimeError(
+                f"TaskGraph(process)/{topology_name} checksum={total_checksum}, expected={target_checksum}"
+            )
+
+    return durations
+
+
 # =========================
 # Main
 # =========================
@@ -450,6 +524,28 @@ def main() -> None:
         )
         summarize(f"SharedMemory ring / {topology_name}", shm, COUNT)
 
+        if consumer_count == 1:
+            graph = run_graph_process_case(
+                topology_name=topology_name,
+                producer_count=producer_count,
+                total_count=COUNT,
+                repeat=REPEAT,
+                mode=PAYLOAD_MODE,
+            )
+            summarize(f"TaskGraph(process) / {topology_name}", graph, COUNT)
+
+            graph_ring = run_graph_process_case(
+                topology_name=topology_name,
+                producer_count=producer_count,
+                total_count=COUNT,
+                repeat=REPEAT,
+                mode=PAYLOAD_MODE,
+                transport="shm_ring",
+            )
+            summarize(
+                f"TaskGraph(process, shm_ring) / {topology_name}", graph_ring, COUNT
+            )
+
 
 if __name__ == "__main__":
     try:
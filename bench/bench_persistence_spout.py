@@ -18,9 +18,10 @@ from celestialflow.persistence.util_sqlite import connect_db
 
 
 class BenchLogSpout(LogSpout):
-    def __init__(self, base_dir: Path) -> None:
+    def __init__(self, base_dir: Path, batch_size: int) -> None:
         super().__init__()
         self._base_dir = base_dir
+        self.max_batch_size = batch_size
 
     def _before_start(self) -> None:
         self.log_path = self._base_dir / "bench_task_logger.log"
@@ -29,9 +30,10 @@ class BenchLogSpout(LogSpout):
 
 
 class BenchFallbackSpout(FallbackSpout):
-    def __init__(self, base_dir: Path) -> None:
+    def __init__(self, base_dir: Path, batch_size: int) -> None:
         super().__init__()
         self._base_dir = base_dir
+        self.max_batch_size = batch_size
 
     def _before_start(self) -> None:
         self.db_path = self._base_dir / "bench_fallback.sqlite3"
@@ -66,9 +68,8 @@ def build_fallback_insert_records(count: int) -> list[dict[str, Any]]:
 
 
 def run_spout_bench(spout: Any, records: list[dict[str, Any]]) -> dict[str, float]:
-    queue = spout.get_queue()
     for record in records:
-        queue.put(record)
+        spout.put(record)
 
     start = time.perf_counter()
     spout.start()
@@ -108,6 +109,12 @@ def parse_args() -> argparse.Namespace:
         default=20_000,
         help="Preloaded fallback insert records for FallbackSpout benchmark.",
     )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=BenchLogSpout.max_batch_size,
+        help="Max records drained per wakeup in batched mode (1 = per-record).",
+    )
     return parser.parse_args()
 
 
@@ -116,20 +123,25 @@ def main() -> None:
     print("Running persistence spout benchmarks...")
     print(f"  log-count:      {args.log_count:,}")
     print(f"  fallback-count: {args.fallback_count:,}")
+    print(f"  batch-size:     {args.batch_size:,}")
     print("  model: preload queue -> start spout -> drain all queued records")
 
-    with tempfile.TemporaryDirectory(prefix="cf_bench_log_") as log_dir_str:
-        log_spout = BenchLogSpout(Path(log_dir_str))
-        log_result = run_spout_bench(log_spout, build_log_records(args.log_count))
-        print_result("LogSpout", log_result)
-
-    with tempfile.TemporaryDirectory(prefix="cf_bench_fallback_") as fallback_dir_str:
-        fallback_spout = BenchFallbackSpout(Path(fallback_dir_str))
-        fallback_result = run_spout_bench(
-            fallback_spout,
-            build_fallback_insert_records(args.fallback_count),
-        )
-        print_result("FallbackSpout (insert + commit per changed record)", fallback_result)
+    for batch_size in (1, args.batch_size):
+        label = "per-record" if batch_size == 1 else f"batch<={batch_size}"
+
+        with tempfile.TemporaryDirectory(prefix="cf_bench_log_") as log_dir_str:
+            log_spout = BenchLogSpout(Path(log_dir_str), batch_size)
+            log_result = run_spout_bench(log_spout, build_log_records(args.log_count))
+            print_result(f"LogSpout ({label})", log_result)
+
+        with tempfile.TemporaryDirectory(prefix="cf_bench_fallback_") as fallback_dir_str:
+            fallback_spout = BenchFallbackSpout(Path(fallback_dir_str), batch_size)
+            fallback_result = run_spout_bench(
+                fallback_spout,
+                build_fallback_insert_records(args.fallback_count),
+            )
+            commit = "commit per record" if batch_size == 1 else "commit per batch"
+            print_result(f"FallbackSpout ({label}, {commit})", fallback_result)
 
 
 if __name__ == "__main__":
@@ -1,4 +1,5 @@
 import os
+import threading
 import time
 from multiprocessing import Manager
 from multiprocessing import Queue as MPQueue
@@ -7,6 +8,15 @@ from queue import Queue as ThreadQueue
 import redis
 from dotenv import load_dotenv
 
+from celestialflow.runtime.core_envelope import TaskEnvelope
+from celestialflow.runtime.core_queue import (
+    VALID_QUEUE_BACKENDS,
+    TaskInQueue,
+    TaskOutQueue,
+    make_queue_backend,
+)
+from celestialflow.runtime.core_ring import SharedRingQueue
+
 load_dotenv()
 redis_host = os.getenv("REDIS_HOST", "127.0.0.1")
 redis_port = int(os.getenv("REDIS_PORT", "6379"))
@@ -104,6 +114,73 @@ def test_manager_queue_perf(count):
     print(f"  empty:  {empty_duration:.6f}s")
 
 
+def test_queue_backend_perf(name, count):
+    q = make_queue_backend(name, topic="bench")
+
+    # 环形队列容量有限，分批写入再读出，避免单线程写满后阻塞
+    batch = 512 if isinstance(q, SharedRingQueue) else count
+
+    put_duration = 0.0
+    get_duration = 0.0
+    for offset in range(0, count, batch):
+        size = min(batch, count - offset)
+
+        start_put = time.perf_counter()
+        for i in range(size):
+            q.put(i)
+        put_duration += time.perf_counter() - start_put
+
+        start_get = time.perf_counter()
+        for _ in range(size):
+            q.get()
+        get_duration += time.perf_counter() - start_get
+
+    start_size = time.perf_counter()
+    for _ in range(count):
+        _ = q.qsize()
+    size_duration = time.perf_counter() - start_size
+
+    start_empty = time.perf_counter()
+    for _ in range(count):
+        _ = q.empty()
+    empty_duration = time.perf_counter() - start_empty
+
+    q.close()
+    if isinstance(q, SharedRingQueue):
+        q.unlink()
+
+    print(f"\nQueueBackend[{name}] ({count} items):")
+    print(f"  put:    {put_duration:.4f}s")
+    print(f"  get:    {get_duration:.4f}s")
+    print(f"  qsize:  {size_duration:.6f}s ")
+    print(f"  empty:  {empty_duration:.6f}s")
+
+
+def test_batched_edge_perf(count, batch_size):
+    """TaskOutQueue → TaskInQueue 的单生产者/单消费者吞吐，对比批量边与逐条传输。"""
+    in_queue = TaskInQueue(out_name="dst")
+    in_queue.add_source_name("src")
+    out_queue = TaskOutQueue(in_name="src")
+    out_queue.add_queue(in_queue, "dst", batch_size=batch_size)
+
+    def consume():
+        for _ in range(count):
+            in_queue.get()
+
+    consumer = threading.Thread(target=consume)
+    start = time.perf_counter()
+    consumer.start()
+    for i in range(count):
+        out_queue.put(TaskEnvelope(i, id=i))
+    out_queue.flush()
+    consumer.join()
+    duration = time.perf_counter() - start
+
+    print(f"\nTaskOutQueue -> TaskInQueue batch_size={batch_size} ({count} items):")
+    print(f"  total:  {duration:.4f}s")
+    print(f"  rate:   {count / duration:,.0f} items/s")
+
+
 def test_redis_list_perf(r, count):
     key = "redis_queue"
     r.delete(key)
@@ -186,6 +263,14 @@ if __name__ == "__main__":
     # Manager queue benchmark
     test_manager_queue_perf(COUNT)
 
+    # TaskInQueue backend benchmarks
+    for backend_name in VALID_QUEUE_BACKENDS:
+        test_queue_backend_perf(backend_name, COUNT)
+
+    # Batched edge benchmarks
+    for size in (1, 16, 256):
+        test_batched_edge_perf(COUNT, size)
+
     # Redis benchmarks (if redis server exists)
     try:
         redis_client = redis.Redis(
@@ -16,7 +16,9 @@ from .graph import (
     TaskWheel,
 )
 from .observability import BaseObserver, TaskReporter
+from .persistence.util_catalog import query_catalog_records
 from .persistence.util_sqlite import (
+    iter_stage_task_chunks,
     load_records,
     load_tasks_grouped_by_stage,
 )
@@ -25,6 +27,7 @@ from .runtime.util_hash import make_hashable
 from .runtime.util_types import TerminationSignal
 from .stage import (
     TaskExecutor,
+    TaskReducer,
     TaskRouter,
     TaskSplitter,
     TaskStage,
@@ -41,6 +44,7 @@ __all__ = [
     "TaskGraph",
     "TaskGrid",
     "TaskLoop",
+    "TaskReducer",
     "TaskReporter",
     "TaskRouter",
     "TaskSplitter",
@@ -50,7 +54,9 @@ __all__ = [
     "benchmark_executor",
     "benchmark_graph",
     "format_table",
+    "iter_stage_task_chunks",
     "load_records",
     "load_tasks_grouped_by_stage",
     "make_hashable",
+    "query_catalog_records",
 ]
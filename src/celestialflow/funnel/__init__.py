@@ -1,13 +1,16 @@
 # funnel/__init__.py
 """CelestialFlow 漏斗模块。
 
-提供数据收集器（Inlet）与监听器（Spout）的基础抽象。
+提供数据收集器（Inlet）与监听器（Spout）的基础抽象，以及跨进程转发记录的桥接器。
 """
 
+from .core_bridge import BridgeSpout, FunnelBridge
 from .core_inlet import BaseInlet
 from .core_spout import BaseSpout
 
 __all__ = [
     "BaseInlet",
     "BaseSpout",
+    "BridgeSpout",
+    "FunnelBridge",
 ]
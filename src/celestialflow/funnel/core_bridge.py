@@ -0,0 +1,162 @@
+# funnel/core_bridge.py
+from __future__ import annotations
+
+import heapq
+import traceback
+from multiprocessing.context import BaseContext
+from multiprocessing.queues import Queue as MPQueue
+from threading import Thread
+from typing import Any
+
+from ..runtime.util_errors import RuntimeStateError
+from ..runtime.util_types import TERMINATION_SIGNAL, TerminationSignal
+from .core_spout import BaseSpout
+
+
+class BridgeSpout(BaseSpout):
+    """
+    子进程侧的转发监听器。
+
+    不直接落盘，而是把整批记录连同通道名写入跨进程队列，
+    由父进程中的 :class:`FunnelBridge` 转交给真正的 spout。
+    每条记录在写入时领取全局序号，父进程据此恢复跨进程的因果顺序。
+    """
+
+    channel: str
+
+    def __init__(self, bridge_queue: MPQueue[Any], sequence: Any, channel: str) -> None:
+        """
+        初始化转发监听器。
+
+        :param bridge_queue: 父进程桥接器持有的跨进程队列
+        :param sequence: 所有进程共享的记录序号计数器（``multiprocessing.Value``）
+        :param channel: 目标通道名，对应父进程中的一个 spout
+        """
+        super().__init__()
+        self.channel = channel
+        self._bridge_queue = bridge_queue
+        self._sequence = sequence
+
+    def put(self, record: Any) -> None:
+        """
+        为记录领取全局序号后放入队列。
+
+        上游进程写入 pending 记录后才会把任务交给下游进程，因此序号顺序
+        与跨进程的因果顺序一致。
+
+        :param record: 待转发的记录
+        """
+        with self._sequence.get_lock():
+            sequence = self._sequence.value
+            self._sequence.value = sequence + 1
+        super().put((sequence, record))
+
+    def _handle_batch(self, records: list[Any]) -> None:
+        """
+        将一批记录整体发送到父进程，摊薄跨进程序列化开销。
+
+        :param records: 按入队顺序排列的记录列表
+        """
+        self._bridge_queue.put((self.channel, records))
+
+
+class FunnelBridge:
+    """
+    父进程侧的 funnel 桥接器。
+
+    持有一个跨进程队列与一个后台线程，把子进程 :class:`BridgeSpout`
+    发来的记录按通道名投递到父进程的 spout，使各进程的 fallback 与日志
+    仍写入同一组文件。
+
+    各子进程独立批量发送，到达顺序与产生顺序不一致；投递线程按全局序号
+    缓存乱序到达的记录，只按序号连续投递，保证同一任务的 pending 记录
+    先于下游进程对它的晋升或删除操作落盘。
+    """
+
+    targets: dict[str, BaseSpout]
+
+    def __init__(self, ctx: BaseContext, targets: dict[str, BaseSpout]) -> None:
+        """
+        初始化桥接器。
+
+        :param ctx: 创建跨进程队列所用的多进程上下文
+        :param targets: 通道名到父进程 spout 的映射
+        """
+        self.targets = targets
+        self._queue: MPQueue[Any] = ctx.Queue()
+        self._sequence = ctx.Value("q", 0)
+        self._thread: Thread | None = None
+
+    def make_spout(self, channel: str) -> BridgeSpout:
+        """
+        创建转发到指定通道的子进程侧监听器。
+
+        :param channel: 通道名，需存在于 ``targets`` 中
+        :return: 转发监听器
+        :rtype: BridgeSpout
+        :raises RuntimeStateError: 通道名未注册
+        """
+        if channel not in self.targets:
+            raise RuntimeStateError(f"unknown funnel bridge channel: {channel}")
+        return BridgeSpout(self._queue, self._sequence, channel)
+
+    def start(self) -> None:
+        """启动父进程侧的投递线程（若未运行）。"""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = Thread(target=self._pump, daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """
+        发送终止信号并等待投递线程处理完此前收到的全部记录。
+
+        应在所有子进程退出后调用，保证终止信号排在全部记录之后。
+        """
+        if self._thread is None:
+            return
+
+        self._queue.put(TERMINATION_SIGNAL)
+        self._thread.join(timeout=5)
+        if self._thread.is_alive():
+            raise RuntimeStateError(
+                "Funnel bridge thread did not terminate within 5 seconds."
+            )
+        self._thread = None
+
+    def _pump(self) -> None:
+        """
+        投递线程主循环，按序号连续投递；收到终止信号时按序冲刷剩余记录后退出。
+
+        子进程异常退出会在序号中留下空洞，此时终止前的冲刷会跳过空洞。
+        """
+        pending: list[tuple[int, str, Any]] = []
+        next_sequence = 0
+        while True:
+            item = self._queue.get()
+            if isinstance(item, TerminationSignal):
+                break
+
+            channel, records = item
+            for sequence, record in records:
+                heapq.heappush(pending, (sequence, channel, record))
+            while pending and pending[0][0] == next_sequence:
+                _, channel, record = heapq.heappop(pending)
+                self._deliver(channel, record)
+                next_sequence += 1
+
+        while pending:
+            _, channel, record = heapq.heappop(pending)
+            self._deliver(channel, record)
+
+    def _deliver(self, channel: str, record: Any) -> None:
+        """
+        将单条记录交给目标 spout。
+
+        :param channel: 通道名
+        :param record: 记录
+        """
+        try:
+            self.targets[channel].put(record)
+        except Exception:
+            # 单条记录投递失败不影响其余记录。
+            traceback.print_exc()
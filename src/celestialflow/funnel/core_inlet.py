@@ -1,11 +1,9 @@
 # funnel/core_inlet.py
 from __future__ import annotations
 
-from queue import Queue
 from typing import TYPE_CHECKING, Any, Self
 
 from ..runtime.util_errors import InitializationError
-from .util_count import PendingCounter
 
 if TYPE_CHECKING:
     from .core_spout import BaseSpout
@@ -14,8 +12,7 @@ if TYPE_CHECKING:
 class BaseInlet:
     """数据收集器基类，负责将记录通过队列发送到对应的监听器。"""
 
-    _queue: Queue[Any]
-    _counter: PendingCounter
+    _spout: BaseSpout
 
     def bind_spout(self, spout: BaseSpout) -> Self:
         """
@@ -25,24 +22,16 @@ class BaseInlet:
         :return: 当前已绑定的 inlet 实例
         :rtype: Self
         """
-        self._queue = spout.get_queue()
-        self._counter = spout.get_counter()
+        self._spout = spout
         return self
 
     def _funnel(self, record: Any) -> None:
         """
-        将记录放入队列。
+        将记录交给绑定的 spout，按其溢出策略入队。
 
         :param record: 待发送的记录
         :return: ``None``
         """
-        if not hasattr(self, "_queue") or not hasattr(self, "_counter"):
+        if not hasattr(self, "_spout"):
             raise InitializationError("inlet is not bound to spout")
-
-        # 先增加待处理数量，再入队；若入队失败则立即回滚计数。
-        self._counter.increment()
-        try:
-            self._queue.put(record)
-        except Exception:
-            self._counter.decrement()
-            raise
+        self._spout.put(record)
@@ -2,24 +2,63 @@
 from __future__ import annotations
 
 import traceback
-from queue import Empty, Queue
-from threading import Thread
+import warnings
+from queue import Empty, Full, Queue
+from threading import Lock, Thread
 from typing import Any
 
-from ..runtime.util_errors import CelestialFlowError, RuntimeStateError
+from ..runtime.util_errors import (
+    CelestialFlowError,
+    InvalidOptionError,
+    RuntimeStateError,
+)
 from ..runtime.util_types import TERMINATION_SIGNAL, TerminationSignal
 from .util_count import PendingCounter
+from .util_spill import SpillFile
 
 
 class BaseSpout:
-    """数据监听器基类，在独立后台线程中消费队列记录。"""
+    """
+    数据监听器基类，在独立后台线程中消费队列记录。
 
-    def __init__(self) -> None:
-        """初始化监听器及其内部队列、待处理计数器和线程引用。"""
-        self._queue: Queue[Any] = Queue()
+    ``maxsize > 0`` 时队列有界，队列写满后按 ``overflow`` 处理新记录：
+
+    - ``"block"``：阻塞写入方直到队列有空位，形成真正的背压；
+      监听线程未运行时无法消费，此时转为溢出到本地文件，避免写入方永久阻塞；
+    - ``"drop_oldest"`` / ``"drop_newest"``：丢弃最旧 / 最新的记录，适合日志；
+      丢弃数量见 :meth:`get_dropped_count`，首次丢弃时发出一次 ``RuntimeWarning``；
+    - ``"spill"``：溢出到本地临时文件，队列清空后按原顺序回读处理。
+    """
+
+    valid_overflows: tuple[str, ...] = ("block", "drop_oldest", "drop_newest", "spill")
+
+    # 单次唤醒最多取出并整批处理的记录数，子类或实例可按需覆写
+    max_batch_size: int = 512
+
+    maxsize: int
+    overflow: str
+
+    def __init__(self, maxsize: int = 0, overflow: str = "block") -> None:
+        """
+        初始化监听器及其内部队列、待处理计数器和线程引用。
+
+        :param maxsize: 队列容量上限，``0`` 表示不限，默认 ``0``
+        :param overflow: 队列写满时的处理策略，见类说明，默认 ``"block"``
+        :raises InvalidOptionError: overflow 不是受支持的取值
+        """
+        if overflow not in self.valid_overflows:
+            raise InvalidOptionError("spout overflow", overflow, self.valid_overflows)
+        self.maxsize = maxsize
+        self.overflow = overflow
+
+        self._queue: Queue[Any] = Queue(maxsize=maxsize)
         self._counter = PendingCounter()
         self._thread: Thread | None = None
 
+        self._put_lock = Lock()
+        self._spill = SpillFile()
+        self._dropped = 0
+
     # ==== 外部调用函数 ====
 
     def start(self) -> None:
@@ -29,29 +68,136 @@ class BaseSpout:
             self._thread = Thread(target=self._spout, daemon=True)
             self._thread.start()
 
+    def put(self, record: Any) -> None:
+        """
+        按溢出策略将记录放入队列，并计入待处理数量。
+
+        :param record: 待处理的记录
+        """
+        # 先增加待处理数量，再入队；若入队失败则立即回滚计数。
+        self._counter.increment()
+        try:
+            self._put(record)
+        except Exception:
+            self._counter.decrement()
+            raise
+
+    def _put(self, record: Any) -> None:
+        """
+        按溢出策略放入单条记录（计数由调用方负责）。
+
+        :param record: 待处理的记录
+        """
+        if self.overflow == "block" and self.is_running() and not len(self._spill):
+            self._queue.put(record)
+            return
+
+        with self._put_lock:
+            # 已有溢出积压时新记录继续溢出，保证整体 FIFO 顺序。
+            if not len(self._spill):
+                try:
+                    self._queue.put_nowait(record)
+                    return
+                except Full:
+                    pass
+
+            if self.overflow in ("block", "spill"):
+                self._spill.append(record)
+            elif self.overflow == "drop_newest":
+                self._drop()
+            else:
+                self._drop_oldest(record)
+
+    def _drop_oldest(self, record: Any) -> None:
+        """
+        丢弃队首记录并放入新记录（调用方需持有写入锁）。
+
+        :param record: 新记录
+        """
+        try:
+            oldest = self._queue.get_nowait()
+        except Empty:
+            self._queue.put_nowait(record)
+            return
+
+        if isinstance(oldest, TerminationSignal):
+            # 终止信号不可丢弃；此时改为丢弃新记录。
+            self._queue.put_nowait(oldest)
+            self._drop()
+            return
+        self._drop()
+        self._queue.put_nowait(record)
+
+    def _drop(self) -> None:
+        """记录一次丢弃，并从待处理数量中扣除；首次丢弃时发出警告。"""
+        self._dropped += 1
+        self._counter.decrement()
+        if self._dropped == 1:
+            # 不经由日志 spout 上报：被丢弃的可能正是日志本身。
+            warnings.warn(
+                f"{type(self).__name__} queue is full (maxsize={self.maxsize}); "
+                f"dropping records with overflow={self.overflow!r}. "
+                "See get_dropped_count() for the running total.",
+                RuntimeWarning,
+                stacklevel=2,
+            )
+
     def _spout(self) -> None:
         """
         后台线程主循环。
 
-        持续从队列拉取记录并调用 ``_handle_record()``，收到终止信号时退出。
-        待处理数量在记录处理完成后递减，因此统计口径包含“已出队但仍在处理”的记录。
+        每次唤醒时尽量取出队列中已有的记录（至多 ``max_batch_size`` 条），
+        整批交给 ``_handle_batch()`` 处理，收到终止信号时退出。
+        待处理数量在整批处理完成后一次性递减，因此统计口径包含“已出队但仍在处理”的记录。
         """
         while True:
             try:
                 record = self._queue.get(timeout=0.5)
             except Empty:
+                self._drain_spill()
                 continue
 
-            if isinstance(record, TerminationSignal):
+            terminated = isinstance(record, TerminationSignal)
+            batch: list[Any] = [] if terminated else [record]
+            while not terminated and len(batch) < self.max_batch_size:
+                try:
+                    record = self._queue.get_nowait()
+                except Empty:
+                    break
+                if isinstance(record, TerminationSignal):
+                    terminated = True
+                else:
+                    batch.append(record)
+
+            if batch:
+                self._process_batch(batch)
+            if terminated:
+                self._drain_spill()
                 break
+            if self._queue.empty():
+                self._drain_spill()
 
-            try:
-                self._handle_record(record)
-            except Exception:
-                # 单条记录处理失败不致死线程。
-                traceback.print_exc()
-            finally:
-                self._counter.decrement()
+    def _process_batch(self, records: list[Any]) -> None:
+        """
+        处理一批记录并一次性递减待处理数量。
+
+        :param records: 队列或溢出文件中取出的记录
+        """
+        try:
+            self._handle_batch(records)
+        except Exception:
+            # 整批处理失败不致死线程。
+            traceback.print_exc()
+        finally:
+            self._counter.decrement(len(records))
+
+    def _drain_spill(self) -> None:
+        """按写入顺序分批处理溢出文件中的全部记录。"""
+        while True:
+            records = self._spill.pop_batch(self.max_batch_size)
+            if not records:
+                return
+            self._process_batch(records)
 
     def stop(self) -> None:
         """发送终止信号并等待后台线程结束。"""
@@ -67,6 +213,17 @@ class BaseSpout:
 
         self._thread = None
         self._after_stop()
+        if not len(self._spill):
+            self._spill.close()
+
+    def is_running(self) -> bool:
+        """
+        判断后台监听线程是否正在运行。
+
+        :return: 正在运行时为 ``True``
+        :rtype: bool
+        """
+        return self._thread is not None and self._thread.is_alive()
 
     def get_queue(self) -> Queue[Any]:
         """获取监听器的输入队列。"""
@@ -90,6 +247,42 @@ class BaseSpout:
         """
         return self._counter.get_count()
 
+    def get_peak_pending_count(self) -> int:
+        """
+        读取历史最高待处理数量（积压高水位）。
+
+        :return: 高水位
+        :rtype: int
+        """
+        return self._counter.get_peak()
+
+    def get_dropped_count(self) -> int:
+        """
+        读取因队列写满而被丢弃的记录数量。
+
+        :return: 累计丢弃数量
+        :rtype: int
+        """
+        return self._dropped
+
+    def get_backlog_stats(self) -> dict[str, Any]:
+        """
+        读取队列积压统计。
+
+        :return: 包含 ``pending``、``peak``、``queued``、``spilled``、``dropped``、
+            ``maxsize`` 与 ``overflow`` 的字典
+        :rtype: dict[str, Any]
+        """
+        return {
+            "pending": self._counter.get_count(),
+            "peak": self._counter.get_peak(),
+            "queued": self._queue.qsize(),
+            "spilled": len(self._spill),
+            "dropped": self._dropped,
+            "maxsize": self.maxsize,
+            "overflow": self.overflow,
+        }
+
     # ==== 生命周期回调 ====
 
     def _before_start(self) -> None:
@@ -104,6 +297,22 @@ class BaseSpout:
         """
         raise CelestialFlowError("_handle_record must be implemented by subclasses")
 
+    def _handle_batch(self, records: list[Any]) -> None:
+        """
+        处理一批队列记录，默认逐条调用 ``_handle_record()``。
+
+        子类可覆写以摊薄逐条开销（如单次提交、单次写入）；
+        覆写时需自行决定单条失败是否影响同批其余记录。
+
+        :param records: 按入队顺序排列的记录列表
+        """
+        for record in records:
+            try:
+                self._handle_record(record)
+            except Exception:
+                # 单条记录处理失败不影响同批其余记录。
+                traceback.print_exc()
+
     def _after_stop(self) -> None:
         """在后台线程停止后调用，子类可覆写以做清理（如关闭文件句柄）。"""
         return None
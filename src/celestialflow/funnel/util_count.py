@@ -6,7 +6,8 @@ from threading import Lock
 class PendingCounter:
     """线程安全的待处理计数器。
 
-    该计数器用于统计某个 spout 对应的记录中，仍未完成处理的数量。
+    该计数器用于统计某个 spout 对应的记录中，仍未完成处理的数量，
+    并记录历史最高积压量（高水位）。
     """
 
     def __init__(self) -> None:
@@ -16,6 +17,7 @@ class PendingCounter:
         :return: ``None``
         """
         self._count = 0
+        self._peak = 0
         self._lock = Lock()
 
     def increment(self) -> int:
@@ -27,17 +29,20 @@ class PendingCounter:
         """
         with self._lock:
             self._count += 1
+            if self._count > self._peak:
+                self._peak = self._count
             return self._count
 
-    def decrement(self) -> int:
+    def decrement(self, count: int = 1) -> int:
         """
-        将待处理数量减一。
+        将待处理数量减去给定值，批量处理时一次性扣除。
 
+        :param count: 减少的数量，默认 1
         :return: 自减后的待处理数量
         :rtype: int
         """
         with self._lock:
-            self._count -= 1
+            self._count -= count
             return self._count
 
     def get_count(self) -> int:
@@ -49,3 +54,25 @@ class PendingCounter:
         """
         with self._lock:
             return self._count
+
+    def get_peak(self) -> int:
+        """
+        读取历史最高待处理数量（高水位）。
+
+        :return: 高水位
+        :rtype: int
+        """
+        with self._lock:
+            return self._peak
+
+    def reset_peak(self) -> int:
+        """
+        将高水位重置为当前待处理数量。
+
+        :return: 重置前的高水位
+        :rtype: int
+        """
+        with self._lock:
+            peak = self._peak
+            self._peak = self._count
+            return peak
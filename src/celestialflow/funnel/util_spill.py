@@ -0,0 +1,97 @@
+# funnel/util_spill.py
+from __future__ import annotations
+
+import os
+import pickle
+import struct
+import tempfile
+from pathlib import Path
+from threading import Lock
+from typing import Any, BinaryIO
+
+# 每条溢出记录的长度前缀（小端 uint32）
+_FRAME_HEADER = struct.Struct("<I")
+
+
+class SpillFile:
+    """
+    按 FIFO 顺序暂存溢出记录的本地临时文件。
+
+    写入端追加 pickle 帧，读取端按偏移顺序读取；全部读完后文件被截断，
+    磁盘占用随积压消退而回收。
+    """
+
+    def __init__(self, directory: str | Path | None = None) -> None:
+        """
+        初始化溢出文件，文件在首次写入时才创建。
+
+        :param directory: 临时文件目录，默认使用系统临时目录
+        """
+        self.directory = None if directory is None else Path(directory)
+        self.path: Path | None = None
+
+        self._lock = Lock()
+        self._file: BinaryIO | None = None
+        self._read_offset = 0
+        self._count = 0
+
+    def append(self, record: Any) -> None:
+        """
+        追加一条记录。
+
+        :param record: 可 pickle 的记录
+        """
+        payload = pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            if self._file is None:
+                fd, name = tempfile.mkstemp(
+                    prefix="celestialflow-spill-", suffix=".bin", dir=self.directory
+                )
+                self.path = Path(name)
+                self._file = os.fdopen(fd, "w+b")
+            _ = self._file.seek(0, os.SEEK_END)
+            _ = self._file.write(_FRAME_HEADER.pack(len(payload)))
+            _ = self._file.write(payload)
+            self._count += 1
+
+    def pop_batch(self, limit: int) -> list[Any]:
+        """
+        按写入顺序取出最早的至多 ``limit`` 条记录。
+
+        :param limit: 单次取出的最大数量
+        :return: 记录列表；没有记录时为空列表
+        :rtype: list[Any]
+        """
+        with self._lock:
+            if self._count == 0 or self._file is None:
+                return []
+            _ = self._file.seek(self._read_offset)
+            records: list[Any] = []
+            while self._count and len(records) < limit:
+                (length,) = _FRAME_HEADER.unpack(self._file.read(_FRAME_HEADER.size))
+                records.append(pickle.loads(self._file.read(length)))
+                self._read_offset += _FRAME_HEADER.size + length
+                self._count -= 1
+
+            if self._count == 0:
+                # 积压已全部读出，截断文件回收磁盘空间。
+                _ = self._file.truncate(0)
+                self._read_offset = 0
+            return records
+
+    def close(self) -> None:
+        """关闭并删除临时文件，未读出的记录会被丢弃。"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if self.path is not None:
+                self.path.unlink(missing_ok=True)
+                self.path = None
+            self._read_offset = 0
+            self._count = 0
+
+    def __len__(self) -> int:
+        """返回尚未读出的记录数量。"""
+        with self._lock:
+            return self._count
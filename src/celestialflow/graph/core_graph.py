@@ -2,31 +2,65 @@
 from __future__ import annotations
 
 import asyncio
+import multiprocessing
 import threading
 import time
 import warnings
 from collections import defaultdict
 from collections.abc import Iterable
+from itertools import cycle, pairwise
+from multiprocessing.context import BaseContext
+from multiprocessing.process import BaseProcess
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
+from ..funnel import FunnelBridge
 from ..observability import NullTaskReporter, ReporterProtocol
-from ..persistence import funnel_scope, get_fallback_spout, get_log_inlet
-from ..persistence.util_sqlite import load_tasks_grouped_by_stage
+from ..persistence import FunnelContext, funnel_scope, get_default_funnel
+from ..persistence.util_sqlite import iter_stage_task_chunks
+from ..runtime.core_backend import QueueBackend
+from ..runtime.core_queue import (
+    DEFAULT_BATCH_DELAY,
+    PROCESS_QUEUE_BACKENDS,
+    VALID_BALANCE_POLICIES,
+    VALID_QUEUE_BACKENDS,
+    EdgeChannel,
+    ReplicaTarget,
+    make_queue_backend,
+    validate_batch_options,
+    validate_edge_capacity,
+)
 from ..runtime.util_errors import (
+    ConfigurationError,
     DuplicateNodeError,
     InvalidOptionError,
     NodeNotFoundError,
+    RuntimeStateError,
 )
 from ..runtime.util_estimators import calc_remaining
-from ..runtime.util_event import EventClient, LocalEventClient
+from ..runtime.util_event import EventClient, LocalEventClient, share_event_client
 from ..runtime.util_format import cluster_by_value_sorted
 from ..stage.core_stage import TaskStage
+from ..stage.core_stages import TaskReducer, TaskRouter, TaskSplitter
 from ..stage.util_types import AnyTaskStage
+from .core_optimizer import WorkerOptimizer
+from .util_analyzer import analyze_bottlenecks
 from .util_estimators import calc_global_pending
-from .util_graph import OrderGraph, compute_node_levels, is_dag, source_nodes
+from .util_graph import (
+    OrderGraph,
+    compute_node_levels,
+    is_dag,
+    linear_chains,
+    node_to_scc_index,
+    source_nodes,
+    tarjan_scc,
+)
+from .util_replica import merge_edge_snapshots, merge_replica_snapshots
 from .util_serialize import build_structure_graph, format_structure_list_from_graph
 
+if TYPE_CHECKING:
+    from multiprocessing.context import ForkContext
+
 
 class TaskGraph:
     """任务图核心类，负责构建、连接和调度一组 TaskStage 节点。
@@ -43,21 +77,41 @@ class TaskGraph:
     graph_id: str
     graph_mode: str
     threads: list[threading.Thread]
+    process_groups: list[list[str]]
     stage_dict: dict[str, AnyTaskStage]
     status_dict: dict[str, dict[str, Any]]
     status_timestamp: float
+    funnel_stats: dict[str, dict[str, Any]]
+    edge_stats: dict[str, dict[str, Any]]
     input_ids: dict[str, set[int]]
     source_stages: list[AnyTaskStage]
     _analysis_dirty: bool
     out_edges: dict[str, list[str]]
     in_edges: dict[str, list[str]]
+    edge_transports: dict[tuple[str, str], str | QueueBackend[Any]]
+    edge_channels: dict[tuple[str, str], EdgeChannel]
     order_graph: OrderGraph
     start_time: float
     reporter: ReporterProtocol
     ctree_client: EventClient
+    funnel: FunnelContext
     structure_graph: dict[str, Any]
     is_dag: bool
     layers_dict: dict[int, list[str]]
+    fusion: bool
+    fused_chains: list[list[str]]
+    inline_stages: list[str]
+    worker_budget: int
+    rebalance_interval: float | None
+    worker_optimizer: WorkerOptimizer | None
+    worker_stats: dict[str, Any]
+    replica_dict: dict[str, list[AnyTaskStage]]
+    replica_balance: dict[str, str]
+    replica_targets: dict[tuple[str, str], ReplicaTarget[Any]]
+    replica_channels: dict[tuple[str, str], list[EdgeChannel]]
+    _fusion_applied: bool
+    _replication_applied: bool
+    _process_shared: bool
 
     # ==== 初始化 ====
 
@@ -79,10 +133,12 @@ class TaskGraph:
         - 如需重复执行，请重新构建新的 TaskGraph 与节点对象。
 
         :param name: 任务图名称
-        :param graph_mode: 图执行模式, 可选值为 'serial'（串行）、'thread'（线程）或 'async'（异步），默认 'serial'
+        :param graph_mode: 图执行模式, 可选值为 'serial'（串行）、'thread'（线程）、
+            'async'（异步）或 'process'（多进程），默认 'serial'
         """
         self._set_name(name)
         self.set_graph_mode(graph_mode)
+        self.set_funnel(get_default_funnel())
         self.set_reporter(NullTaskReporter())
         self.set_ctree(LocalEventClient())
 
@@ -97,6 +153,10 @@ class TaskGraph:
         # 用于保存所有子线程的引用
         self.threads = []
 
+        # 用于保存 process 图模式下用户指定的进程分组（节点名称列表）
+        self.process_groups = []
+        self._process_shared = False
+
         # 用于保存每个节点的运行信息
         self.stage_dict = {}
 
@@ -106,6 +166,12 @@ class TaskGraph:
         # 用于保存最近一次状态快照对应的统一时间戳
         self.status_timestamp = 0.0
 
+        # 用于保存最近一次状态快照中 fallback / log spout 的队列积压统计
+        self.funnel_stats = {}
+
+        # 用于保存最近一次状态快照中各条边的容量占用与生产者阻塞统计
+        self.edge_stats = {}
+
         # 用于保存每个节点的输入任务ID集合
         self.input_ids = defaultdict(set)
 
@@ -116,8 +182,38 @@ class TaskGraph:
         self.out_edges = defaultdict(list)
         self.in_edges = defaultdict(list)
         self.order_graph = OrderGraph()
+
+        # 用于保存每条边选择的队列后端（名称或实例）
+        self.edge_transports = {}
+
+        # 用于保存每条边的通道（容量额度与阻塞统计）
+        self.edge_channels = {}
         self._analysis_dirty = True
 
+        # 算子融合开关与融合分析得到的线性链（由 _build_analysis 计算）
+        self.fusion = False
+        self.fused_chains = []
+
+        # inline 图模式下由上游就地执行的节点（由 _build_analysis 计算）
+        self.inline_stages = []
+        self._fusion_applied = False
+
+        # 工作线程总数预算，0 表示不限制；设置重新分配间隔时由优化器按预算调整并发数
+        self.worker_budget = 0
+        self.rebalance_interval = None
+        self.worker_optimizer = None
+
+        # 用于保存最近一次状态快照中的并发预算与各节点分配结果
+        self.worker_stats = {}
+
+        # 副本：逻辑节点名称 → 原节点之外的副本与负载均衡策略
+        self.replica_dict = {}
+        self.replica_balance = {}
+        # 启动时接线得到的分发目标（上游实例名称, 逻辑节点名称）与副本出边通道
+        self.replica_targets = {}
+        self.replica_channels = {}
+        self._replication_applied = False
+
         # 用于保存任务图启动时间
         self.start_time = 0.0
 
@@ -138,6 +234,7 @@ class TaskGraph:
             self.order_graph.add_node(stage_name)
 
             stage.set_ctree(self.ctree_client)
+            stage.set_funnel(self.funnel)
 
         self._analysis_dirty = True
 
@@ -145,13 +242,55 @@ class TaskGraph:
         self,
         from_stages: list[TaskStage[Any, R]],
         to_stages: list[TaskStage[R, Any]],
+        transport: str | QueueBackend[Any] = "queue",
+        batch_size: int = 1,
+        batch_delay: float | None = DEFAULT_BATCH_DELAY,
+        capacity: int = 0,
     ) -> None:
         """
         建立超边连接：from_stages 中的每个节点连接到 to_stages 中的每个节点。
 
+        ``transport`` 选择承载这些边的队列后端。下游节点的输入队列由其全部入边
+        共享，因此后端实际作用于下游节点的输入队列：同一节点的入边中，除默认的
+        'queue' 外只能选择同一种后端，任一入边选择后整个输入队列随之切换。
+
+        - 'queue'：默认，进程内为 ``queue.Queue``，``process`` 图模式下自动改为 'mp'
+        - 'deque' / 'socket' / 'broker'：连接时立即切换，见 :func:`make_queue_backend`
+        - 'mp' / 'shm_ring'：跨进程后端，仅在 ``process`` 图模式下生效
+        - :class:`QueueBackend` 实例：连接时立即切换为该实例
+
+        ``batch_size > 1`` 时边以批量方式传输：上游按目标暂存结果，攒满
+        ``batch_size`` 条或等待超过 ``batch_delay`` 秒后整批入队，适合任务
+        粒度很细、队列加锁开销占主导的边。
+
+        ``capacity > 0`` 时每条边各自持有 ``capacity`` 份信用额度，在途（已发出
+        但下游尚未取出）的结果数不超过该值，额度耗尽时上游阻塞。与节点的
+        ``max_queue_size`` 由全部入边共享不同，额度按边分配，快的上游不会挤占
+        慢的上游的份额。各边的阻塞次数与时间见 :meth:`get_status_snapshot`。
+
         :param from_stages: 上游节点列表
         :param to_stages: 下游节点列表
-        """
+        :param transport: 后端名称或后端实例，默认 'queue'
+        :param batch_size: 每批最多结果数，默认 1（不批量）
+        :param batch_delay: 批次最长等待秒数，``None`` 表示只在攒满或上游结束时刷新
+        :param capacity: 每条边的在途结果数上限，默认 0（不限制）；
+            开启批量时需不小于 ``batch_size``
+        :raises InvalidOptionError: transport 不是受支持的取值
+        :raises ConfigurationError: 同一下游节点的入边选择了不同的后端，或批量、容量参数不合法
+        """
+        if isinstance(transport, str) and transport not in VALID_QUEUE_BACKENDS:
+            raise InvalidOptionError("edge transport", transport, VALID_QUEUE_BACKENDS)
+        validate_batch_options(batch_size, batch_delay)
+        validate_edge_capacity(capacity, batch_size)
+        if transport != "queue":
+            for to_stage in to_stages:
+                current = self._get_stage_transport(to_stage.get_name())
+                if current not in ("queue", transport):
+                    raise ConfigurationError(
+                        f"conflicting transports for stage {to_stage.get_name()}: "
+                        f"{current!r} and {transport!r}"
+                    )
+
         for from_stage in from_stages:
             from_name = from_stage.get_name()
             from_out_queue = from_stage.result_queue
@@ -166,13 +305,27 @@ class TaskGraph:
                 if to_name not in self.stage_dict:
                     raise NodeNotFoundError(f"to stage not found: {to_name}")
 
+                if transport != "queue" and transport not in PROCESS_QUEUE_BACKENDS:
+                    if isinstance(transport, str):
+                        if self._get_stage_transport(to_name) != transport:
+                            to_in_queue.set_backend(
+                                make_queue_backend(transport, topic=to_name)
+                            )
+                    else:
+                        to_in_queue.set_backend(transport)
+
                 to_stage.prev_binding(from_stage)
-                from_out_queue.add_queue(to_in_queue, to_name)
+                channel = from_out_queue.add_queue(
+                    to_in_queue, to_name, batch_size, batch_delay, capacity
+                )
                 to_in_queue.add_source_name(from_name)
+                to_in_queue.bind_channel(channel)
                 self.order_graph.add_edge(from_name, to_name)
 
                 self.out_edges[from_name].append(to_name)
                 self.in_edges[to_name].append(from_name)
+                self.edge_transports[(from_name, to_name)] = transport
+                self.edge_channels[(from_name, to_name)] = channel
 
         self._analysis_dirty = True
 
@@ -191,13 +344,32 @@ class TaskGraph:
         """
         设置图执行模式。
 
-        :param graph_mode: 图执行模式, 可选值为 'serial'（串行）或 'thread'（线程）或 'async'（异步）
-        :raises InvalidOptionError: graph_mode 不是 'serial' 或 'thread' 或 'async'
+        ``process`` 模式下每个节点（或 :meth:`set_process_groups` 指定的一组节点）
+        运行在独立的 fork 子进程中，边由跨进程队列承载。
+
+        ``inline`` 模式与 ``serial`` 一样在当前线程内逐个启动节点，但执行模式为
+        'serial' 的下游节点不再单独启动：上游每成功一个任务，结果立即在同一线程内
+        深度优先地流经这些下游节点，再取下一个输入。首个结果无需等待上游处理完
+        全部输入，中间结果也不会在队列中堆积。一个节点可就地执行需满足：
+
+        - 自身与全部上游的执行模式均为 'serial'
+        - 全部入边使用默认 'queue' 后端，未开启批量，也未限制容量
+        - 不在环上
+
+        其余节点仍按 ``serial`` 模式的方式依次启动。
+
+        ``layered`` 模式按 :attr:`layers_dict` 逐层启动节点：同一层的节点并发运行，
+        整层结束后才启动下一层，同时运行的节点受 :meth:`set_worker_budget` 约束。
+
+        :param graph_mode: 图执行模式, 可选值为 'serial'（串行）、'inline'（就地串行）、
+            'layered'（分层并发）、'thread'（线程）、'async'（异步）或 'process'（多进程）
+        :raises InvalidOptionError: graph_mode 不是受支持的取值
         """
-        valid_modes = ("serial", "thread", "async")
+        valid_modes = ("serial", "inline", "layered", "thread", "async", "process")
         if graph_mode not in valid_modes:
             raise InvalidOptionError("graph mode", graph_mode, valid_modes)
         self.graph_mode = graph_mode
+        self._analysis_dirty = True
 
     def set_stage_execution_mode(self, execution_mode: str) -> None:
         """
@@ -205,10 +377,150 @@ class TaskGraph:
 
         :param execution_mode: 节点内部执行模式, 可选值为 'serial', 'thread' 或 'async'
         """
-        for stage in self.stage_dict.values():
+        for stage in self._get_all_stages():
             stage.set_execution_mode(execution_mode)
         self._build_analysis()
 
+    def set_process_groups(self, groups: list[list[str]]) -> None:
+        """
+        设置 ``process`` 图模式下的进程分组。
+
+        同组节点在同一子进程内以线程方式并发运行，组间通过跨进程队列通信；
+        未出现在任何分组中的节点各自独占一个进程。被复制的节点按逻辑名称
+        分组，其全部实例都运行在该组的进程内。
+
+        :param groups: 节点名称分组列表
+        :raises NodeNotFoundError: 分组中存在未注册的节点
+        :raises DuplicateNodeError: 同一节点出现在多个分组中
+        """
+        seen: set[str] = set()
+        for group in groups:
+            for name in group:
+                if name not in self.stage_dict:
+                    raise NodeNotFoundError(f"process group stage not found: {name}")
+                if name in seen:
+                    raise DuplicateNodeError(f"duplicate process group stage: {name}")
+                seen.add(name)
+        self.process_groups = [list(group) for group in groups if group]
+
+    def set_fusion(self, enabled: bool = True) -> None:
+        """
+        开启或关闭算子融合。
+
+        开启后，启动时把极大的线性可融合链合并为一个调度循环：链首节点的
+        工作线程依次调用链上各节点的任务函数，省去链内的队列中转与调度线程。
+        一条边可融合需满足：
+
+        - 上游只有这一条出边，下游只有这一条入边
+        - 两端都不是 :class:`TaskSplitter` / :class:`TaskRouter` /
+          :class:`TaskReducer`，也都未被复制
+        - 两端执行模式相同，且为 'serial' 或 'thread'；设置了分区键的下游须为 'serial'
+        - 使用默认 'queue' 后端，未开启批量，也未限制容量
+
+        链上各节点的计数器、重试与失败记录保持独立，链内节点以链首的并发度运行。
+        ``process`` 图模式下不做融合，``inline`` 图模式下由就地执行取代。融合结果见
+        :meth:`get_structure_list`。
+
+        :param enabled: 是否开启，默认 True
+        """
+        self.fusion = enabled
+        self._analysis_dirty = True
+
+    def set_worker_budget(
+        self, budget: int, *, rebalance_interval: float | None = None
+    ) -> None:
+        """
+        设置任务图的工作线程总数预算。
+
+        'serial' 节点占用 1 个名额，其余节点占用 ``max_workers`` 个名额。
+
+        - ``layered`` 图模式下，名额不足时同层剩余节点等待已运行的节点结束后再启动。
+          同一强连通分量内的节点互相等待对方的终止信号，总是一起启动；占用超过
+          预算的节点或分量单独运行。
+        - 设置 ``rebalance_interval`` 时，运行期间每隔该秒数按各节点上一周期的
+          到达速率、平均执行耗时与积压，依 Little 定律在预算内重新分配 'thread'
+          节点的 ``max_workers``（见 :class:`WorkerOptimizer`），其余节点以及
+          设置了分区键的节点名额固定。分配结果与原因见 :meth:`get_status_snapshot` 的 ``workers``。
+          ``process`` 图模式不支持。
+
+        :param budget: 工作线程总数预算，0 表示不限制
+        :param rebalance_interval: 重新分配的间隔（秒），默认不重新分配
+        :raises ConfigurationError: budget 为负数，或重新分配时 budget 或间隔不为正数
+        """
+        if budget < 0:
+            raise ConfigurationError(f"worker budget must be non-negative: {budget}")
+        if rebalance_interval is not None and (budget == 0 or rebalance_interval <= 0):
+            raise ConfigurationError(
+                "worker rebalancing requires a positive budget and interval, "
+                f"got budget={budget}, rebalance_interval={rebalance_interval}"
+            )
+        self.worker_budget = budget
+        self.rebalance_interval = rebalance_interval
+
+    def replicate(
+        self, stage: AnyTaskStage, n: int, balance: str | None = None
+    ) -> None:
+        """
+        将节点扩展为 ``n`` 个实例，在一个逻辑节点后并行运行。
+
+        副本由 :meth:`TaskStage.make_replica` 创建，命名为 ``<name>#1`` ...，
+        与原节点一样单独启动（``process`` 图模式下各占一个进程），因此
+        'serial' 节点以及固定为串行的 :class:`TaskSplitter` / :class:`TaskRouter` /
+        :class:`TaskReducer` 也能横向扩展。
+
+        - 上游发往该节点的结果按 ``balance`` 分给各实例：'round_robin' 依次轮流，
+          'least_queued' 分给输入队列积压最少的实例，'key' 按节点的分区键
+          （见 :meth:`TaskStage.set_partition_key`）经一致性哈希分给固定的实例；
+          终止信号发给全部实例
+        - 各实例的出边沿用原节点出边的配置，下游等待全部实例结束
+        - 直接注入的初始任务按实例轮流分配，'key' 策略下同样按分区键分配
+        - 状态快照与结构输出中各实例合并在逻辑节点名下，见 :meth:`get_status_snapshot`
+
+        副本复制调用时原节点的配置，之后对原节点的单独设置不会同步到副本。
+        副本在启动时接线，可在 :meth:`connect` 之前或之后调用；副本节点不参与
+        算子融合与 ``inline`` 就地执行。再次调用会替换此前的副本，``n`` 为 1 时
+        取消复制。
+
+        :param stage: 已加入任务图的节点
+        :param n: 实例总数（含原节点）
+        :param balance: 负载均衡策略，可选 'round_robin'、'least_queued'、'key'；
+            默认设置了分区键的节点为 'key'，否则为 'round_robin'
+        :raises NodeNotFoundError: 节点不在任务图中
+        :raises ConfigurationError: n 小于 1，或 'key' 策略的节点未设置分区键
+        :raises InvalidOptionError: balance 不是受支持的取值
+        :raises DuplicateNodeError: 副本名称与已有节点重名
+        :raises RuntimeStateError: 任务图已完成副本接线
+        """
+        name = stage.get_name()
+        if self.stage_dict.get(name) is not stage:
+            raise NodeNotFoundError(f"stage not found: {name}")
+        if n < 1:
+            raise ConfigurationError(f"replica count must be >= 1: {n}")
+        if balance is None:
+            balance = "round_robin" if stage.partition_key is None else "key"
+        if balance not in VALID_BALANCE_POLICIES:
+            raise InvalidOptionError("balance policy", balance, VALID_BALANCE_POLICIES)
+        if balance == "key" and stage.partition_key is None:
+            raise ConfigurationError(
+                f"stage {name} has no partition_key for balance policy 'key'"
+            )
+        if self._replication_applied:
+            raise RuntimeStateError("cannot replicate stages after the graph started")
+
+        replica_names = [f"{name}#{i}" for i in range(1, n)]
+        for replica_name in replica_names:
+            if replica_name in self.stage_dict:
+                raise DuplicateNodeError(f"duplicate stage name: {replica_name}")
+
+        _ = self.replica_dict.pop(name, None)
+        _ = self.replica_balance.pop(name, None)
+        if n > 1:
+            self.replica_dict[name] = [
+                stage.make_replica(replica_name) for replica_name in replica_names
+            ]
+            self.replica_balance[name] = balance
+        self._analysis_dirty = True
+
     def set_reporter(self, reporter: ReporterProtocol) -> None:
         """
         设定任务图绑定的 reporter。
@@ -216,6 +528,7 @@ class TaskGraph:
         :param reporter: 需绑定到当前任务图的 reporter 实例
         """
         self.reporter = reporter
+        reporter.log_inlet = self.funnel.log_inlet
 
     def set_ctree(self, ctree_client: EventClient) -> None:
         """
@@ -226,9 +539,26 @@ class TaskGraph:
         self.ctree_client = ctree_client
         if not hasattr(self, "stage_dict"):
             return
-        for stage in self.stage_dict.values():
+        for stage in self._get_all_stages():
             stage.set_ctree(ctree_client)
 
+    def set_funnel(self, funnel: FunnelContext) -> None:
+        """
+        设置任务图及其全部节点共享的 funnel 上下文。
+
+        同一进程内并发运行的多个任务图应各自绑定独立的上下文，
+        以免共用 fallback 文件、日志文件与 spout 生命周期。
+
+        :param funnel: funnel 上下文实例
+        """
+        self.funnel = funnel
+        if hasattr(self, "reporter"):
+            self.reporter.log_inlet = funnel.log_inlet
+        if not hasattr(self, "stage_dict"):
+            return
+        for stage in self._get_all_stages():
+            stage.set_funnel(funnel)
+
     # ==== 分析图 ====
 
     def _ensure_analysis(self) -> None:
@@ -244,9 +574,16 @@ class TaskGraph:
         """
         source_names = source_nodes(self.order_graph)
         self.source_stages = [self.stage_dict[name] for name in source_names]
+        self.fused_chains = self._find_fused_chains()
+        self.inline_stages = self._find_inline_stages()
 
         self.structure_graph = build_structure_graph(
-            self.stage_dict, self.out_edges, self.source_stages
+            self.stage_dict,
+            self.out_edges,
+            self.source_stages,
+            self.fused_chains,
+            self.inline_stages,
+            {name: len(replicas) + 1 for name, replicas in self.replica_dict.items()},
         )
 
         self.is_dag = is_dag(self.order_graph)
@@ -255,21 +592,104 @@ class TaskGraph:
         self.layers_dict = cluster_by_value_sorted(stage_level_dict)
         self._analysis_dirty = False
 
-        if not self.is_dag and self.graph_mode == "serial":
+        if not self.is_dag and self.graph_mode in ("serial", "inline"):
             warnings.warn(
-                "TaskGraph contains a cycle while graph_mode='serial'; "
+                f"TaskGraph contains a cycle while graph_mode={self.graph_mode!r}; "
                 "serial startup may block or leave tasks unconsumed. "
                 "Consider using graph_mode='thread' or 'async'.",
                 UserWarning,
                 stacklevel=2,
             )
 
-    def put_source_signal(self) -> None:
+    def _find_fused_chains(self) -> list[list[str]]:
+        """
+        按 :meth:`set_fusion` 的规则查找可融合的线性链。
+
+        :return: 链列表，未开启融合或为 ``process`` / ``inline`` 图模式时为空
+        """
+        if not self.fusion or self.graph_mode in ("process", "inline"):
+            return []
+        return linear_chains(self.order_graph, self._can_fuse_edge)
+
+    def _find_inline_stages(self) -> list[str]:
+        """
+        按 :meth:`set_graph_mode` 中 ``inline`` 模式的规则查找可就地执行的节点。
+
+        :return: 节点名称列表，非 ``inline`` 图模式时为空
+        """
+        if self.graph_mode != "inline":
+            return []
+
+        cyclic = {
+            name
+            for scc in tarjan_scc(self.order_graph)
+            for name in scc
+            if len(scc) > 1 or name in self.out_edges.get(name, [])
+        }
+        return [
+            name
+            for name, stage in self.stage_dict.items()
+            if stage.execution_mode == "serial"
+            and self.in_edges.get(name)
+            and name not in cyclic
+            and name not in self.replica_dict
+            and all(
+                self.stage_dict[from_name].execution_mode == "serial"
+                and from_name not in self.replica_dict
+                and self._is_plain_edge(from_name, name)
+                for from_name in self.in_edges[name]
+            )
+        ]
+
+    def _can_fuse_edge(self, from_name: str, to_name: str) -> bool:
+        """
+        判断一条边两端的节点与边配置是否允许融合。
+
+        :param from_name: 上游节点名称
+        :param to_name: 下游节点名称
+        :return: 是否可融合
+        """
+        if from_name in self.replica_dict or to_name in self.replica_dict:
+            return False
+        from_stage = self.stage_dict[from_name]
+        to_stage = self.stage_dict[to_name]
+        special_types = (TaskSplitter, TaskRouter, TaskReducer)
+        if isinstance(from_stage, special_types) or isinstance(to_stage, special_types):
+            return False
+        if from_stage.execution_mode not in ("serial", "thread"):
+            return False
+        # 融合后下游在上游的工作线程中执行，无法按分区键保序
+        if to_stage.partition_key is not None and to_stage.execution_mode != "serial":
+            return False
+        return from_stage.execution_mode == to_stage.execution_mode and (
+            self._is_plain_edge(from_name, to_name)
+        )
+
+    def _is_plain_edge(self, from_name: str, to_name: str) -> bool:
+        """
+        判断一条边是否为未开启批量与容量限制的默认 'queue' 边，只有这样的边
+        可以改为在上游线程内直接调用下游。
+
+        :param from_name: 上游节点名称
+        :param to_name: 下游节点名称
+        :return: 是否为默认边
+        """
+        return (
+            self.edge_transports[(from_name, to_name)] == "queue"
+            and self.edge_channels[(from_name, to_name)].capacity == 0
+            and self.stage_dict[from_name].result_queue.get_batch_size(to_name) == 1
+        )
+
+    def put_source_signal(self, stop: threading.Event | None = None) -> None:
         """
         将终止信号放入所有源节点的队列中。
+
+        :param stop: 停止事件，默认 None；置位后放弃尚未写入的终止信号
         """
         for source_stage in self.source_stages:
-            source_stage.put_signal()
+            for stage in self._get_replica_group(source_stage.get_name()):
+                if not stage.put_signal(stop):
+                    return
 
     # ==== 执行 ====
 
@@ -287,14 +707,45 @@ class TaskGraph:
         :return: ``None``
         """
         self._build_analysis()
-        with funnel_scope():
+        with funnel_scope(self.funnel):
             for stage_name, tasks in init_tasks_dict.items():
-                for task in tasks:
-                    self.stage_dict[stage_name].put_task(task)
+                self._put_tasks(stage_name, tasks)
             if if_put_signal:
                 self.put_source_signal()
             self.start()
 
+    def _put_tasks(
+        self,
+        name: str,
+        tasks: Iterable[Any],
+        stop: threading.Event | None = None,
+    ) -> bool:
+        """
+        向节点注入任务，被复制的节点按实例轮流分配，'key' 策略下按分区键分配。
+
+        分区键函数抛出异常的任务记为首个实例的失败任务。
+
+        :param name: 逻辑节点名称
+        :param tasks: 任务可迭代对象
+        :param stop: 停止事件，默认 None；置位后放弃剩余任务
+        :return: 全部任务注入完成返回 True，因 ``stop`` 放弃时返回 False
+        """
+        members = self._get_replica_group(name)
+        if self.replica_balance.get(name) == "key":
+            target = self._make_replica_target(name)
+            for task in tasks:
+                try:
+                    index = target.pick_by_key(task)
+                except Exception as exception:
+                    members[0].reject_task(task, exception)
+                    continue
+                if not members[index].put_task(task, stop):
+                    return False
+            return True
+
+        cycled = cycle(members)
+        return all(next(cycled).put_task(task, stop) for task in tasks)
+
     async def run_async(
         self,
         init_tasks_dict: dict[str, Iterable[Any]],
@@ -309,10 +760,9 @@ class TaskGraph:
         :return: ``None``
         """
         self._build_analysis()
-        with funnel_scope():
+        with funnel_scope(self.funnel):
             for stage_name, tasks in init_tasks_dict.items():
-                for task in tasks:
-                    self.stage_dict[stage_name].put_task(task)
+                self._put_tasks(stage_name, tasks)
             if if_put_signal:
                 self.put_source_signal()
             await self.start_async()
@@ -324,9 +774,16 @@ class TaskGraph:
         *,
         filter_by_error_type: bool = False,
         if_put_signal: bool = True,
+        chunk_size: int = 1000,
+        decode_workers: int = 0,
     ) -> None:
         """
-        从 sqlite 持久化库中读取任务，按 stage 分组后启动任务图。
+        从 sqlite 持久化库中按 stage 流式读取任务，并在任务图运行期间持续注入。
+
+        ``thread`` 图模式下，注入线程与任务图并发运行，节点输入队列有界时会
+        自然形成背压；``serial`` / ``inline`` / ``layered`` 图模式下节点分批运行，
+        无法边读边消费，开启算子融合时融合节点只在启动时执行已注入的任务，
+        这两种情况都在启动前完成注入（仍按块读取，不构建全量中间列表）。
 
         :param db_path: sqlite 数据库文件路径
         :param statuses: 记录状态过滤列表，默认 ``["failed", "pending"]``
@@ -334,24 +791,70 @@ class TaskGraph:
             ``error_type``，默认 ``False``
         :param if_put_signal: 是否在恢复任务注入后，为所有源节点补发终止信号，
             默认 ``True``
+        :param chunk_size: 每次从数据库读取的记录数量，默认 1000
+        :param decode_workers: 并行解码线程数，默认 0（在注入线程中解码）
         """
-        statuses = ["failed", "pending"] if statuses is None else statuses
-        grouped_records = load_tasks_grouped_by_stage(db_path, statuses)
-        tasks: dict[str, Iterable[Any]] = {}
-
-        for name, records in grouped_records.items():
-            stage = self.stage_dict[name]
-            if filter_by_error_type and name in self.stage_dict:
-                retry_error_type_names = stage.metrics.get_retry_error_type_names()
-                records = [
-                    record
-                    for record in records
-                    if str(record["error_type"]) in retry_error_type_names
-                    or record["status"] == "pending"
-                ]
-            tasks[name] = [record["task_json"] for record in records]
-
-        self.run(tasks, if_put_signal=if_put_signal)
+        statuses = ["failed", "pending"] if statuses is None else list(statuses)
+        self._build_analysis()
+        # 任务图结束（含节点异常退出）后置位，注入线程随即放弃阻塞中的写入
+        stop = threading.Event()
+
+        def feed() -> None:
+            try:
+                for name, stage in self.stage_dict.items():
+                    error_types = (
+                        stage.metrics.get_retry_error_type_names()
+                        if filter_by_error_type
+                        else None
+                    )
+                    # 副本直接接收的任务记录在副本名下，同样恢复到逻辑节点
+                    for member in self._get_replica_group(name):
+                        for chunk in iter_stage_task_chunks(
+                            db_path,
+                            member.get_name(),
+                            statuses,
+                            error_types=error_types,
+                            chunk_size=chunk_size,
+                            decode_workers=decode_workers,
+                        ):
+                            if not self._put_tasks(name, chunk, stop):
+                                return
+            finally:
+                # 注入异常时也要补发终止信号，避免运行中的节点永久等待。
+                if if_put_signal:
+                    self.put_source_signal(stop)
+
+        with funnel_scope(self.funnel):
+            # 注入前先完成接线，避免注入线程与启动时的接线并发
+            self._prepare_graph()
+            if self.graph_mode in ("serial", "inline", "layered") or self.fused_chains:
+                # 融合节点只在启动时执行已注入的任务，同样需先完成注入
+                feed()
+                self.start()
+                return
+            if self.graph_mode == "process":
+                # 注入线程与子进程并发写入，需先完成队列迁移。
+                self._share_process_state(self._get_process_context())
+
+            feeder_errors: list[BaseException] = []
+
+            def feed_in_thread() -> None:
+                try:
+                    feed()
+                except BaseException as exception:
+                    feeder_errors.append(exception)
+
+            feeder = threading.Thread(
+                target=feed_in_thread, name=f"{self.name}-restore", daemon=True
+            )
+            feeder.start()
+            try:
+                self.start()
+            finally:
+                stop.set()
+                feeder.join()
+            if feeder_errors:
+                raise feeder_errors[0]
 
     # ==== 启动 ====
 
@@ -366,14 +869,216 @@ class TaskGraph:
 
         :return: ``None``
         """
-        get_log_inlet().start_graph(self.name, self.get_structure_list())
+        self._prepare_graph()
+        self.funnel.log_inlet.start_graph(self.name, self.get_structure_list())
+        self.funnel.fallback_spout.set_graph_id(self.graph_id)
         self.reporter.start()
 
+        # 融合节点需在驱动它的上游启动前就绪，再执行启动前已注入的任务
+        fused_stages = self._get_fused_stages()
+        for stage in fused_stages:
+            stage.begin_fused()
+        for stage in fused_stages:
+            stage.run_queued()
+
+        self._start_worker_optimizer()
+
+    def _start_worker_optimizer(self) -> None:
+        """
+        按 :meth:`set_worker_budget` 的配置启动并发预算优化器。
+
+        :raises ConfigurationError: ``process`` 图模式下开启了重新分配
+        """
+        if self.rebalance_interval is None:
+            return
+        if self.graph_mode == "process":
+            raise ConfigurationError(
+                "worker rebalancing is not supported in graph_mode 'process'"
+            )
+
+        # 分区节点的执行道数在启动时确定，与非 thread 节点一样计为固定开销
+        driving = self._get_driving_stages()
+        stages = [
+            stage
+            for stage in driving
+            if stage.execution_mode == "thread" and stage.partition_key is None
+        ]
+        fixed = sum(
+            self._get_stage_cost(stage) for stage in driving if stage not in stages
+        )
+        self.worker_optimizer = WorkerOptimizer(
+            stages,
+            max(len(stages), self.worker_budget - fixed),
+            self.rebalance_interval,
+        )
+        self.worker_optimizer.start()
+
+    def _prepare_graph(self) -> None:
+        """
+        完成副本接线与算子融合（幂等）。
+
+        两者都会改写节点的队列与计数绑定，须在任何注入线程启动前完成，
+        否则注入与接线并发进行会丢失任务计数或写入旧队列。
+        """
+        self._apply_replication()
+        self._apply_fusion()
+
+    def _apply_fusion(self) -> None:
+        """按融合分析的结果，将节点融合进其上游节点的调度循环（幂等）。"""
+        self._ensure_analysis()
+        if self._fusion_applied:
+            return
+        for chain in self.fused_chains:
+            for from_name, to_name in pairwise(chain):
+                self.stage_dict[from_name].fuse_next(self.stage_dict[to_name])
+        for to_name in self.inline_stages:
+            for from_name in self.in_edges[to_name]:
+                self.stage_dict[from_name].fuse_next(self.stage_dict[to_name])
+        self._fusion_applied = True
+
+    def _apply_replication(self) -> None:
+        """
+        按 :meth:`replicate` 的配置为副本接线（幂等）。
+
+        - 副本的输入队列沿用原节点入边选择的后端
+        - 原节点的每条出边在各副本上按相同配置复制一份，下游把副本登记为来源
+        - 发往被复制节点的每个上游实例（含被复制的上游的副本）改为写入
+          :class:`ReplicaTarget`，各实例把这些上游登记为来源
+        - 按新的拓扑重新绑定各节点的输入任务计数器
+
+        :raises ConfigurationError: 被复制节点的入边指定了后端实例，无法由多个实例共享
+        """
+        if self._replication_applied:
+            return
+        self._replication_applied = True
+        if not self.replica_dict:
+            return
+
+        for name, replicas in self.replica_dict.items():
+            transport = self._get_stage_transport(name)
+            if isinstance(transport, QueueBackend):
+                raise ConfigurationError(
+                    f"stage {name} uses a queue backend instance and cannot be "
+                    "replicated; pass a backend name instead"
+                )
+            if transport not in ("queue", *PROCESS_QUEUE_BACKENDS):
+                for replica in replicas:
+                    replica.task_queue.set_backend(
+                        make_queue_backend(transport, topic=replica.get_name())
+                    )
+
+        for (from_name, to_name), channel in list(self.edge_channels.items()):
+            to_stage = self.stage_dict[to_name]
+            out_queue = self.stage_dict[from_name].result_queue
+            channels = [channel]
+            for replica in self.replica_dict.get(from_name, []):
+                replica_channel = replica.result_queue.add_queue(
+                    to_stage.task_queue,
+                    to_name,
+                    out_queue.get_batch_size(to_name),
+                    out_queue.get_batch_delay(to_name),
+                    channel.capacity,
+                )
+                to_stage.task_queue.add_source_name(replica.get_name())
+                to_stage.task_queue.bind_channel(replica_channel)
+                channels.append(replica_channel)
+            self.replica_channels[(from_name, to_name)] = channels[1:]
+
+            if to_name not in self.replica_dict:
+                continue
+            members = self._get_replica_group(to_name)
+            for from_stage, from_channel in zip(
+                self._get_replica_group(from_name), channels, strict=True
+            ):
+                target = self._make_replica_target(to_name)
+                from_stage.result_queue.set_target_queue(to_name, target)
+                for member in members[1:]:
+                    member.task_queue.add_source_name(from_stage.get_name())
+                    member.task_queue.bind_channel(from_channel)
+                self.replica_targets[(from_stage.get_name(), to_name)] = target
+
+        for stage in self._get_all_stages():
+            stage.metrics.clear_task_counters()
+        self._bind_task_counters()
+
+    def _make_replica_target(self, name: str) -> ReplicaTarget[Any]:
+        """
+        为被复制节点创建一个分发目标。
+
+        'key' 策略下各分发目标的哈希环相同，同一个键无论来自哪个上游实例，
+        都进入同一个副本；分区键函数抛出异常的信封记为首个实例的失败任务。
+
+        :param name: 被复制的逻辑节点名称
+        :return: 分发目标
+        """
+        members = self._get_replica_group(name)
+        return ReplicaTarget(
+            [member.task_queue for member in members],
+            self.replica_balance[name],
+            members[0].partition_key,
+            members[0].handle_task_fail,
+        )
+
+    def _bind_task_counters(self) -> None:
+        """
+        按边把上游的绑定计数器注册到下游的输入任务计数器。
+
+        经 :class:`ReplicaTarget` 分发的边，各实例改为绑定分发目标中各自的计数器。
+        """
+        for from_name, to_name in self.edge_channels:
+            to_stage = self.stage_dict[to_name]
+            for from_stage in self._get_replica_group(from_name):
+                target = self.replica_targets.get((from_stage.get_name(), to_name))
+                if target is None:
+                    to_stage.prev_binding(from_stage)
+                    continue
+                for member, counter in zip(
+                    self._get_replica_group(to_name), target.counters, strict=True
+                ):
+                    member.metrics.append_task_counter(counter)
+
+    def _get_replica_group(self, name: str) -> list[AnyTaskStage]:
+        """
+        获取逻辑节点的全部实例，原节点在前。
+
+        :param name: 逻辑节点名称
+        :return: 实例列表，未被复制时只有原节点
+        """
+        return [self.stage_dict[name], *self.replica_dict.get(name, [])]
+
+    def _get_all_stages(self) -> list[AnyTaskStage]:
+        """
+        获取全部节点实例，副本紧随其原节点。
+
+        :return: 节点列表
+        """
+        return [
+            stage for name in self.stage_dict for stage in self._get_replica_group(name)
+        ]
+
+    def _get_driving_stages(self) -> list[AnyTaskStage]:
+        """
+        获取需要单独启动的节点，融合进上游的节点由上游一并驱动。
+
+        :return: 节点列表，副本紧随其原节点
+        """
+        return [stage for stage in self._get_all_stages() if stage.fused_into is None]
+
+    def _get_fused_stages(self) -> list[AnyTaskStage]:
+        """
+        获取融合进上游调度循环的节点。
+
+        :return: 节点列表
+        """
+        return [
+            stage for stage in self._get_all_stages() if stage.fused_into is not None
+        ]
+
     def _finish_start(self, start_perf: float) -> list[Exception]:
         """
         启动后收尾：回收图内状态、停止上报器并记录结束日志。
 
-        ``fallback`` / ``log`` spout 的启停由外层 ``funnel_scope()`` 统一管理，
+        ``fallback`` / ``log`` spout 的启停由外层 ``funnel_scope(self.funnel)`` 统一管理，
         本方法只负责图对象自身的收尾逻辑。
 
         :param start_perf: 启动时刻的 ``perf_counter`` 时间戳，用于计算运行耗时
@@ -381,13 +1086,29 @@ class TaskGraph:
         """
         error_list: list[Exception] = []
 
+        for stage in self._get_fused_stages():
+            error_list.extend(stage.end_fused(start_perf))
+
         try:
             # 收集并持久化每个节点中未消费的任务
-            for stage in self.stage_dict.values():
+            for stage in self._get_all_stages():
                 stage.drain_task_queue()
         except Exception as exception:
             error_list.append(exception)
 
+        try:
+            # 释放 socket、共享内存等队列后端资源
+            for stage in self._get_all_stages():
+                stage.task_queue.release_queue()
+        except Exception as exception:
+            error_list.append(exception)
+
+        try:
+            if self.worker_optimizer is not None:
+                self.worker_optimizer.stop()
+        except Exception as exception:
+            error_list.append(exception)
+
         try:
             self.collect_runtime_snapshot()
         except Exception as exception:
@@ -399,7 +1120,7 @@ class TaskGraph:
             error_list.append(exception)
 
         try:
-            get_log_inlet().end_graph(self.name, time.perf_counter() - start_perf)
+            self.funnel.log_inlet.end_graph(self.name, time.perf_counter() - start_perf)
         except Exception as exception:
             error_list.append(exception)
 
@@ -430,13 +1151,19 @@ class TaskGraph:
         try:
             self._prepare_start()
 
-            if self.graph_mode == "serial":
+            if self.graph_mode in ("serial", "inline"):
                 self._execute_stages_serial()
+            elif self.graph_mode == "layered":
+                self._execute_stages_layered()
             elif self.graph_mode == "thread":
                 self._execute_stages_thread()
+            elif self.graph_mode == "process":
+                self._execute_stages_process()
             else:
                 raise InvalidOptionError(
-                    "graph mode", self.graph_mode, ("serial", "thread")
+                    "graph mode",
+                    self.graph_mode,
+                    ("serial", "inline", "layered", "thread", "process"),
                 )
         except Exception as exception:
             error_list.append(exception)
@@ -481,18 +1208,132 @@ class TaskGraph:
         """
         以串行方式逐个执行所有节点。
 
-        按节点注册顺序依次执行，每个节点执行完毕后才启动下一个。
+        按节点注册顺序依次执行，每个节点执行完毕后才启动下一个；融合进上游的
+        节点（含 ``inline`` 模式下就地执行的节点）随上游一同运行。
+
+        :raises ConfigurationError: 存在限制容量的边；上游结束前下游不会运行，
+            额度永远无法归还
         """
-        for stage in self.stage_dict.values():
+        limited = [key for key, ch in self.edge_channels.items() if ch.capacity > 0]
+        if limited:
+            raise ConfigurationError(
+                f"edge capacity requires a concurrent graph_mode, got "
+                f"{self.graph_mode!r} with limited edges: {limited}"
+            )
+        for stage in self._get_driving_stages():
             self._execute_stage(stage)
 
+    def _execute_stages_layered(self) -> None:
+        """
+        按层级逐层执行节点：同层节点并发运行，整层结束后再启动下一层。
+
+        同层节点以强连通分量为单位、按注册顺序在工作线程预算内依次启动，
+        见 :meth:`set_worker_budget`。
+
+        :raises ConfigurationError: 存在跨层且限制容量的边；下层节点启动前
+            额度永远无法归还
+        :raises ExceptionGroup: 存在启动失败的节点
+        """
+        self._ensure_analysis()
+        levels = {
+            name: level for level, names in self.layers_dict.items() for name in names
+        }
+        limited = [
+            key
+            for key, ch in self.edge_channels.items()
+            if ch.capacity > 0 and levels[key[0]] != levels[key[1]]
+        ]
+        if limited:
+            raise ConfigurationError(
+                f"edge capacity across levels blocks graph_mode 'layered', "
+                f"limited edges: {limited}"
+            )
+
+        scc_index = node_to_scc_index(tarjan_scc(self.order_graph))
+        error_list: list[Exception] = []
+        for names in self.layers_dict.values():
+            units: dict[int, list[AnyTaskStage]] = {}
+            for name in names:
+                for stage in self._get_replica_group(name):
+                    if stage.fused_into is None:
+                        units.setdefault(scc_index[name], []).append(stage)
+            error_list.extend(self._execute_layer(list(units.values())))
+
+        if error_list:
+            raise ExceptionGroup("Errors occurred in graph layers", error_list)
+
+    def _execute_layer(self, units: list[list[AnyTaskStage]]) -> list[Exception]:
+        """
+        在工作线程预算内并发执行一层节点，并等待整层结束。
+
+        :param units: 按强连通分量分组的节点，同组节点一起启动
+        :return: 节点启动过程中抛出的异常列表
+        """
+        cond = threading.Condition()
+        in_use = 0
+        error_list: list[Exception] = []
+
+        def execute(stage: AnyTaskStage) -> None:
+            try:
+                self._execute_stage(stage)
+            except Exception as exception:
+                error_list.append(exception)
+
+        def execute_unit(unit: list[AnyTaskStage], cost: int) -> None:
+            nonlocal in_use
+            threads = [
+                threading.Thread(
+                    target=execute, args=(stage,), name=stage.get_name(), daemon=True
+                )
+                for stage in unit
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            with cond:
+                in_use -= cost
+                cond.notify_all()
+
+        runners: list[threading.Thread] = []
+        for unit in units:
+            cost = 0
+            if self.worker_budget > 0:
+                cost = min(
+                    sum(self._get_stage_cost(stage) for stage in unit),
+                    self.worker_budget,
+                )
+                with cond:
+                    while in_use + cost > self.worker_budget:
+                        _ = cond.wait()
+                    in_use += cost
+            runner = threading.Thread(
+                target=execute_unit, args=(unit, cost), daemon=True
+            )
+            runner.start()
+            runners.append(runner)
+
+        for runner in runners:
+            runner.join()
+        return error_list
+
+    @staticmethod
+    def _get_stage_cost(stage: AnyTaskStage) -> int:
+        """
+        获取节点运行时占用的工作线程数。
+
+        :param stage: 节点
+        :return: 'serial' 节点为 1，其余为 ``max_workers``
+        """
+        return 1 if stage.execution_mode == "serial" else stage.max_workers
+
     def _execute_stages_thread(self) -> None:
         """
         以线程方式并发执行所有节点。
 
         每个节点在独立线程中启动，最后统一等待所有线程结束。
         """
-        for stage in self.stage_dict.values():
+        for stage in self._get_driving_stages():
             t = threading.Thread(
                 target=self._execute_stage,
                 args=(stage,),
@@ -505,13 +1346,188 @@ class TaskGraph:
         for t in self.threads:
             t.join()
 
+    def _execute_stages_process(self) -> None:
+        """
+        以多进程方式并发执行所有节点。
+
+        每个进程分组在独立的 fork 子进程中运行；子进程内的 fallback 与日志记录
+        经 :class:`FunnelBridge` 回传到当前进程的 spout。
+
+        :raises RuntimeStateError: 存在异常退出的子进程
+        """
+        ctx = self._get_process_context()
+        self._share_process_state(ctx)
+
+        bridge = FunnelBridge(
+            ctx,
+            {"fallback": self.funnel.fallback_spout, "log": self.funnel.log_spout},
+        )
+        bridge.start()
+
+        processes: list[tuple[list[str], BaseProcess]] = []
+        try:
+            for group in self._get_process_groups():
+                names = [stage.get_name() for stage in group]
+                process = ctx.Process(
+                    target=self._execute_process_group,
+                    args=(group, bridge),
+                    name="+".join(names),
+                    daemon=True,
+                )
+                process.start()
+                start_time = time.time()
+                for stage in group:
+                    stage.start_time = start_time
+                processes.append((names, process))
+
+            for _, process in processes:
+                process.join()
+        finally:
+            bridge.stop()
+
+        failed = [
+            f"{names} (exit code {process.exitcode})"
+            for names, process in processes
+            if process.exitcode != 0
+        ]
+        if failed:
+            raise RuntimeStateError(f"stage processes exited abnormally: {failed}")
+
+    def _execute_process_group(
+        self, stages: list[AnyTaskStage], bridge: FunnelBridge
+    ) -> None:
+        """
+        子进程入口：将 funnel 改接到桥接 spout，并以线程方式运行组内节点。
+
+        :param stages: 本进程负责的节点
+        :param bridge: 父进程持有的 funnel 桥接器
+        :raises ExceptionGroup: 组内存在启动失败的节点
+        """
+        fallback_spout = bridge.make_spout("fallback")
+        log_spout = bridge.make_spout("log")
+        # fork 得到的是父进程 inlet 的副本，改接不影响父进程。
+        _ = self.funnel.fallback_inlet.bind_spout(fallback_spout)
+        _ = self.funnel.log_inlet.bind_spout(log_spout)
+        fallback_spout.start()
+        log_spout.start()
+
+        error_list: list[Exception] = []
+
+        def execute(stage: AnyTaskStage) -> None:
+            try:
+                self._execute_stage(stage)
+            except Exception as exception:
+                error_list.append(exception)
+
+        try:
+            threads = [
+                threading.Thread(
+                    target=execute, args=(stage,), name=stage.get_name(), daemon=True
+                )
+                for stage in stages
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        finally:
+            log_spout.stop()
+            fallback_spout.stop()
+
+        if error_list:
+            raise ExceptionGroup("Errors occurred in stage process", error_list)
+
+    def _get_process_context(self) -> ForkContext:
+        """
+        获取 ``process`` 图模式使用的多进程上下文。
+
+        节点函数、队列与计数器通过 fork 继承，无需可 pickle；
+        跨进程传递的只有任务与结果本身。
+
+        :return: fork 多进程上下文
+        :raises ConfigurationError: 当前平台不支持 fork
+        """
+        if "fork" not in multiprocessing.get_all_start_methods():
+            raise ConfigurationError(
+                "graph_mode 'process' requires the 'fork' start method"
+            )
+        return multiprocessing.get_context("fork")
+
+    def _get_process_groups(self) -> list[list[AnyTaskStage]]:
+        """
+        按用户分组与注册顺序计算进程分组，未分组的节点各自独占一组。
+
+        分组中的被复制节点展开为全部实例，保证每个实例都有进程执行。
+
+        :return: 节点分组列表
+        """
+        grouped = {name for group in self.process_groups for name in group}
+        groups = [
+            [stage for name in group for stage in self._get_replica_group(name)]
+            for group in self.process_groups
+        ]
+        groups.extend(
+            [stage]
+            for name in self.stage_dict
+            if name not in grouped
+            for stage in self._get_replica_group(name)
+        )
+        return groups
+
+    def _share_process_state(self, ctx: BaseContext) -> None:
+        """
+        将事件客户端、节点计数器、输入队列与边通道迁移为跨进程版本（幂等）。
+
+        输入队列的传输方式由节点入边的 ``transport`` 决定，见 :meth:`connect`。
+
+        计数器迁移会解除节点间的计数绑定，因此在全部节点迁移后按边重新绑定。
+
+        :param ctx: 多进程上下文
+        """
+        if self._process_shared:
+            return
+
+        self._apply_replication()
+        self.set_ctree(share_event_client(self.ctree_client, ctx))
+        for name in self.stage_dict:
+            transport = self._get_stage_transport(name)
+            # 实例后端与线程内后端在进程模式下均退回默认的 mp 队列
+            if not isinstance(transport, str) or (
+                transport not in PROCESS_QUEUE_BACKENDS
+            ):
+                transport = "mp"
+            for stage in self._get_replica_group(name):
+                stage.share_state(ctx, transport)
+        for channel in self.edge_channels.values():
+            channel.share_state(ctx)
+        for channels in self.replica_channels.values():
+            for channel in channels:
+                channel.share_state(ctx)
+        for target in self.replica_targets.values():
+            target.share_state(ctx)
+        self._bind_task_counters()
+        self._process_shared = True
+
+    def _get_stage_transport(self, name: str) -> str | QueueBackend[Any]:
+        """
+        获取节点入边选择的非默认后端。
+
+        :param name: 节点名称
+        :return: 入边选择的后端名称或实例；均为默认时返回 'queue'
+        """
+        for from_name in self.in_edges.get(name, []):
+            transport = self.edge_transports[(from_name, name)]
+            if transport != "queue":
+                return transport
+        return "queue"
+
     async def _execute_stages_async(self) -> None:
         """
         异步执行所有节点：全图并发执行。
         """
         tasks = [
             asyncio.create_task(self._execute_stage_async(stage))
-            for stage in self.stage_dict.values()
+            for stage in self._get_driving_stages()
         ]
         await asyncio.gather(*tasks)
 
@@ -576,8 +1592,14 @@ class TaskGraph:
         running_processed_map: dict[str, int] = {}
         running_pending_map: dict[str, int] = {}
 
-        for stage_name, stage in self.stage_dict.items():
-            snapshot = stage.snapshot(interval)
+        for stage_name in self.stage_dict:
+            members = self._get_replica_group(stage_name)
+            if len(members) == 1:
+                snapshot = members[0].snapshot(interval)
+            else:
+                snapshot = merge_replica_snapshots(
+                    [member.snapshot(interval) for member in members]
+                )
             status_dict[stage_name] = snapshot
 
             running_processed_map[stage_name] = int(snapshot["tasks_processed"] or 0)
@@ -597,6 +1619,27 @@ class TaskGraph:
 
         self.status_dict = status_dict
         self.status_timestamp = now
+        self.funnel_stats = {
+            "fallback": self.funnel.fallback_spout.get_backlog_stats(),
+            "log": self.funnel.log_spout.get_backlog_stats(),
+        }
+        self.edge_stats = {
+            f"{from_name}->{to_name}": merge_edge_snapshots(
+                [
+                    channel.snapshot()
+                    for channel in (
+                        channel,
+                        *self.replica_channels.get((from_name, to_name), []),
+                    )
+                ]
+            )
+            for (from_name, to_name), channel in self.edge_channels.items()
+        }
+        if self.worker_optimizer is not None:
+            self.worker_stats = {
+                "budget": self.worker_budget,
+                "allocations": self.worker_optimizer.get_allocations(),
+            }
 
     # ==== 查询接口 ====
 
@@ -612,19 +1655,35 @@ class TaskGraph:
         """
         获取带统一时间戳的状态快照
 
-        :return: {"timestamp": float, "status": {...}}
+        ``status`` 中每个节点的 ``queue_wait`` / ``execution`` 为排队与执行耗时分布；
+        ``edges`` 以 ``"上游->下游"`` 为键，记录每条边的容量、当前积压
+        （``depth``）、最高积压（``high_water``）与生产者阻塞统计，
+        ``blocked_time`` 最大的边即背压的来源。``workers`` 为开启重新分配时的
+        并发预算与各 'thread' 节点最近一次的分配结果及原因。
+
+        被复制的节点（见 :meth:`replicate`）在 ``status`` 中合并为逻辑节点名下的
+        一项，带有实例总数 ``replicas``；其出边在 ``edges`` 中同样合并统计。
+
+        :return: {"timestamp": float, "status": {...}, "funnels": {...}, "edges": {...},
+            "workers": {...}}
         """
         return {
             "timestamp": self.status_timestamp,
             "status": self.status_dict,
+            "funnels": self.funnel_stats,
+            "edges": self.edge_stats,
+            "workers": self.worker_stats,
         }
 
     def get_graph_analysis(self) -> dict[str, Any]:
         """
         获取任务图的分析信息
 
+        ``bottleneck`` 为基于最近一次状态快照的瓶颈与关键路径分析，
+        字段见 :func:`analyze_bottlenecks`。
+
         :return: 包含 ``graphId``、``graphMode``、``name``、``startTime``、
-            ``className``、``isDAG`` 与 ``layersDict`` 的字典
+            ``className``、``isDAG``、``layersDict`` 与 ``bottleneck`` 的字典
         """
         self._ensure_analysis()
         return {
@@ -635,6 +1694,7 @@ class TaskGraph:
             "className": self.__class__.__name__,
             "isDAG": self.is_dag,
             "layersDict": self.layers_dict,
+            "bottleneck": analyze_bottlenecks(self.order_graph, self.status_dict),
         }
 
     def get_structure_graph(self) -> dict[str, Any]:
@@ -678,7 +1738,7 @@ class TaskGraph:
 
         :return: 失败任务持久化文件的绝对路径，未设置时返回空 Path
         """
-        db_path = get_fallback_spout().db_path
+        db_path = self.funnel.fallback_spout.db_path
         if db_path is None:
             return Path()
         return Path(db_path).resolve()
@@ -0,0 +1,152 @@
+# graph/core_optimizer.py
+from __future__ import annotations
+
+import threading
+import time
+from threading import Event, Thread
+from typing import Any
+
+from ..runtime.util_errors import RuntimeStateError
+from ..stage.util_types import AnyTaskStage
+from .util_budget import allocate_worker_budget
+
+
+class WorkerOptimizer:
+    """
+    并发预算优化器。
+
+    后台线程每隔 ``interval`` 秒采集各节点在上一周期内的到达速率、平均执行耗时
+    与当前积压，按 Little 定律（见 :func:`allocate_worker_budget`）在预算内
+    重新分配各节点的 ``max_workers``。只调整 'thread' 执行模式的节点。
+    """
+
+    stages: list[AnyTaskStage]
+    budget: int
+    interval: float
+    horizon: float
+
+    # ==== 生命周期 ====
+    def __init__(
+        self,
+        stages: list[AnyTaskStage],
+        budget: int,
+        interval: float = 1.0,
+        horizon: float | None = None,
+    ) -> None:
+        """
+        初始化优化器
+
+        :param stages: 参与分配的节点
+        :param budget: 这些节点的并发总数预算
+        :param interval: 重新分配的间隔（秒）
+        :param horizon: 消化积压的目标时长（秒），默认等于 ``interval``
+        """
+        self.stages = stages
+        self.budget = budget
+        self.interval = interval
+        self.horizon = interval if horizon is None else horizon
+
+        self._lock = threading.Lock()
+        self._allocations: dict[str, dict[str, Any]] = {}
+        # 上一次采样：节点名 → (时刻, 输入任务数, 执行次数, 执行总耗时)
+        self._last: dict[str, tuple[float, int, int, float]] = {}
+        self._stop_flag: Event = Event()
+        self._thread: Thread | None = None
+
+    def start(self) -> None:
+        """按预算预留线程池，完成首次分配并启动后台线程。"""
+        for stage in self.stages:
+            stage.set_max_workers(stage.max_workers, pool_size=self.budget)
+        _ = self.rebalance()
+
+        self._stop_flag.clear()
+        self._thread = Thread(target=self._loop, name="worker-optimizer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        停止后台线程。
+
+        :raises RuntimeStateError: 后台线程未能在超时内退出
+        """
+        if self._thread is None:
+            return
+
+        self._stop_flag.set()
+        self._thread.join(timeout=2)
+        if self._thread.is_alive():
+            raise RuntimeStateError("Worker optimizer thread is still running.")
+        self._thread = None
+
+    def _loop(self) -> None:
+        """后台线程主循环"""
+        while not self._stop_flag.wait(self.interval):
+            _ = self.rebalance()
+
+    # ==== 分配 ====
+    def rebalance(self) -> dict[str, dict[str, Any]]:
+        """
+        采集一次观测值，重新分配并应用各节点的并发数。
+
+        :return: {stage_name: 分配结果}，见 :meth:`get_allocations`
+        """
+        now = time.perf_counter()
+        stats = {stage.get_name(): self._measure(stage, now) for stage in self.stages}
+        allocations = allocate_worker_budget(stats, self.budget, self.horizon)
+
+        for stage in self.stages:
+            name = stage.get_name()
+            workers = allocations[name]["workers"]
+            if workers != stage.max_workers:
+                stage.set_max_workers(workers)
+            # 观测值在前，分配结果中的 workers 覆盖观测时的并发数
+            allocations[name] = {**stats[name], **allocations[name]}
+
+        with self._lock:
+            self._allocations = allocations
+        return allocations
+
+    def _measure(self, stage: AnyTaskStage, now: float) -> dict[str, float]:
+        """
+        采集节点自上一次采样以来的到达速率与平均执行耗时，以及当前积压。
+
+        首次采样没有可比较的上一周期，到达速率记为 0，执行耗时取累计平均值。
+
+        :param stage: 节点
+        :param now: 当前 ``perf_counter`` 时刻
+        :return: 观测值字典
+        """
+        counts = stage.get_counts()
+        execution = stage.metrics.get_latency_stats()["execution"]
+        tasks_input = int(counts["tasks_input"] or 0)
+        exec_count = int(execution["count"])
+        exec_sum = float(execution["mean"]) * exec_count
+
+        arrival_rate = 0.0
+        service_time = float(execution["mean"])
+        last = self._last.get(stage.get_name())
+        if last is not None:
+            last_time, last_input, last_count, last_sum = last
+            if now > last_time:
+                arrival_rate = (tasks_input - last_input) / (now - last_time)
+            if exec_count > last_count:
+                service_time = (exec_sum - last_sum) / (exec_count - last_count)
+        self._last[stage.get_name()] = (now, tasks_input, exec_count, exec_sum)
+
+        return {
+            "arrival_rate": arrival_rate,
+            "service_time": service_time,
+            "queue_depth": float(counts["tasks_pending"] or 0),
+            "workers": float(stage.max_workers),
+        }
+
+    # ==== 查询 ====
+    def get_allocations(self) -> dict[str, dict[str, Any]]:
+        """
+        获取最近一次分配结果。
+
+        :return: {stage_name: {"workers", "demand", "reason", "arrival_rate",
+            "service_time", "queue_depth"}}
+        """
+        with self._lock:
+            return {name: dict(entry) for name, entry in self._allocations.items()}
@@ -0,0 +1,205 @@
+# graph/util_analyzer.py
+from __future__ import annotations
+
+from typing import Any
+
+from .util_graph import OrderGraph, get_condensation, topo_sort
+
+
+# ==== 瓶颈分析 ====
+def analyze_bottlenecks(
+    graph: OrderGraph,
+    status_dict: dict[str, dict[str, Any]],
+    tolerance: float = 0.05,
+) -> dict[str, Any]:
+    """
+    基于任务图与各节点的运行时快照，识别限制端到端吞吐的瓶颈节点并求关键路径。
+
+    采用排队网络的操作分析（operational analysis）：
+
+    - 访问次数 ``visits``：节点输入任务数 / 源 SCC 的输入任务数之和，
+      即每个源任务平均在该节点被处理的次数，扇出、过滤与环路都体现在其中
+    - 服务需求 ``demand = visits * service_time / workers``：每个源任务在该节点
+      占用的（按并发数摊薄后的）处理时长
+    - 端到端吞吐上限 ``max_throughput = 1 / max(demand)``（源任务/秒），
+      ``demand`` 与最大值相差不超过 ``tolerance`` 的节点均视为瓶颈
+    - ``speedup``：仅给该节点增加 1 个并发后吞吐上限的提升倍数；
+      ``max_speedup``：该节点并发不受限时的提升倍数，即下一个瓶颈决定的上限，
+      不再有其他节点限制吞吐时为 ``None``
+
+    关键路径以各节点的平均排队耗时 + 平均执行耗时为权重，在 SCC 凝聚图上求
+    最长路径，因此对含环的图同样适用；环内节点按一次绕行计入，实际绕行次数
+    见各节点的 ``visits``。
+
+    尚无执行样本的节点 ``demand`` 为 0，不参与瓶颈判定。
+
+    :param graph: 任务依赖图
+    :param status_dict: {stage_name: 节点快照}，字段见 ``TaskStage.snapshot``
+    :param tolerance: 视为并列瓶颈的相对差值
+    :return: {"stages": {...}, "bottlenecks": [...], "max_throughput": float,
+        "critical_path": {"stages": [...], "latency": float, "cycles": [...]}}
+    """
+    cond, sccs = get_condensation(graph)
+
+    # 源 SCC 的输入任务数之和作为访问次数的基准
+    source_input = sum(
+        _stage_stat(status_dict, name, "tasks_input")
+        for i, scc in enumerate(sccs)
+        if not cond.predecessors(f"scc_{i}")
+        for name in scc
+    )
+
+    stages: dict[str, dict[str, Any]] = {}
+    for name in graph.nodes:
+        status = status_dict.get(name, {})
+        tasks_input = _stage_stat(status_dict, name, "tasks_input")
+        service_time = float(status.get("execution", {}).get("mean", 0.0))
+        queue_wait = float(status.get("queue_wait", {}).get("mean", 0.0))
+        workers = _effective_workers(status)
+        visits = tasks_input / source_input if source_input else 1.0
+        elapsed = float(status.get("elapsed_time", 0.0) or 0.0)
+        processed = _stage_stat(status_dict, name, "tasks_processed")
+
+        capacity = workers / service_time if service_time > 0 else 0.0
+        throughput = processed / elapsed if elapsed > 0 else 0.0
+        stages[name] = {
+            "visits": round(visits, 4),
+            "service_time": service_time,
+            "queue_wait": queue_wait,
+            "workers": workers,
+            "demand": visits * service_time / workers,
+            "capacity": capacity,
+            "throughput": throughput,
+            "utilization": min(1.0, throughput / capacity) if capacity else 0.0,
+        }
+
+    demands = {name: entry["demand"] for name, entry in stages.items()}
+    max_demand = max(demands.values(), default=0.0)
+    bottlenecks = [
+        name
+        for name, demand in demands.items()
+        if max_demand > 0 and demand >= max_demand * (1 - tolerance)
+    ]
+    for name, entry in stages.items():
+        workers = entry["workers"]
+        entry["speedup"] = _estimate_speedup(demands, name, workers / (workers + 1))
+        entry["max_speedup"] = _estimate_speedup(demands, name, 0.0)
+
+    return {
+        "stages": stages,
+        "bottlenecks": bottlenecks,
+        "max_throughput": 1 / max_demand if max_demand > 0 else 0.0,
+        "critical_path": _critical_path(graph, cond, sccs, stages),
+    }
+
+
+def _stage_stat(status_dict: dict[str, dict[str, Any]], name: str, key: str) -> int:
+    """
+    读取节点快照中的计数字段，缺失时为 0。
+
+    :param status_dict: {stage_name: 节点快照}
+    :param name: 节点名称
+    :param key: 计数字段名
+    :return: 计数值
+    """
+    return int(status_dict.get(name, {}).get(key, 0) or 0)
+
+
+def _effective_workers(status: dict[str, Any]) -> int:
+    """
+    节点实际可同时处理的任务数。
+
+    'serial' 节点每个副本只有 1 个并发，合并后的快照按副本数计；
+    其余节点使用合并时已按副本求和的 ``max_workers``。
+
+    :param status: 节点快照
+    :return: 并发数
+    """
+    if status.get("execution_mode") == "serial":
+        return max(1, int(status.get("replicas", 1) or 1))
+    return max(1, int(status.get("max_workers", 1) or 1))
+
+
+def _estimate_speedup(
+    demands: dict[str, float], name: str, scale: float
+) -> float | None:
+    """
+    估算单个节点的服务需求按 ``scale`` 缩放后端到端吞吐上限的提升倍数。
+
+    服务需求与并发数成反比，并发数由 m 调整为 n 时 ``scale = m / n``，
+    并发不受限时 ``scale = 0``。
+
+    :param demands: {stage_name: 服务需求}
+    :param name: 调整的节点
+    :param scale: 服务需求的缩放比例
+    :return: 提升倍数，无执行样本时为 1.0；调整后不再有节点限制吞吐时为 ``None``
+    """
+    current = max(demands.values(), default=0.0)
+    if current <= 0:
+        return 1.0
+
+    others = max((d for n, d in demands.items() if n != name), default=0.0)
+    new_max = max(others, demands[name] * scale)
+    return round(current / new_max, 3) if new_max > 0 else None
+
+
+def _critical_path(
+    graph: OrderGraph,
+    cond: OrderGraph,
+    sccs: list[list[str]],
+    stages: dict[str, dict[str, Any]],
+) -> dict[str, Any]:
+    """
+    在 SCC 凝聚图上按节点平均耗时求最长路径。
+
+    :param graph: 任务依赖图
+    :param cond: ``graph`` 的 SCC 凝聚图
+    :param sccs: 凝聚图节点 ``scc_i`` 对应的强连通分量
+    :param stages: {stage_name: 分析结果}，需包含 ``queue_wait`` 与 ``service_time``
+    :return: {"stages": 路径上的节点, "latency": 路径总耗时, "cycles": 路径上的环}
+    """
+    order = topo_sort(cond)
+    if order is None:
+        raise ValueError("condensation graph must be a DAG")
+
+    def weight(node: str) -> float:
+        scc = sccs[int(node.removeprefix("scc_"))]
+        return sum(
+            stages[name]["queue_wait"] + stages[name]["service_time"] for name in scc
+        )
+
+    # 最长路径的动态规划：dist 为以该 SCC 结尾的最长耗时，prev 记录前驱
+    dist: dict[str, float] = {}
+    prev: dict[str, str | None] = {}
+    for node in order:
+        best, best_prev = 0.0, None
+        for pred in cond.predecessors(node):
+            if best_prev is None or dist[pred] > best:
+                best, best_prev = dist[pred], pred
+        dist[node] = best + weight(node)
+        prev[node] = best_prev
+
+    if not dist:
+        return {"stages": [], "latency": 0.0, "cycles": []}
+
+    last = max(order, key=lambda node: dist[node])
+    latency = dist[last]
+    path: list[str] = []
+    end: str | None = last
+    while end is not None:
+        path.append(end)
+        end = prev[end]
+    path.reverse()
+
+    # SCC 内按节点注册顺序展开
+    position = {name: i for i, name in enumerate(graph.nodes)}
+    path_stages: list[str] = []
+    cycles: list[list[str]] = []
+    for node in path:
+        scc = sccs[int(node.removeprefix("scc_"))]
+        members = sorted(scc, key=position.__getitem__)
+        path_stages.extend(members)
+        if len(members) > 1 or members[0] in graph.successors(members[0]):
+            cycles.append(members)
+
+    return {"stages": path_stages, "latency": latency, "cycles": cycles}
@@ -0,0 +1,108 @@
+# graph/util_budget.py
+from __future__ import annotations
+
+import math
+from typing import Any
+
+
+# ==== 工作线程预算分配 ====
+def estimate_worker_demand(
+    arrival_rate: float,
+    service_time: float,
+    queue_depth: float,
+    horizon: float,
+) -> float:
+    """
+    按 Little 定律估算节点需要的并发数。
+
+    稳态下需要 ``arrival_rate * service_time`` 个并发才能跟上到达速度；
+    已积压的 ``queue_depth`` 个任务还需在 ``horizon`` 秒内额外消化，
+    即再加 ``queue_depth * service_time / horizon``。
+
+    :param arrival_rate: 到达速率（任务/秒）
+    :param service_time: 单个任务的平均执行耗时（秒）
+    :param queue_depth: 当前积压的任务数
+    :param horizon: 消化积压的目标时长（秒）
+    :return: 需要的并发数（未取整）
+    """
+    backlog = queue_depth * service_time / horizon if horizon > 0 else 0.0
+    return arrival_rate * service_time + backlog
+
+
+def allocate_worker_budget(
+    stats: dict[str, dict[str, float]],
+    budget: int,
+    horizon: float,
+) -> dict[str, dict[str, Any]]:
+    """
+    在总预算内为各节点分配并发数。
+
+    ``stats`` 的每项包含 ``arrival_rate``、``service_time``、``queue_depth`` 与
+    当前并发数 ``workers``。尚无执行样本（``service_time`` 为 0）的节点以当前
+    并发数作为需求。各节点至少分得 1 个；需求总和超出预算时按需求比例缩减，
+    取整采用最大余数法，保证分配总和不超过预算（节点数多于预算时除外）。
+
+    :param stats: {stage_name: 观测值字典}
+    :param budget: 并发总数预算
+    :param horizon: 消化积压的目标时长（秒）
+    :return: {stage_name: {"workers", "demand", "reason"}}
+    """
+    demands: dict[str, float] = {}
+    reasons: dict[str, str] = {}
+    for name, stat in stats.items():
+        service_time = stat["service_time"]
+        if service_time <= 0:
+            demands[name] = max(1.0, stat["workers"])
+            reasons[name] = "no samples yet, keep configured workers"
+            continue
+        demands[name] = estimate_worker_demand(
+            stat["arrival_rate"], service_time, stat["queue_depth"], horizon
+        )
+        reasons[name] = (
+            f"little's law: {stat['arrival_rate']:.1f}/s x "
+            f"{service_time * 1000:.2f}ms + backlog {stat['queue_depth']:.0f}"
+        )
+
+    wanted = {name: max(1, math.ceil(demand)) for name, demand in demands.items()}
+    if sum(wanted.values()) <= budget:
+        workers = wanted
+    else:
+        workers = _scale_to_budget(demands, budget)
+        for name in workers:
+            if workers[name] < wanted[name]:
+                reasons[name] += f", scaled to budget {budget}"
+
+    return {
+        name: {
+            "workers": workers[name],
+            "demand": round(demands[name], 3),
+            "reason": reasons[name],
+        }
+        for name in stats
+    }
+
+
+def _scale_to_budget(demands: dict[str, float], budget: int) -> dict[str, int]:
+    """
+    按需求比例把预算分给各节点，每个节点至少 1 个。
+
+    :param demands: {stage_name: 需求并发数}
+    :param budget: 并发总数预算
+    :return: {stage_name: 分得的并发数}
+    """
+    spare = max(0, budget - len(demands))
+    total = sum(max(0.0, demand - 1) for demand in demands.values())
+    if total <= 0:
+        return dict.fromkeys(demands, 1)
+
+    shares = {
+        name: spare * max(0.0, demand - 1) / total for name, demand in demands.items()
+    }
+    workers = {name: 1 + int(share) for name, share in shares.items()}
+    leftover = spare - sum(int(share) for share in shares.values())
+    by_remainder = sorted(
+        shares, key=lambda name: shares[name] - int(shares[name]), reverse=True
+    )
+    for name in by_remainder[:leftover]:
+        workers[name] += 1
+    return workers
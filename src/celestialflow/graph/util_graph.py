@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from collections import deque
-from collections.abc import Iterable
+from collections.abc import Callable, Iterable
 
 
 class OrderGraph:
@@ -342,3 +342,42 @@ def compute_node_levels(graph: OrderGraph) -> dict[str, int]:
             level[original_node] = lv
 
     return level
+
+
+def linear_chains(
+    graph: OrderGraph, can_fuse: Callable[[str, str], bool]
+) -> list[list[str]]:
+    """
+    查找图中极大的线性可融合链。
+
+    边 ``u -> v`` 可融合需满足：``u`` 只有这一条出边、``v`` 只有这一条入边，
+    且 ``can_fuse(u, v)`` 为真。每个节点至多有一条可融合入边，因此从没有
+    可融合入边的节点出发逐边延伸即可得到互不相交的链；纯环上没有这样的
+    起点，不会被融合。
+
+    :param graph: 输入图。
+    :param can_fuse: 判断一条边两端节点是否兼容的谓词。
+    :return: 长度至少为 2 的链列表，链内按数据流顺序排列。
+    """
+
+    def fusible_next(u: str) -> str | None:
+        succs = graph.successors(u)
+        if len(succs) != 1:
+            return None
+        v = succs[0]
+        if len(graph.predecessors(v)) != 1 or not can_fuse(u, v):
+            return None
+        return v
+
+    fused_targets = {v for u in graph.nodes if (v := fusible_next(u)) is not None}
+
+    chains: list[list[str]] = []
+    for head in graph.nodes:
+        if head in fused_targets:
+            continue
+        chain = [head]
+        while (nxt := fusible_next(chain[-1])) is not None:
+            chain.append(nxt)
+        if len(chain) > 1:
+            chains.append(chain)
+    return chains
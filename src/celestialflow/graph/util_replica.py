@@ -0,0 +1,91 @@
+# graph/util_replica.py
+from __future__ import annotations
+
+from typing import Any
+
+from ..runtime.util_estimators import calc_remaining, format_avg_time
+from ..runtime.util_types import StageStatus
+
+# 副本快照中按求和合并的计数字段
+_SUMMED_STAGE_FIELDS = (
+    "max_workers",
+    "tasks_input",
+    "tasks_succeeded",
+    "tasks_failed",
+    "tasks_duplicated",
+    "tasks_processed",
+    "tasks_pending",
+)
+
+# 副本边快照中按求和合并的统计字段
+_SUMMED_EDGE_FIELDS = (
+    "depth",
+    "high_water",
+    "blocked_count",
+    "blocked_time",
+    "credit_blocked_time",
+    "queue_blocked_time",
+)
+
+
+# ==== 副本快照合并 ====
+def merge_replica_snapshots(snapshots: list[dict[str, Any]]) -> dict[str, Any]:
+    """
+    将同一逻辑节点各副本的运行时快照合并为逻辑节点的快照。
+
+    - 计数与 ``max_workers`` 求和，``replicas`` 记录副本数
+    - 副本状态不一致时视为运行中
+    - 启动时间取最早值，耗时取最大值，并据此重新估算剩余时间与平均耗时
+    - 耗时分布的次数求和、均值按次数加权，分位数与最大值取各副本的最大值
+
+    :param snapshots: 各副本快照，首项为原节点的快照
+    :return: 合并后的快照
+    """
+    merged = dict(snapshots[0])
+    for key in _SUMMED_STAGE_FIELDS:
+        merged[key] = sum(int(snapshot[key] or 0) for snapshot in snapshots)
+
+    statuses = {snapshot["status"] for snapshot in snapshots}
+    merged["status"] = statuses.pop() if len(statuses) == 1 else StageStatus.RUNNING
+    start_times = [snapshot["start_time"] for snapshot in snapshots]
+    merged["start_time"] = min((t for t in start_times if t), default=0.0)
+    merged["elapsed_time"] = max(snapshot["elapsed_time"] for snapshot in snapshots)
+    merged["remaining_time"] = calc_remaining(
+        merged["tasks_processed"], merged["tasks_pending"], merged["elapsed_time"]
+    )
+    merged["task_avg_time"] = format_avg_time(
+        merged["elapsed_time"], merged["tasks_processed"]
+    )
+
+    for key in ("queue_wait", "execution"):
+        merged[key] = _merge_latency([snapshot[key] for snapshot in snapshots])
+    merged["replicas"] = len(snapshots)
+    return merged
+
+
+def _merge_latency(stats: list[dict[str, Any]]) -> dict[str, Any]:
+    """
+    合并多个耗时分布汇总。
+
+    :param stats: 各副本的耗时分布汇总，字段见 ``LatencyHistogram.snapshot``
+    :return: 合并后的汇总
+    """
+    count = sum(int(stat["count"]) for stat in stats)
+    total = sum(stat["mean"] * stat["count"] for stat in stats)
+    merged: dict[str, Any] = {"count": count, "mean": total / count if count else 0.0}
+    for key in ("p50", "p90", "p99", "max"):
+        merged[key] = max(stat[key] for stat in stats)
+    return merged
+
+
+def merge_edge_snapshots(snapshots: list[dict[str, Any]]) -> dict[str, Any]:
+    """
+    将逻辑边在各上游副本上的边通道快照合并，积压与阻塞统计求和。
+
+    :param snapshots: 各副本边的快照，首项为原节点出边的快照
+    :return: 合并后的快照
+    """
+    merged = dict(snapshots[0])
+    for key in _SUMMED_EDGE_FIELDS:
+        merged[key] = sum(snapshot[key] for snapshot in snapshots)
+    return merged
@@ -11,26 +11,48 @@ def build_structure_graph(
     stage_dict: dict[str, AnyTaskStage],
     out_edges: dict[str, list[str]],
     source_stages: list[AnyTaskStage],
+    fused_chains: list[list[str]] | None = None,
+    inline_stages: list[str] | None = None,
+    replicas: dict[str, int] | None = None,
 ) -> dict[str, Any]:
     """
     从源节点、邻接表和节点字典构建标准化图结构。
 
     返回的结构采用 ``nodes + edges + source_nodes`` 形式：
-    - ``nodes``: 以节点名为 key 的节点元信息字典
+    - ``nodes``: 以节点名为 key 的节点元信息字典，融合进链首的节点带有
+      ``fused_into`` 字段，由上游就地执行的节点带有 ``inline`` 字段，
+      被复制的节点带有 ``replicas`` 字段（实例总数）
     - ``edges``: 邻接表 {stage_name: [next_stage_name, ...]}
     - ``source_nodes``: 图入口节点名称列表
+    - ``fused_chains``: 算子融合得到的线性链列表
+    - ``inline_stages``: ``inline`` 图模式下由上游就地执行的节点名称列表
+    - ``replicas``: {stage_name: 实例总数}，仅包含被复制的节点
 
     :param stage_dict: {stage_name: AnyTaskStage}
     :param out_edges: 邻接表 {stage_name: [next_stage_name, ...]}
     :param source_stages: 源节点列表
+    :param fused_chains: 融合链列表，默认无融合
+    :param inline_stages: 就地执行的节点名称列表，默认无
+    :param replicas: {stage_name: 实例总数}，默认无副本
     :return: 标准化图结构字典
     """
+    fused_chains = [list(chain) for chain in fused_chains or []]
+    fused_into = {name: chain[0] for chain in fused_chains for name in chain[1:]}
+    inline_stages = list(inline_stages or [])
+    replicas = dict(replicas or {})
+
     nodes: dict[str, dict[str, Any]] = {}
     edges: dict[str, list[str]] = {}
 
     for stage_name, stage in stage_dict.items():
         node_summary = dict(stage.get_summary())
         node_summary.pop("name", None)
+        if stage_name in fused_into:
+            node_summary["fused_into"] = fused_into[stage_name]
+        if stage_name in inline_stages:
+            node_summary["inline"] = True
+        if stage_name in replicas:
+            node_summary["replicas"] = replicas[stage_name]
         nodes[stage_name] = node_summary
         edges[stage_name] = list(out_edges.get(stage_name, []))
 
@@ -38,6 +60,9 @@ def build_structure_graph(
         "nodes": nodes,
         "edges": edges,
         "source_nodes": [stage.get_name() for stage in source_stages],
+        "fused_chains": fused_chains,
+        "inline_stages": inline_stages,
+        "replicas": replicas,
     }
 
 
@@ -76,11 +101,17 @@ def format_structure_list_from_graph(
         """
         node = nodes.get(node_name, {})
         visited_note = " [Ref]" if is_ref else ""
+        fused_head = node.get("fused_into")
+        fused_note = f" [Fused:{fused_head}]" if fused_head else ""
+        if node.get("inline"):
+            fused_note += " [Inline]"
+        if node.get("replicas"):
+            fused_note += f" [Replicas:{node['replicas']}]"
         F = node.get("func_name", "?")  # 函数名
         E = node.get("execution_mode", "?")  # 执行模式
         W = node.get("max_workers", "?")  # 最大工作数
 
-        return f"{node_name}::{F} (E:{E}, W:{W}){visited_note}"
+        return f"{node_name}::{F} (E:{E}, W:{W}){fused_note}{visited_note}"
 
     # 只渲染"子节点"（有父节点）——保证一定画连接符
     def build_child_lines(node_name: str, prefix: str, is_last: bool) -> list[str]:
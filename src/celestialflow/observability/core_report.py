@@ -5,6 +5,7 @@ from typing import Any, Protocol
 import requests
 
 from ..persistence import LogInlet, get_log_inlet
+from ..persistence.util_payload import to_persisted_payload
 from ..persistence.util_sqlite import (
     load_records,
     load_records_after_event_id_in_fail,
@@ -18,6 +19,7 @@ class ReporterProtocol(Protocol):
     """Reporter 依赖方所需的最小接口。"""
 
     interval: int
+    log_inlet: LogInlet
 
     def start(self) -> None:
         """启动 reporter。"""
@@ -204,6 +206,11 @@ class TaskReporter:
             if not all_errors:
                 return
 
+            # 二进制编解码器还原出的任务可能不是 JSON 友好结构，推送前统一转换。
+            for record in all_errors:
+                record["task_json"] = to_persisted_payload(record["task_json"])
+                record["result_json"] = to_persisted_payload(record["result_json"])
+
             payload: dict[str, Any] = {
                 "graph_id": graph_id,
                 "errors": all_errors,
@@ -268,6 +275,11 @@ class NullTaskReporter:
 
     interval: int = 1
     history_limit: int = 20
+    log_inlet: LogInlet
+
+    def __init__(self) -> None:
+        """初始化空上报器，日志入口默认指向全局 log inlet。"""
+        self.log_inlet = get_log_inlet()
 
     def start(self) -> None:
         """启动上报器线程"""
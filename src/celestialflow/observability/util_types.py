@@ -30,6 +30,6 @@ class ReporterTaskGraph(Protocol):
 class ReporterTaskStage(Protocol):
     """TaskReporter 依赖的最小任务阶段接口。"""
 
-    def put_task(self, task: Any) -> None: ...
+    def put_task(self, task: Any) -> bool: ...
 
-    def put_signal(self) -> None: ...
+    def put_signal(self) -> bool: ...
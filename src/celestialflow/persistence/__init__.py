@@ -1,7 +1,7 @@
 # persistence/__init__.py
 """CelestialFlow 持久化模块。
 
-提供任务失败回退（Fallback）与运行日志（Log）的记录、写入与查询能力。
+提供任务失败回退（Fallback）与运行日志（Log）的记录、写入、查询与目录维护能力。
 """
 
 from .core_fallback import (
@@ -16,16 +16,22 @@ from .core_log import (
     get_log_inlet,
     get_log_spout,
 )
-from .core_scope import funnel_scope
+from .core_maintenance import MaintenancePolicy, MaintenanceWorker, run_maintenance
+from .core_scope import FunnelContext, funnel_scope, get_default_funnel
 
 __all__ = [
     "FallbackInlet",
     "FallbackSpout",
+    "FunnelContext",
     "LogInlet",
     "LogSpout",
+    "MaintenancePolicy",
+    "MaintenanceWorker",
     "funnel_scope",
+    "get_default_funnel",
     "get_fallback_inlet",
     "get_fallback_spout",
     "get_log_inlet",
     "get_log_spout",
+    "run_maintenance",
 ]
@@ -1,101 +1,174 @@
 # persistence/core_fallback.py
 from __future__ import annotations
 
+import os
 import sqlite3
+import warnings
 from datetime import datetime
 from pathlib import Path
-from typing import Any, cast
+from typing import Any, Self
 
 from ..funnel import BaseInlet, BaseSpout
-from ..runtime.util_errors import InitializationError
-from .util_payload import to_persisted_payload
+from ..runtime.util_config import (
+    load_fallback_codec_from_pyproject,
+    load_fallback_engine_from_pyproject,
+    load_spout_queue_from_pyproject,
+)
+from ..runtime.util_errors import InitializationError, InvalidOptionError
+from .util_catalog import register_fallback_file
+from .util_codec import PayloadCodec, get_codec
+from .util_segment import SegmentLog
 from .util_sqlite import (
+    apply_fallback_op,
+    apply_fallback_ops,
     connect_db,
-    delete_record_by_event_id,
-    insert_record,
     load_task_error_records,
     load_task_result_records,
-    promote_record_to_failed_by_event_id,
-    promote_record_to_success_by_event_id,
-    update_record_event_id_by_event_id,
 )
 
 
 class FallbackSpout(BaseSpout):
-    """Fallback 记录监听器，将任务生命周期写入 fallback 目录的 sqlite 文件。"""
+    """
+    Fallback 记录监听器，将任务生命周期写入 fallback 目录的 sqlite 文件。
+
+    支持两种存储引擎：
+
+    - ``"sqlite"``：每条操作直接在 ``records`` 表上执行并提交；
+    - ``"segment"``：操作顺序追加到分段日志，由后台线程压实进同一 sqlite 文件。
+
+    ``task_json`` / ``result_json`` 列按 ``codec`` 指定的编解码器写入。
+    fallback 记录不可丢失，队列写满时只支持 ``"block"`` 与 ``"spill"`` 策略。
+    停止时会把本次 fallback 文件登记到 ``./fallbacks/catalog.sqlite3``，供跨运行查询。
+    """
+
+    engine: str
+    codec: str
+    file_tag: str
+    graph_id: str
+
+    valid_overflows = ("block", "spill")
+
+    def __init__(
+        self,
+        engine: str = "sqlite",
+        codec: str = "json",
+        maxsize: int = 0,
+        overflow: str = "block",
+        file_tag: str = "",
+    ) -> None:
+        """
+        初始化失败记录监听器
+
+        :param engine: 存储引擎，可选 ``"sqlite"`` / ``"segment"``，默认 ``"sqlite"``
+        :param codec: 负载编解码器名称，见 ``util_codec``，默认 ``"json"``
+        :param maxsize: 队列容量上限，``0`` 表示不限，默认 ``0``
+        :param overflow: 队列写满时的处理策略，可选 ``"block"`` / ``"spill"``
+        :param file_tag: fallback 文件名后缀，用于区分同一进程内的多个 funnel，默认为空
+        :raises InvalidOptionError: engine、codec 或 overflow 不是受支持的取值
+        """
+        super().__init__(maxsize, overflow)
 
-    def __init__(self) -> None:
-        """初始化失败记录监听器"""
-        super().__init__()
+        valid_engines = ("sqlite", "segment")
+        if engine not in valid_engines:
+            raise InvalidOptionError("fallback engine", engine, valid_engines)
+        self.engine = engine
+        self.codec = get_codec(codec).name
+        self.file_tag = file_tag
 
         self.db_path: Path | None = None
+        self.graph_id = ""
 
         self._conn: sqlite3.Connection | None = None
+        self._segment_log: SegmentLog | None = None
 
     def _before_start(self) -> None:
-        """创建 fallback 目录并打开 sqlite 文件。"""
+        """创建 fallback 目录并打开 sqlite 文件或分段日志。"""
         # 创建 fallback 目录
         now = datetime.now()
         date_str = now.strftime("%Y-%m-%d")
         time_str = now.strftime("%H-%M-%S-%f")[:-3]
-        self.db_path = Path(f"./fallbacks/{date_str}/fallback({time_str}).sqlite3")
+        suffix = f"@{self.file_tag}" if self.file_tag else ""
+        # 带上进程号，多个进程在同一毫秒启动时不会写入同一文件
+        file_name = f"fallback({time_str}-{os.getpid()}{suffix}).sqlite3"
+        self.db_path = Path(f"./fallbacks/{date_str}") / file_name
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
-        self._conn = connect_db(self.db_path)
+        self.graph_id = ""
+
+        if self.engine == "segment":
+            segment_dir = self.db_path.with_suffix(".segments")
+            self._segment_log = SegmentLog(segment_dir, self.db_path, codec=self.codec)
+            self._segment_log.open()
+        else:
+            self._conn = connect_db(self.db_path)
 
     def _handle_record(self, record: dict[str, Any]) -> None:
         """
-        处理单条 fallback 记录并写入 sqlite。
+        处理单条 fallback 记录并写入 sqlite 或分段日志。
 
         :param record: fallback 操作字典
         """
+        if self._segment_log is not None:
+            # 热路径只做顺序追加，records 表由后台压实线程维护。
+            self._segment_log.append(record)
+            return
+
         if self._conn is None:
             raise InitializationError("fail database is not initialized")
 
-        op = str(record["__op__"])
-        if op == "insert":
-            # 新任务进入某个 stage，写入一条 pending 记录。
-            changed = insert_record(self._conn, cast(dict[str, Any], record["record"]))
-        elif op == "delete":
-            # 任务成功或重复时，删除对应的 pending 记录。
-            changed = delete_record_by_event_id(self._conn, int(record["event_id"]))
-        elif op == "update_event_id":
-            # 任务重试时，将 pending 记录迁移到新的 retry 事件 ID。
-            changed = update_record_event_id_by_event_id(
-                self._conn,
-                int(record["event_id"]),
-                int(record["new_event_id"]),
-                ts=float(record["ts"]),
-            )
-        elif op == "promote_success":
-            # 任务成功时，将 pending 记录晋升为 success 并写入结果。
-            changed = promote_record_to_success_by_event_id(
-                self._conn,
-                int(record["event_id"]),
-                record["result_json"],
-                ts=float(record["ts"]),
-            )
-        elif op == "promote_failed":
-            # 任务最终失败时，将 pending 记录晋升为 failed 并补齐错误信息。
-            changed = promote_record_to_failed_by_event_id(
-                self._conn,
-                int(record["event_id"]),
-                int(record["error_id"]),
-                ts=float(record["ts"]),
-                error_type=str(record["error_type"]),
-                error_message=str(record["error_message"]),
-            )
-        else:
-            raise ValueError(f"unsupported fallback operation: {op}")
-        if changed:
+        if apply_fallback_op(self._conn, record, self.codec):
+            self._conn.commit()
+
+    def _handle_batch(self, records: list[dict[str, Any]]) -> None:
+        """
+        整批处理 fallback 记录：sqlite 引擎单次提交，segment 引擎单次刷盘。
+
+        单条操作失败只打印堆栈，不影响同批其余操作的提交。
+
+        :param records: 按入队顺序排列的 fallback 操作字典
+        """
+        if self._segment_log is not None:
+            self._segment_log.append_many(records)
+            return
+
+        if self._conn is None:
+            raise InitializationError("fail database is not initialized")
+
+        if apply_fallback_ops(self._conn, records, self.codec):
             self._conn.commit()
 
     def _after_stop(self) -> None:
-        """关闭 sqlite 连接，确保剩余事务落盘。"""
+        """关闭 sqlite 连接或分段日志，确保剩余事务落盘，并登记到 catalog。"""
+        if self._segment_log is not None:
+            self._segment_log.close()
+            self._segment_log = None
         if self._conn:
             self._conn.commit()
             self._conn.close()
             self._conn = None
 
+        if self.db_path is not None and self.db_path.exists():
+            try:
+                register_fallback_file(
+                    self.db_path,
+                    self.graph_id,
+                    self.db_path.parent.parent / "catalog.sqlite3",
+                )
+            except sqlite3.Error as e:
+                # catalog 只是索引，登记失败不应影响 fallback 文件本身。
+                warnings.warn(
+                    f"Failed to register {self.db_path} in fallback catalog: {e}",
+                    RuntimeWarning,
+                    stacklevel=2,
+                )
+
+    def set_graph_id(self, graph_id: str) -> None:
+        """
+        设置本次 fallback 文件所属的任务图 ID，登记 catalog 时使用。
+
+        :param graph_id: 任务图 ID
+        """
+        self.graph_id = graph_id
+
     def get_task_error_pairs(self, stage: str) -> list[tuple[Any, tuple[str, str]]]:
         """
         从 sqlite 文件中读取指定 stage 的错误记录
@@ -124,6 +197,21 @@ class FallbackInlet(BaseInlet):
     线程安全 fallback 记录包装类，所有生命周期变更通过队列发送到监听线程写入。
     """
 
+    _codec: PayloadCodec = get_codec("json")
+
+    def bind_spout(self, spout: BaseSpout) -> Self:
+        """
+        绑定到给定 spout，并沿用其负载编解码器。
+
+        :param spout: 目标监听器
+        :return: 当前已绑定的 inlet 实例
+        :rtype: Self
+        """
+        _ = super().bind_spout(spout)
+        if isinstance(spout, FallbackSpout):
+            self._codec = get_codec(spout.codec)
+        return self
+
     def task_in(self, stage_name: str, event_id: int, task: Any) -> None:
         """
         写入一条 pending 记录，表示任务已进入某个 stage。
@@ -140,7 +228,7 @@ class FallbackInlet(BaseInlet):
                 "ts": now.timestamp(),
                 "stage": stage_name,
                 "status": "pending",
-                "task_json": to_persisted_payload(task),
+                "task_json": self._codec.prepare(task),
             },
         }
         self._funnel(pending_item)
@@ -160,7 +248,7 @@ class FallbackInlet(BaseInlet):
                     "__op__": "promote_success",
                     "event_id": event_id,
                     "ts": now.timestamp(),
-                    "result_json": to_persisted_payload(result),
+                    "result_json": self._codec.prepare(result),
                 }
             )
         else:
@@ -220,7 +308,11 @@ class FallbackInlet(BaseInlet):
 
 # ==== 全局单例 ====
 
-_fallback_spout = FallbackSpout()
+_fallback_spout = FallbackSpout(
+    load_fallback_engine_from_pyproject(),
+    load_fallback_codec_from_pyproject(),
+    *load_spout_queue_from_pyproject("fallback", 0, "block"),
+)
 _fallback_inlet = FallbackInlet().bind_spout(_fallback_spout)
 
 
@@ -6,7 +6,10 @@ from time import localtime, strftime
 from typing import Any, TextIO
 
 from ..funnel import BaseInlet, BaseSpout
-from ..runtime.util_config import load_log_level_from_pyproject
+from ..runtime.util_config import (
+    load_log_level_from_pyproject,
+    load_spout_queue_from_pyproject,
+)
 from ..runtime.util_constant import LEVEL_DICT
 from ..runtime.util_errors import InitializationError, InvalidOptionError
 
@@ -16,9 +19,20 @@ class LogSpout(BaseSpout):
     日志监听线程，用于将日志写入文件
     """
 
-    def __init__(self) -> None:
-        """初始化日志监听器"""
-        super().__init__()
+    file_tag: str
+
+    def __init__(
+        self, maxsize: int = 0, overflow: str = "block", file_tag: str = ""
+    ) -> None:
+        """
+        初始化日志监听器
+
+        :param maxsize: 队列容量上限，``0`` 表示不限，默认 ``0``
+        :param overflow: 队列写满时的处理策略，见 ``BaseSpout``，默认 ``"block"``
+        :param file_tag: 日志文件名后缀，用于区分同一进程内的多个 funnel，默认为空
+        """
+        super().__init__(maxsize, overflow)
+        self.file_tag = file_tag
 
         self.log_path: Path | None = None
         self._file: TextIO | None = None
@@ -27,7 +41,8 @@ class LogSpout(BaseSpout):
         """创建 logs 目录并打开日志文件"""
         # 创建 logs 目录
         now = strftime("%Y-%m-%d", localtime())
-        self.log_path = Path(f"logs/task_logger({now}).log")
+        suffix = f"@{self.file_tag}" if self.file_tag else ""
+        self.log_path = Path(f"logs/task_logger({now}{suffix}).log")
         self.log_path.parent.mkdir(parents=True, exist_ok=True)
 
         # 打开日志文件
@@ -51,6 +66,21 @@ class LogSpout(BaseSpout):
             raise InitializationError("log file is not initialized")
         _ = self._file.write(line)
 
+    def _handle_batch(self, records: list[dict[str, Any]]) -> None:
+        """
+        整批格式化日志记录并单次写入日志文件。
+
+        :param records: 包含 timestamp, level, message 的日志记录字典列表
+        """
+        if self._file is None:
+            raise InitializationError("log file is not initialized")
+        _ = self._file.write(
+            "".join(
+                f"{record['timestamp']} {record['level']} {record['message']}\n"
+                for record in records
+            )
+        )
+
     def _after_stop(self) -> None:
         """关闭日志文件句柄。"""
         if self._file:
@@ -385,6 +415,30 @@ class LogInlet(BaseInlet):
             f"In '{func_name}', Task {task_repr} has routed to {target_node}. Used {use_time:.2f}s. [{parent_id}->{route_id}*]",
         )
 
+    # ==== 归约器 ====
+    def window_emit(
+        self,
+        func_name: str,
+        key_repr: str,
+        task_count: int,
+        use_time: float,
+        window_id: int,
+    ) -> None:
+        """
+        记录窗口归约结果输出
+
+        :param func_name: 任务函数名称
+        :param key_repr: 窗口键表示，未分键时为空字符串
+        :param task_count: 窗口内的任务数量
+        :param use_time: 窗口从打开到关闭的耗时（秒）
+        :param window_id: 归约记录 ID
+        """
+        key_note = f" {key_repr}" if key_repr else ""
+        self._log(
+            "SUCCESS",
+            f"In '{func_name}', Window{key_note} reduced {task_count} tasks. Used {use_time:.2f}s. [{window_id}*]",
+        )
+
     # ==== 终止信号 ====
     def termination_input(
         self, func_name: str, source: str, termination_id: int
@@ -562,7 +616,7 @@ class LogInlet(BaseInlet):
 
 # ==== 全局单例 ====
 
-_log_spout = LogSpout()
+_log_spout = LogSpout(*load_spout_queue_from_pyproject("log", 0, "block"))
 _log_inlet = LogInlet(load_log_level_from_pyproject()).bind_spout(_log_spout)
 
 
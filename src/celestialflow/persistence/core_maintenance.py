@@ -0,0 +1,474 @@
+# persistence/core_maintenance.py
+from __future__ import annotations
+
+import gzip
+import os
+import shutil
+import sqlite3
+import time
+import traceback
+from collections.abc import Callable, Iterable
+from pathlib import Path
+from threading import Event, Thread
+
+from ..runtime.util_errors import ConfigurationError, RuntimeStateError
+from .core_scope import get_live_funnels
+from .util_catalog import (
+    load_catalog_graph_ids,
+    register_fallback_file,
+    unregister_fallback_file,
+)
+from .util_sqlite import close_read_connections, compact_db, merge_db_into
+
+_DAY_SECONDS = 24 * 60 * 60
+
+# fallback 文件伴随的 WAL / 共享内存文件后缀
+_SQLITE_SIDECARS = ("-wal", "-shm")
+
+
+class MaintenancePolicy:
+    """
+    fallback / log 目录的维护策略。
+
+    所有时间按文件最后修改时间计算；取值为 ``None`` 时跳过对应步骤。
+    """
+
+    max_age_days: float | None
+    archive_after_days: float | None
+    max_total_mb: float | None
+    merge_below_kb: float | None
+    vacuum_free_ratio: float
+    min_idle_seconds: float
+
+    def __init__(
+        self,
+        *,
+        max_age_days: float | None = 30,
+        archive_after_days: float | None = 7,
+        max_total_mb: float | None = None,
+        merge_below_kb: float | None = 256,
+        vacuum_free_ratio: float = 0.2,
+        min_idle_seconds: float = 300,
+    ) -> None:
+        """
+        初始化维护策略。
+
+        :param max_age_days: 超过该天数的文件（含归档）被删除，默认 30
+        :param archive_after_days: 超过该天数的文件被 gzip 归档，默认 7
+        :param max_total_mb: fallback 与 log 目录的总大小上限，超出时从最旧文件开始删除
+        :param merge_below_kb: 同一日期目录下小于该大小的 fallback 文件会被合并，默认 256
+        :param vacuum_free_ratio: 空闲页占比达到该值时执行 ``VACUUM``，默认 0.2
+        :param min_idle_seconds: 最近修改未超过该秒数的文件视为活跃并跳过，默认 300
+        :raises ConfigurationError: 存在负数取值，或归档天数不小于删除天数
+        """
+        values = {
+            "max_age_days": max_age_days,
+            "archive_after_days": archive_after_days,
+            "max_total_mb": max_total_mb,
+            "merge_below_kb": merge_below_kb,
+            "vacuum_free_ratio": vacuum_free_ratio,
+            "min_idle_seconds": min_idle_seconds,
+        }
+        for name, value in values.items():
+            if value is not None and value < 0:
+                raise ConfigurationError(f"{name} must be >= 0, got {value}")
+        if (
+            max_age_days is not None
+            and archive_after_days is not None
+            and archive_after_days >= max_age_days
+        ):
+            raise ConfigurationError(
+                "archive_after_days must be smaller than max_age_days"
+            )
+
+        self.max_age_days = max_age_days
+        self.archive_after_days = archive_after_days
+        self.max_total_mb = max_total_mb
+        self.merge_below_kb = merge_below_kb
+        self.vacuum_free_ratio = vacuum_free_ratio
+        self.min_idle_seconds = min_idle_seconds
+
+
+# ==== 文件工具 ====
+
+
+def _get_active_paths() -> set[Path]:
+    """
+    读取当前进程内全部 funnel 上下文正在写入的 fallback 与日志文件。
+
+    :return: 绝对路径集合
+    :rtype: set[Path]
+    """
+    active: set[Path] = set()
+    for funnel in get_live_funnels():
+        fallback_spout = funnel.fallback_spout
+        if fallback_spout.is_running() and fallback_spout.db_path is not None:
+            active.add(fallback_spout.db_path.resolve())
+        log_spout = funnel.log_spout
+        if log_spout.is_running() and log_spout.log_path is not None:
+            active.add(log_spout.log_path.resolve())
+    return active
+
+
+def _get_mtime(path: Path) -> float:
+    """
+    读取文件及其 WAL 的最新修改时间。
+
+    :param path: 文件路径
+    :return: 最新修改时间戳
+    :rtype: float
+    """
+    mtime = path.stat().st_mtime
+    wal_path = path.with_name(path.name + "-wal")
+    if wal_path.exists():
+        mtime = max(mtime, wal_path.stat().st_mtime)
+    return mtime
+
+
+def _get_size(path: Path) -> int:
+    """
+    读取文件及其 sqlite 伴随文件的总字节数。
+
+    :param path: 文件路径
+    :return: 字节数
+    :rtype: int
+    """
+    size = path.stat().st_size
+    for suffix in _SQLITE_SIDECARS:
+        sidecar = path.with_name(path.name + suffix)
+        if sidecar.exists():
+            size += sidecar.stat().st_size
+    return size
+
+
+def _remove_file(path: Path) -> None:
+    """
+    删除文件及其 sqlite 伴随文件。
+
+    :param path: 文件路径
+    """
+    close_read_connections(path)
+    path.unlink(missing_ok=True)
+    for suffix in _SQLITE_SIDECARS:
+        path.with_name(path.name + suffix).unlink(missing_ok=True)
+
+
+def _compact_file(path: Path, vacuum_free_ratio: float) -> int:
+    """
+    压实 fallback 文件并恢复其修改时间，避免压实本身重置文件年龄。
+
+    :param path: fallback 文件路径
+    :param vacuum_free_ratio: 空闲页占比达到该值时执行 ``VACUUM``
+    :return: 回收的字节数
+    :rtype: int
+    """
+    mtime = _get_mtime(path)
+    reclaimed = compact_db(path, vacuum_free_ratio)
+    os.utime(path, (mtime, mtime))
+    return reclaimed
+
+
+def _gzip_file(path: Path) -> Path:
+    """
+    将文件压缩为同目录的 ``.gz`` 归档并删除原文件。
+
+    归档沿用原文件的修改时间，使按年龄删除的口径保持一致。
+
+    :param path: 文件路径
+    :return: 归档文件路径
+    :rtype: Path
+    """
+    archive_path = path.with_name(path.name + ".gz")
+    tmp_path = archive_path.with_name(archive_path.name + ".tmp")
+    with path.open("rb") as src, gzip.open(tmp_path, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    stat = path.stat()
+    os.utime(tmp_path, (stat.st_atime, stat.st_mtime))
+    _ = tmp_path.replace(archive_path)
+    _remove_file(path)
+    return archive_path
+
+
+# ==== 维护入口 ====
+
+
+def run_maintenance(
+    fallback_root: str | Path = "./fallbacks",
+    log_root: str | Path = "./logs",
+    policy: MaintenancePolicy | None = None,
+) -> dict[str, int]:
+    """
+    对 fallback 与 log 目录执行一轮维护。
+
+    依次执行：按年龄删除 → 按年龄归档 → 合并小文件 → 压实 → 按总大小删除。
+    当前进程正在写入的文件、带未压实分段目录的文件，以及最近仍被修改的文件都会跳过，
+    因此可以与正在运行的任务图并发执行。
+
+    :param fallback_root: fallback 根目录，默认 ``./fallbacks``
+    :param log_root: 日志目录，默认 ``./logs``
+    :param policy: 维护策略，默认 ``MaintenancePolicy()``
+    :return: ``{"deleted", "archived", "merged", "compacted", "reclaimed_bytes"}``
+    :rtype: dict[str, int]
+    """
+    policy = policy or MaintenancePolicy()
+    fallback_root = Path(fallback_root)
+    log_root = Path(log_root)
+    catalog_path = fallback_root / "catalog.sqlite3"
+
+    stats = {
+        "deleted": 0,
+        "archived": 0,
+        "merged": 0,
+        "compacted": 0,
+        "reclaimed_bytes": 0,
+    }
+    now = time.time()
+    active = _get_active_paths()
+
+    def is_idle(path: Path) -> bool:
+        if not path.exists() or path.resolve() in active:
+            return False
+        if path.with_suffix(".segments").exists():
+            return False
+        return now - _get_mtime(path) >= policy.min_idle_seconds
+
+    def age_days(path: Path) -> float:
+        return (now - _get_mtime(path)) / _DAY_SECONDS
+
+    def delete(path: Path) -> None:
+        stats["reclaimed_bytes"] += _get_size(path)
+        stats["deleted"] += 1
+        _remove_file(path)
+        if path.suffix == ".sqlite3":
+            unregister_fallback_file(path, catalog_path)
+
+    def archive(path: Path) -> None:
+        if path.suffix == ".sqlite3":
+            # 归档前截断 WAL 并压实，使 .gz 中只包含完整的主文件。
+            _ = _compact_file(path, policy.vacuum_free_ratio)
+            unregister_fallback_file(path, catalog_path)
+        size = _get_size(path)
+        archive_path = _gzip_file(path)
+        stats["reclaimed_bytes"] += max(0, size - archive_path.stat().st_size)
+        stats["archived"] += 1
+
+    def list_all() -> list[Path]:
+        return _list_managed_files(fallback_root, log_root, is_idle)
+
+    # 1. 按年龄删除
+    if policy.max_age_days is not None:
+        for path in list_all():
+            if age_days(path) >= policy.max_age_days:
+                delete(path)
+
+    # 2. 按年龄归档
+    if policy.archive_after_days is not None:
+        for path in list_all():
+            if path.suffix != ".gz" and age_days(path) >= policy.archive_after_days:
+                archive(path)
+
+    # 3. 合并同一日期目录下的小文件
+    fallback_files = _list_files(fallback_root, "*/fallback(*).sqlite3", is_idle)
+    if policy.merge_below_kb is not None:
+        threshold = policy.merge_below_kb * 1024
+        small_files = [path for path in fallback_files if _get_size(path) < threshold]
+        stats["merged"] += _merge_small_files(small_files, catalog_path)
+
+    # 4. 压实剩余文件并刷新 catalog 中的大小
+    graph_ids = load_catalog_graph_ids(catalog_path)
+    for path in fallback_files:
+        if not path.exists():
+            continue
+        try:
+            reclaimed = _compact_file(path, policy.vacuum_free_ratio)
+        except sqlite3.Error:
+            traceback.print_exc()
+            continue
+        if reclaimed:
+            stats["compacted"] += 1
+            stats["reclaimed_bytes"] += reclaimed
+            register_fallback_file(
+                path, graph_ids.get(str(path.resolve()), ""), catalog_path
+            )
+
+    # 5. 按总大小从最旧文件开始删除
+    if policy.max_total_mb is not None:
+        candidates = sorted(list_all(), key=_get_mtime)
+        total = sum(
+            _get_size(path)
+            for path in _list_managed_files(fallback_root, log_root, lambda _: True)
+        )
+        limit = policy.max_total_mb * 1024 * 1024
+        for path in candidates:
+            if total <= limit:
+                break
+            size = _get_size(path)
+            delete(path)
+            total -= size
+
+    _remove_empty_dirs(fallback_root)
+    return stats
+
+
+def _list_files(
+    root: Path, pattern: str, is_idle: Callable[[Path], bool]
+) -> list[Path]:
+    """
+    列出目录中匹配模式且处于空闲状态的文件，按路径排序。
+
+    :param root: 根目录
+    :param pattern: glob 模式
+    :param is_idle: 判断文件是否空闲的函数
+    :return: 文件路径列表
+    :rtype: list[Path]
+    """
+    if not root.is_dir():
+        return []
+    return [path for path in sorted(root.glob(pattern)) if is_idle(path)]
+
+
+def _list_managed_files(
+    fallback_root: Path, log_root: Path, is_idle: Callable[[Path], bool]
+) -> list[Path]:
+    """
+    列出受维护策略管理的 fallback 文件、日志文件及其归档。
+
+    :param fallback_root: fallback 根目录
+    :param log_root: 日志目录
+    :param is_idle: 判断文件是否空闲的函数
+    :return: 文件路径列表
+    :rtype: list[Path]
+    """
+    return (
+        _list_files(fallback_root, "*/fallback(*).sqlite3", is_idle)
+        + _list_files(log_root, "task_logger(*).log", is_idle)
+        + _list_files(fallback_root, "*/fallback(*).sqlite3.gz", is_idle)
+        + _list_files(log_root, "task_logger(*).log.gz", is_idle)
+    )
+
+
+def _merge_small_files(paths: Iterable[Path], catalog_path: Path) -> int:
+    """
+    将同一日期目录下的小 fallback 文件合并进该目录中最早的文件。
+
+    :param paths: 候选小文件
+    :param catalog_path: catalog 文件路径
+    :return: 被合并（并删除）的文件数量
+    :rtype: int
+    """
+    groups: dict[Path, list[Path]] = {}
+    for path in paths:
+        groups.setdefault(path.parent, []).append(path)
+
+    graph_ids = load_catalog_graph_ids(catalog_path)
+    merged = 0
+    for group in groups.values():
+        if len(group) < 2:
+            continue
+        target, *sources = sorted(group)
+        target_ids = [graph_ids.get(str(target.resolve()), "")]
+        # 合并后的文件沿用组内最新的修改时间，按年龄保留时不会提前删除新数据。
+        mtime = max(_get_mtime(path) for path in group)
+
+        close_read_connections(target)
+        for source in sources:
+            try:
+                _ = merge_db_into(target, source)
+            except sqlite3.Error:
+                # 合并失败时保留源文件，等待下一轮维护。
+                traceback.print_exc()
+                continue
+            target_ids.append(graph_ids.get(str(source.resolve()), ""))
+            _remove_file(source)
+            unregister_fallback_file(source, catalog_path)
+            merged += 1
+
+        os.utime(target, (mtime, mtime))
+        graph_id = ",".join(dict.fromkeys(i for i in target_ids if i))
+        register_fallback_file(target, graph_id, catalog_path)
+    return merged
+
+
+def _remove_empty_dirs(root: Path) -> None:
+    """
+    删除根目录下的空日期目录。
+
+    :param root: 根目录
+    """
+    if not root.is_dir():
+        return
+    for directory in root.iterdir():
+        if directory.is_dir() and not any(directory.iterdir()):
+            directory.rmdir()
+
+
+# ==== 后台维护 ====
+
+
+class MaintenanceWorker:
+    """
+    在后台线程中周期性执行 :func:`run_maintenance`。
+
+    单轮维护异常只打印堆栈，不会终止线程。
+    """
+
+    interval: float
+    fallback_root: Path
+    log_root: Path
+    policy: MaintenancePolicy
+
+    def __init__(
+        self,
+        interval: float = 3600,
+        fallback_root: str | Path = "./fallbacks",
+        log_root: str | Path = "./logs",
+        policy: MaintenancePolicy | None = None,
+    ) -> None:
+        """
+        初始化后台维护线程。
+
+        :param interval: 两轮维护之间的间隔（秒），默认 3600
+        :param fallback_root: fallback 根目录，默认 ``./fallbacks``
+        :param log_root: 日志目录，默认 ``./logs``
+        :param policy: 维护策略，默认 ``MaintenancePolicy()``
+        """
+        self.interval = interval
+        self.fallback_root = Path(fallback_root)
+        self.log_root = Path(log_root)
+        self.policy = policy or MaintenancePolicy()
+
+        self.last_stats: dict[str, int] = {}
+        self._stop_flag = Event()
+        self._thread: Thread | None = None
+
+    def start(self) -> None:
+        """启动后台维护线程（若未运行），启动后立即执行一轮维护。"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_flag.clear()
+        self._thread = Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """通知后台线程退出并等待当前一轮维护结束。"""
+        if self._thread is None:
+            return
+        self._stop_flag.set()
+        self._thread.join(timeout=60)
+        if self._thread.is_alive():
+            raise RuntimeStateError(
+                "Maintenance thread did not terminate within 60 seconds."
+            )
+        self._thread = None
+
+    def _loop(self) -> None:
+        """后台线程主循环。"""
+        while True:
+            try:
+                self.last_stats = run_maintenance(
+                    self.fallback_root, self.log_root, self.policy
+                )
+            except Exception:
+                traceback.print_exc()
+            if self._stop_flag.wait(self.interval):
+                return
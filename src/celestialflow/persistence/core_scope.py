@@ -1,41 +1,202 @@
 from __future__ import annotations
 
+import re
+import weakref
 from collections.abc import Generator
 from contextlib import contextmanager
+from itertools import count
+from threading import Lock
 
-from .core_fallback import get_fallback_spout
-from .core_log import get_log_spout
+from ..runtime.util_config import (
+    load_fallback_codec_from_pyproject,
+    load_fallback_engine_from_pyproject,
+    load_log_level_from_pyproject,
+    load_spout_queue_from_pyproject,
+)
+from .core_fallback import (
+    FallbackInlet,
+    FallbackSpout,
+    get_fallback_inlet,
+    get_fallback_spout,
+)
+from .core_log import LogInlet, LogSpout, get_log_inlet, get_log_spout
+
+# 上下文编号，未命名上下文以此区分各自的文件
+_context_ids = count(1)
+
+# 当前进程内存活的 funnel 上下文，目录维护据此跳过正在写入的文件
+_live_funnels: weakref.WeakSet[FunnelContext] = weakref.WeakSet()
+_live_funnels_lock = Lock()
+
+
+class FunnelContext:
+    """
+    一组相互独立的 fallback / log spout 与 inlet。
+
+    每个上下文拥有自己的写入线程与文件，可绑定到任务图或执行器上，
+    使同一进程内的多个任务图并发运行时互不干扰生命周期。
+    上下文的启停采用引用计数：首次进入时启动 spout，最后一次退出时停止。
+    """
+
+    name: str
+    context_id: int
+    fallback_spout: FallbackSpout
+    fallback_inlet: FallbackInlet
+    log_spout: LogSpout
+    log_inlet: LogInlet
+
+    def __init__(
+        self,
+        name: str = "",
+        *,
+        fallback_spout: FallbackSpout | None = None,
+        fallback_inlet: FallbackInlet | None = None,
+        log_spout: LogSpout | None = None,
+        log_inlet: LogInlet | None = None,
+    ) -> None:
+        """
+        初始化 funnel 上下文，未传入的 spout / inlet 按项目配置新建。
+
+        :param name: 上下文名称，作为 fallback 与日志文件名后缀；为空时以
+            ``ctx<context_id>`` 代替，避免多个未命名上下文写入同一文件
+        :param fallback_spout: 复用的 fallback spout
+        :param fallback_inlet: 复用的 fallback inlet，需已绑定到 ``fallback_spout``
+        :param log_spout: 复用的 log spout
+        :param log_inlet: 复用的 log inlet，需已绑定到 ``log_spout``
+        """
+        self.name = name
+        self.context_id = next(_context_ids)
+        file_tag = re.sub(r"[^\w.-]", "_", name) if name else f"ctx{self.context_id}"
+
+        self.fallback_spout = fallback_spout or FallbackSpout(
+            load_fallback_engine_from_pyproject(),
+            load_fallback_codec_from_pyproject(),
+            *load_spout_queue_from_pyproject("fallback", 0, "block"),
+            file_tag=file_tag,
+        )
+        self.fallback_inlet = fallback_inlet or FallbackInlet().bind_spout(
+            self.fallback_spout
+        )
+        self.log_spout = log_spout or LogSpout(
+            *load_spout_queue_from_pyproject("log", 0, "block"),
+            file_tag=file_tag,
+        )
+        self.log_inlet = log_inlet or LogInlet(
+            load_log_level_from_pyproject()
+        ).bind_spout(self.log_spout)
+
+        self._lock = Lock()
+        self._depth = 0
+        with _live_funnels_lock:
+            _live_funnels.add(self)
+
+    def enter(self) -> None:
+        """
+        进入上下文；首次进入时启动 fallback 与 log spout。
+
+        :raises Exception: spout 启动失败时原样抛出，已启动的 spout 会被停止
+        """
+        with self._lock:
+            if self._depth == 0:
+                self.fallback_spout.start()
+                try:
+                    self.log_spout.start()
+                except Exception:
+                    self.fallback_spout.stop()
+                    raise
+            self._depth += 1
+
+    def exit(self) -> None:
+        """
+        退出上下文；最后一次退出时停止 log 与 fallback spout。
+
+        :raises ExceptionGroup: 停止 spout 时存在一个或多个异常
+        """
+        with self._lock:
+            if self._depth == 0:
+                return
+            self._depth -= 1
+            if self._depth > 0:
+                return
+
+            error_list: list[Exception] = []
+            try:
+                self.log_spout.stop()
+            except Exception as exception:
+                error_list.append(exception)
+            try:
+                self.fallback_spout.stop()
+            except Exception as exception:
+                error_list.append(exception)
+
+        if error_list:
+            raise ExceptionGroup("Errors occurred while stopping funnel", error_list)
+
+    def get_depth(self) -> int:
+        """
+        读取当前嵌套进入的层数。
+
+        :return: 嵌套层数，0 表示 spout 未由本上下文启动
+        :rtype: int
+        """
+        with self._lock:
+            return self._depth
+
+
+def get_live_funnels() -> list[FunnelContext]:
+    """
+    获取当前进程内仍存活的全部 funnel 上下文，包含默认上下文。
+
+    :return: funnel 上下文列表
+    :rtype: list[FunnelContext]
+    """
+    with _live_funnels_lock:
+        return list(_live_funnels)
+
+
+_default_funnel = FunnelContext(
+    fallback_spout=get_fallback_spout(),
+    fallback_inlet=get_fallback_inlet(),
+    log_spout=get_log_spout(),
+    log_inlet=get_log_inlet(),
+)
+
+
+def get_default_funnel() -> FunnelContext:
+    """
+    获取包装全局 fallback / log 单例的默认 funnel 上下文。
+    """
+    return _default_funnel
 
 
 @contextmanager
-def funnel_scope() -> Generator[None, None, None]:
+def funnel_scope(funnel: FunnelContext | None = None) -> Generator[None, None, None]:
     """
-    管理全局 funnel 生命周期的单层作用域。
+    管理 funnel 生命周期的作用域，支持嵌套与多个任务图共享同一上下文。
 
-    - 进入作用域时启动全局 ``fallback`` / ``log`` spout
-    - 退出作用域时统一停止 spout
-    - 当前实现不承诺嵌套作用域复用
+    - 进入作用域时按引用计数启动 ``funnel`` 的 ``fallback`` / ``log`` spout
+    - 最外层作用域退出时统一停止 spout
+    :param funnel: 目标 funnel 上下文，默认使用包装全局单例的默认上下文
     :return: ``None``
     :rtype: Iterator[None]
     :raises ExceptionGroup: 进入或退出作用域时存在一个或多个异常
     """
+    funnel = funnel or _default_funnel
     error_list: list[Exception] = []
+    entered = False
 
     try:
-        get_fallback_spout().start()
-        get_log_spout().start()
+        funnel.enter()
+        entered = True
         yield
     except Exception as exception:
         error_list.append(exception)
     finally:
-        try:
-            get_log_spout().stop()
-        except Exception as exception:
-            error_list.append(exception)
-        try:
-            get_fallback_spout().stop()
-        except Exception as exception:
-            error_list.append(exception)
+        if entered:
+            try:
+                funnel.exit()
+            except ExceptionGroup as group:
+                error_list.extend(group.exceptions)
 
     if error_list:
         raise ExceptionGroup("Errors occurred during funnel scope", error_list)
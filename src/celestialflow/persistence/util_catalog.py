@@ -0,0 +1,430 @@
+# persistence/util_catalog.py
+from __future__ import annotations
+
+import base64
+import heapq
+import json
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from .util_sqlite import query_records_by_cursor, summarize_records
+
+# 默认的 catalog 数据库路径，与各次运行的 fallback 目录并列
+DEFAULT_CATALOG_PATH = Path("./fallbacks/catalog.sqlite3")
+
+
+# ==== 连接与表结构 ====
+
+
+def connect_catalog(catalog_path: str | Path | None = None) -> sqlite3.Connection:
+    """
+    创建 catalog 数据库连接并交给调用方管理其生命周期。
+
+    :param catalog_path: catalog 文件路径，默认 ``./fallbacks/catalog.sqlite3``
+    :return: 可直接用于 catalog 读写的 sqlite 连接
+    :rtype: sqlite3.Connection
+    """
+    path = Path(catalog_path or DEFAULT_CATALOG_PATH)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+    conn.row_factory = sqlite3.Row
+
+    _ = conn.execute("PRAGMA journal_mode=WAL")
+    _ = conn.execute("PRAGMA synchronous=NORMAL")
+    _ = conn.execute("PRAGMA foreign_keys=ON")
+    _ensure_catalog_table(conn)
+    return conn
+
+
+def _ensure_catalog_table(conn: sqlite3.Connection) -> None:
+    """
+    在给定连接上确保 catalog 表与索引存在。
+
+    - ``files``：每个 fallback 文件一行，记录所属图与整体时间范围；
+      合并后的文件可能属于多个图，``graph_id`` 以逗号分隔；
+    - ``file_stages``：每个文件中每个 (stage, status) 一行，记录数量与时间范围。
+
+    :param conn: 已建立的 sqlite 连接
+    :return: None
+    """
+    _ = conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS files (
+            path TEXT PRIMARY KEY,
+            graph_id TEXT NOT NULL DEFAULT '',
+            min_ts REAL,
+            max_ts REAL,
+            size INTEGER NOT NULL DEFAULT 0,
+            registered_ts REAL NOT NULL
+        )
+        """
+    )
+    _ = conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS file_stages (
+            path TEXT NOT NULL REFERENCES files(path) ON DELETE CASCADE,
+            stage TEXT NOT NULL,
+            status TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            min_ts REAL,
+            max_ts REAL,
+            PRIMARY KEY (path, stage, status)
+        )
+        """
+    )
+    _ = conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_file_stages_stage_status "
+        "ON file_stages(stage, status, max_ts)"
+    )
+    conn.commit()
+
+
+# ==== 登记 ====
+
+
+def register_fallback_file(
+    db_path: str | Path,
+    graph_id: str = "",
+    catalog_path: str | Path | None = None,
+) -> None:
+    """
+    汇总 fallback 文件中的 stage、状态数量与时间范围，并登记（或刷新）到 catalog。
+
+    :param db_path: fallback sqlite 文件路径
+    :param graph_id: 产生该文件的任务图 ID，未知时为空串
+    :param catalog_path: catalog 文件路径，默认 ``./fallbacks/catalog.sqlite3``
+    :return: None
+    """
+    path = Path(db_path).resolve()
+    summary = summarize_records(path)
+    min_values = [item["min_ts"] for item in summary if item["min_ts"] is not None]
+    max_values = [item["max_ts"] for item in summary if item["max_ts"] is not None]
+
+    conn = connect_catalog(catalog_path)
+    try:
+        # 先删后插，刷新已登记文件的全部 stage 汇总。
+        _ = conn.execute("DELETE FROM files WHERE path = ?", [str(path)])
+        _ = conn.execute(
+            """
+            INSERT INTO files (path, graph_id, min_ts, max_ts, size, registered_ts)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            [
+                str(path),
+                graph_id,
+                min(min_values, default=None),
+                max(max_values, default=None),
+                path.stat().st_size,
+                time.time(),
+            ],
+        )
+        _ = conn.executemany(
+            """
+            INSERT INTO file_stages (path, stage, status, count, min_ts, max_ts)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (
+                    str(path),
+                    item["stage"],
+                    item["status"],
+                    item["count"],
+                    item["min_ts"],
+                    item["max_ts"],
+                )
+                for item in summary
+            ],
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def unregister_fallback_file(
+    db_path: str | Path, catalog_path: str | Path | None = None
+) -> None:
+    """
+    从 catalog 中移除指定 fallback 文件。
+
+    :param db_path: fallback sqlite 文件路径
+    :param catalog_path: catalog 文件路径，默认 ``./fallbacks/catalog.sqlite3``
+    :return: None
+    """
+    conn = connect_catalog(catalog_path)
+    try:
+        _ = conn.execute(
+            "DELETE FROM files WHERE path = ?", [str(Path(db_path).resolve())]
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def rebuild_catalog(
+    fallback_root: str | Path = "./fallbacks",
+    catalog_path: str | Path | None = None,
+) -> int:
+    """
+    扫描 fallback 根目录重新登记全部文件，并移除已不存在的文件。
+
+    已登记文件的 ``graph_id`` 会被保留。
+
+    :param fallback_root: fallback 根目录，默认 ``./fallbacks``
+    :param catalog_path: catalog 文件路径，默认 ``<fallback_root>/catalog.sqlite3``
+    :return: 登记的文件数量
+    :rtype: int
+    """
+    root = Path(fallback_root)
+    catalog_path = catalog_path or root / "catalog.sqlite3"
+
+    graph_ids = load_catalog_graph_ids(catalog_path)
+    conn = connect_catalog(catalog_path)
+    try:
+        for path in graph_ids:
+            if not Path(path).exists():
+                _ = conn.execute("DELETE FROM files WHERE path = ?", [path])
+        conn.commit()
+    finally:
+        conn.close()
+
+    registered = 0
+    for db_path in sorted(root.glob("*/fallback(*).sqlite3")):
+        path = str(db_path.resolve())
+        register_fallback_file(path, graph_ids.get(path, ""), catalog_path)
+        registered += 1
+    return registered
+
+
+# ==== 查询 ====
+
+
+def load_catalog_graph_ids(catalog_path: str | Path | None = None) -> dict[str, str]:
+    """
+    读取 catalog 中全部已登记文件的任务图 ID。
+
+    :param catalog_path: catalog 文件路径，默认 ``./fallbacks/catalog.sqlite3``
+    :return: ``{path: graph_id}``
+    :rtype: dict[str, str]
+    """
+    conn = connect_catalog(catalog_path)
+    try:
+        return {
+            str(row["path"]): str(row["graph_id"])
+            for row in conn.execute("SELECT path, graph_id FROM files")
+        }
+    finally:
+        conn.close()
+
+
+def list_catalog_files(
+    stage: str = "",
+    status: str = "",
+    since: float | None = None,
+    until: float | None = None,
+    graph_id: str = "",
+    catalog_path: str | Path | None = None,
+) -> list[dict[str, Any]]:
+    """
+    列出可能包含命中记录的 fallback 文件。
+
+    仅依据 catalog 中的汇总信息筛选，不打开任何 fallback 文件。
+
+    :param stage: stage 名称过滤条件；为空时不限
+    :param status: 记录状态过滤条件；为空时不限
+    :param since: 文件中命中记录的最大 ``ts`` 不早于该值
+    :param until: 文件中命中记录的最小 ``ts`` 不晚于该值
+    :param graph_id: 任务图 ID 过滤条件；为空时不限
+    :param catalog_path: catalog 文件路径，默认 ``./fallbacks/catalog.sqlite3``
+    :return: ``[{"path", "graph_id", "count", "min_ts", "max_ts"}, ...]``，按最新时间降序
+    :rtype: list[dict[str, Any]]
+    """
+    where_clauses: list[str] = []
+    params: list[Any] = []
+    if stage:
+        where_clauses.append("s.stage = ?")
+        params.append(stage)
+    if status:
+        where_clauses.append("s.status = ?")
+        params.append(status)
+    if since is not None:
+        where_clauses.append("s.max_ts >= ?")
+        params.append(float(since))
+    if until is not None:
+        where_clauses.append("s.min_ts <= ?")
+        params.append(float(until))
+    if graph_id:
+        where_clauses.append("instr(',' || f.graph_id || ',', ',' || ? || ',') > 0")
+        params.append(graph_id)
+    where_sql = f"WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
+
+    conn = connect_catalog(catalog_path)
+    try:
+        rows = conn.execute(
+            f"""
+            SELECT f.path, f.graph_id, SUM(s.count) AS count
+                 , MIN(s.min_ts) AS min_ts, MAX(s.max_ts) AS max_ts
+            FROM file_stages AS s
+            JOIN files AS f ON f.path = s.path
+            {where_sql}
+            GROUP BY f.path
+            HAVING SUM(s.count) > 0
+            ORDER BY max_ts DESC, f.path ASC
+            """,
+            params,
+        ).fetchall()
+    finally:
+        conn.close()
+
+    return [
+        {
+            "path": str(row["path"]),
+            "graph_id": str(row["graph_id"]),
+            "count": int(row["count"]),
+            "min_ts": row["min_ts"],
+            "max_ts": row["max_ts"],
+        }
+        for row in rows
+    ]
+
+
+def query_catalog_records(
+    stage: str = "",
+    status: str = "failed",
+    *,
+    since: float | None = None,
+    until: float | None = None,
+    keyword: str = "",
+    graph_id: str = "",
+    cursor: str | None = None,
+    page_size: int = 50,
+    sort_order: str = "newest",
+    max_workers: int = 8,
+    catalog_path: str | Path | None = None,
+) -> tuple[list[dict[str, Any]], str | None]:
+    """
+    跨多个 fallback 文件查询记录，并按 ``(ts, path, id)`` 游标合并分页。
+
+    先按 catalog 汇总筛掉不可能命中的文件，再并行查询剩余文件；游标条件下推到
+    每个文件的 ``(ts, id)`` 索引范围，每个文件最多取 ``page_size`` 条，归并后
+    截取当前页，翻页耗时与页码无关。
+    返回的每条记录额外带有 ``db_path`` 与 ``graph_id`` 字段。
+
+    :param stage: stage 名称过滤条件；为空时不限
+    :param status: 记录状态过滤条件，默认 ``failed``
+    :param since: 仅返回 ``ts >= since`` 的记录
+    :param until: 仅返回 ``ts <= until`` 的记录
+    :param keyword: 关键词过滤条件
+    :param graph_id: 任务图 ID 过滤条件；为空时不限
+    :param cursor: 上一页返回的游标；为 ``None`` 时从第一页开始
+    :param page_size: 每页大小
+    :param sort_order: 排序方式，支持 ``newest`` 或 ``oldest``
+    :param max_workers: 并行查询的最大线程数，默认 8
+    :param catalog_path: catalog 文件路径，默认 ``./fallbacks/catalog.sqlite3``
+    :return: ``(page_items, next_cursor)``；没有下一页时 ``next_cursor`` 为 ``None``
+    :rtype: tuple[list[dict[str, Any]], str | None]
+    :raises ValueError: ``cursor`` 不是本函数返回的游标
+    """
+    position = None if cursor is None else _decode_cursor(cursor)
+    file_since, file_until = since, until
+    if position is not None:
+        # 游标之前的记录已返回过，按游标时间收紧文件筛选范围。
+        if sort_order == "oldest":
+            file_since = position[0] if since is None else max(since, position[0])
+        else:
+            file_until = position[0] if until is None else min(until, position[0])
+    files = list_catalog_files(
+        stage, status, file_since, file_until, graph_id, catalog_path
+    )
+    if not files:
+        return [], None
+
+    def query_file(entry: dict[str, Any]) -> tuple[list[dict[str, Any]], bool]:
+        if not Path(entry["path"]).exists():
+            return [], False
+        items, next_cursor = query_records_by_cursor(
+            entry["path"],
+            page_size,
+            node=stage,
+            keyword=keyword,
+            sort_order=sort_order,
+            status=status,
+            cursor=None if position is None else _file_cursor(position, entry["path"]),
+            since=since,
+            until=until,
+        )
+        for item in items:
+            item["db_path"] = entry["path"]
+            item["graph_id"] = entry["graph_id"]
+        return items, next_cursor is not None
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(files)))) as pool:
+        per_file = list(pool.map(query_file, files))
+
+    # 每个文件内部已按 (ts, id) 有序，归并时以路径打破跨文件的平局。
+    reverse = sort_order != "oldest"
+    merged = list(
+        heapq.merge(
+            *(items for items, _ in per_file),
+            key=_record_position,
+            reverse=reverse,
+        )
+    )
+    page_items = merged[:page_size]
+    has_more = len(merged) > page_size or any(more for _, more in per_file)
+    if not has_more or not page_items:
+        return page_items, None
+    return page_items, _encode_cursor(_record_position(page_items[-1]))
+
+
+# ==== 跨文件游标 ====
+
+# 比任何记录 id 都大的哨兵，用于让 ``(ts, id)`` 比较只按 ts 判定
+_MAX_RECORD_ID = 2**63 - 1
+
+
+def _record_position(item: dict[str, Any]) -> tuple[float, str, int]:
+    """返回记录在跨文件归并顺序中的位置 ``(ts, path, id)``。"""
+    return float(item["ts"]), str(item["db_path"]), int(item["id"])
+
+
+def _file_cursor(position: tuple[float, str, int], path: str) -> tuple[float, int]:
+    """
+    将跨文件游标换算为单个文件内的 ``(ts, id)`` 游标。
+
+    ``ts`` 相同时按路径排序：排在游标文件之前的文件，同一 ``ts`` 的记录都已
+    返回过；之后的文件则都尚未返回。两种排序方向下换算方式相同。
+
+    :param position: 跨文件游标 ``(ts, path, id)``
+    :param path: 待查询的文件路径
+    :return: 该文件内的 ``(ts, id)`` 游标
+    :rtype: tuple[float, int]
+    """
+    ts, cursor_path, record_id = position
+    if path == cursor_path:
+        return ts, record_id
+    return ts, (_MAX_RECORD_ID if path < cursor_path else -1)
+
+
+def _encode_cursor(position: tuple[float, str, int]) -> str:
+    """将 ``(ts, path, id)`` 编码为不透明的 URL 安全字符串。"""
+    payload = json.dumps(list(position), ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> tuple[float, str, int]:
+    """
+    解码 :func:`_encode_cursor` 生成的游标。
+
+    :param cursor: 不透明游标字符串
+    :return: ``(ts, path, id)``
+    :rtype: tuple[float, str, int]
+    :raises ValueError: 游标格式不正确
+    """
+    try:
+        ts, path, record_id = json.loads(base64.urlsafe_b64decode(cursor))
+        return float(ts), str(path), int(record_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"invalid catalog cursor: {cursor!r}") from e
@@ -0,0 +1,225 @@
+# persistence/util_codec.py
+from __future__ import annotations
+
+import json
+import pickle
+import zlib
+from typing import Any, Protocol
+
+from ..runtime.util_errors import ConfigurationError, InvalidOptionError
+from .util_payload import to_persisted_payload
+
+# 二进制负载首字节的编解码器标记；文本负载恒为 JSON，不带标记。
+TAG_PICKLE = 0x01
+TAG_JSON_ZLIB = 0x02
+TAG_MSGPACK = 0x03
+
+
+# ==== 编解码器 ====
+
+
+class PayloadCodec(Protocol):
+    """
+    ``task_json`` / ``result_json`` 列的负载编解码器接口。
+
+    - ``prepare`` 在 inlet 调用线程执行，将任务转换为可安全跨线程传递的结构；
+    - ``encode`` 在 spout 线程执行，输出 ``str``（TEXT）或带标记字节的 ``bytes``（BLOB）；
+    - ``decode`` 接收去掉标记字节后的 BLOB 内容。
+
+    显式继承本接口的编解码器可沿用 ``prepare`` 的默认实现，``encode`` 与
+    ``decode`` 必须实现，缺少时由类型检查报告。
+    """
+
+    name: str
+    tag: int | None
+
+    def prepare(self, value: Any) -> Any:
+        """
+        将原始任务转换为待编码结构。
+
+        :param value: 任务或结果
+        :return: 待编码结构
+        """
+        return value
+
+    def encode(self, value: Any) -> str | bytes:
+        """
+        将待编码结构编码为可写入 sqlite 的值。
+
+        :param value: ``prepare`` 的返回值
+        :return: TEXT 或带标记字节的 BLOB
+        :rtype: str | bytes
+        """
+        ...
+
+    def decode(self, data: bytes) -> Any:
+        """
+        解码去掉标记字节后的 BLOB 内容。
+
+        :param data: BLOB 内容
+        :return: 解码后的任务或结果
+        """
+        ...
+
+
+class JsonCodec(PayloadCodec):
+    """
+    JSON 编解码器，与历史 TEXT 格式兼容；可选在超过阈值时以 zlib 压缩为 BLOB。
+    """
+
+    tag = TAG_JSON_ZLIB
+
+    compress_threshold: int | None
+
+    def __init__(self, name: str = "json", compress_threshold: int | None = None):
+        """
+        初始化 JSON 编解码器。
+
+        :param name: 注册名称
+        :param compress_threshold: 编码后字节数达到该阈值时压缩；``None`` 表示不压缩
+        """
+        self.name = name
+        self.compress_threshold = compress_threshold
+
+    def prepare(self, value: Any) -> Any:
+        return to_persisted_payload(value)
+
+    def encode(self, value: Any) -> str | bytes:
+        text = json.dumps(value, ensure_ascii=False)
+        if self.compress_threshold is None:
+            return text
+        data = text.encode("utf-8")
+        if len(data) < self.compress_threshold:
+            return text
+        return bytes([TAG_JSON_ZLIB]) + zlib.compress(data)
+
+    def decode(self, data: bytes) -> Any:
+        return json.loads(zlib.decompress(data).decode("utf-8"))
+
+
+class PickleCodec(PayloadCodec):
+    """
+    pickle 协议 5 编解码器，可无损还原任意可 pickle 的任务对象。
+
+    序列化在 ``prepare`` 中完成，写入的是调用 inlet 时的任务快照，之后对
+    任务对象的修改不会影响落盘内容。仅应读取可信来源的 fallback 文件。
+    """
+
+    name = "pickle"
+    tag = TAG_PICKLE
+
+    def prepare(self, value: Any) -> bytes:
+        """
+        在 inlet 调用线程内序列化任务。
+
+        :param value: 任务或结果
+        :return: pickle 字节串
+        """
+        return pickle.dumps(value, protocol=5)
+
+    def encode(self, value: Any) -> str | bytes:
+        """
+        为 ``prepare`` 得到的字节串加上标记字节。
+
+        :param value: ``prepare`` 的返回值
+        :return: 带标记字节的 BLOB
+        """
+        return bytes([TAG_PICKLE]) + value
+
+    def decode(self, data: bytes) -> Any:
+        return pickle.loads(data)
+
+
+class MsgpackCodec(PayloadCodec):
+    """msgpack 编解码器，需要安装可选依赖 ``msgpack``。"""
+
+    name = "msgpack"
+    tag = TAG_MSGPACK
+
+    def _module(self) -> Any:
+        """延迟导入 msgpack，未安装时抛出配置错误。"""
+        try:
+            import msgpack  # pyright: ignore[reportMissingImports]
+        except ImportError as e:
+            raise ConfigurationError(
+                "msgpack codec requires the 'msgpack' package to be installed"
+            ) from e
+        return msgpack
+
+    def prepare(self, value: Any) -> Any:
+        return to_persisted_payload(value)
+
+    def encode(self, value: Any) -> str | bytes:
+        return bytes([TAG_MSGPACK]) + self._module().packb(value, use_bin_type=True)
+
+    def decode(self, data: bytes) -> Any:
+        return self._module().unpackb(data, raw=False)
+
+
+# ==== 注册表 ====
+
+_codecs: dict[str, PayloadCodec] = {}
+_codecs_by_tag: dict[int, PayloadCodec] = {}
+
+
+def register_codec(codec: PayloadCodec) -> None:
+    """
+    注册负载编解码器；同名或同标记的编解码器会被覆盖。
+
+    :param codec: 编解码器实例
+    """
+    _codecs[codec.name] = codec
+    if codec.tag is not None:
+        _codecs_by_tag[codec.tag] = codec
+
+
+def get_codec(name: str) -> PayloadCodec:
+    """
+    按名称获取已注册的编解码器。
+
+    :param name: 编解码器名称
+    :return: 编解码器实例
+    :rtype: PayloadCodec
+    :raises InvalidOptionError: 名称未注册
+    """
+    codec = _codecs.get(name)
+    if codec is None:
+        raise InvalidOptionError("payload codec", name, tuple(_codecs))
+    return codec
+
+
+def encode_payload(value: Any, codec: str = "json") -> str | bytes:
+    """
+    使用指定编解码器编码已 ``prepare`` 的负载。
+
+    :param value: 待编码结构
+    :param codec: 编解码器名称，默认 ``"json"``
+    :return: TEXT 或带标记字节的 BLOB
+    :rtype: str | bytes
+    """
+    return get_codec(codec).encode(value)
+
+
+def decode_payload(data: str | bytes) -> Any:
+    """
+    解码 ``task_json`` / ``result_json`` 列的值。
+
+    TEXT 按 JSON 解析；BLOB 按首字节标记分派到对应编解码器。
+
+    :param data: 列值
+    :return: 解码后的任务或结果
+    :raises ValueError: BLOB 标记未注册
+    """
+    if isinstance(data, str):
+        return json.loads(data)
+
+    codec = _codecs_by_tag.get(data[0]) if data else None
+    if codec is None:
+        raise ValueError(f"unknown payload codec tag: {data[:1]!r}")
+    return codec.decode(data[1:])
+
+
+register_codec(JsonCodec())
+register_codec(JsonCodec("json-zlib", compress_threshold=1024))
+register_codec(PickleCodec())
+register_codec(MsgpackCodec())
@@ -0,0 +1,279 @@
+# persistence/util_segment.py
+from __future__ import annotations
+
+import pickle
+import struct
+import time
+import traceback
+from collections import deque
+from collections.abc import Iterator
+from pathlib import Path
+from threading import Event, Lock, Thread
+from typing import Any, BinaryIO
+
+from ..runtime.util_errors import RuntimeStateError
+from .util_sqlite import apply_fallback_ops, connect_db
+
+# 每个分段帧的长度前缀（小端 uint32）
+_FRAME_HEADER = struct.Struct("<I")
+
+
+# ==== 分段文件读写工具 ====
+
+
+def iter_segment_records(segment_path: str | Path) -> Iterator[dict[str, Any]]:
+    """
+    顺序读取单个分段文件中的全部 fallback 操作。
+
+    进程崩溃时文件末尾可能残留半帧，读取到不完整的帧时直接停止。
+
+    :param segment_path: 分段文件路径
+    :return: fallback 操作字典迭代器
+    """
+    with Path(segment_path).open("rb") as file:
+        while True:
+            header = file.read(_FRAME_HEADER.size)
+            if len(header) < _FRAME_HEADER.size:
+                return
+            (length,) = _FRAME_HEADER.unpack(header)
+            payload = file.read(length)
+            if len(payload) < length:
+                return
+            yield pickle.loads(payload)
+
+
+def compact_segment_file(
+    conn: Any, segment_path: str | Path, codec: str = "json"
+) -> int:
+    """
+    将单个分段文件中的操作按顺序回放到 sqlite，并在同一事务内提交。
+
+    单条操作失败不会中断整个分段的回放。
+
+    :param conn: 已建立的 sqlite 连接
+    :param segment_path: 分段文件路径
+    :param codec: 负载编解码器名称，默认 ``"json"``
+    :return: 实际改动记录的操作数量
+    :rtype: int
+    """
+    # 与 spout 整批处理保持一致：单条失败只打印堆栈。
+    changed = apply_fallback_ops(conn, iter_segment_records(segment_path), codec)
+    conn.commit()
+    return changed
+
+
+def compact_segment_dir(
+    segment_dir: str | Path, db_path: str | Path, codec: str = "json"
+) -> int:
+    """
+    将目录中残留的全部分段文件按序号压实进 sqlite，并删除已回放的分段。
+
+    用于在进程异常退出后恢复尚未压实的生命周期操作。
+
+    :param segment_dir: 分段文件目录
+    :param db_path: 目标 sqlite 数据库文件路径
+    :param codec: 写入时使用的负载编解码器名称，默认 ``"json"``
+    :return: 实际改动记录的操作数量
+    :rtype: int
+    """
+    directory = Path(segment_dir)
+    if not directory.is_dir():
+        return 0
+
+    changed = 0
+    conn = connect_db(db_path)
+    try:
+        for segment_path in sorted(directory.glob("segment-*.log")):
+            changed += compact_segment_file(conn, segment_path, codec)
+            segment_path.unlink()
+    finally:
+        conn.close()
+
+    if not any(directory.iterdir()):
+        directory.rmdir()
+    return changed
+
+
+# ==== 分段日志 ====
+
+
+class SegmentLog:
+    """
+    顺序追加 fallback 生命周期操作的分段日志。
+
+    写入线程只做顺序追加；分段写满或超过压实间隔后被封存，
+    由后台压实线程按序号回放进 ``records`` 表并删除。
+    """
+
+    segment_dir: Path
+    db_path: Path
+    segment_max_bytes: int
+    compact_interval: float
+    codec: str
+
+    def __init__(
+        self,
+        segment_dir: str | Path,
+        db_path: str | Path,
+        *,
+        segment_max_bytes: int = 16 * 1024 * 1024,
+        compact_interval: float = 1.0,
+        codec: str = "json",
+    ) -> None:
+        """
+        初始化分段日志。
+
+        :param segment_dir: 分段文件目录
+        :param db_path: 压实目标 sqlite 数据库文件路径
+        :param segment_max_bytes: 单个分段的最大字节数，超出后封存，默认 16MB
+        :param compact_interval: 后台压实间隔（秒），默认 1.0
+        :param codec: 压实时使用的负载编解码器名称，默认 ``"json"``
+        """
+        self.segment_dir = Path(segment_dir)
+        self.db_path = Path(db_path)
+        self.segment_max_bytes = segment_max_bytes
+        self.compact_interval = compact_interval
+        self.codec = codec
+
+        self._lock = Lock()
+        self._file: BinaryIO | None = None
+        self._file_path: Path | None = None
+        self._file_bytes = 0
+        self._file_opened_at = 0.0
+        self._next_seq = 1
+        self._sealed: deque[Path] = deque()
+
+        self._stop_flag = Event()
+        self._compactor: Thread | None = None
+
+    # ==== 生命周期 ====
+
+    def open(self) -> None:
+        """创建分段目录与目标数据库，并启动后台压实线程。"""
+        self.segment_dir.mkdir(parents=True, exist_ok=True)
+        connect_db(self.db_path).close()
+
+        self._stop_flag.clear()
+        self._compactor = Thread(target=self._compact_loop, daemon=True)
+        self._compactor.start()
+
+    def close(self) -> None:
+        """停止后台压实线程，封存当前分段并同步压实剩余分段。"""
+        if self._compactor is not None:
+            self._stop_flag.set()
+            self._compactor.join(timeout=30)
+            if self._compactor.is_alive():
+                raise RuntimeStateError(
+                    "Segment compactor thread did not terminate within 30 seconds."
+                )
+            self._compactor = None
+
+        with self._lock:
+            self._seal_locked()
+        self.compact_sealed()
+
+        if self.segment_dir.is_dir() and not any(self.segment_dir.iterdir()):
+            self.segment_dir.rmdir()
+
+    # ==== 写入 ====
+
+    def append(self, record: dict[str, Any]) -> None:
+        """
+        以长度前缀帧的形式顺序追加一条操作。
+
+        :param record: fallback 操作字典
+        """
+        self.append_many([record])
+
+    def append_many(self, records: list[dict[str, Any]]) -> None:
+        """
+        顺序追加一批操作，整批只刷盘一次。
+
+        :param records: fallback 操作字典列表
+        """
+        payloads = [
+            pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL) for record in records
+        ]
+        with self._lock:
+            for payload in payloads:
+                if self._file is None:
+                    self._open_segment_locked()
+                assert self._file is not None
+                _ = self._file.write(_FRAME_HEADER.pack(len(payload)))
+                _ = self._file.write(payload)
+                self._file_bytes += _FRAME_HEADER.size + len(payload)
+
+                if self._file_bytes >= self.segment_max_bytes:
+                    self._seal_locked()
+            if self._file is not None:
+                self._file.flush()
+
+    def _open_segment_locked(self) -> None:
+        """打开下一个序号的分段文件（调用方需持有锁）。"""
+        self._file_path = self.segment_dir / f"segment-{self._next_seq:08d}.log"
+        self._next_seq += 1
+        self._file = self._file_path.open("ab")
+        self._file_bytes = 0
+        self._file_opened_at = time.monotonic()
+
+    def _seal_locked(self) -> None:
+        """关闭当前分段并加入待压实队列（调用方需持有锁）。"""
+        if self._file is None or self._file_path is None:
+            return
+        self._file.close()
+        self._sealed.append(self._file_path)
+        self._file = None
+        self._file_path = None
+        self._file_bytes = 0
+
+    # ==== 压实 ====
+
+    def _compact_loop(self) -> None:
+        """后台压实线程主循环：定期封存空闲分段并回放已封存分段。"""
+        while not self._stop_flag.wait(self.compact_interval):
+            try:
+                with self._lock:
+                    age = time.monotonic() - self._file_opened_at
+                    if self._file is not None and age >= self.compact_interval:
+                        # 低流量时也按时间封存，保证读取端能及时看到记录。
+                        self._seal_locked()
+                self.compact_sealed()
+            except Exception:
+                # 压实失败不致死线程，分段保留在磁盘等待下次重试。
+                traceback.print_exc()
+
+    def compact_sealed(self) -> int:
+        """
+        按序号回放全部已封存分段，并删除回放完成的分段文件。
+
+        :return: 实际改动记录的操作数量
+        :rtype: int
+        """
+        changed = 0
+        with self._lock:
+            if not self._sealed:
+                return 0
+            pending = list(self._sealed)
+
+        conn = connect_db(self.db_path)
+        try:
+            for segment_path in pending:
+                changed += compact_segment_file(conn, segment_path, self.codec)
+                segment_path.unlink()
+                with self._lock:
+                    _ = self._sealed.popleft()
+        finally:
+            conn.close()
+        return changed
+
+    # ==== 查询 ====
+
+    def get_sealed_count(self) -> int:
+        """
+        读取尚未压实的已封存分段数量。
+
+        :return: 已封存分段数量
+        :rtype: int
+        """
+        with self._lock:
+            return len(self._sealed)
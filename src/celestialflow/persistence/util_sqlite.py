@@ -1,14 +1,29 @@
 # persistence/util_sqlite.py
 from __future__ import annotations
 
-import json
+import hashlib
+import heapq
+import re
 import sqlite3
-from collections.abc import Iterable
+import threading
+import traceback
+import weakref
+from collections import OrderedDict, deque
+from collections.abc import Generator, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from itertools import batched
 from pathlib import Path
+from threading import Lock, RLock
 from typing import Any
 
+from .util_codec import decode_payload, encode_payload
+
 # ==== 连接与表结构 ====
 
+# 当前表结构版本，记录在 ``PRAGMA user_version`` 中
+SCHEMA_VERSION = 4
+
 
 def connect_db(db_path: str | Path) -> sqlite3.Connection:
     """
@@ -52,7 +67,25 @@ def _ensure_table(conn: sqlite3.Connection) -> None:
             error_type TEXT NOT NULL DEFAULT '',
             error_message TEXT NOT NULL DEFAULT '',
             task_json TEXT NOT NULL,
-            result_json TEXT NOT NULL DEFAULT 'null'
+            result_json TEXT NOT NULL DEFAULT 'null',
+            error_ref INTEGER,
+            error_prefix INTEGER,
+            error_suffix INTEGER
+        )
+        """
+    )
+    # 创建错误归并表：同一 stage 下类型与消息指纹相同的错误只保存一行。
+    _ = conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS errors (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            stage TEXT NOT NULL,
+            error_type TEXT NOT NULL,
+            fingerprint TEXT NOT NULL,
+            message TEXT NOT NULL,
+            first_ts REAL,
+            last_ts REAL,
+            count INTEGER NOT NULL DEFAULT 0
         )
         """
     )
@@ -63,13 +96,508 @@ def _ensure_table(conn: sqlite3.Connection) -> None:
     _ = conn.execute(
         "CREATE INDEX IF NOT EXISTS idx_records_status_id ON records(status, id)"
     )
+    _ = conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_records_stage_status_id "
+        "ON records(stage, status, id)"
+    )
+    _ = conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_records_status_ts_id ON records(status, ts, id)"
+    )
+    _ = conn.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_errors_key "
+        "ON errors(stage, error_type, fingerprint)"
+    )
     conn.commit()
+    _migrate_schema(conn)
+
+
+def _migrate_schema(conn: sqlite3.Connection) -> None:
+    """
+    按 ``PRAGMA user_version`` 逐级升级表结构，已是最新版本时直接返回。
+
+    - v1：新增 failed 记录的 FTS5 索引；
+    - v2：新增 ``errors`` 归并表与 ``records.error_ref``，并归并已有失败记录；
+    - v3：FTS5 索引不再收录 ``task_json``，重建并回填；
+    - v4：新增 ``records.error_prefix`` / ``error_suffix``，归并记录只保存与样本
+      不同的片段。
+
+    触发器总是按当前定义整体重建。
+
+    :param conn: 已建立的 sqlite 连接
+    :return: None
+    """
+    if _get_schema_version(conn) >= SCHEMA_VERSION:
+        return
+
+    # 立即获取写锁并复查版本，避免多个连接并发迁移时重复回填。
+    _ = conn.execute("BEGIN IMMEDIATE")
+    try:
+        version = _get_schema_version(conn)
+        if version >= SCHEMA_VERSION:
+            conn.rollback()
+            return
+
+        for trigger in _TRIGGER_NAMES:
+            _ = conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(records)")}
+        for column in ("error_ref", "error_prefix", "error_suffix"):
+            if column not in columns:
+                _ = conn.execute(f"ALTER TABLE records ADD COLUMN {column} INTEGER")
+        if version < 1:
+            _ = conn.execute("DROP INDEX IF EXISTS idx_records_stage_id")
+        if version < 3:
+            _ = conn.execute("DROP TABLE IF EXISTS records_fts")
+        if version < 4:
+            # v2 起留空的消息即为样本本身，其余已归并记录保存的是完整消息。
+            _ = conn.execute(
+                """
+                UPDATE records
+                SET error_prefix = CASE
+                        WHEN error_message = '' THEN (
+                            SELECT length(message) FROM errors
+                            WHERE errors.id = records.error_ref
+                        )
+                        ELSE 0
+                    END
+                  , error_suffix = 0
+                WHERE error_ref IS NOT NULL AND error_prefix IS NULL
+                """
+            )
+        if version < 2:
+            _intern_existing_errors(conn)
+
+        _create_failed_fts(conn)
+        _create_error_triggers(conn)
+        _ = conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def _get_schema_version(conn: sqlite3.Connection) -> int:
+    """读取当前数据库文件的表结构版本。"""
+    return int(conn.execute("PRAGMA user_version").fetchone()[0])
+
+
+_TRIGGER_NAMES = (
+    "records_fts_ai",
+    "records_fts_ad",
+    "records_fts_au",
+    "records_errors_ad",
+    "records_errors_au",
+)
+
+# 已归并的错误消息在 records 中只保存与样本不同的片段，读取时用样本的公共
+# 前后缀补回，见 :func:`_split_error_message`。
+_ERROR_MESSAGE_TEXT = (
+    "CASE WHEN {row}.error_ref IS NULL OR {row}.error_prefix IS NULL "
+    "THEN {row}.error_message "
+    "ELSE (SELECT substr(message, 1, {row}.error_prefix) || {row}.error_message "
+    "|| substr(message, length(message) - {row}.error_suffix + 1) "
+    "FROM errors WHERE errors.id = {row}.error_ref) END"
+)
+_ERROR_MESSAGE_SQL = _ERROR_MESSAGE_TEXT.format(row="records")
+
+
+def _create_failed_fts(conn: sqlite3.Connection) -> None:
+    """
+    创建仅覆盖 failed 记录的 FTS5 trigram 外部内容索引及其同步触发器。
+
+    索引只收录错误类型与错误消息：任务负载体积不受控，逐字 trigram 会让索引
+    膨胀数倍并放大每次失败的写入。pending / success 记录不进入索引，热路径的
+    插入与删除不会触发 FTS 写入。
+    索引首次创建时回填已有记录；当前 sqlite 不支持 FTS5 或 trigram 分词器时跳过，
+    查询回退为 ``LIKE``。
+
+    :param conn: 已处于写事务中的 sqlite 连接
+    :return: None
+    """
+    existed = _has_failed_fts(conn)
+    try:
+        _ = conn.execute(
+            """
+            CREATE VIRTUAL TABLE IF NOT EXISTS records_fts USING fts5(
+                error_type, error_message,
+                content='records', content_rowid='id', tokenize='trigram'
+            )
+            """
+        )
+    except sqlite3.OperationalError:
+        return
+
+    new_message = _ERROR_MESSAGE_TEXT.format(row="new")
+    old_message = _ERROR_MESSAGE_TEXT.format(row="old")
+    _ = conn.execute(
+        f"""
+        CREATE TRIGGER records_fts_ai
+        AFTER INSERT ON records WHEN new.status = 'failed'
+        BEGIN
+            INSERT INTO records_fts(rowid, error_type, error_message)
+            VALUES (new.id, new.error_type, {new_message});
+        END
+        """
+    )
+    _ = conn.execute(
+        f"""
+        CREATE TRIGGER records_fts_ad
+        AFTER DELETE ON records WHEN old.status = 'failed'
+        BEGIN
+            INSERT INTO records_fts(records_fts, rowid, error_type, error_message)
+            VALUES ('delete', old.id, old.error_type, {old_message});
+        END
+        """
+    )
+    # 单个触发器内先删旧条目再写新条目，保证同一 rowid 的操作顺序确定。
+    _ = conn.execute(
+        f"""
+        CREATE TRIGGER records_fts_au
+        AFTER UPDATE OF status, error_type, error_message, error_ref
+                      , error_prefix, error_suffix
+        ON records
+        WHEN old.status = 'failed' OR new.status = 'failed'
+        BEGIN
+            INSERT INTO records_fts(records_fts, rowid, error_type, error_message)
+            SELECT 'delete', old.id, old.error_type, {old_message}
+            WHERE old.status = 'failed';
+            INSERT INTO records_fts(rowid, error_type, error_message)
+            SELECT new.id, new.error_type, {new_message}
+            WHERE new.status = 'failed';
+        END
+        """
+    )
+    if not existed:
+        _ = conn.execute(
+            f"""
+            INSERT INTO records_fts(rowid, error_type, error_message)
+            SELECT id, error_type, {_ERROR_MESSAGE_SQL}
+            FROM records
+            WHERE status = 'failed'
+            """
+        )
+
+
+def _create_error_triggers(conn: sqlite3.Connection) -> None:
+    """
+    创建维护 ``errors.count`` 的触发器：记录删除或重新绑定时递减原归并行。
+
+    递增由写入端在归并时完成，见 :func:`_intern_errors`；已失败的记录再次晋升
+    到同一归并行时，先递减再递增，计数保持不变。
+
+    :param conn: 已处于写事务中的 sqlite 连接
+    :return: None
+    """
+    _ = conn.execute(
+        """
+        CREATE TRIGGER records_errors_ad
+        AFTER DELETE ON records WHEN old.error_ref IS NOT NULL
+        BEGIN
+            UPDATE errors SET count = count - 1 WHERE id = old.error_ref;
+        END
+        """
+    )
+    _ = conn.execute(
+        """
+        CREATE TRIGGER records_errors_au
+        AFTER UPDATE OF error_ref ON records WHEN old.error_ref IS NOT NULL
+        BEGIN
+            UPDATE errors SET count = count - 1 WHERE id = old.error_ref;
+        END
+        """
+    )
+
+
+def _intern_existing_errors(conn: sqlite3.Connection) -> None:
+    """
+    将尚未归并的 failed 记录归并进 ``errors`` 表（旧版本数据库迁移用）。
+
+    :param conn: 已处于写事务中的 sqlite 连接
+    :return: None
+    """
+    rows = conn.execute(
+        """
+        SELECT id, ts, stage, error_type, error_message
+        FROM records
+        WHERE status = 'failed' AND error_ref IS NULL
+        ORDER BY id ASC
+        """
+    ).fetchall()
+    interned = _intern_errors(
+        conn,
+        [
+            (
+                str(row["stage"]),
+                str(row["error_type"]),
+                str(row["error_message"]),
+                float(row["ts"] or 0.0),
+            )
+            for row in rows
+        ],
+    )
+    _ = conn.executemany(
+        """
+        UPDATE records
+        SET error_ref = ?, error_prefix = ?, error_message = ?, error_suffix = ?
+        WHERE id = ?
+        """,
+        [(*parts, int(row["id"])) for parts, row in zip(interned, rows, strict=True)],
+    )
+
+
+def _intern_errors(
+    conn: sqlite3.Connection, failures: list[tuple[str, str, str, float]]
+) -> list[tuple[int, int, str, int]]:
+    """
+    将一批失败归并进 ``errors`` 表，并累加计数、刷新首末次出现时间。
+
+    同一错误键在这批失败中只执行一次 upsert，错误风暴下每批写入的归并行数量
+    与错误种类数相当，而不是与失败数相当。
+
+    :param conn: 已建立的 sqlite 连接
+    :param failures: ``(stage, error_type, error_message, ts)`` 列表
+    :return: 与 ``failures`` 一一对应的 ``(error_ref, prefix, stored_message, suffix)``，
+        后三项见 :func:`_split_error_message`
+    :rtype: list[tuple[int, int, str, int]]
+    """
+    keys: list[tuple[str, str, str]] = []
+    groups: dict[tuple[str, str, str], tuple[str, float, float, int]] = {}
+    for stage, error_type, message, ts in failures:
+        key = (stage, error_type, fingerprint_error_message(message))
+        keys.append(key)
+        group = groups.get(key)
+        if group is None:
+            groups[key] = (message, ts, ts, 1)
+        else:
+            sample, first_ts, last_ts, count = group
+            groups[key] = (sample, min(first_ts, ts), max(last_ts, ts), count + 1)
+
+    samples: dict[tuple[str, str, str], tuple[int, str]] = {}
+    for key, (message, first_ts, last_ts, count) in groups.items():
+        row = conn.execute(
+            """
+            INSERT INTO errors
+                (stage, error_type, fingerprint, message, first_ts, last_ts, count)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (stage, error_type, fingerprint) DO UPDATE SET
+                count = count + excluded.count,
+                first_ts = MIN(first_ts, excluded.first_ts),
+                last_ts = MAX(last_ts, excluded.last_ts)
+            RETURNING id, message
+            """,
+            [*key, message, first_ts, last_ts, count],
+        ).fetchone()
+        samples[key] = (int(row["id"]), str(row["message"]))
+
+    interned: list[tuple[int, int, str, int]] = []
+    for key, (_, _, message, _) in zip(keys, failures, strict=True):
+        error_ref, sample = samples[key]
+        interned.append((error_ref, *_split_error_message(sample, message)))
+    return interned
+
+
+def _split_error_message(sample: str, message: str) -> tuple[int, str, int]:
+    """
+    拆出错误消息中与归并样本不同的片段。
+
+    同一指纹的消息通常只有 ID、数值等少数片段不同，记录只保存从首个差异到
+    末个差异之间的片段，读取时用样本的公共前后缀补回。
+
+    :param sample: ``errors`` 表中的归并样本
+    :param message: 本次失败的错误消息
+    :return: ``(prefix, middle, suffix)``：公共前缀长度、差异片段、公共后缀长度
+    :rtype: tuple[int, str, int]
+    """
+    prefix = _common_prefix_length(sample, message)
+    suffix = _common_prefix_length(sample[prefix:][::-1], message[prefix:][::-1])
+    return prefix, message[prefix : len(message) - suffix], suffix
+
+
+def _common_prefix_length(left: str, right: str) -> int:
+    """返回两个字符串公共前缀的长度。"""
+    for index, (left_char, right_char) in enumerate(zip(left, right, strict=False)):
+        if left_char != right_char:
+            return index
+    return min(len(left), len(right))
+
+
+# ==== 只读连接缓存 ====
+
+# 每个线程最多缓存的只读连接数量
+READ_CONNECTION_CACHE_SIZE = 8
+
+
+class _ReadConnectionCache:
+    """单个线程持有的只读连接 LRU 缓存。"""
+
+    lock: RLock
+    conns: OrderedDict[str, sqlite3.Connection]
+
+    def __init__(self) -> None:
+        self.lock = RLock()
+        self.conns = OrderedDict()
+
+
+_read_local = threading.local()
+_read_caches: weakref.WeakSet[_ReadConnectionCache] = weakref.WeakSet()
+_read_caches_lock = Lock()
+_schema_checked: set[str] = set()
+
+
+def _resolve_readable(db_path: str | Path) -> str | None:
+    """
+    解析数据库路径，并在首次读取该路径时以只读方式检查表结构版本。
+
+    读取端不创建目录或文件；只有旧版本文件需要升级表结构时，才交给写入端的
+    :func:`connect_db` 完成一次迁移。
+
+    :param db_path: sqlite 数据库文件路径
+    :return: 解析后的绝对路径字符串；文件不存在时为 ``None``
+    :rtype: str | None
+    """
+    resolved = Path(db_path).resolve()
+    if not resolved.is_file():
+        return None
+    path = str(resolved)
+    if path not in _schema_checked:
+        conn = _open_read_connection(path)
+        try:
+            version = _get_schema_version(conn)
+        finally:
+            conn.close()
+        if version < SCHEMA_VERSION:
+            connect_db(path).close()
+        _schema_checked.add(path)
+    return path
+
+
+def _open_empty_connection() -> sqlite3.Connection:
+    """
+    打开带有完整表结构的内存库，读取不存在的数据库文件时以空结果代替。
+
+    :return: 内存 sqlite 连接
+    :rtype: sqlite3.Connection
+    """
+    conn = sqlite3.connect(":memory:", check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    _ensure_table(conn)
+    return conn
+
+
+def _open_read_connection(path: str) -> sqlite3.Connection:
+    """
+    以 ``mode=ro`` URI 打开只读连接。
+
+    :param path: 已解析的绝对路径
+    :return: 只读 sqlite 连接
+    :rtype: sqlite3.Connection
+    """
+    # 自动提交模式：不隐式开启事务，避免长期持有旧快照读到过期数据。
+    conn = sqlite3.connect(
+        f"{Path(path).as_uri()}?mode=ro",
+        uri=True,
+        check_same_thread=False,
+        isolation_level=None,
+    )
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def _get_thread_cache() -> _ReadConnectionCache:
+    """获取当前线程的只读连接缓存，不存在时创建并登记。"""
+    cache: _ReadConnectionCache | None = getattr(_read_local, "cache", None)
+    if cache is None:
+        cache = _ReadConnectionCache()
+        _read_local.cache = cache
+        with _read_caches_lock:
+            _read_caches.add(cache)
+    return cache
+
+
+@contextmanager
+def read_connection(db_path: str | Path) -> Generator[sqlite3.Connection, None, None]:
+    """
+    借出当前线程缓存的只读连接。
+
+    连接以 ``mode=ro`` 打开，不参与写锁竞争；表结构检查对每个路径只执行一次。
+    文件不存在时借出一个空的内存库，读取结果为空且不会创建该文件。
+    复用连接同时复用了 sqlite3 模块按连接缓存的预编译语句。
+
+    :param db_path: sqlite 数据库文件路径
+    :return: 只读 sqlite 连接上下文
+    """
+    path = _resolve_readable(db_path)
+    if path is None:
+        conn = _open_empty_connection()
+        try:
+            yield conn
+        finally:
+            conn.close()
+        return
+
+    cache = _get_thread_cache()
+    with cache.lock:
+        conn = cache.conns.get(path)
+        if conn is None:
+            conn = _open_read_connection(path)
+            cache.conns[path] = conn
+            while len(cache.conns) > READ_CONNECTION_CACHE_SIZE:
+                _, evicted = cache.conns.popitem(last=False)
+                evicted.close()
+        else:
+            cache.conns.move_to_end(path)
+        yield conn
+
+
+def close_read_connections(db_path: str | Path | None = None) -> None:
+    """
+    关闭所有线程中缓存的只读连接。
+
+    移动、删除或替换数据库文件前应先调用本函数。
+
+    :param db_path: 仅关闭该路径的连接；为 ``None`` 时关闭全部
+    """
+    path = None if db_path is None else str(Path(db_path).resolve())
+    with _read_caches_lock:
+        caches = list(_read_caches)
+
+    for cache in caches:
+        with cache.lock:
+            for key in [k for k in cache.conns if path is None or k == path]:
+                cache.conns.pop(key).close()
+
+    if path is None:
+        _schema_checked.clear()
+    else:
+        _schema_checked.discard(path)
 
 
 # ==== 记录序列化工具 ====
 
+# 计算错误指纹前抹去的易变片段：引号内字符串、十六进制地址与数字。
+_FINGERPRINT_PATTERNS = (
+    (re.compile(r"'[^']*'|\"[^\"]*\""), "'?'"),
+    (re.compile(r"0x[0-9a-fA-F]+"), "0x?"),
+    (re.compile(r"\d+"), "#"),
+)
+
 
-def normalize_record(record: dict[str, Any]) -> dict[str, Any] | None:
+def fingerprint_error_message(message: str) -> str:
+    """
+    计算错误消息的指纹，消息中仅 ID、地址、数值等易变片段不同的错误指纹相同。
+
+    :param message: 错误消息
+    :return: 16 位十六进制指纹
+    :rtype: str
+    """
+    normalized = message
+    for pattern, replacement in _FINGERPRINT_PATTERNS:
+        normalized = pattern.sub(replacement, normalized)
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def normalize_record(
+    record: dict[str, Any], codec: str = "json"
+) -> dict[str, Any] | None:
     """
     将记录归一化为 sqlite 可写格式。
 
@@ -77,6 +605,7 @@ def normalize_record(record: dict[str, Any]) -> dict[str, Any] | None:
     ``status``，由调用方保证写入语义完整。
 
     :param record: 原始记录字典
+    :param codec: ``task_json`` / ``result_json`` 的编解码器名称，默认 ``"json"``
     :return: 可直接写入 sqlite 的参数字典，或 ``None``
     :rtype: dict[str, Any] | None
     """
@@ -91,11 +620,25 @@ def normalize_record(record: dict[str, Any]) -> dict[str, Any] | None:
         "error_type": str(record.get("error_type", "") or ""),
         "error_message": str(record.get("error_message", "") or ""),
         "ts": float(record.get("ts", 0.0) or 0.0),
-        "task_json": json.dumps(record["task_json"], ensure_ascii=False),
-        "result_json": json.dumps(record.get("result_json"), ensure_ascii=False),
+        "task_json": encode_payload(record["task_json"], codec),
+        "result_json": _encode_result(record.get("result_json"), codec),
     }
 
 
+def _encode_result(result: Any, codec: str) -> str | bytes:
+    """
+    编码结果列；空结果统一保存为 JSON ``null``，与列默认值保持一致。
+
+    :param result: 任务结果
+    :param codec: 编解码器名称
+    :return: TEXT 或 BLOB
+    :rtype: str | bytes
+    """
+    if result is None:
+        return "null"
+    return encode_payload(result, codec)
+
+
 def row_to_record_dict(row: sqlite3.Row) -> dict[str, Any]:
     """
     将 sqlite 行转换为对外记录字典。
@@ -112,15 +655,17 @@ def row_to_record_dict(row: sqlite3.Row) -> dict[str, Any]:
         "status": str(row["status"]),
         "error_type": str(row["error_type"]),
         "error_message": str(row["error_message"]),
-        "task_json": json.loads(str(row["task_json"])),
-        "result_json": json.loads(str(row["result_json"])),
+        "task_json": decode_payload(row["task_json"]),
+        "result_json": decode_payload(row["result_json"]),
     }
 
 
 # ==== 复用已有连接的写操作 ====
 
 
-def insert_record(conn: sqlite3.Connection, record: dict[str, Any]) -> bool:
+def insert_record(
+    conn: sqlite3.Connection, record: dict[str, Any], codec: str = "json"
+) -> bool:
     """
     在给定连接上插入单条记录。
 
@@ -128,25 +673,59 @@ def insert_record(conn: sqlite3.Connection, record: dict[str, Any]) -> bool:
 
     :param conn: 已建立的 sqlite 连接
     :param record: 原始错误记录字典
+    :param codec: 负载编解码器名称，默认 ``"json"``
     :return: 是否实际插入了一条记录
     :rtype: bool
     """
-    normalized = normalize_record(record)
+    normalized = normalize_record(record, codec)
     if normalized is None:
         return False
 
+    # failed 记录先归并错误，再写入对 errors 行的引用。
+    normalized["error_ref"] = None
+    normalized["error_prefix"] = None
+    normalized["error_suffix"] = None
+    if normalized["status"] == "failed":
+        (
+            normalized["error_ref"],
+            normalized["error_prefix"],
+            normalized["error_message"],
+            normalized["error_suffix"],
+        ) = _intern_errors(
+            conn,
+            [
+                (
+                    normalized["stage"],
+                    normalized["error_type"],
+                    normalized["error_message"],
+                    normalized["ts"],
+                )
+            ],
+        )[0]
+
     # 插入单条归一化后的记录。
-    _ = conn.execute(
-        """
-        INSERT INTO records (
-            event_id, ts, stage, status, error_type, error_message, task_json, result_json
-        )
-        VALUES (
-            :event_id, :ts, :stage, :status, :error_type, :error_message, :task_json, :result_json
+    try:
+        _ = conn.execute(
+            """
+            INSERT INTO records (
+                event_id, ts, stage, status, error_type, error_message, task_json
+                , result_json, error_ref, error_prefix, error_suffix
+            )
+            VALUES (
+                :event_id, :ts, :stage, :status, :error_type, :error_message, :task_json
+                , :result_json, :error_ref, :error_prefix, :error_suffix
+            )
+            """,
+            normalized,
         )
-        """,
-        normalized,
-    )
+    except sqlite3.IntegrityError:
+        # 插入失败时撤销本次归并计数。
+        if normalized["error_ref"] is not None:
+            _ = conn.execute(
+                "UPDATE errors SET count = count - 1 WHERE id = ?",
+                [normalized["error_ref"]],
+            )
+        raise
     return True
 
 
@@ -171,15 +750,83 @@ def promote_record_to_failed_by_event_id(
     :return: 是否更新到记录
     :rtype: bool
     """
-    cursor = conn.execute(
+    return (
+        _promote_records_to_failed(
+            conn,
+            [
+                {
+                    "event_id": event_id,
+                    "error_id": new_event_id,
+                    "ts": ts,
+                    "error_type": error_type,
+                    "error_message": error_message,
+                }
+            ],
+        )
+        > 0
+    )
+
+
+def _promote_records_to_failed(
+    conn: sqlite3.Connection, ops: list[dict[str, Any]]
+) -> int:
+    """
+    在给定连接上批量执行 ``promote_failed`` 操作。
+
+    一次查询取回全部记录的 stage，错误按批归并（见 :func:`_intern_errors`），
+    再批量更新记录。调用方需保证各操作涉及的事件 ID 互不相同。
+
+    :param conn: 已建立的 sqlite 连接
+    :param ops: ``promote_failed`` 操作字典列表
+    :return: 更新到的记录数量
+    :rtype: int
+    """
+    stages: dict[int, str] = {}
+    # 分块查询，避免超出 sqlite 的绑定参数上限。
+    for chunk in batched([int(op["event_id"]) for op in ops], 500):
+        placeholders = ", ".join("?" for _ in chunk)
+        for row in conn.execute(
+            f"SELECT event_id, stage FROM records WHERE event_id IN ({placeholders})",
+            chunk,
+        ):
+            stages[int(row["event_id"])] = str(row["stage"])
+
+    found = [op for op in ops if int(op["event_id"]) in stages]
+    if not found:
+        return 0
+
+    # 风暴期间同类错误只累加 errors 计数，records 中只保存与样本不同的片段。
+    interned = _intern_errors(
+        conn,
+        [
+            (
+                stages[int(op["event_id"])],
+                str(op["error_type"]),
+                str(op["error_message"]),
+                float(op["ts"]),
+            )
+            for op in found
+        ],
+    )
+    cursor = conn.executemany(
         """
         UPDATE records
-        SET event_id = ?, ts = ?, status = 'failed', error_type = ?, error_message = ?
+        SET event_id = ?, ts = ?, status = 'failed', error_type = ?
+          , error_ref = ?, error_prefix = ?, error_message = ?, error_suffix = ?
         WHERE event_id = ?
         """,
-        [int(new_event_id), ts, error_type, error_message, int(event_id)],
+        [
+            (
+                int(op["error_id"]),
+                float(op["ts"]),
+                str(op["error_type"]),
+                *parts,
+                int(op["event_id"]),
+            )
+            for op, parts in zip(found, interned, strict=True)
+        ],
     )
-    return cursor.rowcount > 0
+    return cursor.rowcount
 
 
 def promote_record_to_success_by_event_id(
@@ -188,6 +835,7 @@ def promote_record_to_success_by_event_id(
     result: Any,
     *,
     ts: float,
+    codec: str = "json",
 ) -> bool:
     """
     在给定连接上按 ``event_id`` 将记录晋升为 success，并写入结果。
@@ -196,6 +844,7 @@ def promote_record_to_success_by_event_id(
     :param event_id: 当前事件 ID
     :param result: 任务结果
     :param ts: 生命周期更新时间戳
+    :param codec: 负载编解码器名称，默认 ``"json"``
     :return: 是否更新到记录
     :rtype: bool
     """
@@ -205,7 +854,7 @@ def promote_record_to_success_by_event_id(
         SET status = 'success', ts = ?, result_json = ?
         WHERE event_id = ?
         """,
-        [ts, json.dumps(result, ensure_ascii=False), int(event_id)],
+        [ts, _encode_result(result, codec), int(event_id)],
     )
     return cursor.rowcount > 0
 
@@ -256,6 +905,135 @@ def delete_record_by_event_id(conn: sqlite3.Connection, event_id: int) -> bool:
     return cursor.rowcount > 0
 
 
+def apply_fallback_op(
+    conn: sqlite3.Connection, record: dict[str, Any], codec: str = "json"
+) -> bool:
+    """
+    在给定连接上应用一条 fallback 生命周期操作，不负责提交事务。
+
+    :param conn: 已建立的 sqlite 连接
+    :param record: 带 ``__op__`` 字段的 fallback 操作字典
+    :param codec: 负载编解码器名称，默认 ``"json"``
+    :return: 是否实际改动了记录
+    :rtype: bool
+    :raises ValueError: ``__op__`` 不是受支持的操作
+    """
+    op = str(record["__op__"])
+    if op == "insert":
+        # 新任务进入某个 stage，写入一条 pending 记录。
+        return insert_record(conn, record["record"], codec)
+    if op == "delete":
+        # 任务成功或重复时，删除对应的 pending 记录。
+        return delete_record_by_event_id(conn, int(record["event_id"]))
+    if op == "update_event_id":
+        # 任务重试时，将 pending 记录迁移到新的 retry 事件 ID。
+        return update_record_event_id_by_event_id(
+            conn,
+            int(record["event_id"]),
+            int(record["new_event_id"]),
+            ts=float(record["ts"]),
+        )
+    if op == "promote_success":
+        # 任务成功时，将 pending 记录晋升为 success 并写入结果。
+        return promote_record_to_success_by_event_id(
+            conn,
+            int(record["event_id"]),
+            record["result_json"],
+            ts=float(record["ts"]),
+            codec=codec,
+        )
+    if op == "promote_failed":
+        # 任务最终失败时，将 pending 记录晋升为 failed 并补齐错误信息。
+        return promote_record_to_failed_by_event_id(
+            conn,
+            int(record["event_id"]),
+            int(record["error_id"]),
+            ts=float(record["ts"]),
+            error_type=str(record["error_type"]),
+            error_message=str(record["error_message"]),
+        )
+    raise ValueError(f"unsupported fallback operation: {op}")
+
+
+def apply_fallback_ops(
+    conn: sqlite3.Connection, records: Iterable[dict[str, Any]], codec: str = "json"
+) -> int:
+    """
+    在给定连接上按顺序应用一批 fallback 生命周期操作，不负责提交事务。
+
+    连续的 ``promote_failed`` 操作合并为一段执行，见
+    :func:`_apply_promote_failed_run`。单条操作失败只打印堆栈，不影响其余操作。
+
+    :param conn: 已建立的 sqlite 连接
+    :param records: 按入队顺序排列的 fallback 操作字典
+    :param codec: 负载编解码器名称，默认 ``"json"``
+    :return: 实际改动记录的操作数量
+    :rtype: int
+    """
+    changed = 0
+    run: list[dict[str, Any]] = []
+    run_ids: set[int] = set()
+    for record in records:
+        if record.get("__op__") == "promote_failed":
+            ids = {int(record["event_id"]), int(record["error_id"])}
+            # 同一段内的事件 ID 必须互不相同，链式晋升需分段保持先后顺序。
+            if not run_ids.isdisjoint(ids):
+                changed += _apply_promote_failed_run(conn, run)
+                run, run_ids = [], set()
+            run.append(record)
+            run_ids |= ids
+            continue
+
+        changed += _apply_promote_failed_run(conn, run)
+        run, run_ids = [], set()
+        try:
+            changed += apply_fallback_op(conn, record, codec)
+        except Exception:
+            traceback.print_exc()
+    return changed + _apply_promote_failed_run(conn, run)
+
+
+def _apply_promote_failed_run(
+    conn: sqlite3.Connection, run: list[dict[str, Any]]
+) -> int:
+    """
+    在保存点内合并执行一段连续的 ``promote_failed`` 操作。
+
+    合并执行失败（如新事件 ID 冲突）时回滚到保存点，逐条重放以定位出错的操作。
+
+    :param conn: 已建立的 sqlite 连接
+    :param run: 事件 ID 互不相同的 ``promote_failed`` 操作字典列表
+    :return: 实际改动记录的操作数量
+    :rtype: int
+    """
+    if not run:
+        return 0
+    # 保存点须嵌套在事务内，否则释放时会直接提交。
+    if not conn.in_transaction:
+        _ = conn.execute("BEGIN")
+    _ = conn.execute("SAVEPOINT promote_failed_run")
+    try:
+        changed = _promote_records_to_failed(conn, run)
+    except Exception:
+        _ = conn.execute("ROLLBACK TO promote_failed_run")
+        _ = conn.execute("RELEASE promote_failed_run")
+    else:
+        _ = conn.execute("RELEASE promote_failed_run")
+        return changed
+
+    # 逐条重放时每条操作各自一个保存点，出错的操作不会留下归并计数。
+    changed = 0
+    for record in run:
+        _ = conn.execute("SAVEPOINT promote_failed_op")
+        try:
+            changed += apply_fallback_op(conn, record)
+        except Exception:
+            _ = conn.execute("ROLLBACK TO promote_failed_op")
+            traceback.print_exc()
+        _ = conn.execute("RELEASE promote_failed_op")
+    return changed
+
+
 # ==== 自持完整 conn 生命周期的写操作 ====
 
 
@@ -269,17 +1047,21 @@ def clear_records(db_path: str | Path) -> None:
     conn = connect_db(db_path)
     try:
         _ = conn.execute("DELETE FROM records")
+        _ = conn.execute("DELETE FROM errors")
         conn.commit()
     finally:
         conn.close()
 
 
-def append_records(db_path: str | Path, records: Iterable[dict[str, Any]]) -> int:
+def append_records(
+    db_path: str | Path, records: Iterable[dict[str, Any]], codec: str = "json"
+) -> int:
     """
     自行创建并关闭连接，将给定记录列表追加写入数据库。
 
     :param db_path: sqlite 数据库文件路径
     :param records: 待追加的记录迭代器
+    :param codec: 负载编解码器名称，默认 ``"json"``
     :return: 实际追加写入的记录数量
     :rtype: int
     """
@@ -288,7 +1070,7 @@ def append_records(db_path: str | Path, records: Iterable[dict[str, Any]]) -> in
         inserted = 0
         for item in records:
             try:
-                if insert_record(conn, item):
+                if insert_record(conn, item, codec):
                     inserted += 1
             except sqlite3.IntegrityError:
                 # event_id 已存在时跳过，保证增量同步接口具备幂等性。
@@ -299,19 +1081,154 @@ def append_records(db_path: str | Path, records: Iterable[dict[str, Any]]) -> in
         conn.close()
 
 
-# ==== 自持完整 conn 生命周期的元数据读取函数 ====
+def compact_db(db_path: str | Path, vacuum_free_ratio: float = 0.2) -> int:
+    """
+    自行创建并关闭连接，截断 WAL 并在空闲页占比达到阈值时执行 ``VACUUM``。
+
+    pending 记录先插入后删除，已结束的 fallback 文件通常残留大量空闲页。
+    调用方需保证文件不再被写入。
+
+    :param db_path: sqlite 数据库文件路径
+    :param vacuum_free_ratio: 空闲页占比达到该值时执行 ``VACUUM``，默认 0.2
+    :return: 回收的字节数（含 WAL）
+    :rtype: int
+    """
+    path = Path(db_path)
+    wal_path = path.with_name(path.name + "-wal")
+    before = path.stat().st_size + (wal_path.stat().st_size if wal_path.exists() else 0)
+
+    close_read_connections(path)
+    conn = connect_db(path)
+    try:
+        # PRAGMA 语句需读尽结果，否则 VACUUM 会因仍有语句在执行而失败。
+        _ = conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+        page_count = int(conn.execute("PRAGMA page_count").fetchall()[0][0])
+        freelist_count = int(conn.execute("PRAGMA freelist_count").fetchall()[0][0])
+        if page_count and freelist_count / page_count >= vacuum_free_ratio:
+            _ = conn.execute("VACUUM")
+            _ = conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+    finally:
+        conn.close()
+
+    after = path.stat().st_size + (wal_path.stat().st_size if wal_path.exists() else 0)
+    return max(0, before - after)
+
+
+def merge_db_into(target_path: str | Path, source_path: str | Path) -> int:
+    """
+    自行创建并关闭连接，将源数据库的全部记录与错误归并行并入目标数据库。
+
+    - 同一错误键的归并行计数相加，首末时间取并集；
+    - 源记录与目标记录的 ``event_id`` 冲突时，源记录整体平移到目标最大 ``event_id`` 之后；
+    - 源记录只保存了差异片段的错误消息，若源与目标归并行样本不同，会被物化为
+      完整消息写回 ``error_message``。
+
+    :param target_path: 目标 sqlite 数据库文件路径
+    :param source_path: 源 sqlite 数据库文件路径，调用方负责在成功后删除
+    :return: 并入的记录数量
+    :rtype: int
+    """
+    # 先以读写连接打开源文件，确保其表结构已迁移到当前版本。
+    connect_db(source_path).close()
+
+    conn = connect_db(target_path)
+    try:
+        _ = conn.execute("ATTACH DATABASE ? AS src", [str(source_path)])
+        try:
+            _ = conn.execute("BEGIN IMMEDIATE")
+            conflict = conn.execute(
+                """
+                SELECT 1 FROM src.records AS s
+                JOIN main.records AS m ON m.event_id = s.event_id
+                LIMIT 1
+                """
+            ).fetchone()
+            offset = 0
+            if conflict is not None:
+                row = conn.execute(
+                    """
+                    SELECT (SELECT MAX(event_id) FROM main.records)
+                         - (SELECT MIN(event_id) FROM src.records) + 1
+                    """
+                ).fetchone()
+                offset = int(row[0])
+
+            _ = conn.execute(
+                """
+                INSERT INTO main.errors
+                    (stage, error_type, fingerprint, message, first_ts, last_ts, count)
+                SELECT stage, error_type, fingerprint, message, first_ts, last_ts, count
+                FROM src.errors WHERE true
+                ON CONFLICT(stage, error_type, fingerprint) DO UPDATE SET
+                    count = count + excluded.count,
+                    first_ts = MIN(COALESCE(first_ts, excluded.first_ts),
+                                   COALESCE(excluded.first_ts, first_ts)),
+                    last_ts = MAX(COALESCE(last_ts, excluded.last_ts),
+                                  COALESCE(excluded.last_ts, last_ts))
+                """
+            )
+            cursor = conn.execute(
+                """
+                INSERT INTO main.records (
+                    event_id, ts, stage, status, error_type, error_message,
+                    task_json, result_json, error_ref, error_prefix, error_suffix
+                )
+                SELECT r.event_id + ?, r.ts, r.stage, r.status, r.error_type
+                     , CASE
+                           WHEN r.error_prefix IS NULL OR e.message = m.message
+                           THEN r.error_message
+                           ELSE substr(e.message, 1, r.error_prefix)
+                                || r.error_message
+                                || substr(
+                                       e.message,
+                                       length(e.message) - r.error_suffix + 1
+                                   )
+                       END
+                     , r.task_json, r.result_json, m.id
+                     , CASE
+                           WHEN r.error_prefix IS NULL OR e.message = m.message
+                           THEN r.error_prefix
+                           ELSE 0
+                       END
+                     , CASE
+                           WHEN r.error_prefix IS NULL OR e.message = m.message
+                           THEN r.error_suffix
+                           ELSE 0
+                       END
+                FROM src.records AS r
+                LEFT JOIN src.errors AS e ON e.id = r.error_ref
+                LEFT JOIN main.errors AS m
+                    ON m.stage = e.stage
+                   AND m.error_type = e.error_type
+                   AND m.fingerprint = e.fingerprint
+                ORDER BY r.id ASC
+                """,
+                [offset],
+            )
+            merged = cursor.rowcount
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            _ = conn.execute("DETACH DATABASE src")
+        return merged
+    finally:
+        conn.close()
+
+
+# ==== 复用只读连接的元数据读取函数 ====
 
 
 def get_max_event_id_in_fail(db_path: str | Path) -> int | None:
     """
-    自行创建并关闭连接，读取失败记录中的最大 ``event_id``。
+    复用当前线程的只读连接，读取失败记录中的最大 ``event_id``。
 
     :param db_path: sqlite 数据库文件路径
     :return: 失败记录中的最大 ``event_id``；若不存在失败记录则返回 ``None``
     :rtype: int | None
     """
-    conn = connect_db(db_path)
-    try:
+    with read_connection(db_path) as conn:
         row = conn.execute(
             """
             SELECT MAX(event_id) AS max_event_id
@@ -321,11 +1238,9 @@ def get_max_event_id_in_fail(db_path: str | Path) -> int | None:
         ).fetchone()
         max_event_id = row["max_event_id"]
         return None if max_event_id is None else int(max_event_id)
-    finally:
-        conn.close()
 
 
-# ==== 自持完整 conn 生命周期的 load 函数 ====
+# ==== 复用只读连接的 load 函数 ====
 
 
 def load_records(
@@ -333,19 +1248,19 @@ def load_records(
     status: str = "failed",
 ) -> list[dict[str, Any]]:
     """
-    自行创建并关闭连接，读取数据库中指定状态的记录。
+    复用当前线程的只读连接，读取数据库中指定状态的记录。
 
     :param db_path: sqlite 数据库文件路径
     :param status: 记录状态过滤条件，默认 ``failed``
     :return: 指定状态的记录列表
     :rtype: list[dict[str, Any]]
     """
-    conn = connect_db(db_path)
-    try:
+    with read_connection(db_path) as conn:
         # 按写入顺序读取指定状态的记录。
         rows = conn.execute(
-            """
-            SELECT id, event_id, ts, stage, status, error_type, error_message, task_json
+            f"""
+            SELECT id, event_id, ts, stage, status, error_type
+                 , {_ERROR_MESSAGE_SQL} AS error_message, task_json
                  , result_json
             FROM records
             WHERE status = ?
@@ -354,8 +1269,6 @@ def load_records(
             [status],
         ).fetchall()
         return [row_to_record_dict(row) for row in rows]
-    finally:
-        conn.close()
 
 
 def load_tasks_grouped_by_stage(
@@ -363,15 +1276,14 @@ def load_tasks_grouped_by_stage(
     statuses: Iterable[str] = ("failed", "pending"),
 ) -> dict[str, list[dict[str, Any]]]:
     """
-    自行创建并关闭连接，按 stage 分组读取指定状态的记录。
+    复用当前线程的只读连接，按 stage 分组读取指定状态的记录。
 
     :param db_path: sqlite 数据库文件路径
     :param statuses: 记录状态过滤条件；可传单个状态或状态列表
     :return: ``{stage_name: [{"task_json": task, "error_type": str, "status": str}, ...], ...}``
     :rtype: dict[str, list[dict[str, Any]]]
     """
-    conn = connect_db(db_path)
-    try:
+    with read_connection(db_path) as conn:
         if not statuses:
             return {}
 
@@ -389,40 +1301,130 @@ def load_tasks_grouped_by_stage(
         grouped_records: dict[str, list[dict[str, Any]]] = {}
         for row in rows:
             stage_name = str(row["stage"])
-            task_json = str(row["task_json"])
             error_type = str(row["error_type"])
             status = str(row["status"])
 
             stage_tasks = grouped_records.setdefault(stage_name, [])
             stage_tasks.append(
                 {
-                    "task_json": json.loads(task_json),
+                    "task_json": decode_payload(row["task_json"]),
                     "error_type": error_type,
                     "status": status,
                 }
             )
         return grouped_records
+
+
+def iter_stage_task_chunks(
+    db_path: str | Path,
+    stage: str,
+    statuses: Iterable[str] = ("failed", "pending"),
+    *,
+    error_types: Iterable[str] | None = None,
+    chunk_size: int = 1000,
+    decode_workers: int = 0,
+) -> Iterator[list[Any]]:
+    """
+    使用独立只读连接，以游标分块流式读取指定 stage 的任务。
+
+    与 :func:`load_tasks_grouped_by_stage` 不同，本函数不会一次性载入全部记录，
+    内存占用只与 ``chunk_size`` 和预取深度相关。
+
+    :param db_path: sqlite 数据库文件路径
+    :param stage: 待读取的 stage 名称
+    :param statuses: 记录状态过滤条件
+    :param error_types: 仅保留这些错误类型的 failed 记录（pending 记录总是保留）；
+        ``None`` 表示不过滤
+    :param chunk_size: 每块读取的记录数量，默认 1000
+    :param decode_workers: 并行解码线程数；0 表示在当前线程解码，默认 0
+    :return: 按写入顺序产出的任务块迭代器
+    """
+    statuses = tuple(dict.fromkeys(statuses))
+    if not statuses:
+        return
+    error_types = None if error_types is None else tuple(error_types)
+
+    # 长时间持有游标，使用独立只读连接而不是线程缓存中的连接。
+    path = _resolve_readable(db_path)
+    if path is None:
+        return
+    conn = _open_read_connection(path)
+
+    def iter_status_rows(status: str) -> Generator[sqlite3.Row, None, None]:
+        where_sql = "stage = ? AND status = ?"
+        params: list[Any] = [stage, status]
+        if error_types is not None and status != "pending":
+            type_placeholders = ", ".join("?" for _ in error_types) or "NULL"
+            where_sql += f" AND error_type IN ({type_placeholders})"
+            params.extend(error_types)
+        yield from conn.execute(
+            f"""
+            SELECT id, task_json
+            FROM records
+            WHERE {where_sql}
+            ORDER BY id ASC
+            """,
+            params,
+        )
+
+    # 每个状态单独走 (stage, status, id) 索引再按 id 归并，
+    # 避免 ``status IN (...) ORDER BY id`` 触发全量临时排序。
+    status_rows = [iter_status_rows(status) for status in statuses]
+    merged_rows = heapq.merge(*status_rows, key=lambda row: row["id"])
+    pool = ThreadPoolExecutor(max_workers=decode_workers) if decode_workers else None
+    try:
+        if pool is None:
+            for rows in batched(merged_rows, chunk_size):
+                yield [decode_payload(row["task_json"]) for row in rows]
+            return
+
+        # 解码与读取流水线化：最多保留 decode_workers + 1 个在途块，按顺序产出。
+        pending: deque[Future[list[Any]]] = deque()
+        for rows in batched(merged_rows, chunk_size):
+            payloads = [row["task_json"] for row in rows]
+            pending.append(pool.submit(_decode_payloads, payloads))
+            if len(pending) > decode_workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
     finally:
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+        # 调用方提前停止迭代时，先关闭各游标生成器再关闭连接，
+        # 避免它们被回收时访问已关闭的连接。
+        for rows in status_rows:
+            rows.close()
         conn.close()
 
 
+def _decode_payloads(payloads: list[str | bytes]) -> list[Any]:
+    """
+    批量解码负载列值，供并行解码线程使用。
+
+    :param payloads: 列值列表
+    :return: 解码后的任务列表
+    :rtype: list[Any]
+    """
+    return [decode_payload(payload) for payload in payloads]
+
+
 def load_records_after_event_id_in_fail(
     db_path: str | Path,
     min_event_id: int,
 ) -> list[dict[str, Any]]:
     """
-    自行创建并关闭连接，读取失败记录中 ``event_id`` 大于给定下界的条目。
+    复用当前线程的只读连接，读取失败记录中 ``event_id`` 大于给定下界的条目。
 
     :param db_path: sqlite 数据库文件路径
     :param min_event_id: 失败记录的 ``event_id`` 下界
     :return: 命中的失败记录列表
     :rtype: list[dict[str, Any]]
     """
-    conn = connect_db(db_path)
-    try:
+    with read_connection(db_path) as conn:
         rows = conn.execute(
-            """
-            SELECT id, event_id, ts, stage, status, error_type, error_message, task_json
+            f"""
+            SELECT id, event_id, ts, stage, status, error_type
+                 , {_ERROR_MESSAGE_SQL} AS error_message, task_json
                     , result_json
             FROM records
             WHERE status = 'failed' AND event_id > ?
@@ -431,27 +1433,24 @@ def load_records_after_event_id_in_fail(
             [int(min_event_id)],
         ).fetchall()
         return [row_to_record_dict(row) for row in rows]
-    finally:
-        conn.close()
 
 
 def load_task_error_records(
     db_path: str | Path, stage: str
 ) -> list[tuple[Any, tuple[str, str]]]:
     """
-    自行创建并关闭连接，读取指定 stage 的失败任务与记录配对列表。
+    复用当前线程的只读连接，读取指定 stage 的失败任务与记录配对列表。
 
     :param db_path: sqlite 数据库文件路径
     :param stage: 待读取的 stage 名称
     :return: ``[(task, error_record), ...]``
     :rtype: list[tuple[Any, tuple[str, str]]]
     """
-    conn = connect_db(db_path)
-    try:
+    with read_connection(db_path) as conn:
         # 读取任务与错误信息的配对原始行，供后续组装业务对象。
         rows = conn.execute(
-            """
-            SELECT error_type, error_message, task_json
+            f"""
+            SELECT error_type, {_ERROR_MESSAGE_SQL} AS error_message, task_json
             FROM records
             WHERE status = 'failed' AND stage = ?
             ORDER BY id ASC
@@ -460,26 +1459,23 @@ def load_task_error_records(
         ).fetchall()
         return [
             (
-                json.loads(str(row["task_json"])),
+                decode_payload(row["task_json"]),
                 (str(row["error_type"]), str(row["error_message"])),
             )
             for row in rows
         ]
-    finally:
-        conn.close()
 
 
 def load_task_result_records(db_path: str | Path, stage: str) -> list[tuple[Any, Any]]:
     """
-    自行创建并关闭连接，读取指定 stage 的任务与成功结果配对列表。
+    复用当前线程的只读连接，读取指定 stage 的任务与成功结果配对列表。
 
     :param db_path: sqlite 数据库文件路径
     :param stage: 待读取的 stage 名称
     :return: ``[(task, result), ...]``
     :rtype: list[tuple[Any, Any]]
     """
-    conn = connect_db(db_path)
-    try:
+    with read_connection(db_path) as conn:
         rows = conn.execute(
             """
             SELECT task_json, result_json
@@ -491,16 +1487,65 @@ def load_task_result_records(db_path: str | Path, stage: str) -> list[tuple[Any,
         ).fetchall()
         return [
             (
-                json.loads(str(row["task_json"])),
-                json.loads(str(row["result_json"])),
+                decode_payload(row["task_json"]),
+                decode_payload(row["result_json"]),
             )
             for row in rows
         ]
-    finally:
-        conn.close()
 
 
-# ==== 自持完整 conn 生命周期的 query 函数 ====
+# ==== 复用只读连接的 query 函数 ====
+
+
+def _build_record_filter(
+    conn: sqlite3.Connection, node: str, keyword: str, status: str
+) -> tuple[list[str], list[Any]]:
+    """
+    构造记录查询的筛选条件。
+
+    关键词匹配错误类型、错误消息与以 TEXT 存储的 ``task_json``。failed 记录且关键词
+    不少于 3 个字符时，错误字段走 FTS5 trigram 索引，``task_json`` 仍按 ``LIKE``
+    匹配；其余情况全部回退为 ``LIKE`` 子串匹配。两者均不区分大小写。
+
+    :param conn: 已建立的 sqlite 连接
+    :param node: 节点名称过滤条件
+    :param keyword: 关键词过滤条件
+    :param status: 记录状态过滤条件
+    :return: ``(where_clauses, params)``
+    :rtype: tuple[list[str], list[Any]]
+    """
+    where_clauses: list[str] = ["status = ?"]
+    params: list[Any] = [status]
+    if node:
+        where_clauses.append("stage = ?")
+        params.append(node)
+    if not keyword:
+        return where_clauses, params
+
+    if status == "failed" and len(keyword) >= 3 and _has_failed_fts(conn):
+        # trigram 分词下，双引号短语即任意位置的子串匹配。
+        phrase = '"' + keyword.replace('"', '""') + '"'
+        where_clauses.append(
+            "(id IN (SELECT rowid FROM records_fts WHERE records_fts MATCH ?) "
+            "OR LOWER(task_json) LIKE ?)"
+        )
+        params.extend([phrase, f"%{keyword.lower()}%"])
+    else:
+        like_pattern = f"%{keyword.lower()}%"
+        where_clauses.append(
+            f"(LOWER(error_type) LIKE ? OR LOWER({_ERROR_MESSAGE_SQL}) LIKE ? "
+            "OR LOWER(task_json) LIKE ?)"
+        )
+        params.extend([like_pattern, like_pattern, like_pattern])
+    return where_clauses, params
+
+
+def _has_failed_fts(conn: sqlite3.Connection) -> bool:
+    """判断数据库文件中是否存在 failed 记录的 FTS 索引。"""
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'records_fts'"
+    ).fetchone()
+    return row is not None
 
 
 def query_records(
@@ -513,32 +1558,21 @@ def query_records(
     status: str = "failed",
 ) -> tuple[int, int, list[dict[str, Any]]]:
     """
-    自行创建并关闭连接，按条件查询指定状态的记录并返回分页结果。
+    复用当前线程的只读连接，按条件查询指定状态的记录并返回分页结果。
 
     :param db_path: sqlite 数据库文件路径
     :param page: 请求页码
     :param page_size: 每页大小
     :param node: 节点名称过滤条件
-    :param keyword: 关键词过滤条件
+    :param keyword: 关键词过滤条件；匹配错误类型、错误消息与 TEXT 形式的 ``task_json``
     :param sort_order: 排序方式，支持 ``newest`` 或 ``oldest``
     :param status: 记录状态过滤条件，默认 ``failed``
     :return: ``(total, total_pages, page_items)``
     :rtype: tuple[int, int, list[dict[str, Any]]]
     """
-    conn = connect_db(db_path)
-    try:
+    with read_connection(db_path) as conn:
         # 构造动态筛选条件与参数。
-        where_clauses: list[str] = ["status = ?"]
-        params: list[Any] = [status]
-        if node:
-            where_clauses.append("stage = ?")
-            params.append(node)
-        if keyword:
-            like_pattern = f"%{keyword.lower()}%"
-            where_clauses.append(
-                "(LOWER(error_type) LIKE ? OR LOWER(error_message) LIKE ? OR LOWER(task_json) LIKE ?)"
-            )
-            params.extend([like_pattern, like_pattern, like_pattern])
+        where_clauses, params = _build_record_filter(conn, node, keyword, status)
 
         # 先查询总数，并据此归一化分页参数。
         where_sql = f"WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
@@ -556,7 +1590,8 @@ def query_records(
         # 查询当前页数据；按 ts 和 id 排序以保持稳定顺序。
         rows = conn.execute(
             f"""
-            SELECT id, event_id, ts, stage, status, error_type, error_message, task_json
+            SELECT id, event_id, ts, stage, status, error_type
+                 , {_ERROR_MESSAGE_SQL} AS error_message, task_json
                  , result_json
             FROM records
             {where_sql}
@@ -568,8 +1603,69 @@ def query_records(
 
         # 转换为上层使用的错误字典格式。
         return total, total_pages, [row_to_record_dict(row) for row in rows]
-    finally:
-        conn.close()
+
+
+def query_records_by_cursor(
+    db_path: str | Path,
+    page_size: int,
+    node: str = "",
+    keyword: str = "",
+    sort_order: str = "newest",
+    status: str = "failed",
+    cursor: tuple[float, int] | None = None,
+    since: float | None = None,
+    until: float | None = None,
+) -> tuple[list[dict[str, Any]], tuple[float, int] | None]:
+    """
+    复用当前线程的只读连接，按 ``(ts, id)`` 游标分页查询指定状态的记录。
+
+    与 :func:`query_records` 的 ``OFFSET`` 分页不同，每页只沿索引向后扫描
+    ``page_size + 1`` 行，翻页耗时与页码无关，也不计算总数。
+
+    :param db_path: sqlite 数据库文件路径
+    :param page_size: 每页大小
+    :param node: 节点名称过滤条件
+    :param keyword: 关键词过滤条件
+    :param sort_order: 排序方式，支持 ``newest`` 或 ``oldest``
+    :param status: 记录状态过滤条件，默认 ``failed``
+    :param cursor: 上一页返回的游标；为 ``None`` 时从第一页开始
+    :param since: 仅返回 ``ts >= since`` 的记录，默认不限
+    :param until: 仅返回 ``ts <= until`` 的记录，默认不限
+    :return: ``(page_items, next_cursor)``；没有下一页时 ``next_cursor`` 为 ``None``
+    :rtype: tuple[list[dict[str, Any]], tuple[float, int] | None]
+    """
+    with read_connection(db_path) as conn:
+        where_clauses, params = _build_record_filter(conn, node, keyword, status)
+        sort_sql = "ASC" if sort_order == "oldest" else "DESC"
+        if cursor is not None:
+            compare = ">" if sort_order == "oldest" else "<"
+            where_clauses.append(f"(ts, id) {compare} (?, ?)")
+            params.extend([float(cursor[0]), int(cursor[1])])
+        if since is not None:
+            where_clauses.append("ts >= ?")
+            params.append(float(since))
+        if until is not None:
+            where_clauses.append("ts <= ?")
+            params.append(float(until))
+
+        # 多取一行用于判断是否还有下一页。
+        rows = conn.execute(
+            f"""
+            SELECT id, event_id, ts, stage, status, error_type
+                 , {_ERROR_MESSAGE_SQL} AS error_message, task_json
+                 , result_json
+            FROM records
+            WHERE {" AND ".join(where_clauses)}
+            ORDER BY ts {sort_sql}, id {sort_sql}
+            LIMIT ?
+            """,
+            [*params, page_size + 1],
+        ).fetchall()
+
+        items = [row_to_record_dict(row) for row in rows[:page_size]]
+        if len(rows) <= page_size:
+            return items, None
+        return items, (items[-1]["ts"], items[-1]["id"])
 
 
 def query_error_type_counts(
@@ -578,7 +1674,7 @@ def query_error_type_counts(
     status: str = "failed",
 ) -> list[dict[str, Any]]:
     """
-    自行创建并关闭连接，按错误类型聚合指定状态的记录数量。
+    复用当前线程的只读连接，按错误类型聚合指定状态的记录数量。
 
     :param db_path: sqlite 数据库文件路径
     :param node: 节点名称过滤条件；为空时统计全部节点
@@ -586,8 +1682,29 @@ def query_error_type_counts(
     :return: ``[{"error_type": str, "count": int}, ...]``
     :rtype: list[dict[str, Any]]
     """
-    conn = connect_db(db_path)
-    try:
+    with read_connection(db_path) as conn:
+        if status == "failed":
+            # failed 记录已归并进 errors 表，聚合开销只与不同错误数量相关。
+            where_sql = "WHERE stage = ?" if node else ""
+            rows = conn.execute(
+                f"""
+                SELECT error_type, SUM(count) AS count
+                FROM errors
+                {where_sql}
+                GROUP BY error_type
+                HAVING SUM(count) > 0
+                ORDER BY count DESC, error_type ASC
+                """,
+                [node] if node else [],
+            ).fetchall()
+            return [
+                {
+                    "error_type": str(row["error_type"]),
+                    "count": int(row["count"]),
+                }
+                for row in rows
+            ]
+
         where_clauses: list[str] = ["status = ?"]
         params: list[Any] = [status]
         if node:
@@ -612,5 +1729,67 @@ def query_error_type_counts(
             }
             for row in rows
         ]
-    finally:
-        conn.close()
+
+
+def summarize_records(db_path: str | Path) -> list[dict[str, Any]]:
+    """
+    复用当前线程的只读连接，按 stage 与状态汇总记录数量和时间范围。
+
+    :param db_path: sqlite 数据库文件路径
+    :return: ``[{"stage", "status", "count", "min_ts", "max_ts"}, ...]``
+    :rtype: list[dict[str, Any]]
+    """
+    with read_connection(db_path) as conn:
+        rows = conn.execute(
+            """
+            SELECT stage, status, COUNT(*) AS count, MIN(ts) AS min_ts, MAX(ts) AS max_ts
+            FROM records
+            GROUP BY stage, status
+            ORDER BY stage ASC, status ASC
+            """
+        ).fetchall()
+        return [
+            {
+                "stage": str(row["stage"]),
+                "status": str(row["status"]),
+                "count": int(row["count"]),
+                "min_ts": None if row["min_ts"] is None else float(row["min_ts"]),
+                "max_ts": None if row["max_ts"] is None else float(row["max_ts"]),
+            }
+            for row in rows
+        ]
+
+
+def query_error_groups(db_path: str | Path, node: str = "") -> list[dict[str, Any]]:
+    """
+    复用当前线程的只读连接，读取归并后的失败错误列表。
+
+    :param db_path: sqlite 数据库文件路径
+    :param node: 节点名称过滤条件；为空时读取全部节点
+    :return: ``[{"id", "stage", "error_type", "message", "first_ts", "last_ts",
+        "count"}, ...]``，按数量降序
+    :rtype: list[dict[str, Any]]
+    """
+    with read_connection(db_path) as conn:
+        where_sql = "AND stage = ?" if node else ""
+        rows = conn.execute(
+            f"""
+            SELECT id, stage, error_type, message, first_ts, last_ts, count
+            FROM errors
+            WHERE count > 0 {where_sql}
+            ORDER BY count DESC, id ASC
+            """,
+            [node] if node else [],
+        ).fetchall()
+        return [
+            {
+                "id": int(row["id"]),
+                "stage": str(row["stage"]),
+                "error_type": str(row["error_type"]),
+                "message": str(row["message"]),
+                "first_ts": float(row["first_ts"] or 0.0),
+                "last_ts": float(row["last_ts"] or 0.0),
+                "count": int(row["count"]),
+            }
+            for row in rows
+        ]
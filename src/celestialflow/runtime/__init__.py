@@ -1,16 +1,46 @@
 # runtime/__init__.py
 """CelestialFlow 运行时模块。
 
-提供信封（Envelope）、队列（Queue）、指标（Metrics）等运行期核心基础设施。
+提供信封（Envelope）、队列（Queue）及其可插拔后端（Backend）、
+共享内存环形队列（Ring）、指标（Metrics）等运行期核心基础设施。
 """
 
+from .core_backend import (
+    BrokerClient,
+    BrokerQueueBackend,
+    DequeQueueBackend,
+    LocalBroker,
+    ProcessQueueBackend,
+    QueueBackend,
+    SocketQueueBackend,
+    ThreadQueueBackend,
+)
 from .core_envelope import TaskEnvelope
 from .core_metrics import TaskMetrics
-from .core_queue import TaskInQueue, TaskOutQueue
+from .core_queue import (
+    EdgeChannel,
+    ReplicaTarget,
+    TaskInQueue,
+    TaskOutQueue,
+    make_queue_backend,
+)
+from .core_ring import SharedRingQueue
 
 __all__ = [
+    "BrokerClient",
+    "BrokerQueueBackend",
+    "DequeQueueBackend",
+    "EdgeChannel",
+    "LocalBroker",
+    "ProcessQueueBackend",
+    "QueueBackend",
+    "ReplicaTarget",
+    "SharedRingQueue",
+    "SocketQueueBackend",
     "TaskEnvelope",
     "TaskInQueue",
     "TaskMetrics",
     "TaskOutQueue",
+    "ThreadQueueBackend",
+    "make_queue_backend",
 ]
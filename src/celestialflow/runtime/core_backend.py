@@ -0,0 +1,638 @@
+# runtime/core_backend.py
+from __future__ import annotations
+
+import hashlib
+import hmac
+import os
+import pickle
+import socket
+import struct
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from collections.abc import Iterable
+from multiprocessing.context import BaseContext
+from multiprocessing.queues import Queue as MPQueue
+from queue import Empty, Queue
+from typing import Protocol
+
+# socket 帧首部：负载长度（小端 uint32）
+_FRAME_HEADER = struct.Struct("<I")
+
+# socket 帧认证标签：以 authkey 对负载计算的 HMAC-SHA256
+_FRAME_DIGEST = hashlib.sha256
+_FRAME_TAG_SIZE = _FRAME_DIGEST().digest_size
+
+# socket 帧负载的默认长度上限（字节）
+DEFAULT_MAX_FRAME_SIZE = 64 * 1024 * 1024
+
+
+# ==== 后端基类 ====
+class QueueBackend[T](ABC):
+    """
+    节点输入队列的底层后端接口。
+
+    :class:`TaskInQueue` 只通过本接口读写条目，因此可以在不改动节点代码的
+    前提下把一条边换成更快的传输方式。子类必须实现 :meth:`put`、:meth:`get`
+    与 :meth:`qsize`；批量读写默认逐条转发，子类可覆写以摊薄开销。
+    """
+
+    # 是否可在 fork 出的子进程之间共享（``process`` 图模式要求为 True）
+    process_safe: bool = False
+
+    # qsize 能否给出积压数量；为 False 时 qsize 恒为 0，empty 需由子类直接判断
+    supports_qsize: bool = True
+
+    maxsize: int = 0
+
+    @abstractmethod
+    def put(self, item: T, block: bool = True, timeout: float | None = None) -> None:
+        """
+        写入一条记录，后端有界且已满时按 ``block`` / ``timeout`` 等待。
+
+        无界后端忽略 ``block`` 与 ``timeout``，总是立即写入。
+
+        :param item: 记录
+        :param block: 后端已满时是否等待
+        :param timeout: 等待的最长秒数，``None`` 表示无限等待
+        :raises Full: 非阻塞或超时后后端仍已满
+        """
+
+    def put_many(self, items: Iterable[T]) -> None:
+        """
+        按顺序写入多条记录。
+
+        :param items: 记录序列
+        """
+        for item in items:
+            self.put(item)
+
+    @abstractmethod
+    def get(self, block: bool = True, timeout: float | None = None) -> T:
+        """
+        读出最早写入的一条记录。
+
+        :param block: 后端为空时是否等待
+        :param timeout: 等待的最长秒数，``None`` 表示无限等待
+        :return: 记录
+        :raises Empty: 非阻塞或超时后仍没有记录
+        """
+
+    def get_many(self, max_count: int, timeout: float | None = None) -> list[T]:
+        """
+        等待至少一条记录，随后不阻塞地继续读取，至多 ``max_count`` 条。
+
+        :param max_count: 单次读取的最大数量
+        :param timeout: 等待第一条记录的最长秒数，``None`` 表示无限等待
+        :return: 记录列表
+        :raises Empty: 超时后仍没有记录
+        """
+        items = [self.get(timeout=timeout)]
+        while len(items) < max_count:
+            try:
+                items.append(self.get(block=False))
+            except Empty:
+                break
+        return items
+
+    @abstractmethod
+    def qsize(self) -> int:
+        """
+        返回当前进程可见的近似积压数量。
+
+        :return: 积压数量
+        """
+
+    def empty(self) -> bool:
+        """
+        判断后端是否为空（近似值）。
+
+        :return: 积压为 0 时返回 True
+        """
+        return self.qsize() == 0
+
+    def close(self) -> None:  # noqa: B027
+        """释放当前进程持有的资源，默认不做任何处理。"""
+
+
+class SupportsPut[T](Protocol):
+    """:class:`TaskOutQueue` 下游通道的最小接口，只需支持 ``put``。"""
+
+    def put(self, item: T, block: bool = True) -> None:
+        """写入一条记录，``block`` 为 False 且通道已满时抛出 ``Full``。"""
+        ...
+
+
+# ==== 进程内后端 ====
+class ThreadQueueBackend[T](QueueBackend[T]):
+    """基于 ``queue.Queue`` 的进程内后端，支持有界容量，是节点输入队列的默认后端。"""
+
+    def __init__(self, maxsize: int = 0) -> None:
+        """
+        初始化进程内队列后端。
+
+        :param maxsize: 队列最大容量，默认为 0（无限制）
+        """
+        self.maxsize = maxsize
+        self._queue: Queue[T] = Queue(maxsize=maxsize)
+
+    def put(self, item: T, block: bool = True, timeout: float | None = None) -> None:
+        """
+        写入一条记录，队列已满时按 ``block`` / ``timeout`` 等待。
+
+        :param item: 记录
+        :param block: 队列已满时是否等待
+        :param timeout: 等待的最长秒数，``None`` 表示无限等待
+        :raises Full: 非阻塞或超时后队列仍已满
+        """
+        self._queue.put(item, block, timeout)
+
+    def get(self, block: bool = True, timeout: float | None = None) -> T:
+        """
+        读出最早写入的一条记录。
+
+        :param block: 队列为空时是否等待
+        :param timeout: 等待的最长秒数，``None`` 表示无限等待
+        :return: 记录
+        :raises Empty: 非阻塞或超时后队列仍为空
+        """
+        return self._queue.get(block, timeout)
+
+    def qsize(self) -> int:
+        """
+        返回队列中的近似记录数量。
+
+        :return: 记录数量
+        """
+        return self._queue.qsize()
+
+
+class DequeQueueBackend[T](QueueBackend[T]):
+    """
+    基于 ``collections.deque`` 的无界进程内后端。
+
+    ``deque`` 的 append / popleft 本身是原子操作：有数据时读写都不加锁，
+    只有消费者需要等待时才经过条件变量，比 ``queue.Queue`` 每次读写都
+    加锁的开销更低。不支持容量上限，需要背压的边应使用默认后端。
+    """
+
+    def __init__(self) -> None:
+        """初始化无界 deque 后端。"""
+        self._items: deque[T] = deque()
+        self._not_empty = threading.Condition()
+        self._waiters = 0
+
+    def put(self, item: T, block: bool = True, timeout: float | None = None) -> None:
+        """
+        追加一条记录；deque 后端无界，忽略 ``block`` 与 ``timeout``。
+
+        :param item: 记录
+        :param block: 为兼容接口保留
+        :param timeout: 为兼容接口保留
+        """
+        self._items.append(item)
+        if self._waiters:
+            with self._not_empty:
+                self._not_empty.notify()
+
+    def put_many(self, items: Iterable[T]) -> None:
+        """
+        一次追加多条记录，只唤醒一次等待的消费者。
+
+        :param items: 记录序列
+        """
+        self._items.extend(items)
+        if self._waiters:
+            with self._not_empty:
+                self._not_empty.notify_all()
+
+    def get(self, block: bool = True, timeout: float | None = None) -> T:
+        """
+        读出最早写入的一条记录，有数据时不加锁。
+
+        :param block: 后端为空时是否等待
+        :param timeout: 等待的最长秒数，``None`` 表示无限等待
+        :return: 记录
+        :raises Empty: 非阻塞或超时后仍没有记录
+        """
+        try:
+            return self._items.popleft()
+        except IndexError:
+            if not block:
+                raise Empty from None
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._not_empty:
+            # 先登记等待者再复查，保证与 put 的无锁快路径之间不会丢失唤醒。
+            self._waiters += 1
+            try:
+                while True:
+                    try:
+                        return self._items.popleft()
+                    except IndexError:
+                        pass
+                    remaining = (
+                        None if deadline is None else deadline - time.monotonic()
+                    )
+                    if remaining is not None and remaining <= 0:
+                        raise Empty
+                    _ = self._not_empty.wait(remaining)
+            finally:
+                self._waiters -= 1
+
+    def qsize(self) -> int:
+        """
+        返回 deque 中的记录数量。
+
+        :return: 记录数量
+        """
+        return len(self._items)
+
+
+# ==== 跨进程后端 ====
+class ProcessQueueBackend[T](QueueBackend[T]):
+    """基于 ``multiprocessing.Queue`` 的跨进程后端，``process`` 图模式的默认后端。"""
+
+    process_safe = True
+
+    # macOS 不支持 sem_getvalue，multiprocessing.Queue 无法给出积压数量
+    supports_qsize = sys.platform != "darwin"
+
+    def __init__(self, ctx: BaseContext, maxsize: int = 0) -> None:
+        """
+        初始化跨进程队列后端。
+
+        :param ctx: 创建队列所用的多进程上下文
+        :param maxsize: 队列最大容量，默认为 0（无限制）
+        """
+        self.maxsize = maxsize
+        self._queue: MPQueue[T] = ctx.Queue(maxsize=maxsize)
+
+    def put(self, item: T, block: bool = True, timeout: float | None = None) -> None:
+        """
+        写入一条记录，队列已满时按 ``block`` / ``timeout`` 等待。
+
+        :param item: 记录
+        :param block: 队列已满时是否等待
+        :param timeout: 等待的最长秒数，``None`` 表示无限等待
+        :raises Full: 非阻塞或超时后队列仍已满
+        """
+        self._queue.put(item, block, timeout)
+
+    def get(self, block: bool = True, timeout: float | None = None) -> T:
+        """
+        读出最早写入的一条记录。
+
+        :param block: 队列为空时是否等待
+        :param timeout: 等待的最长秒数，``None`` 表示无限等待
+        :return: 记录
+        :raises Empty: 非阻塞或超时后队列仍为空
+        """
+        return self._queue.get(block, timeout)
+
+    def qsize(self) -> int:
+        """
+        返回跨进程队列的近似记录数量，平台不支持时返回 0。
+
+        :return: 记录数量
+        """
+        if not self.supports_qsize:
+            return 0
+        return self._queue.qsize()
+
+    def empty(self) -> bool:
+        """
+        判断队列是否为空（近似值），在 ``qsize`` 不可用的平台上同样有效。
+
+        :return: 队列为空时返回 True
+        """
+        return self._queue.empty()
+
+    def close(self) -> None:
+        """关闭当前进程对队列的写入端。"""
+        self._queue.close()
+
+
+class SocketQueueBackend[T](QueueBackend[T]):
+    """
+    基于 TCP socket 的后端，记录以 ``[4B 长度][32B 标签][pickle 负载]`` 帧传输。
+
+    创建时即绑定监听地址；每个写入进程首次写入时建立一条连接，
+    读取进程首次读取时才启动接收线程，把各连接收到的记录汇入本地缓冲。
+    因此后端可以在 fork 前创建、由任意进程读写，也可以通过 :attr:`address`
+    跨主机连接。同一写入进程内的记录保持顺序，不同进程之间不保证顺序。
+
+    信任边界：每帧携带以 ``authkey`` 计算的 HMAC-SHA256 标签，读取端先校验
+    标签再反序列化，标签不符时立即断开该连接，其负载不会被 pickle 还原。
+    持有 ``authkey`` 的一方仍可借 pickle 在读取进程中执行任意代码，也可以
+    重放截获的帧，因此密钥只能交给受信任的写入方；默认密钥随机生成，
+    只经 fork 传给子进程。
+
+    标签要读完负载才能校验，因此读取端先按 ``max_frame_size`` 检查首部声明的
+    长度，超限的连接直接断开，未认证的对端无法迫使读取进程缓冲任意大的帧。
+    """
+
+    process_safe = True
+
+    address: tuple[str, int]
+    max_frame_size: int
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        authkey: bytes | None = None,
+        max_frame_size: int = DEFAULT_MAX_FRAME_SIZE,
+    ) -> None:
+        """
+        初始化 socket 后端并开始监听。
+
+        :param host: 监听地址，默认仅本机
+        :param port: 监听端口，默认由系统分配
+        :param authkey: 帧认证密钥，默认随机生成；跨主机写入方需使用同一密钥
+        :param max_frame_size: 单帧负载的最大字节数，默认 64 MiB
+        :raises ValueError: max_frame_size 不为正数
+        """
+        if max_frame_size <= 0:
+            raise ValueError(f"max_frame_size must be positive: {max_frame_size}")
+        self.max_frame_size = max_frame_size
+        self._authkey = authkey if authkey is not None else os.urandom(32)
+        self._listener = socket.create_server((host, port))
+        self.address = self._listener.getsockname()[:2]
+
+        self._buffer: Queue[T] = Queue()
+        self._receiver_pid: int | None = None
+        self._sender: socket.socket | None = None
+        self._sender_pid: int | None = None
+        self._lock = threading.Lock()
+
+    # ==== 写入端 ====
+    def put(self, item: T, block: bool = True, timeout: float | None = None) -> None:
+        """
+        发送一条记录；socket 后端无界，忽略 ``block`` 与 ``timeout``。
+
+        :param item: 可 pickle 的记录
+        :param block: 为兼容接口保留
+        :param timeout: 为兼容接口保留
+        """
+        self._send(self._encode(item))
+
+    def put_many(self, items: Iterable[T]) -> None:
+        """
+        将多条记录的帧拼接后一次发送。
+
+        :param items: 可 pickle 的记录序列
+        """
+        self._send(b"".join(self._encode(item) for item in items))
+
+    def _encode(self, item: T) -> bytes:
+        """
+        将记录编码为带认证标签的一帧。
+
+        :param item: 可 pickle 的记录
+        :return: 帧字节
+        :raises ValueError: 负载超过 ``max_frame_size``
+        """
+        payload = pickle.dumps(item, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(payload) > self.max_frame_size:
+            raise ValueError(
+                f"socket frame too large: {len(payload)} bytes > "
+                f"{self.max_frame_size} bytes max_frame_size"
+            )
+        tag = hmac.digest(self._authkey, payload, _FRAME_DIGEST)
+        return _FRAME_HEADER.pack(len(payload)) + tag + payload
+
+    def _send(self, data: bytes) -> None:
+        """
+        通过当前进程的连接发送数据，首次调用时建立连接。
+
+        :param data: 一帧或多帧拼接后的字节
+        """
+        with self._lock:
+            if self._sender is None or self._sender_pid != os.getpid():
+                # fork 得到的连接与父进程共享，子进程需另建连接以免帧交错。
+                self._sender = socket.create_connection(self.address)
+                self._sender.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                self._sender_pid = os.getpid()
+            self._sender.sendall(data)
+
+    # ==== 读取端 ====
+    def get(self, block: bool = True, timeout: float | None = None) -> T:
+        """
+        读出一条记录，首次读取时在当前进程启动接收线程。
+
+        :param block: 缓冲为空时是否等待
+        :param timeout: 等待的最长秒数，``None`` 表示无限等待
+        :return: 记录
+        :raises Empty: 非阻塞或超时后仍没有记录
+        """
+        self._ensure_receiver()
+        return self._buffer.get(block, timeout)
+
+    def qsize(self) -> int:
+        """
+        返回当前进程已接收但尚未读出的记录数量。
+
+        :return: 记录数量
+        """
+        return self._buffer.qsize()
+
+    def _ensure_receiver(self) -> None:
+        """在当前进程中启动接收线程（若未启动）。"""
+        with self._lock:
+            if self._receiver_pid == os.getpid():
+                return
+            self._buffer = Queue()
+            self._receiver_pid = os.getpid()
+            threading.Thread(target=self._accept_loop, daemon=True).start()
+
+    def _accept_loop(self) -> None:
+        """接受写入端连接，每条连接由独立线程读取。"""
+        while True:
+            try:
+                conn, _ = self._listener.accept()
+            except OSError:
+                # 监听 socket 已关闭
+                return
+            threading.Thread(target=self._read_loop, args=(conn,), daemon=True).start()
+
+    def _read_loop(self, conn: socket.socket) -> None:
+        """
+        逐帧读取一条连接上的记录，直到对端关闭或出现超长、认证失败的帧。
+
+        :param conn: 已接受的连接
+        """
+        with conn, conn.makefile("rb") as stream:
+            while True:
+                header = stream.read(_FRAME_HEADER.size + _FRAME_TAG_SIZE)
+                if len(header) < _FRAME_HEADER.size + _FRAME_TAG_SIZE:
+                    return
+                (length,) = _FRAME_HEADER.unpack_from(header)
+                if length > self.max_frame_size:
+                    # 首部尚未认证，超长的帧不读取负载，直接丢弃整条连接
+                    return
+                payload = stream.read(length)
+                expected = hmac.digest(self._authkey, payload, _FRAME_DIGEST)
+                if len(payload) < length or not hmac.compare_digest(
+                    header[_FRAME_HEADER.size :], expected
+                ):
+                    # 截断或未认证的帧：丢弃整条连接，不反序列化其负载
+                    return
+                self._buffer.put(pickle.loads(payload))
+
+    def close(self) -> None:
+        """关闭当前进程的写入连接与监听 socket。"""
+        with self._lock:
+            if self._sender is not None:
+                self._sender.close()
+                self._sender = None
+        self._listener.close()
+
+
+# ==== 消息中间件后端 ====
+class BrokerClient(Protocol):
+    """消息中间件客户端最小抽象接口，消息体为已序列化的字节。"""
+
+    def publish(self, topic: str, messages: list[bytes]) -> None:
+        """按顺序向主题发布一批消息。"""
+        ...
+
+    def consume(self, topic: str, max_count: int, timeout: float | None) -> list[bytes]:
+        """从主题取出至多 ``max_count`` 条消息，超时后返回空列表。"""
+        ...
+
+    def pending(self, topic: str) -> int:
+        """返回主题中尚未被取出的消息数量。"""
+        ...
+
+
+class LocalBroker:
+    """
+    进程内的消息中间件替身，实现 :class:`BrokerClient`。
+
+    用于在没有真实中间件的环境中运行与测试 :class:`BrokerQueueBackend`；
+    主题数据只存在于当前进程，不能跨 fork 共享。
+    """
+
+    # 主题数据只存在于当前进程
+    process_safe = False
+
+    def __init__(self) -> None:
+        """初始化空的主题表。"""
+        self._topics: dict[str, deque[bytes]] = {}
+        self._cond = threading.Condition()
+
+    def publish(self, topic: str, messages: list[bytes]) -> None:
+        """
+        按顺序向主题发布一批消息。
+
+        :param topic: 主题名
+        :param messages: 消息列表
+        """
+        with self._cond:
+            self._topics.setdefault(topic, deque()).extend(messages)
+            self._cond.notify_all()
+
+    def consume(self, topic: str, max_count: int, timeout: float | None) -> list[bytes]:
+        """
+        从主题取出至多 ``max_count`` 条消息。
+
+        :param topic: 主题名
+        :param max_count: 单次取出的最大数量
+        :param timeout: 主题为空时等待的最长秒数，``None`` 表示无限等待
+        :return: 消息列表，超时后为空列表
+        """
+        with self._cond:
+            messages = self._topics.setdefault(topic, deque())
+            if not self._cond.wait_for(lambda: bool(messages), timeout):
+                return []
+            return [messages.popleft() for _ in range(min(max_count, len(messages)))]
+
+    def pending(self, topic: str) -> int:
+        """
+        返回主题中尚未被取出的消息数量。
+
+        :param topic: 主题名
+        :return: 消息数量
+        """
+        with self._cond:
+            return len(self._topics.get(topic, ()))
+
+
+class BrokerQueueBackend[T](QueueBackend[T]):
+    """
+    基于消息中间件主题的后端，记录 pickle 后作为消息发布。
+
+    是否可跨进程取决于客户端：客户端的 ``process_safe`` 属性为 False 时
+    （如 :class:`LocalBroker`）只能用于进程内的图模式，未声明时视为可跨进程。
+    """
+
+    client: BrokerClient
+    topic: str
+
+    def __init__(self, client: BrokerClient, topic: str) -> None:
+        """
+        初始化中间件后端。
+
+        :param client: 中间件客户端
+        :param topic: 承载本条边的主题名
+        """
+        self.client = client
+        self.topic = topic
+        self.process_safe = getattr(client, "process_safe", True)
+
+    def put(self, item: T, block: bool = True, timeout: float | None = None) -> None:
+        """
+        将一条记录发布到主题；是否有界由中间件决定，忽略 ``block`` 与 ``timeout``。
+
+        :param item: 可 pickle 的记录
+        :param block: 为兼容接口保留
+        :param timeout: 为兼容接口保留
+        """
+        self.client.publish(self.topic, [pickle.dumps(item)])
+
+    def put_many(self, items: Iterable[T]) -> None:
+        """
+        将多条记录作为一批消息发布。
+
+        :param items: 可 pickle 的记录序列
+        """
+        self.client.publish(self.topic, [pickle.dumps(item) for item in items])
+
+    def get(self, block: bool = True, timeout: float | None = None) -> T:
+        """
+        从主题取出一条记录。
+
+        :param block: 主题为空时是否等待
+        :param timeout: 等待的最长秒数，``None`` 表示无限等待
+        :return: 记录
+        :raises Empty: 非阻塞或超时后主题仍为空
+        """
+        messages = self.client.consume(self.topic, 1, timeout if block else 0)
+        if not messages:
+            raise Empty
+        return pickle.loads(messages[0])
+
+    def get_many(self, max_count: int, timeout: float | None = None) -> list[T]:
+        """
+        一次从主题取出至多 ``max_count`` 条记录。
+
+        :param max_count: 单次读取的最大数量
+        :param timeout: 等待第一条记录的最长秒数，``None`` 表示无限等待
+        :return: 记录列表
+        :raises Empty: 超时后仍没有记录
+        """
+        messages = self.client.consume(self.topic, max_count, timeout)
+        if not messages:
+            raise Empty
+        return [pickle.loads(message) for message in messages]
+
+    def qsize(self) -> int:
+        """
+        返回主题中尚未被取出的记录数量。
+
+        :return: 记录数量
+        """
+        return self.client.pending(self.topic)
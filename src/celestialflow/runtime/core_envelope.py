@@ -1,13 +1,15 @@
 # runtime/core_envelope.py
 from __future__ import annotations
 
+import time
+
 from .util_hash import object_to_hash
 
 
 class TaskEnvelope[T]:
     """任务信封，封装原始任务及其哈希、ID 等元信息。"""
 
-    __slots__: tuple[str, ...] = ("_hash", "_id", "_task")
+    __slots__: tuple[str, ...] = ("_enqueue_ts", "_hash", "_id", "_source", "_task")
 
     def __init__(
         self,
@@ -23,6 +25,38 @@ class TaskEnvelope[T]:
         self._task: T = task
         self._hash: bytes | None = None
         self._id: int = id
+        self._enqueue_ts: float = 0.0
+        self._source: str | None = None
+
+    def __getstate__(self) -> tuple[T, int, bytes | None, float, str | None]:
+        """
+        以紧凑元组表示信封状态，缩短跨进程传递时的 pickle 负载。
+
+        :return: (任务, ID, 哈希, 入队时刻, 来源)
+        """
+        return (self._task, self._id, self._hash, self._enqueue_ts, self._source)
+
+    def __setstate__(
+        self, state: tuple[T, int, bytes | None, float, str | None]
+    ) -> None:
+        """
+        从 :meth:`__getstate__` 产生的元组恢复信封状态。
+
+        :param state: 信封状态元组
+        """
+        self._task, self._id, self._hash, self._enqueue_ts, self._source = state
+
+    def mark_enqueued(self, source: str | None = None) -> None:
+        """
+        记录信封进入队列的时刻与来源边。
+
+        时刻取自 ``time.perf_counter``（Linux 下为系统级单调时钟，fork 出的
+        子进程之间可直接比较），用于统计任务的排队耗时。
+
+        :param source: 发出信封的上游节点名称，外部输入为 ``None``
+        """
+        self._enqueue_ts = time.perf_counter()
+        self._source = source
 
     def get_task(self) -> T:
         """
@@ -58,3 +92,37 @@ class TaskEnvelope[T]:
         :return: 任务 ID
         """
         return self._id
+
+    def get_enqueue_ts(self) -> float:
+        """
+        获取信封最近一次入队的时刻
+
+        :return: ``time.perf_counter`` 时间戳，未入队时为 0.0
+        """
+        return self._enqueue_ts
+
+    def get_source(self) -> str | None:
+        """
+        获取信封最近一次入队的来源节点名称
+
+        :return: 上游节点名称，外部输入或未入队时为 ``None``
+        """
+        return self._source
+
+
+class TaskBatch[T]:
+    """一批发往同一下游的任务信封，作为单个队列条目传递以摊薄队列加锁开销。"""
+
+    __slots__: tuple[str, ...] = ("envelopes",)
+
+    def __init__(self, envelopes: list[TaskEnvelope[T]]):
+        """
+        初始化任务批次。
+
+        :param envelopes: 按产生顺序排列的任务信封
+        """
+        self.envelopes: list[TaskEnvelope[T]] = envelopes
+
+    def __len__(self) -> int:
+        """返回批次内的信封数量。"""
+        return len(self.envelopes)
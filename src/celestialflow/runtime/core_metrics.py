@@ -1,11 +1,17 @@
 # runtime/core_metrics.py
 from __future__ import annotations
 
+from multiprocessing.context import BaseContext
 from threading import Lock
 from typing import TYPE_CHECKING
 
 from ..runtime.util_types import StageStatus
-from .util_types import SumCounter, ValueWrapper
+from .util_types import (
+    LatencyHistogram,
+    SharedValueWrapper,
+    SumCounter,
+    ValueWrapper,
+)
 
 if TYPE_CHECKING:
     from ..observability import BaseObserver
@@ -16,7 +22,7 @@ class TaskMetrics:
     任务指标统计类
 
     负责管理任务执行过程中的各项指标统计，包括成功、失败、重复任务的计数，
-    以及可重试异常类型和去重逻辑。
+    排队与执行耗时分布，以及可重试异常类型和去重逻辑。
     """
 
     lock: Lock
@@ -26,6 +32,8 @@ class TaskMetrics:
     success_counter: ValueWrapper
     fail_counter: ValueWrapper
     duplicate_counter: ValueWrapper
+    queue_wait_histogram: LatencyHistogram
+    execution_histogram: LatencyHistogram
     processed_set: set[bytes]
 
     # ==== 初始化 ====
@@ -41,7 +49,7 @@ class TaskMetrics:
         self.enable_duplicate_check = enable_duplicate_check
         self.retry_exceptions = ()
         self._observers: list[BaseObserver] = []
-        self._status = int(StageStatus.NOT_STARTED)
+        self._status = ValueWrapper(int(StageStatus.NOT_STARTED))
 
         self.lock = Lock()
         self._init_counter()
@@ -58,6 +66,30 @@ class TaskMetrics:
         self.fail_counter = ValueWrapper(value=0, lock=self.lock)
         self.duplicate_counter = ValueWrapper(value=0, lock=self.lock)
 
+        # 任务在输入队列中的等待耗时，与任务函数单次执行耗时
+        self.queue_wait_histogram = LatencyHistogram()
+        self.execution_histogram = LatencyHistogram()
+
+    def share_counters(self, ctx: BaseContext) -> None:
+        """
+        将计数器与状态迁移到跨进程共享内存，供 ``process`` 图模式在 fork 前调用。
+
+        迁移后 ``task_counter`` 不再引用任何上游计数器，调用方需在上游
+        节点完成迁移后重新绑定。
+
+        :param ctx: 创建共享内存所用的多进程上下文
+        """
+        self.task_counter.init_value = SharedValueWrapper(
+            self.task_counter.init_value.value, ctx
+        )
+        self.task_counter.counters = []
+        self.success_counter = SharedValueWrapper(self.success_counter.value, ctx)
+        self.fail_counter = SharedValueWrapper(self.fail_counter.value, ctx)
+        self.duplicate_counter = SharedValueWrapper(self.duplicate_counter.value, ctx)
+        self._status = SharedValueWrapper(self._status.value, ctx)
+        self.queue_wait_histogram.share(ctx)
+        self.execution_histogram.share(ctx)
+
     # ==== 重置 ====
     def reset_counter(self) -> None:
         """
@@ -67,6 +99,8 @@ class TaskMetrics:
         self.success_counter.reset()
         self.fail_counter.reset()
         self.duplicate_counter.reset()
+        self.queue_wait_histogram.reset()
+        self.execution_histogram.reset()
 
     def reset_state(self) -> None:
         """
@@ -142,6 +176,10 @@ class TaskMetrics:
         """
         self.task_counter.append_counter(counter)
 
+    def clear_task_counters(self) -> None:
+        """解除全部已绑定的任务总数计数器，直接注入的任务数保留。"""
+        self.task_counter.counters = []
+
     def add_task_count(self, add_count: int = 1) -> None:
         """
         更新任务总数计数器
@@ -190,6 +228,23 @@ class TaskMetrics:
         for observer in self._observers:
             observer.on_task_duplicate(count)
 
+    # ==== 耗时分布 ====
+    def observe_queue_wait(self, seconds: float) -> None:
+        """
+        记录一个任务从入队到开始执行的等待耗时。
+
+        :param seconds: 等待耗时（秒）
+        """
+        self.queue_wait_histogram.observe(seconds)
+
+    def observe_execution(self, seconds: float) -> None:
+        """
+        记录任务函数一次执行（含失败与重试的每次尝试）的耗时。
+
+        :param seconds: 执行耗时（秒）
+        """
+        self.execution_histogram.observe(seconds)
+
     # ==== 启动与结束 ====
     def on_start(self, _name: str, _total: int) -> None:
         """
@@ -199,7 +254,7 @@ class TaskMetrics:
         :param _total: 任务总数
         :return: ``None``
         """
-        self._status = int(StageStatus.RUNNING)
+        self._status.value = int(StageStatus.RUNNING)
         for observer in self._observers:
             observer.on_start(_name, _total)
 
@@ -209,7 +264,7 @@ class TaskMetrics:
 
         :return: ``None``
         """
-        self._status = int(StageStatus.STOPPED)
+        self._status.value = int(StageStatus.STOPPED)
         for observer in self._observers:
             observer.on_finish()
 
@@ -295,6 +350,18 @@ class TaskMetrics:
             "tasks_pending": pending,
         }
 
+    def get_latency_stats(self) -> dict[str, dict[str, float | int]]:
+        """
+        获取排队与执行耗时分布的汇总
+
+        :return: ``{"queue_wait": {...}, "execution": {...}}``，各项字段见
+            :meth:`LatencyHistogram.snapshot`
+        """
+        return {
+            "queue_wait": self.queue_wait_histogram.snapshot(),
+            "execution": self.execution_histogram.snapshot(),
+        }
+
     def get_retry_error_type_names(self) -> set[str]:
         """
         获取当前执行器允许从持久化失败记录中恢复的错误类型名称集合。
@@ -306,4 +373,4 @@ class TaskMetrics:
 
     def get_status(self) -> StageStatus:
         """读取当前状态（返回 StageStatus 枚举）。"""
-        return StageStatus(self._status)
+        return StageStatus(self._status.value)
@@ -1,16 +1,266 @@
 # runtime/core_queue.py
 from __future__ import annotations
 
-from queue import Empty, Queue
+import multiprocessing
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from multiprocessing.context import BaseContext
+from queue import Empty, Full
 from typing import Any
 
-from .core_envelope import TaskEnvelope
+from .core_backend import (
+    BrokerQueueBackend,
+    DequeQueueBackend,
+    LocalBroker,
+    ProcessQueueBackend,
+    QueueBackend,
+    SocketQueueBackend,
+    SupportsPut,
+    ThreadQueueBackend,
+)
+from .core_envelope import TaskBatch, TaskEnvelope
+from .core_ring import SharedRingQueue
 from .util_errors import (
+    ConfigurationError,
     DuplicateNodeError,
+    InvalidOptionError,
     TerminationMergeError,
     UnknownNodeError,
 )
-from .util_types import TerminationIdPool, TerminationSignal
+from .util_hash import ConsistentHashRing
+from .util_types import (
+    SharedValueWrapper,
+    TerminationIdPool,
+    TerminationSignal,
+    ValueWrapper,
+)
+
+# 队列后端中实际传递的条目：单个信封、批量信封或终止信号
+type QueueItem[T] = TaskEnvelope[T] | TaskBatch[T] | TerminationSignal
+
+# 批量边默认的最长攒批时间（秒）
+DEFAULT_BATCH_DELAY = 0.005
+
+# 批量边刷新线程空闲多久后退出（秒），有新批次时再按需启动
+_FLUSHER_IDLE_TIMEOUT = 1.0
+
+# put_until 在队列已满时检查停止事件的间隔（秒）
+_PUT_POLL_INTERVAL = 0.1
+
+# EdgeChannel 统计数组的下标
+(
+    _DEPTH,
+    _HIGH_WATER,
+    _CREDIT_WAITS,
+    _CREDIT_WAIT_TIME,
+    _QUEUE_WAITS,
+    _QUEUE_WAIT_TIME,
+) = range(6)
+
+
+# ==== 后端工厂 ====
+VALID_QUEUE_BACKENDS = ("queue", "deque", "mp", "shm_ring", "socket", "broker")
+
+# 只能在 process 图模式下、由多进程上下文创建的后端
+PROCESS_QUEUE_BACKENDS = ("mp", "shm_ring")
+
+# 副本节点的负载均衡策略
+VALID_BALANCE_POLICIES = ("round_robin", "least_queued", "key")
+
+
+def validate_batch_options(batch_size: int, batch_delay: float | None) -> None:
+    """
+    校验批量边参数。
+
+    :param batch_size: 单批最多信封数，需不小于 1
+    :param batch_delay: 批次最长等待秒数，需为正数或 ``None``
+    :raises ConfigurationError: 参数不合法
+    """
+    if batch_size < 1:
+        raise ConfigurationError(f"batch_size must be >= 1: {batch_size}")
+    if batch_delay is not None and batch_delay <= 0:
+        raise ConfigurationError(f"batch_delay must be positive or None: {batch_delay}")
+
+
+def validate_edge_capacity(capacity: int, batch_size: int = 1) -> None:
+    """
+    校验边的容量上限。
+
+    批量边中暂存的信封同样占用额度，额度小于批大小时批次可能永远攒不满。
+
+    :param capacity: 边的容量上限，0 表示不限制
+    :param batch_size: 同一条边的单批最多信封数
+    :raises ConfigurationError: 容量为负数，或开启限制时小于 ``batch_size``
+    """
+    if capacity < 0:
+        raise ConfigurationError(f"capacity must be >= 0: {capacity}")
+    if 0 < capacity < batch_size:
+        raise ConfigurationError(
+            f"capacity must be >= batch_size when limited: {capacity} < {batch_size}"
+        )
+
+
+def make_queue_backend(
+    name: str,
+    *,
+    ctx: BaseContext | None = None,
+    maxsize: int = 0,
+    topic: str = "",
+) -> QueueBackend[Any]:
+    """
+    按名称创建队列后端。
+
+    :param name: 后端名称，可选值见 :data:`VALID_QUEUE_BACKENDS`：
+        'queue'（``queue.Queue``）、'deque'（无界 deque）、'mp'（``multiprocessing.Queue``）、
+        'shm_ring'（共享内存环形队列）、'socket'（本机 TCP socket）、
+        'broker'（以 :class:`LocalBroker` 为替身的中间件主题）
+    :param ctx: 'mp' / 'shm_ring' 所用的多进程上下文，默认使用全局上下文
+    :param maxsize: 'queue' / 'mp' 的容量上限，默认为 0（无限制）
+    :param topic: 'broker' 的主题名
+    :return: 队列后端
+    :raises InvalidOptionError: name 不是受支持的取值
+    """
+    if name not in VALID_QUEUE_BACKENDS:
+        raise InvalidOptionError("queue backend", name, VALID_QUEUE_BACKENDS)
+
+    if name == "queue":
+        return ThreadQueueBackend(maxsize)
+    if name == "deque":
+        return DequeQueueBackend()
+    if name == "socket":
+        return SocketQueueBackend()
+    if name == "broker":
+        return BrokerQueueBackend(LocalBroker(), topic)
+
+    ctx = ctx or multiprocessing.get_context()
+    if name == "mp":
+        return ProcessQueueBackend(ctx, maxsize)
+    return SharedRingQueue(ctx)
+
+
+# ==== 边通道 ====
+class EdgeChannel:
+    """
+    单条边的积压深度、信用额度与生产者阻塞统计，由上游输出队列与下游输入队列共享。
+
+    上游把信封（或整批信封）写入下游队列时计入积压，下游从底层队列取出后
+    按信封记录的来源扣减，因此 ``depth`` 是这条边当前积压在下游队列中的
+    信封数，``high_water`` 是运行以来的最大值。积压按队列条目整体增减，
+    批量边每批只需各加锁一次。
+
+    ``capacity > 0`` 时边另外持有同等数量的信用额度：信封进入通道（包括暂存
+    到批次）前领取一份，下游取出后归还，因此一条边在途的信封不会超过
+    ``capacity``。
+    每条入边各自持有额度，较快的上游只会耗尽自己的额度，不会挤占同一下游的
+    其他入边。
+
+    生产者等待的时间分两类记录：等待本边额度（``credit``），以及下游有界输入
+    队列已满（``queue``）。前者说明本边是背压来源，后者说明下游节点整体处理
+    不过来。
+    """
+
+    source: str
+    target: str
+    capacity: int
+
+    def __init__(self, source: str, target: str, capacity: int = 0) -> None:
+        """
+        初始化边通道。
+
+        :param source: 上游节点名称
+        :param target: 下游节点名称
+        :param capacity: 在途信封数上限，默认为 0（不限制）
+        :raises ConfigurationError: 容量为负数
+        """
+        validate_edge_capacity(capacity)
+        self.source = source
+        self.target = target
+        self.capacity = capacity
+
+        self._credits: Any = threading.Semaphore(capacity) if capacity > 0 else None
+        self._stats: Any = [0.0] * 6
+        self._lock: Any = threading.Lock()
+
+    def share_state(self, ctx: BaseContext) -> None:
+        """
+        将额度与统计迁移为跨进程版本，供 ``process`` 图模式在 fork 前调用。
+
+        :param ctx: 多进程上下文
+        """
+        if self.capacity > 0:
+            self._credits = ctx.Semaphore(self.capacity)
+        stats = ctx.Array("d", self._stats)
+        self._stats = stats
+        self._lock = stats.get_lock()
+
+    # ==== 额度与积压 ====
+    def acquire(self) -> None:
+        """为一个信封领取额度，额度耗尽时阻塞并记录等待时间；不限制容量时直接返回。"""
+        if self._credits is None or self._credits.acquire(False):
+            return
+        start = time.perf_counter()
+        self._credits.acquire()
+        waited = time.perf_counter() - start
+        with self._lock:
+            self._stats[_CREDIT_WAITS] += 1
+            self._stats[_CREDIT_WAIT_TIME] += waited
+
+    def add_depth(self, count: int = 1) -> None:
+        """
+        记录写入下游队列的信封，更新积压与最高积压。
+
+        :param count: 写入的信封数量
+        """
+        with self._lock:
+            depth = self._stats[_DEPTH] + count
+            self._stats[_DEPTH] = depth
+            if depth > self._stats[_HIGH_WATER]:
+                self._stats[_HIGH_WATER] = depth
+
+    def release(self, count: int = 1) -> None:
+        """
+        下游取出信封后扣减积压，并归还其占用的额度。
+
+        :param count: 取出的信封数量
+        """
+        with self._lock:
+            self._stats[_DEPTH] -= count
+        if self._credits is not None:
+            for _ in range(count):
+                self._credits.release()
+
+    def record_queue_wait(self, seconds: float) -> None:
+        """
+        记录一次因下游输入队列已满而阻塞的时间。
+
+        :param seconds: 阻塞秒数
+        """
+        with self._lock:
+            self._stats[_QUEUE_WAITS] += 1
+            self._stats[_QUEUE_WAIT_TIME] += seconds
+
+    # ==== 查询 ====
+    def snapshot(self) -> dict[str, Any]:
+        """
+        采集边的运行时快照。
+
+        :return: 包含容量、当前积压与最高积压、生产者阻塞次数 / 时间的字典
+        """
+        with self._lock:
+            stats = list(self._stats)
+        return {
+            "source": self.source,
+            "target": self.target,
+            "capacity": self.capacity,
+            "depth": int(stats[_DEPTH]),
+            "high_water": int(stats[_HIGH_WATER]),
+            "blocked_count": int(stats[_CREDIT_WAITS] + stats[_QUEUE_WAITS]),
+            "blocked_time": stats[_CREDIT_WAIT_TIME] + stats[_QUEUE_WAIT_TIME],
+            "credit_blocked_time": stats[_CREDIT_WAIT_TIME],
+            "queue_blocked_time": stats[_QUEUE_WAIT_TIME],
+        }
 
 
 # ==== 输入队列 ====
@@ -18,28 +268,37 @@ class TaskInQueue[T]:
     """任务输入队列，聚合多个上游来源的任务和终止信号。"""
 
     out_name: str
-    queue: Queue[TaskEnvelope[T] | TerminationSignal]
+    queue: QueueBackend[QueueItem[T]]
     source_names: list[str]
     termination_dict: dict[str, int]
+    _channels: dict[str, EdgeChannel]
 
     # ==== 初始化 ====
     def __init__(
         self,
         out_name: str,
         maxsize: int = 0,
+        backend: QueueBackend[QueueItem[T]] | None = None,
     ) -> None:
         """
         初始化任务入队
 
         :param out_name: 当前节点唯一名称
         :param maxsize: 队列最大容量，默认为 0（无限制）
+        :param backend: 底层队列后端，默认使用容量为 ``maxsize`` 的 ``queue.Queue`` 后端
         """
         self.out_name = out_name
-        self.queue = Queue(maxsize=maxsize)
+        self.queue = backend or ThreadQueueBackend(maxsize)
 
         self.source_names = []
         self.termination_dict = {}
 
+        # 入边通道：上游名称 → 通道，取出其信封后扣减积压并归还额度
+        self._channels = {}
+
+        # 从批次中拆出、尚未被 get 取走的信封
+        self._unbatched: deque[TaskEnvelope[T]] = deque()
+
     # ==== 添加 ====
 
     def add_source_name(self, name: str) -> None:
@@ -53,6 +312,70 @@ class TaskInQueue[T]:
             raise DuplicateNodeError(f"duplicate queue source name: {name}")
         self.source_names.append(name)
 
+    def bind_channel(self, channel: EdgeChannel) -> None:
+        """
+        绑定一条入边通道，取出该上游发来的信封后扣减通道积压并归还额度。
+
+        :param channel: 上游输出队列中对应本节点的边通道
+        """
+        self._channels[channel.source] = channel
+
+    def set_backend(self, backend: QueueBackend[QueueItem[T]]) -> None:
+        """
+        替换底层队列后端，并按原顺序迁移已入队的条目。
+
+        迁移期间不应有其他线程并发入队；旧后端迁移完成后被关闭。
+
+        :param backend: 新的队列后端
+        """
+        if backend is self.queue:
+            return
+        old_backend = self.queue
+        while True:
+            try:
+                backend.put(old_backend.get(block=False))
+            except Empty:
+                break
+        old_backend.close()
+        self.queue = backend
+
+    def share_queue(self, ctx: BaseContext, transport: str = "mp") -> None:
+        """
+        将默认的进程内后端替换为跨进程后端，供 ``process`` 图模式在 fork 前调用。
+
+        已是可跨进程共享的后端时不做任何处理。
+
+        :param ctx: 创建跨进程后端所用的多进程上下文
+        :param transport: 跨进程传输方式，'mp' 使用 ``multiprocessing.Queue``，
+            'shm_ring' 使用 :class:`SharedRingQueue`
+        :raises InvalidOptionError: transport 不是受支持的取值
+        :raises ConfigurationError: 当前后端由用户指定且无法跨进程共享
+        """
+        if transport not in PROCESS_QUEUE_BACKENDS:
+            raise InvalidOptionError(
+                "queue transport", transport, PROCESS_QUEUE_BACKENDS
+            )
+        if self.queue.process_safe:
+            return
+        if not isinstance(self.queue, ThreadQueueBackend):
+            raise ConfigurationError(
+                f"queue backend {type(self.queue).__name__} of stage "
+                f"{self.out_name} cannot be shared across processes"
+            )
+        self.set_backend(
+            make_queue_backend(transport, ctx=ctx, maxsize=self.queue.maxsize)
+        )
+
+    def release_queue(self) -> None:
+        """
+        释放底层后端持有的资源；'shm_ring' 后端同时删除共享内存名称。
+
+        已映射的进程仍可读出剩余条目，因此可在子进程退出后安全调用。
+        """
+        self.queue.close()
+        if isinstance(self.queue, SharedRingQueue):
+            self.queue.unlink()
+
     # ==== 终止 ====
     def _record_termination(self, signal: TerminationSignal) -> None:
         """
@@ -101,29 +424,90 @@ class TaskInQueue[T]:
         )
 
     # ==== 入队与出队 ====
-    def put(self, item: TaskEnvelope[T] | TerminationSignal) -> None:
+    @property
+    def maxsize(self) -> int:
+        """底层后端的容量上限，0 表示无限制。"""
+        return self.queue.maxsize
+
+    def put(self, item: QueueItem[T], block: bool = True) -> None:
         """
-        入队任务或终止信号
+        入队任务、任务批次或终止信号
 
-        :param item: 要入队的任务或终止信号
+        :param item: 要入队的条目
+        :param block: 队列已满时是否等待
+        :raises Full: ``block`` 为 False 且队列已满
+        """
+        self.queue.put(item, block)
+
+    def put_until(self, item: QueueItem[T], stop: threading.Event) -> bool:
         """
-        self.queue.put(item)
+        阻塞写入条目，队列已满时定期检查 ``stop``，置位后放弃写入。
+
+        供外部注入线程使用：下游节点异常退出后不再有消费者，注入线程不能
+        无限期阻塞在有界队列上。
+
+        :param item: 要入队的条目
+        :param stop: 停止事件
+        :return: 写入成功返回 True，因 ``stop`` 置位放弃时返回 False
+        """
+        while True:
+            try:
+                self.queue.put(item, True, _PUT_POLL_INTERVAL)
+                return True
+            except Full:
+                if stop.is_set():
+                    return False
 
     def get(self) -> TaskEnvelope[T] | TerminationIdPool:
         """
         出队任务或终止符号id池
 
+        批量边送来的 :class:`TaskBatch` 在此透明拆开，批内信封按顺序先于
+        其后入队的条目返回；上游总是先刷新批次再发送终止信号，因此终止
+        信号不会越过同一上游尚未返回的信封。
+
         :return: 出队的任务或终止符号id池
         """
         while True:
-            item: TaskEnvelope[T] | TerminationSignal | TerminationIdPool = (
-                self.queue.get()
-            )
+            try:
+                return self._unbatched.popleft()
+            except IndexError:
+                pass
+
+            item: QueueItem[T] | TerminationIdPool = self.queue.get()
+            if isinstance(item, TaskBatch):
+                self._release(item.envelopes[0], len(item))
+                self._unbatched.extend(item.envelopes)
+                continue
             result = self._process_item(item)
             if result is None:
                 continue
             return result
 
+    def discard(self, envelope: TaskEnvelope[T]) -> None:
+        """
+        丢弃一个上游已写入通道、但不会进入底层队列的信封。
+
+        信封写入通道时已领取额度并计入积压，按失败处理而不入队时需由此归还，
+        否则限制容量的边会被逐渐占满。
+
+        :param envelope: 被丢弃的任务信封
+        """
+        self._release(envelope)
+
+    def _release(self, envelope: TaskEnvelope[T], count: int = 1) -> None:
+        """
+        条目离开底层队列后，扣减其来源边的积压并归还额度。
+
+        同一批次的信封来自同一条边，以首个信封记录的来源代表整批。
+
+        :param envelope: 取出的任务信封（批次取首个信封）
+        :param count: 条目包含的信封数量
+        """
+        source = envelope.get_source()
+        if source is not None and source in self._channels:
+            self._channels[source].release(count)
+
     def _process_item(
         self,
         item: TaskEnvelope[T] | TerminationSignal | TerminationIdPool,
@@ -135,13 +519,25 @@ class TaskInQueue[T]:
         :return: 处理后的任务或终止符号id池
         """
         if isinstance(item, TaskEnvelope):
+            self._release(item)
             return item
 
         if isinstance(item, TerminationIdPool):
             # 直接注入的终止信号池，不经上游汇合逻辑
             return item
 
-        self._record_termination(item)
+        return self.accept_termination(item)
+
+    def accept_termination(self, signal: TerminationSignal) -> TerminationIdPool | None:
+        """
+        记录一个终止信号，并判断当前节点是否应当结束。
+
+        除出队时调用外，也供融合节点在不经过底层队列时直接汇合上游的终止信号。
+
+        :param signal: 上游或外部注入的终止信号
+        :return: 应当结束时返回终止符号id池，否则返回 ``None``
+        """
+        self._record_termination(signal)
         if "input" in self.termination_dict:
             # 外部终止符注入, 直接退出
             return TerminationIdPool(ids=[self.termination_dict["input"]])
@@ -161,12 +557,17 @@ class TaskInQueue[T]:
 
         :return: 包含所有任务的列表
         """
-        results: list[TaskEnvelope[T]] = []
+        results: list[TaskEnvelope[T]] = list(self._unbatched)
+        self._unbatched.clear()
         while True:
             try:
-                item: TaskEnvelope[T] | TerminationSignal = self.queue.get_nowait()
+                item: QueueItem[T] = self.queue.get(block=False)
                 if isinstance(item, TaskEnvelope):
+                    self._release(item)
                     results.append(item)
+                elif isinstance(item, TaskBatch):
+                    self._release(item.envelopes[0], len(item))
+                    results.extend(item.envelopes)
                 else:
                     self._record_termination(item)
             except Empty:
@@ -174,12 +575,186 @@ class TaskInQueue[T]:
         return results
 
 
+# ==== 副本分发 ====
+class ReplicaTarget[T]:
+    """
+    副本节点的分发目标，替代单个输入队列挂在上游的输出队列上。
+
+    上游写入的信封（或整批信封）按负载均衡策略交给其中一个副本的输入队列，
+    终止信号则发给全部副本，使每个副本都能按自身入边汇合终止。每个副本
+    各有一个计数器记录分到的信封数，供副本绑定为输入任务数。
+
+    - 'round_robin'：依次轮流分发
+    - 'least_queued'：分给底层队列积压最少的副本，积压相同时按轮转顺序
+    - 'key'：按 ``partition_key(task)`` 经一致性哈希分给固定的副本，同一个键的
+      任务始终进入同一个副本，且保持写入顺序；批次按副本拆分为子批次。
+      分区键函数抛出异常的信封不进入任何副本：先归还其占用的边额度与积压，
+      再计入首个副本的分发数并交给 ``on_key_error`` 按失败处理，与节点内
+      按分区键调度时的行为一致
+    """
+
+    members: list[TaskInQueue[T]]
+    balance: str
+    counters: list[ValueWrapper]
+    partition_key: Callable[[T], Any] | None
+    on_key_error: Callable[[TaskEnvelope[T], Exception], None] | None
+
+    def __init__(
+        self,
+        members: list[TaskInQueue[T]],
+        balance: str = "round_robin",
+        partition_key: Callable[[T], Any] | None = None,
+        on_key_error: Callable[[TaskEnvelope[T], Exception], None] | None = None,
+    ) -> None:
+        """
+        :param members: 各副本的输入队列
+        :param balance: 负载均衡策略，可选值见 :data:`VALID_BALANCE_POLICIES`
+        :param partition_key: 分区键函数，'key' 策略必填
+        :param on_key_error: 分区键函数抛出异常时的失败处理函数，
+            默认 None，此时异常向写入方抛出
+        :raises InvalidOptionError: balance 不是受支持的取值
+        :raises ConfigurationError: 'key' 策略未提供 partition_key
+        """
+        if balance not in VALID_BALANCE_POLICIES:
+            raise InvalidOptionError("balance policy", balance, VALID_BALANCE_POLICIES)
+        if balance == "key" and partition_key is None:
+            raise ConfigurationError("balance policy 'key' requires a partition_key")
+        self.members = members
+        self.balance = balance
+        self.partition_key = partition_key
+        self.on_key_error = on_key_error
+        self.counters = [ValueWrapper(0, threading.Lock()) for _ in members]
+        self._ring = ConsistentHashRing(len(members)) if balance == "key" else None
+        self._next = 0
+        self._lock = threading.Lock()
+
+    @property
+    def maxsize(self) -> int:
+        """无容量上限，写满的副本由其输入队列自身阻塞。"""
+        return 0
+
+    def share_state(self, ctx: BaseContext) -> None:
+        """
+        将各副本的计数器迁移为跨进程版本，供 ``process`` 图模式在 fork 前调用。
+
+        :param ctx: 多进程上下文
+        """
+        self.counters = [
+            SharedValueWrapper(counter.value, ctx) for counter in self.counters
+        ]
+
+    def put(self, item: QueueItem[T], block: bool = True) -> None:
+        """
+        分发信封或广播终止信号。
+
+        :param item: 上游写入的条目
+        :param block: 副本输入队列已满时是否等待
+        """
+        if isinstance(item, TerminationSignal):
+            for member in self.members:
+                member.put(item, block)
+            return
+
+        if self.balance == "key":
+            self._put_by_key(item, block)
+            return
+
+        index = self._pick()
+        self.counters[index].add(len(item) if isinstance(item, TaskBatch) else 1)
+        self.members[index].put(item, block)
+
+    def _put_by_key(self, item: TaskEnvelope[T] | TaskBatch[T], block: bool) -> None:
+        """
+        按分区键分发信封，批次拆分为各副本的子批次，子批次内保持原顺序。
+
+        :param item: 上游写入的信封或批次
+        :param block: 副本输入队列已满时是否等待
+        :raises Exception: 未设置 ``on_key_error`` 时，分区键函数抛出的异常
+        """
+        if isinstance(item, TaskEnvelope):
+            index = self._pick_envelope(item)
+            if index is not None:
+                self.counters[index].add(1)
+                self.members[index].put(item, block)
+            return
+
+        groups: dict[int, list[TaskEnvelope[T]]] = {}
+        for envelope in item.envelopes:
+            index = self._pick_envelope(envelope)
+            if index is not None:
+                groups.setdefault(index, []).append(envelope)
+        for index, envelopes in groups.items():
+            self.counters[index].add(len(envelopes))
+            self.members[index].put(TaskBatch(envelopes), block)
+
+    def _pick_envelope(self, envelope: TaskEnvelope[T]) -> int | None:
+        """
+        按分区键选出接收信封的副本，分区键函数抛出异常时交给 ``on_key_error``。
+
+        失败的信封不会入队，先归还其在边上占用的额度与积压，再计入首个
+        副本的分发数，使其输入任务数包含这次失败。
+
+        :param envelope: 上游写入的信封
+        :return: 副本下标，按失败处理时为 None
+        :raises Exception: 未设置 ``on_key_error`` 时，分区键函数抛出的异常
+        """
+        try:
+            return self.pick_by_key(envelope.get_task())
+        except Exception as exception:
+            if self.on_key_error is None:
+                raise
+            self.members[0].discard(envelope)
+            self.counters[0].add(1)
+            self.on_key_error(envelope, exception)
+            return None
+
+    def pick_by_key(self, task: T) -> int:
+        """
+        按分区键选出接收任务的副本，非 'key' 策略时按负载均衡策略选择。
+
+        :param task: 任务
+        :return: 副本下标
+        :raises Exception: 分区键函数抛出的异常
+        """
+        if self._ring is None or self.partition_key is None:
+            return self._pick()
+        return self._ring.get_slot(self.partition_key(task))
+
+    def _pick(self) -> int:
+        """
+        按负载均衡策略选出接收下一条目的副本。
+
+        :return: 副本下标
+        """
+        with self._lock:
+            start = self._next
+            self._next = (start + 1) % len(self.members)
+        if self.balance != "least_queued":
+            return start
+
+        order = [(start + i) % len(self.members) for i in range(len(self.members))]
+        return min(order, key=lambda i: self.members[i].queue.qsize())
+
+
 # ==== 输出队列 ====
 class TaskOutQueue[T]:
-    """任务输出队列，将任务广播到一个或多个下游队列通道。"""
+    """任务输出队列，将任务广播到一个或多个下游队列通道。
+
+    通道可开启批量传输：信封先按目标暂存，攒满 ``batch_size`` 条或最早一条
+    等待超过 ``batch_delay`` 秒时，作为一个 :class:`TaskBatch` 整体入队，
+    下游每批只需一次加锁与唤醒。终止信号发送前总会先刷新该通道的批次。
+
+    每个通道对应一个 :class:`EdgeChannel`，统计通道积压，可限制在途信封数，
+    并记录生产者因额度耗尽或下游队列已满而阻塞的时间。
+    """
 
     in_name: str
-    _queues: dict[str, Queue[TaskEnvelope[T] | TerminationSignal]]  # name → queue
+    _queues: dict[str, SupportsPut[QueueItem[T]]]  # name → queue
+    _channels: dict[str, EdgeChannel]  # name → channel
+    _batch_sizes: dict[str, int]
+    _batch_delays: dict[str, float | None]
+    _buffers: dict[str, list[TaskEnvelope[T]]]
+    _deadlines: dict[str, float]
 
     # ==== 初始化 ====
     def __init__(
@@ -194,20 +769,64 @@ class TaskOutQueue[T]:
         self.in_name = in_name
 
         self._queues = {}
+        self._channels = {}
+
+        # 批量通道的配置与暂存区，仅包含 batch_size > 1 的通道
+        self._batch_sizes = {}
+        self._batch_delays = {}
+        self._buffers = {}
+        self._deadlines = {}
+        self._batch_cond = threading.Condition()
+        self._flusher: threading.Thread | None = None
 
     # ==== 入队 ====
 
-    def add_queue(self, queue: Any, name: str) -> None:
+    def add_queue(
+        self,
+        queue: SupportsPut[QueueItem[T]],
+        name: str,
+        batch_size: int = 1,
+        batch_delay: float | None = DEFAULT_BATCH_DELAY,
+        capacity: int = 0,
+    ) -> EdgeChannel:
         """
         添加一个输出队列到队列列表中
 
-        :param queue: 要添加的输出队列
+        :param queue: 要添加的输出队列，通常为下游节点的 :class:`TaskInQueue`，
+            任何支持 ``put`` 的对象均可；开启批量或限制容量时需能接收 :class:`TaskBatch`
         :param name: 队列的目标节点名称，用于标识该队列
+        :param batch_size: 单批最多信封数，默认 1（不批量）
+        :param batch_delay: 批次最长等待秒数，``None`` 表示只在攒满或终止时刷新
+        :param capacity: 通道在途信封数上限，默认 0（不限制）；下游需通过
+            :meth:`TaskInQueue.bind_channel` 绑定返回的通道以扣减积压、归还额度
+        :return: 该通道对应的边通道
         :raises DuplicateNodeError: 如果名称已存在于队列列表中
+        :raises ConfigurationError: 批量或容量参数不合法
         """
+        validate_batch_options(batch_size, batch_delay)
+        validate_edge_capacity(capacity, batch_size)
         if name in self._queues:
             raise DuplicateNodeError(f"duplicate queue target name: {name}")
         self._queues[name] = queue
+        channel = EdgeChannel(self.in_name, name, capacity)
+        self._channels[name] = channel
+        if batch_size > 1:
+            self._batch_sizes[name] = batch_size
+            self._batch_delays[name] = batch_delay
+            self._buffers[name] = []
+        return channel
+
+    def set_target_queue(self, name: str, queue: SupportsPut[QueueItem[T]]) -> None:
+        """
+        替换指定通道的下游队列，通道的批量配置与边通道保持不变。
+
+        :param name: 输出队列目标节点名称
+        :param queue: 新的下游队列
+        :raises UnknownNodeError: 如果名称不在队列列表中
+        """
+        if name not in self._queues:
+            raise UnknownNodeError(f"unknown queue target name: {name}")
+        self._queues[name] = queue
 
     def put(self, item: TaskEnvelope[T] | TerminationSignal) -> None:
         """
@@ -222,10 +841,109 @@ class TaskOutQueue[T]:
         """
         入队任务或终止信号到指定的输出队列
 
+        批量通道中的信封先暂存，终止信号则先刷新暂存的批次再入队。
+        信封进入通道时记录入队时刻与来源，限制容量时先领取额度；暂存在
+        批次中的信封同样占用额度，写入下游队列时才计入积压。
+
         :param item: 要入队的任务或终止信号
         :param name: 输出队列目标节点名称，用于标识该队列通道
         """
-        self._queues[name].put(item)
+        channel = self._channels[name]
+        if isinstance(item, TaskEnvelope):
+            # 额度需在批量锁外领取，等待期间超时刷新线程仍可送出已暂存的批次
+            channel.acquire()
+            item.mark_enqueued(self.in_name)
+            if name not in self._batch_sizes:
+                channel.add_depth()
+
+        if name not in self._batch_sizes:
+            self._send(name, item)
+            return
+
+        with self._batch_cond:
+            if not isinstance(item, TaskEnvelope):
+                self._flush_target(name)
+                self._send(name, item)
+                return
+
+            buffer = self._buffers[name]
+            buffer.append(item)
+            if len(buffer) >= self._batch_sizes[name]:
+                self._flush_target(name)
+            elif len(buffer) == 1:
+                delay = self._batch_delays[name]
+                if delay is not None:
+                    self._deadlines[name] = time.monotonic() + delay
+                    self._ensure_flusher()
+                    self._batch_cond.notify()
+
+    def flush(self) -> None:
+        """立即刷新所有批量通道中暂存的信封。"""
+        with self._batch_cond:
+            for name in self._buffers:
+                self._flush_target(name)
+
+    def _flush_target(self, name: str) -> None:
+        """
+        将指定通道暂存的信封作为一个批次入队，调用方需持有 ``_batch_cond``。
+
+        入队在锁内完成，保证批次与其后的终止信号之间的顺序。
+
+        :param name: 输出队列目标节点名称
+        """
+        buffer = self._buffers[name]
+        _ = self._deadlines.pop(name, None)
+        if not buffer:
+            return
+        self._buffers[name] = []
+        self._channels[name].add_depth(len(buffer))
+        self._send(name, TaskBatch(buffer))
+
+    def _send(self, name: str, item: QueueItem[T]) -> None:
+        """
+        将条目写入指定通道的下游队列。
+
+        下游队列有界时先尝试非阻塞写入，已满再阻塞等待，并把等待时间记入边通道。
+
+        :param name: 输出队列目标节点名称
+        :param item: 要写入的条目
+        """
+        queue = self._queues[name]
+        if getattr(queue, "maxsize", 0) <= 0:
+            queue.put(item)
+            return
+        try:
+            queue.put(item, False)
+        except Full:
+            start = time.perf_counter()
+            queue.put(item)
+            self._channels[name].record_queue_wait(time.perf_counter() - start)
+
+    def _ensure_flusher(self) -> None:
+        """按需启动超时刷新线程，调用方需持有 ``_batch_cond``。"""
+        if self._flusher is None or not self._flusher.is_alive():
+            self._flusher = threading.Thread(
+                target=self._flush_loop, name=f"{self.in_name}-flusher", daemon=True
+            )
+            self._flusher.start()
+
+    def _flush_loop(self) -> None:
+        """超时刷新线程：刷新等待超过 ``batch_delay`` 的批次，空闲一段时间后退出。"""
+        with self._batch_cond:
+            while True:
+                if not self._deadlines:
+                    notified = self._batch_cond.wait(_FLUSHER_IDLE_TIMEOUT)
+                    if not notified and not self._deadlines:
+                        self._flusher = None
+                        return
+                    continue
+
+                now = time.monotonic()
+                expired = [name for name, due in self._deadlines.items() if due <= now]
+                for name in expired:
+                    self._flush_target(name)
+                if not expired:
+                    _ = self._batch_cond.wait(min(self._deadlines.values()) - now)
 
     # ==== 查询 ====
 
@@ -236,3 +954,38 @@ class TaskOutQueue[T]:
         :return: 输出队列目标节点名称列表
         """
         return list(self._queues.keys())
+
+    def get_batch_size(self, name: str) -> int:
+        """
+        获取指定输出通道的批量大小
+
+        :param name: 输出队列目标节点名称
+        :return: 单批最多信封数，未开启批量时为 1
+        """
+        return self._batch_sizes.get(name, 1)
+
+    def get_batch_delay(self, name: str) -> float | None:
+        """
+        获取指定输出通道的批次最长等待秒数
+
+        :param name: 输出队列目标节点名称
+        :return: 批次最长等待秒数，未开启批量时为默认值
+        """
+        return self._batch_delays.get(name, DEFAULT_BATCH_DELAY)
+
+    def get_channel(self, name: str) -> EdgeChannel:
+        """
+        获取指定输出通道的边通道
+
+        :param name: 输出队列目标节点名称
+        :return: 边通道
+        """
+        return self._channels[name]
+
+    def get_channels(self) -> list[EdgeChannel]:
+        """
+        获取所有输出通道的边通道
+
+        :return: 边通道列表
+        """
+        return list(self._channels.values())
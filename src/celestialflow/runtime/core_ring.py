@@ -0,0 +1,251 @@
+# runtime/core_ring.py
+from __future__ import annotations
+
+import pickle
+import struct
+import time
+from contextlib import suppress
+from multiprocessing import shared_memory
+from multiprocessing.context import BaseContext
+from queue import Empty, Full
+from typing import Any
+
+from .core_backend import QueueBackend
+
+# 每条帧首部：负载长度（小端 uint32），与负载一起按槽位切分存放
+_FRAME_HEADER = struct.Struct("<I")
+
+
+class SharedRingQueue[T](QueueBackend[T]):
+    """
+    基于 ``SharedMemory`` 的多生产者 / 多消费者环形队列。
+
+    环由 ``slot_count`` 个定长槽位组成；每条记录序列化为一帧
+    ``[4B 长度][pickle 负载]``，按需占用若干连续槽位，因此负载长度可变，
+    只要单帧不超过整个环的容量。任务与终止信号都以普通帧传递，
+    :class:`TaskInQueue` 的终止合并逻辑无需区分底层队列。
+
+    与 ``multiprocessing.Queue`` 相比，记录直接写入共享内存，不经过管道与
+    后台 feeder 线程。协议：
+
+    - 生产者持有 ``write_lock`` 领取空槽位、写入整帧，释放锁后发布一帧
+    - 消费者获取一帧后持有 ``read_lock`` 读出整帧，再归还其占用的槽位
+
+    写入在锁内完成，消费者按 ``read_idx`` 读取的帧必然已写完，与
+    ``bench/bench_mpqueue_vs_shared_memory.py`` 中的基准协议一致。
+    """
+
+    process_safe = True
+
+    slot_count: int
+    slot_size: int
+
+    def __init__(
+        self, ctx: BaseContext, slot_count: int = 1024, slot_size: int = 4096
+    ) -> None:
+        """
+        创建共享内存环形队列。
+
+        :param ctx: 创建锁、信号量与共享索引所用的多进程上下文
+        :param slot_count: 槽位数量
+        :param slot_size: 单个槽位字节数，需大于帧首部长度
+        :raises ValueError: 槽位参数不合法
+        """
+        if slot_count <= 0:
+            raise ValueError(f"slot_count must be positive: {slot_count}")
+        if slot_size <= _FRAME_HEADER.size:
+            raise ValueError(
+                f"slot_size must be greater than {_FRAME_HEADER.size}: {slot_size}"
+            )
+
+        self.slot_count = slot_count
+        self.slot_size = slot_size
+        # 兼容 queue.Queue 的 maxsize 语义：以槽位数近似表示容量上限
+        self.maxsize = slot_count
+
+        self._shm = shared_memory.SharedMemory(create=True, size=slot_count * slot_size)
+        self._write_lock = ctx.Lock()
+        self._read_lock = ctx.Lock()
+        self._empty_slots = ctx.Semaphore(slot_count)
+        self._full_frames = ctx.Semaphore(0)
+        self._write_idx = ctx.RawValue("q", 0)
+        self._read_idx = ctx.RawValue("q", 0)
+        # 已发布但尚未读出的帧数，仅用于 qsize 统计
+        self._frames = ctx.Value("q", 0)
+
+    # ==== 序列化 ====
+    def __getstate__(self) -> dict[str, Any]:
+        """
+        以共享内存名称代替映射本身，使队列可在 spawn 子进程启动时传递。
+
+        :return: 可 pickle 的状态字典
+        """
+        state = self.__dict__.copy()
+        state["_shm"] = self._shm.name
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        """
+        在子进程中按名称重新挂载共享内存。
+
+        :param state: :meth:`__getstate__` 产生的状态字典
+        """
+        vars(self).update(state)
+        self._shm = shared_memory.SharedMemory(name=state["_shm"])
+
+    # ==== 入队与出队 ====
+    def put(self, item: T, block: bool = True, timeout: float | None = None) -> None:
+        """
+        将记录写入环中，槽位不足时按 ``block`` / ``timeout`` 等待。
+
+        :param item: 可 pickle 的记录
+        :param block: 槽位不足时是否等待
+        :param timeout: 等待的最长秒数，``None`` 表示无限等待
+        :raises ValueError: 单帧超过整个环的容量
+        :raises Full: 非阻塞或超时后仍没有足够的空槽位
+        """
+        payload = pickle.dumps(item, protocol=pickle.HIGHEST_PROTOCOL)
+        frame = _FRAME_HEADER.pack(len(payload)) + payload
+        need = self._slots_for(len(frame))
+        if need > self.slot_count:
+            raise ValueError(
+                f"ring frame too large: {len(frame)} bytes > "
+                f"{self.slot_count * self.slot_size} bytes ring capacity"
+            )
+
+        with self._write_lock:
+            # 在写锁内领取全部槽位，保证同一帧占用连续槽位且生产者之间不会互相饿死。
+            # 多个槽位共享同一截止时间，整帧的等待不超过 timeout。
+            deadline = None if timeout is None else time.monotonic() + timeout
+            acquired = 0
+            while acquired < need:
+                remaining = (
+                    None if deadline is None else max(0.0, deadline - time.monotonic())
+                )
+                if not self._empty_slots.acquire(block, remaining):
+                    for _ in range(acquired):
+                        self._empty_slots.release()
+                    raise Full
+                acquired += 1
+
+            start = self._write_idx.value
+            self._write_slots(start, frame)
+            self._write_idx.value = (start + need) % self.slot_count
+        with self._frames.get_lock():
+            self._frames.value += 1
+        self._full_frames.release()
+
+    def put_nowait(self, item: T) -> None:
+        """
+        非阻塞写入记录。
+
+        :param item: 可 pickle 的记录
+        :raises Full: 没有足够的空槽位
+        """
+        self.put(item, block=False)
+
+    def get(self, block: bool = True, timeout: float | None = None) -> T:
+        """
+        读出最早写入的一条记录。
+
+        :param block: 环为空时是否等待
+        :param timeout: 等待的最长秒数，``None`` 表示无限等待
+        :return: 记录
+        :raises Empty: 非阻塞或超时后环仍为空
+        """
+        if not self._full_frames.acquire(block, timeout):
+            raise Empty
+
+        with self._read_lock:
+            start = self._read_idx.value
+            frame, need = self._read_slots(start)
+            self._read_idx.value = (start + need) % self.slot_count
+
+        with self._frames.get_lock():
+            self._frames.value -= 1
+        for _ in range(need):
+            self._empty_slots.release()
+        return pickle.loads(frame)
+
+    def get_nowait(self) -> T:
+        """
+        非阻塞读出一条记录。
+
+        :return: 记录
+        :raises Empty: 环为空
+        """
+        return self.get(block=False)
+
+    def qsize(self) -> int:
+        """
+        返回已写入但尚未读出的记录数量。
+
+        :return: 记录数量
+        """
+        return self._frames.value
+
+    # ==== 生命周期 ====
+    def close(self) -> None:
+        """关闭当前进程对共享内存的映射。"""
+        self._shm.close()
+
+    def unlink(self) -> None:
+        """
+        删除共享内存名称；已挂载的进程在关闭映射前仍可继续读写。
+
+        应只由创建队列的进程调用一次。
+        """
+        with suppress(FileNotFoundError):
+            self._shm.unlink()
+
+    # ==== 槽位读写 ====
+    def _slots_for(self, frame_size: int) -> int:
+        """
+        计算一帧占用的槽位数。
+
+        :param frame_size: 帧字节数（含首部）
+        :return: 槽位数
+        """
+        return -(-frame_size // self.slot_size)
+
+    def _write_slots(self, start: int, frame: bytes) -> None:
+        """
+        自 ``start`` 槽位起按槽位切分写入整帧，越过环尾时回绕。
+
+        :param start: 起始槽位
+        :param frame: 帧字节
+        """
+        buf = self._shm.buf
+        assert buf is not None
+        for offset in range(0, len(frame), self.slot_size):
+            slot = (start + offset // self.slot_size) % self.slot_count
+            chunk = frame[offset : offset + self.slot_size]
+            base = slot * self.slot_size
+            buf[base : base + len(chunk)] = chunk
+
+    def _read_slots(self, start: int) -> tuple[bytes, int]:
+        """
+        自 ``start`` 槽位起读出整帧负载。
+
+        :param start: 起始槽位
+        :return: (pickle 负载, 占用的槽位数)
+        """
+        buf = self._shm.buf
+        assert buf is not None
+        base = start * self.slot_size
+        (length,) = _FRAME_HEADER.unpack(buf[base : base + _FRAME_HEADER.size])
+        frame_size = _FRAME_HEADER.size + length
+        need = self._slots_for(frame_size)
+
+        # 帧未回绕时一次切片读出；回绕时按槽位拼接。
+        if start + need <= self.slot_count:
+            return bytes(buf[base + _FRAME_HEADER.size : base + frame_size]), need
+
+        chunks: list[bytes] = []
+        remaining = frame_size
+        for i in range(need):
+            slot_base = ((start + i) % self.slot_count) * self.slot_size
+            size = min(self.slot_size, remaining)
+            chunks.append(bytes(buf[slot_base : slot_base + size]))
+            remaining -= size
+        return b"".join(chunks)[_FRAME_HEADER.size :], need
@@ -3,19 +3,20 @@ from __future__ import annotations
 
 import tomllib
 from pathlib import Path
+from typing import Any
 
 from .util_constant import LEVEL_DICT
 from .util_errors import InvalidOptionError
 
 
-def load_log_level_from_pyproject() -> str:
+def load_config_from_pyproject() -> dict[str, Any]:
     """
-    从项目级 ``pyproject.toml`` 的 ``[tool.celestialflow]`` 节读取 ``log_level``。
+    读取项目级 ``pyproject.toml`` 的 ``[tool.celestialflow]`` 节。
 
-    从当前工作目录开始向上搜索，未找到时返回 ``"INFO"``。
+    从当前工作目录开始向上搜索，跳过无法解析的文件，未找到时返回空字典。
 
-    :return: 日志级别字符串（大写）
-    :rtype: str
+    :return: ``[tool.celestialflow]`` 配置字典
+    :rtype: dict[str, Any]
     """
     current_dir = Path.cwd()
     for parent in [current_dir, *current_dir.parents]:
@@ -23,18 +24,71 @@ def load_log_level_from_pyproject() -> str:
         if pyproject.exists():
             try:
                 data = tomllib.loads(pyproject.read_text("utf-8"))
-                level = (
-                    data.get("tool", {})
-                    .get("celestialflow", {})
-                    .get("log_level", "INFO")
-                )
-
-                log_level = str(level).upper()
-                if log_level not in LEVEL_DICT:
-                    raise InvalidOptionError(
-                        "log level", log_level, tuple(LEVEL_DICT.keys())
-                    )
-                return log_level
             except tomllib.TOMLDecodeError:
                 continue
-    return "INFO"
+            return dict(data.get("tool", {}).get("celestialflow", {}))
+    return {}
+
+
+def load_log_level_from_pyproject() -> str:
+    """
+    从项目级 ``pyproject.toml`` 的 ``[tool.celestialflow]`` 节读取 ``log_level``。
+
+    从当前工作目录开始向上搜索，未找到时返回 ``"INFO"``。
+
+    :return: 日志级别字符串（大写）
+    :rtype: str
+    """
+    level = load_config_from_pyproject().get("log_level", "INFO")
+
+    log_level = str(level).upper()
+    if log_level not in LEVEL_DICT:
+        raise InvalidOptionError("log level", log_level, tuple(LEVEL_DICT.keys()))
+    return log_level
+
+
+def load_fallback_engine_from_pyproject() -> str:
+    """
+    从项目级 ``pyproject.toml`` 的 ``[tool.celestialflow]`` 节读取 ``fallback_engine``。
+
+    未配置时返回 ``"sqlite"``；取值合法性由 ``FallbackSpout`` 负责校验。
+
+    :return: fallback 存储引擎名称（小写）
+    :rtype: str
+    """
+    engine = load_config_from_pyproject().get("fallback_engine", "sqlite")
+    return str(engine).lower()
+
+
+def load_fallback_codec_from_pyproject() -> str:
+    """
+    从项目级 ``pyproject.toml`` 的 ``[tool.celestialflow]`` 节读取 ``fallback_codec``。
+
+    未配置时返回 ``"json"``；取值合法性由 ``FallbackSpout`` 负责校验。
+
+    :return: fallback 负载编解码器名称（小写）
+    :rtype: str
+    """
+    codec = load_config_from_pyproject().get("fallback_codec", "json")
+    return str(codec).lower()
+
+
+def load_spout_queue_from_pyproject(
+    name: str, default_maxsize: int, default_overflow: str
+) -> tuple[int, str]:
+    """
+    从项目级 ``pyproject.toml`` 的 ``[tool.celestialflow]`` 节读取 spout 队列配置。
+
+    读取 ``<name>_queue_maxsize`` 与 ``<name>_queue_overflow`` 两项，
+    取值合法性由对应 spout 负责校验。
+
+    :param name: spout 名称，如 ``"fallback"`` / ``"log"``
+    :param default_maxsize: 未配置时的队列容量上限
+    :param default_overflow: 未配置时的溢出策略
+    :return: ``(maxsize, overflow)``
+    :rtype: tuple[int, str]
+    """
+    config = load_config_from_pyproject()
+    maxsize = int(config.get(f"{name}_queue_maxsize", default_maxsize))
+    overflow = str(config.get(f"{name}_queue_overflow", default_overflow)).lower()
+    return maxsize, overflow
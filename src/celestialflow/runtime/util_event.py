@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import threading
+from multiprocessing.context import BaseContext
 from typing import Any, Protocol
 
 
@@ -52,6 +53,64 @@ class LocalEventClient:
             self._next_id += 1
             return current_id
 
+    def share(self, ctx: BaseContext) -> SharedEventClient:
+        """
+        创建从当前 ID 续发的跨进程事件客户端。
+
+        读取当前 ID 与创建共享计数器在同一把锁内完成，期间的并发发射不会得到
+        与新客户端重复的 ID。
+
+        :param ctx: 创建共享内存所用的多进程上下文
+        :return: 跨进程事件客户端
+        """
+        with self._lock:
+            return SharedEventClient(ctx, self._next_id)
+
+
+class SharedEventClient:
+    """跨进程事件客户端，基于共享内存计数器生成全局递增事件 ID。"""
+
+    def __init__(self, ctx: BaseContext, start_id: int = 1) -> None:
+        """
+        初始化跨进程事件客户端。
+
+        :param ctx: 创建共享内存所用的多进程上下文
+        :param start_id: 起始事件 ID，默认 1
+        """
+        self._next_id = ctx.Value("q", start_id)
+
+    def emit(
+        self,
+        type_: str,
+        parents: list[int] | None = None,
+        message: str | None = None,
+        payload: list[Any] | dict[str, Any] | None = None,
+    ) -> int:
+        """
+        发射一个事件并返回在所有进程间唯一的递增 ID。
+
+        :param type_: 事件类型，当前实现不使用
+        :param parents: 父事件 ID 列表，当前实现不使用
+        :param message: 事件消息，当前实现不使用
+        :param payload: 事件载荷，当前实现不使用
+        :return: 递增事件 ID
+        """
+        with self._next_id.get_lock():
+            current_id = self._next_id.value
+            self._next_id.value = current_id + 1
+            return current_id
+
+
+def share_event_client(client: EventClient, ctx: BaseContext) -> EventClient:
+    """将事件客户端转换为可跨进程使用的版本。
+
+    本地事件客户端转换为从当前 ID 续发的 :class:`SharedEventClient`；
+    其他实现（如远端事件服务）本身不依赖进程内状态，直接复用。
+    """
+    if isinstance(client, LocalEventClient):
+        return client.share(ctx)
+    return client
+
 
 def clone_event_client(client: EventClient) -> EventClient:
     """克隆事件客户端。
@@ -1,8 +1,11 @@
 # runtime/util_hash.py
+import bisect
 import hashlib
 import pickle
 from typing import Any, cast
 
+from .util_errors import ConfigurationError
+
 
 # ==== 哈希工具 ====
 def make_hashable(obj: Any) -> Any:
@@ -37,3 +40,57 @@ def object_to_hash(obj: Any) -> bytes:
     """
     obj_bytes = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
     return hashlib.sha1(obj_bytes).digest()
+
+
+def key_to_int(key: Any) -> int:
+    """
+    将任意分区键映射为稳定的 64 位整数，跨进程、跨运行保持一致。
+
+    :param key: 分区键，经 :func:`make_hashable` 规整后须可 pickle
+    :return: 64 位无符号整数
+    """
+    return int.from_bytes(object_to_hash(make_hashable(key))[:8], "big")
+
+
+# ==== 一致性哈希 ====
+class ConsistentHashRing:
+    """
+    一致性哈希环，把分区键稳定地映射到 ``slots`` 个槽位之一。
+
+    每个槽位在环上放置 ``vnodes`` 个虚拟节点以均衡负载；槽位数变化时只有
+    约 ``1 / slots`` 的键改变归属，其余键仍落在原槽位上。
+    """
+
+    slots: int
+    vnodes: int
+
+    def __init__(self, slots: int, vnodes: int = 160) -> None:
+        """
+        :param slots: 槽位数
+        :param vnodes: 每个槽位的虚拟节点数
+        :raises ConfigurationError: slots 或 vnodes 小于 1
+        """
+        if slots < 1 or vnodes < 1:
+            raise ConfigurationError(
+                f"hash ring requires positive slots and vnodes: {slots}, {vnodes}"
+            )
+        self.slots = slots
+        self.vnodes = vnodes
+
+        points = sorted(
+            (key_to_int(("slot", slot, i)), slot)
+            for slot in range(slots)
+            for i in range(vnodes)
+        )
+        self._points = [point for point, _ in points]
+        self._owners = [slot for _, slot in points]
+
+    def get_slot(self, key: Any) -> int:
+        """
+        获取分区键所属的槽位：环上顺时针方向的第一个虚拟节点。
+
+        :param key: 分区键
+        :return: 槽位下标
+        """
+        index = bisect.bisect_right(self._points, key_to_int(key))
+        return self._owners[index % len(self._points)]
@@ -1,9 +1,12 @@
 # runtime/util_types.py
 from __future__ import annotations
 
+from bisect import bisect_left
 from enum import IntEnum
+from multiprocessing.context import BaseContext
 from threading import Lock
 from types import TracebackType
+from typing import Any
 
 
 class TerminationSignal:
@@ -66,7 +69,7 @@ class NoOpContext:
 class ValueWrapper:
     """线程内/单进程的计数器包装，可选线程锁。"""
 
-    value: int
+    _value: int
     _lock: Lock | NoOpContext
 
     def __init__(self, value: int, lock: Lock | NoOpContext | None = None) -> None:
@@ -77,9 +80,19 @@ class ValueWrapper:
         :param lock: 可选的线程锁，默认 None
         :note: 如果 lock 为 None，则使用 NoOpContext 作为默认锁
         """
-        self.value = value
+        self._value = value
         self._lock = lock or NoOpContext()
 
+    @property
+    def value(self) -> int:
+        """读取当前值"""
+        return self._value
+
+    @value.setter
+    def value(self, value: int) -> None:
+        """写入当前值"""
+        self._value = value
+
     def get_lock(self) -> Lock | NoOpContext:
         """获取锁对象，无锁时返回空上下文"""
         return self._lock
@@ -100,6 +113,35 @@ class ValueWrapper:
             self.value = 0
 
 
+class SharedValueWrapper(ValueWrapper):
+    """跨进程计数器包装，数值存放在 ``multiprocessing`` 共享内存中。
+
+    fork 出的子进程与父进程读写同一块内存，供 ``process`` 图模式共享统计。
+    """
+
+    _shared: Any
+
+    def __init__(self, value: int, ctx: BaseContext) -> None:
+        """
+        初始化共享计数器。
+
+        :param value: 初始值
+        :param ctx: 创建共享内存所用的多进程上下文
+        """
+        self._shared = ctx.Value("q", value)
+        self._lock = self._shared.get_lock()
+
+    @property
+    def value(self) -> int:
+        """读取共享内存中的当前值"""
+        return self._shared.value
+
+    @value.setter
+    def value(self, value: int) -> None:
+        """写入共享内存"""
+        self._shared.value = value
+
+
 class SumCounter:
     """累加多个 counter（ValueWrapper）"""
 
@@ -131,8 +173,8 @@ class SumCounter:
 
         :param value: 增加的值
         """
-        with self.lock:
-            self.init_value.value += value
+        # init_value 的锁在单进程下即 self.lock，共享后为跨进程锁。
+        self.init_value.add(value)
 
     def get(self) -> int:
         """获取所有计数器的累加值"""
@@ -161,6 +203,105 @@ class SumCounter:
         return total
 
 
+# LatencyHistogram 的桶上界（秒）：自 10 微秒起按 2 倍递增，约覆盖到 84 秒，
+# 超出最后一个上界的观测计入溢出桶
+LATENCY_BUCKET_BOUNDS: tuple[float, ...] = tuple(1e-5 * 2**i for i in range(24))
+
+# LatencyHistogram 数据数组中各汇总字段的下标，桶计数从 _HIST_BUCKETS 起
+_HIST_COUNT, _HIST_SUM, _HIST_MAX, _HIST_BUCKETS = range(4)
+
+
+class LatencyHistogram:
+    """按对数分桶的耗时分布，可迁移到共享内存供多进程写入。
+
+    分位数以所在桶的上界估算，精度为 2 倍以内，足以区分各节点的量级差异；
+    记录一次观测只需一次加锁与常数次运算。
+    """
+
+    _data: Any
+    _lock: Any
+
+    def __init__(self) -> None:
+        """初始化空的耗时分布。"""
+        self._data = [0.0] * (_HIST_BUCKETS + len(LATENCY_BUCKET_BOUNDS) + 1)
+        self._lock = Lock()
+
+    def share(self, ctx: BaseContext) -> None:
+        """
+        将分布数据迁移到跨进程共享内存，供 ``process`` 图模式在 fork 前调用。
+
+        :param ctx: 创建共享内存所用的多进程上下文
+        """
+        data = ctx.Array("d", self._data)
+        self._data = data
+        self._lock = data.get_lock()
+
+    def observe(self, seconds: float) -> None:
+        """
+        记录一次耗时观测。
+
+        :param seconds: 耗时（秒），负值按 0 处理
+        """
+        seconds = max(seconds, 0.0)
+        bucket = bisect_left(LATENCY_BUCKET_BOUNDS, seconds)
+        with self._lock:
+            self._data[_HIST_COUNT] += 1
+            self._data[_HIST_SUM] += seconds
+            if seconds > self._data[_HIST_MAX]:
+                self._data[_HIST_MAX] = seconds
+            self._data[_HIST_BUCKETS + bucket] += 1
+
+    def reset(self) -> None:
+        """清空全部观测。"""
+        with self._lock:
+            for i in range(len(self._data)):
+                self._data[i] = 0.0
+
+    def snapshot(self) -> dict[str, float | int]:
+        """
+        汇总当前分布。
+
+        :return: 包含 ``count``、``mean``、``p50``、``p90``、``p99`` 与 ``max``
+            的字典，耗时单位为秒；无观测时各项均为 0
+        """
+        with self._lock:
+            data = list(self._data)
+
+        count = int(data[_HIST_COUNT])
+        summary: dict[str, float | int] = {
+            "count": count,
+            "mean": data[_HIST_SUM] / count if count else 0.0,
+        }
+        buckets = data[_HIST_BUCKETS:]
+        for name, quantile in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99)):
+            summary[name] = self._estimate(buckets, count, quantile, data[_HIST_MAX])
+        summary["max"] = data[_HIST_MAX]
+        return summary
+
+    @staticmethod
+    def _estimate(
+        buckets: list[float], count: int, quantile: float, maximum: float
+    ) -> float:
+        """
+        以桶上界估算分位数，结果不超过观测到的最大值。
+
+        :param buckets: 各桶计数
+        :param count: 观测总数
+        :param quantile: 分位点，取值 (0, 1]
+        :param maximum: 观测到的最大值
+        :return: 分位数估计值（秒）
+        """
+        if not count:
+            return 0.0
+        rank = quantile * count
+        seen = 0.0
+        for bound, bucket_count in zip(LATENCY_BUCKET_BOUNDS, buckets, strict=False):
+            seen += bucket_count
+            if seen >= rank:
+                return min(bound, maximum)
+        return maximum
+
+
 class StageStatus(IntEnum):
     """Stage 生命周期状态枚举。"""
 
@@ -177,5 +318,6 @@ class CTreeEvent:
     TASK_ERROR: str = "task.error"
     TASK_RETRY_PREFIX: str = "task.retry."
     TASK_DUPLICATE: str = "task.duplicate"
+    TASK_REDUCE: str = "task.reduce"
     TERMINATION_INPUT: str = "termination.input"
     TERMINATION_MERGE: str = "termination.merge"
@@ -3,6 +3,8 @@ from __future__ import annotations
 
 import asyncio
 import inspect
+import queue
+import threading
 import time
 from collections.abc import Awaitable, Callable
 from concurrent.futures import (
@@ -11,16 +13,20 @@ from concurrent.futures import (
     ThreadPoolExecutor,
     wait,
 )
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
-from ..persistence import get_log_inlet
-from ..runtime.core_envelope import TaskEnvelope
+from ..runtime.core_envelope import TaskBatch, TaskEnvelope
+from ..runtime.core_queue import EdgeChannel, QueueItem
 from ..runtime.util_errors import ConfigurationError, InitializationError
+from ..runtime.util_hash import ConsistentHashRing
 from ..runtime.util_types import CTreeEvent, TerminationIdPool, TerminationSignal
 
 if TYPE_CHECKING:
     from .core_executor import TaskExecutor
 
+# 分区执行道的缓冲上限，缓冲写满时分发循环等待，积压留在输入队列中
+LANE_BUFFER_SIZE = 16
+
 
 class TaskDispatch[T, R]:
     """任务调度器，负责以串行、线程或异步方式执行单个任务。"""
@@ -43,18 +49,30 @@ class TaskDispatch[T, R]:
         self.func = func
         self.max_workers = max_workers
 
+        # 线程池大小下限，运行期间可能调大 max_workers 时预留线程
+        self.pool_size = 0
+
         self._pool: ThreadPoolExecutor | None = None
 
+        # 融合执行时上游的多个工作线程会并发调用去重检查
+        self._inline_lock = threading.Lock()
+
     def _call_sync(self, task: T) -> R:
         """
-        调用同步任务函数；若返回 awaitable，说明模式与函数类型不匹配。
+        调用同步任务函数并记录执行耗时；若返回 awaitable，说明模式与函数类型不匹配。
 
         :param task: 任务参数
         :return: 任务执行结果
         :rtype: R
         :raises ConfigurationError: 若任务函数返回 awaitable 但执行模式不是异步
         """
-        result = self.func(task)
+        start_time = time.perf_counter()
+        try:
+            result = self.func(task)
+        finally:
+            self.task_executor.metrics.observe_execution(
+                time.perf_counter() - start_time
+            )
         if inspect.isawaitable(result):
             raise ConfigurationError(
                 "execution_mode is not 'async' but task function returned an awaitable object"
@@ -63,19 +81,25 @@ class TaskDispatch[T, R]:
 
     async def _call_async(self, task: T) -> R:
         """
-        调用异步任务函数；若返回值不可 await，说明模式与函数类型不匹配。
+        调用异步任务函数并记录执行耗时；若返回值不可 await，说明模式与函数类型不匹配。
 
         :param task: 任务参数
         :return: 任务执行结果
         :rtype: R
         :raises ConfigurationError: 若任务函数返回非 awaitable 但执行模式是异步
         """
-        result = self.func(task)
-        if not inspect.isawaitable(result):
-            raise ConfigurationError(
-                "execution_mode is 'async' but task function did not return an awaitable object"
+        start_time = time.perf_counter()
+        try:
+            result = self.func(task)
+            if not inspect.isawaitable(result):
+                raise ConfigurationError(
+                    "execution_mode is 'async' but task function did not return an awaitable object"
+                )
+            return await result
+        finally:
+            self.task_executor.metrics.observe_execution(
+                time.perf_counter() - start_time
             )
-        return await result
 
     def _init_pool(self, execution_mode: str) -> None:
         """
@@ -85,7 +109,9 @@ class TaskDispatch[T, R]:
         """
         # 可以复用的线程池
         if execution_mode == "thread" and self._pool is None:
-            self._pool = ThreadPoolExecutor(max_workers=self.max_workers)
+            self._pool = ThreadPoolExecutor(
+                max_workers=max(self.max_workers, self.pool_size)
+            )
 
     # ==== 预处理 ====
     def _process_termination_signal(
@@ -107,12 +133,33 @@ class TaskDispatch[T, R]:
             termination_id,
             source=self.task_executor.get_name(),
         )
-        get_log_inlet().termination_merge(
+        self.task_executor.funnel.log_inlet.termination_merge(
             self.task_executor.get_func_name(), parent_ids, termination_id
         )
         return signal
 
+    def _forward_termination(self, signal: TerminationSignal) -> None:
+        """
+        输入全部处理完毕后，先让执行器输出缓存的结果，再把终止信号传给下游。
+
+        :param signal: 本节点的终止信号
+        """
+        self.task_executor.flush_on_termination()
+        self.task_executor.result_queue.put(signal)
+
     # ==== 工作执行 ====
+    def _observe_queue_wait(self, task_envelope: TaskEnvelope[T]) -> None:
+        """
+        记录任务从入队到开始执行的等待耗时，未记录入队时刻的信封不计入。
+
+        :param task_envelope: 即将执行的任务信封
+        """
+        enqueue_ts = task_envelope.get_enqueue_ts()
+        if enqueue_ts:
+            self.task_executor.metrics.observe_queue_wait(
+                time.perf_counter() - enqueue_ts
+            )
+
     def _worker(self, task_envelope: TaskEnvelope[T]) -> None:
         """
         同步执行单个任务（计时、成功/失败处理）
@@ -120,6 +167,7 @@ class TaskDispatch[T, R]:
         :param task_envelope: 包含任务信息的信封
         """
         try:
+            self._observe_queue_wait(task_envelope)
             task: T = task_envelope.get_task()
             max_retries: int = self.task_executor.max_retries
 
@@ -142,7 +190,7 @@ class TaskDispatch[T, R]:
                         task_envelope, exception, retry_time + 1
                     )
         except Exception as e:
-            get_log_inlet().worker_crash(e)
+            self.task_executor.funnel.log_inlet.worker_crash(e)
 
     async def _async_worker(self, task_envelope: TaskEnvelope[T]) -> None:
         """
@@ -151,6 +199,7 @@ class TaskDispatch[T, R]:
         :param task_envelope: 包含任务信息的信封
         """
         try:
+            self._observe_queue_wait(task_envelope)
             task: T = task_envelope.get_task()
             max_retries: int = self.task_executor.max_retries
 
@@ -172,7 +221,7 @@ class TaskDispatch[T, R]:
                         task_envelope, exception, retry_time + 1
                     )
         except Exception as e:
-            get_log_inlet().worker_crash(e)
+            self.task_executor.funnel.log_inlet.worker_crash(e)
 
     # ==== 调度 ====
     def dispatch_serial(self) -> None:
@@ -180,7 +229,6 @@ class TaskDispatch[T, R]:
         串行地执行任务
         """
         task_queue = self.task_executor.task_queue
-        result_queue = self.task_executor.result_queue
 
         while True:
             envelope = task_queue.get()
@@ -195,7 +243,7 @@ class TaskDispatch[T, R]:
 
             self._worker(envelope)
 
-        result_queue.put(termination_signal)
+        self._forward_termination(termination_signal)
 
     def dispatch_thread(self) -> None:
         """
@@ -203,8 +251,11 @@ class TaskDispatch[T, R]:
         """
         self._init_pool(execution_mode="thread")
         try:
+            if self.task_executor.partition_key is not None:
+                self._dispatch_thread_partitioned(self.task_executor.partition_key)
+                return
+
             task_queue = self.task_executor.task_queue
-            result_queue = self.task_executor.result_queue
 
             pending: set[Future[None]] = set()  # 用于存储等待执行的任务
 
@@ -230,7 +281,7 @@ class TaskDispatch[T, R]:
 
             # 等待当前批次的所有任务完成
             _done, pending = wait(pending)
-            result_queue.put(termination_signal)
+            self._forward_termination(termination_signal)
 
         finally:
             # 避免pool未完全释放
@@ -241,8 +292,11 @@ class TaskDispatch[T, R]:
         异步地执行任务，限制并发数量。
         支持流式到达的任务（stage 模式），边收边跑。
         """
+        if self.task_executor.partition_key is not None:
+            await self._dispatch_async_partitioned(self.task_executor.partition_key)
+            return
+
         task_queue = self.task_executor.task_queue
-        result_queue = self.task_executor.result_queue
 
         semaphore = asyncio.Semaphore(self.max_workers)
         pending: set[asyncio.Task[None]] = set()
@@ -267,7 +321,152 @@ class TaskDispatch[T, R]:
             task.add_done_callback(pending.discard)
 
         _ = await asyncio.gather(*pending)
-        result_queue.put(termination_signal)
+        self._forward_termination(termination_signal)
+
+    # ==== 分区调度 ====
+    def _get_lane(
+        self,
+        envelope: TaskEnvelope[T],
+        ring: ConsistentHashRing,
+        partition_key: Callable[[T], Any],
+    ) -> int | None:
+        """
+        计算任务所属的执行道，分区键函数抛出异常时按任务失败处理。
+
+        :param envelope: 任务信封
+        :param ring: 执行道的一致性哈希环
+        :param partition_key: 分区键函数
+        :return: 执行道下标，失败时为 None
+        """
+        try:
+            return ring.get_slot(partition_key(envelope.get_task()))
+        except Exception as exception:
+            self.task_executor.handle_task_fail(envelope, exception)
+            return None
+
+    def _run_lane(self, lane: queue.Queue[TaskEnvelope[T] | None]) -> None:
+        """
+        按到达顺序逐个执行一条执行道中的任务，收到 None 时退出。
+
+        :param lane: 执行道的缓冲队列
+        """
+        while (envelope := lane.get()) is not None:
+            self._worker(envelope)
+
+    async def _run_lane_async(
+        self, lane: asyncio.Queue[TaskEnvelope[T] | None]
+    ) -> None:
+        """
+        异步版本的 :meth:`_run_lane`。
+
+        :param lane: 执行道的缓冲队列
+        """
+        while (envelope := await lane.get()) is not None:
+            await self._async_worker(envelope)
+
+    def _dispatch_thread_partitioned(self, partition_key: Callable[[T], Any]) -> None:
+        """
+        按分区键把任务分给 ``max_workers`` 条执行道，每条执行道占用线程池中的
+        一个线程按序执行，同一个键的任务不会并发执行，也不会乱序。
+
+        :param partition_key: 分区键函数
+        """
+        if self._pool is None:
+            raise InitializationError("execution pool has not been initialized")
+
+        task_queue = self.task_executor.task_queue
+        ring = ConsistentHashRing(self.max_workers)
+        lanes: list[queue.Queue[TaskEnvelope[T] | None]] = [
+            queue.Queue(maxsize=LANE_BUFFER_SIZE) for _ in range(ring.slots)
+        ]
+        runners = [self._pool.submit(self._run_lane, lane) for lane in lanes]
+
+        try:
+            while True:
+                envelope = task_queue.get()
+                if isinstance(envelope, TerminationIdPool):
+                    termination_signal = self._process_termination_signal(envelope)
+                    break
+
+                task_hash = envelope.get_hash()
+                if self.task_executor.metrics.is_duplicate(task_hash):
+                    self.task_executor.deal_duplicate(envelope)
+                    continue
+
+                index = self._get_lane(envelope, ring, partition_key)
+                if index is not None:
+                    lanes[index].put(envelope)
+        finally:
+            for lane in lanes:
+                lane.put(None)
+            _done, _pending = wait(runners)
+
+        self._forward_termination(termination_signal)
+
+    async def _dispatch_async_partitioned(
+        self, partition_key: Callable[[T], Any]
+    ) -> None:
+        """
+        异步版本的 :meth:`_dispatch_thread_partitioned`，每条执行道为一个协程。
+
+        :param partition_key: 分区键函数
+        """
+        task_queue = self.task_executor.task_queue
+        ring = ConsistentHashRing(self.max_workers)
+        lanes: list[asyncio.Queue[TaskEnvelope[T] | None]] = [
+            asyncio.Queue(maxsize=LANE_BUFFER_SIZE) for _ in range(ring.slots)
+        ]
+        runners = [asyncio.create_task(self._run_lane_async(lane)) for lane in lanes]
+
+        try:
+            while True:
+                envelope = await asyncio.to_thread(task_queue.get)
+                if isinstance(envelope, TerminationIdPool):
+                    termination_signal = self._process_termination_signal(envelope)
+                    break
+
+                task_hash = envelope.get_hash()
+                if self.task_executor.metrics.is_duplicate(task_hash):
+                    self.task_executor.deal_duplicate(envelope)
+                    continue
+
+                index = self._get_lane(envelope, ring, partition_key)
+                if index is not None:
+                    await lanes[index].put(envelope)
+        finally:
+            for lane in lanes:
+                await lane.put(None)
+            _ = await asyncio.gather(*runners)
+
+        self._forward_termination(termination_signal)
+
+    # ==== 融合执行 ====
+    def run_inline(self, task_envelope: TaskEnvelope[T]) -> None:
+        """
+        在调用方线程内直接执行一个任务，供融合边的上游节点调用。
+
+        :param task_envelope: 上游送来的任务信封
+        """
+        with self._inline_lock:
+            duplicate = self.task_executor.metrics.is_duplicate(
+                task_envelope.get_hash()
+            )
+        if duplicate:
+            self.task_executor.deal_duplicate(task_envelope)
+            return
+
+        self._worker(task_envelope)
+
+    def finish_inline(self, signal: TerminationSignal) -> None:
+        """
+        汇合上游的终止信号；集齐后生成本节点的终止信号并继续向下游传递。
+
+        :param signal: 上游的终止信号
+        """
+        termination_pool = self.task_executor.task_queue.accept_termination(signal)
+        if termination_pool is None:
+            return
+        self._forward_termination(self._process_termination_signal(termination_pool))
 
     # ==== 清理 ====
     def _release_pool(self) -> None:
@@ -279,3 +478,43 @@ class TaskDispatch[T, R]:
 
         self._pool.shutdown(wait=True)
         self._pool = None
+
+
+class InlineTarget[T]:
+    """
+    融合边的下游目标，替代下游节点的输入队列挂在上游的输出队列上。
+
+    上游写入的信封不经过队列，直接在上游的工作线程内交给下游节点的
+    :class:`TaskDispatch` 执行，计数、重试、失败记录仍归属下游节点；
+    终止信号按下游输入队列的规则汇合后继续向下传递。
+    """
+
+    # 无容量上限，TaskOutQueue 直接写入
+    maxsize = 0
+
+    dispatch: TaskDispatch[T, Any]
+    channel: EdgeChannel
+
+    def __init__(self, dispatch: TaskDispatch[T, Any], channel: EdgeChannel) -> None:
+        """
+        :param dispatch: 下游节点的调度器
+        :param channel: 融合边的边通道，执行前扣减其积压
+        """
+        self.dispatch = dispatch
+        self.channel = channel
+
+    def put(self, item: QueueItem[T], block: bool = True) -> None:
+        """
+        执行任务或汇合终止信号。
+
+        :param item: 上游写入的条目
+        :param block: 为兼容队列接口保留，直接执行时不会阻塞
+        """
+        if isinstance(item, TerminationSignal):
+            self.dispatch.finish_inline(item)
+            return
+
+        envelopes = item.envelopes if isinstance(item, TaskBatch) else [item]
+        self.channel.release(len(envelopes))
+        for envelope in envelopes:
+            self.dispatch.run_inline(envelope)
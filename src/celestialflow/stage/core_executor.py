@@ -7,16 +7,16 @@ import time
 import warnings
 from collections.abc import Awaitable, Callable, Iterable
 from pathlib import Path
+from threading import Event, Thread
 from typing import Any, cast
 
 from ..observability import BaseObserver
 from ..persistence import (
+    FunnelContext,
     funnel_scope,
-    get_fallback_inlet,
-    get_fallback_spout,
-    get_log_inlet,
+    get_default_funnel,
 )
-from ..persistence.util_sqlite import load_tasks_grouped_by_stage
+from ..persistence.util_sqlite import iter_stage_task_chunks
 from ..runtime import (
     TaskEnvelope,
     TaskInQueue,
@@ -57,7 +57,9 @@ class TaskExecutor[T, R]:
     _name: str
     func: Callable[[T], R] | Callable[[T], Awaitable[R]]
     _func_name: str
+    partition_key: Callable[[T], Any] | None
     ctree_client: EventClient
+    funnel: FunnelContext
 
     # ==== 初始化 ====
     def __init__(
@@ -72,6 +74,7 @@ class TaskExecutor[T, R]:
         max_info: int = 50,
         enable_duplicate_check: bool = False,
         persist_result: bool = False,
+        partition_key: Callable[[T], Any] | None = None,
     ):
         """
         初始化 TaskExecutor
@@ -85,6 +88,7 @@ class TaskExecutor[T, R]:
         :param max_info: 日志中每条信息的最大长度，默认 50
         :param enable_duplicate_check: 是否启用重复检查，默认 False
         :param persist_result: 是否持久化任务结果，默认 False
+        :param partition_key: 分区键函数，默认 None，见 :meth:`set_partition_key`
         :note:
             TaskExecutor 为一次性对象。完成一次 start()/start_async() 后，不应复用
             同一实例再次启动；如需重复执行，请重新创建实例。
@@ -100,9 +104,15 @@ class TaskExecutor[T, R]:
         self.max_info = max_info
         self.enable_duplicate_check = enable_duplicate_check
         self.persist_result = persist_result
+        self.set_partition_key(partition_key)
 
         self.set_ctree(LocalEventClient())
+        self.set_funnel(get_default_funnel())
 
+        self._init_components()
+
+    def _init_components(self) -> None:
+        """创建调度器、输入 / 输出队列与指标等运行期组件。"""
         self.dispatch = TaskDispatch(self, self.func, self.max_workers)
         self.task_queue = TaskInQueue(
             out_name=self.get_name(),
@@ -170,6 +180,42 @@ class TaskExecutor[T, R]:
                 f"execution_mode is 'async' but '{self.func.__name__}' is not a coroutine function"
             )
 
+    def set_max_workers(
+        self, max_workers: int, *, pool_size: int | None = None
+    ) -> None:
+        """
+        设置同时处理数量，可在运行期间调用，新的上限对之后取出的任务生效。
+
+        thread 模式的线程池在启动时按 ``max(max_workers, pool_size)`` 创建，运行期间
+        调大的并发数超过线程池大小时，多出的任务在线程池内排队。
+
+        :param max_workers: 同时处理数量
+        :param pool_size: 线程池大小，默认不变；需在启动前设置
+        :raises ConfigurationError: max_workers 小于 1
+        """
+        if max_workers < 1:
+            raise ConfigurationError(f"max_workers must be positive: {max_workers}")
+        self.max_workers = max_workers
+        self.dispatch.max_workers = max_workers
+        if pool_size is not None:
+            self.dispatch.pool_size = pool_size
+
+    def set_partition_key(self, partition_key: Callable[[T], Any] | None) -> None:
+        """
+        设置分区键函数，需在启动前设置。
+
+        设置后 'thread' 与 'async' 模式在启动时建立 ``max_workers`` 条执行道，
+        每个任务按 ``partition_key(task)`` 经一致性哈希分到固定的执行道，同一
+        执行道内的任务按到达顺序逐个执行。因此同一个键的任务始终由同一个
+        工作者依次处理，用户函数可按键维护无锁的缓存与状态。执行道数在启动时
+        确定，运行期间调整 ``max_workers`` 不影响分区。
+
+        分区键函数抛出异常的任务按失败处理；'serial' 模式本身有序，不受影响。
+
+        :param partition_key: 接收任务、返回可哈希分区键的函数，None 表示不分区
+        """
+        self.partition_key = partition_key
+
     def set_ctree(self, ctree_client: EventClient) -> None:
         """
         设置执行器使用的事件客户端。
@@ -178,6 +224,14 @@ class TaskExecutor[T, R]:
         """
         self.ctree_client = ctree_client
 
+    def set_funnel(self, funnel: FunnelContext) -> None:
+        """
+        设置执行器写入 fallback 与日志所使用的 funnel 上下文。
+
+        :param funnel: funnel 上下文实例
+        """
+        self.funnel = funnel
+
     def set_name(self, name: str) -> None:
         """
         设置节点/管理器名称。
@@ -274,49 +328,84 @@ class TaskExecutor[T, R]:
 
         :return: 失败任务持久化文件的绝对路径，未设置时返回空 Path
         """
-        db_path = get_fallback_spout().db_path
+        db_path = self.funnel.fallback_spout.db_path
         if db_path is None:
             return Path()
         return Path(db_path).resolve()
 
     # ==== 任务输入 ====
-    def put_task(self, task: T) -> None:
+    def put_task(self, task: T, stop: Event | None = None) -> bool:
         """
         将单个任务封装为 TaskEnvelope 并放入队列。
 
         :param task: 原始任务数据
+        :param stop: 停止事件，默认 None；给出时队列已满也会定期检查，
+            置位后放弃写入，已登记的输入记录保持 pending
+        :return: 是否已放入队列
+        """
+        envelope = self._record_input(task)
+        envelope.mark_enqueued()
+        if stop is None:
+            self.task_queue.put(envelope)
+            return True
+        return self.task_queue.put_until(envelope, stop)
+
+    def reject_task(self, task: T, exception: Exception) -> None:
+        """
+        登记一个输入任务并直接按失败处理，不放入队列。
+
+        用于在分发阶段就无法处理的任务，如分区键函数抛出异常的初始任务。
+
+        :param task: 原始任务数据
+        :param exception: 分发时捕获的异常
+        """
+        self.handle_task_fail(self._record_input(task), exception)
+
+    def _record_input(self, task: T) -> TaskEnvelope[T]:
+        """
+        为外部注入的任务分配输入 id，计入输入任务数并持久化输入记录。
+
+        :param task: 原始任务数据
+        :return: 封装后的任务
         """
         input_id = self.ctree_client.emit(
             CTreeEvent.TASK_INPUT,
             payload=self.get_summary(),
         )
         envelope: TaskEnvelope[T] = TaskEnvelope(task, input_id)
-        self.task_queue.put(envelope)
         self.metrics.add_task_count()
 
-        get_fallback_inlet().task_in(self.get_name(), input_id, task)
-        get_log_inlet().task_input(
+        self.funnel.fallback_inlet.task_in(self.get_name(), input_id, task)
+        self.funnel.log_inlet.task_input(
             self.get_func_name(),
             self._get_repr(task),
             self.get_name(),
             input_id,
         )
+        return envelope
 
-    def put_signal(self) -> None:
+    def put_signal(self, stop: Event | None = None) -> bool:
         """
         放入终止信号到队列。
+
+        :param stop: 停止事件，默认 None；含义同 :meth:`put_task`
+        :return: 是否已放入队列
         """
         termination_id = self.ctree_client.emit(
             CTreeEvent.TERMINATION_INPUT,
             payload=self.get_summary(),
         )
         signal = TerminationSignal(termination_id, source="input")
-        self.task_queue.put(signal)
-        get_log_inlet().termination_input(
+        if stop is None:
+            self.task_queue.put(signal)
+        elif not self.task_queue.put_until(signal, stop):
+            return False
+        self.funnel.log_inlet.termination_input(
             self.get_func_name(),
             self.get_name(),
             termination_id,
         )
+        return True
 
     def _get_repr(self, task: T | R) -> str:
         """
@@ -348,9 +437,11 @@ class TaskExecutor[T, R]:
         )
 
         self.metrics.add_success_count()
-        get_fallback_inlet().task_success(task_id, result, persist=self.persist_result)
+        self.funnel.fallback_inlet.task_success(
+            task_id, result, persist=self.persist_result
+        )
 
-        get_log_inlet().task_success(
+        self.funnel.log_inlet.task_success(
             self.get_func_name(),
             self._get_repr(task),
             self.execution_mode,
@@ -366,7 +457,7 @@ class TaskExecutor[T, R]:
                 parents=[result_id],
                 payload=self.get_summary(),
             )
-            get_fallback_inlet().task_in(target_name, downstream_input_id, result)
+            self.funnel.fallback_inlet.task_in(target_name, downstream_input_id, result)
             downstream_envelope: TaskEnvelope[R] = TaskEnvelope(
                 task=result,
                 id=downstream_input_id,
@@ -401,7 +492,7 @@ class TaskExecutor[T, R]:
             id=retry_id,
         )
 
-        get_log_inlet().task_retry(
+        self.funnel.log_inlet.task_retry(
             self.get_func_name(),
             self._get_repr(task),
             retry_time,
@@ -409,7 +500,7 @@ class TaskExecutor[T, R]:
             task_id,
             retry_id,
         )
-        get_fallback_inlet().task_retry(task_id, retry_id)
+        self.funnel.fallback_inlet.task_retry(task_id, retry_id)
 
         return retry_envelope
 
@@ -435,8 +526,8 @@ class TaskExecutor[T, R]:
 
         self.metrics.add_fail_count()
 
-        get_fallback_inlet().task_fail(task_id, error_id, exception)
-        get_log_inlet().task_fail(
+        self.funnel.fallback_inlet.task_fail(task_id, error_id, exception)
+        self.funnel.log_inlet.task_fail(
             self.get_func_name(),
             self._get_repr(task),
             exception,
@@ -444,6 +535,11 @@ class TaskExecutor[T, R]:
             error_id,
         )
 
+    def flush_on_termination(self) -> None:
+        """
+        输入全部处理完毕、终止信号传给下游之前调用，子类可覆写以输出缓存的结果。
+        """
+
     def deal_duplicate(self, task_envelope: TaskEnvelope[T]) -> None:
         """
         处理重复任务
@@ -454,13 +550,13 @@ class TaskExecutor[T, R]:
         task_id = task_envelope.get_id()
 
         self.metrics.add_duplicate_count()
-        get_fallback_inlet().task_duplicate(task_id)
+        self.funnel.fallback_inlet.task_duplicate(task_id)
         duplicate_id = self.ctree_client.emit(
             CTreeEvent.TASK_DUPLICATE,
             parents=[task_id],
             payload=self.get_summary(),
         )
-        get_log_inlet().task_duplicate(
+        self.funnel.log_inlet.task_duplicate(
             self.get_func_name(),
             self._get_repr(task),
             task_id,
@@ -482,7 +578,7 @@ class TaskExecutor[T, R]:
         :param if_put_signal: 是否注入终止信号，默认 True
         :return: ``None``
         """
-        with funnel_scope():
+        with funnel_scope(self.funnel):
             for task in task_source:
                 self.put_task(task)
             if if_put_signal:
@@ -502,7 +598,7 @@ class TaskExecutor[T, R]:
         :param if_put_signal: 是否注入终止信号，默认 True
         :return: ``None``
         """
-        with funnel_scope():
+        with funnel_scope(self.funnel):
             for task in task_source:
                 self.put_task(task)
             if if_put_signal:
@@ -515,32 +611,52 @@ class TaskExecutor[T, R]:
         statuses: Iterable[str] | None = None,
         *,
         filter_by_error_type: bool = False,
+        chunk_size: int = 1000,
+        decode_workers: int = 0,
     ) -> None:
         """
-        从 sqlite 持久化库中读取当前 stage 的任务并启动执行。
+        从 sqlite 持久化库中流式读取当前 stage 的任务，并在执行期间持续注入。
+
+        注入线程与执行器并发运行；输入队列有界时会自然形成背压。
 
         :param db_path: sqlite 数据库文件路径
         :param statuses: 记录状态过滤列表，默认 ``["failed", "pending"]``
         :param filter_by_error_type: 是否按当前执行器的 ``retry_exceptions`` 过滤
             ``error_type``，默认 ``False``
+        :param chunk_size: 每次从数据库读取的记录数量，默认 1000
+        :param decode_workers: 并行解码线程数，默认 0（在注入线程中解码）
         """
-        statuses = ["failed", "pending"] if statuses is None else statuses
-        grouped_tasks = load_tasks_grouped_by_stage(db_path, statuses)
-        records = grouped_tasks.get(self.get_name(), [])
-        tasks: Iterable[T] = []
-
-        if filter_by_error_type:
-            retry_error_type_names = self.metrics.get_retry_error_type_names()
-            records = [
-                record
-                for record in records
-                if str(record["error_type"]) in retry_error_type_names
-                or record["status"] == "pending"
-            ]
-        tasks = [cast(T, record["task_json"]) for record in records]
-
-        self.run(tasks)
+        statuses = ["failed", "pending"] if statuses is None else list(statuses)
+        error_types = (
+            self.metrics.get_retry_error_type_names() if filter_by_error_type else None
+        )
+        feeder_errors: list[BaseException] = []
+
+        def feed() -> None:
+            try:
+                for chunk in iter_stage_task_chunks(
+                    db_path,
+                    self.get_name(),
+                    statuses,
+                    error_types=error_types,
+                    chunk_size=chunk_size,
+                    decode_workers=decode_workers,
+                ):
+                    for task in chunk:
+                        self.put_task(cast(T, task))
+            except BaseException as exception:
+                feeder_errors.append(exception)
+            finally:
+                # 注入异常时也要补发终止信号，避免执行器永久等待。
+                self.put_signal()
 
+        with funnel_scope(self.funnel):
+            feeder = Thread(target=feed, name=f"{self.get_name()}-restore", daemon=True)
+            feeder.start()
+            self.start()
+            feeder.join()
+        if feeder_errors:
+            raise feeder_errors[0]
 
     # ==== 启动 ====
 
@@ -553,7 +669,7 @@ class TaskExecutor[T, R]:
         self.metrics.reset_state()
         self.metrics.on_start(self.get_full_name(), 0)
 
-        get_log_inlet().start_executor(
+        self.funnel.log_inlet.start_executor(
             self.get_name(),
             self.metrics.get_task_count(),
             self._get_execution_mode_desc(),
@@ -568,7 +684,7 @@ class TaskExecutor[T, R]:
         error_list: list[Exception] = []
 
         try:
-            get_log_inlet().end_executor(
+            self.funnel.log_inlet.end_executor(
                 self.get_name(),
                 self._get_execution_mode_desc(),
                 time.perf_counter() - start_perf,
@@ -640,7 +756,7 @@ class TaskExecutor[T, R]:
             self._prepare_start()
             await self.dispatch.dispatch_async()
         except Exception as exception:
-            get_log_inlet().executor_crash(self.get_name(), exception)
+            self.funnel.log_inlet.executor_crash(self.get_name(), exception)
             error_list.append(exception)
         finally:
             error_list.extend(self._finish_start(start_perf))
@@ -664,7 +780,7 @@ class TaskExecutor[T, R]:
                 stacklevel=2,
             )
             return []
-        return get_fallback_spout().get_task_result_pairs(self.get_name())
+        return self.funnel.fallback_spout.get_task_result_pairs(self.get_name())
 
     def get_error_pairs(self) -> list[tuple[T, PersistedError]]:
         """
@@ -672,7 +788,9 @@ class TaskExecutor[T, R]:
 
         :return: (task, PersistedError) 元组列表
         """
-        task_error_pairs = get_fallback_spout().get_task_error_pairs(self.get_name())
+        task_error_pairs = self.funnel.fallback_spout.get_task_error_pairs(
+            self.get_name()
+        )
         return [
             (task, PersistedError(error_type, error_message))
             for task, (error_type, error_message) in task_error_pairs
@@ -1,16 +1,20 @@
 # stage/core_stage.py
 from __future__ import annotations
 
+import copy
+import time
 from collections.abc import Awaitable, Callable
+from multiprocessing.context import BaseContext
 from typing import Any
 
 from ..runtime import TaskInQueue, TaskOutQueue
-from ..runtime.util_errors import UnconsumedError
+from ..runtime.util_errors import ConfigurationError, UnconsumedError
 from ..runtime.util_estimators import (
     calc_elapsed,
     calc_remaining,
     format_avg_time,
 )
+from .core_dispatch import InlineTarget
 from .core_executor import TaskExecutor
 
 
@@ -29,6 +33,7 @@ class TaskStage[T, R](TaskExecutor[T, R]):
     _last_pending: int
     start_time: float
     execution_mode: str
+    fused_into: str | None
     task_queue: TaskInQueue[T]
     result_queue: TaskOutQueue[R]
 
@@ -52,6 +57,7 @@ class TaskStage[T, R](TaskExecutor[T, R]):
         :param max_info: 日志中每条信息的最大长度，默认 50
         :param enable_duplicate_check: 是否启用重复检查，默认 False
         :param persist_result: 是否持久化任务结果，默认 False
+        :param partition_key: 分区键函数，默认 None，见 :meth:`set_partition_key`
         """
         super().__init__(
             name,
@@ -69,6 +75,35 @@ class TaskStage[T, R](TaskExecutor[T, R]):
         self._last_elapsed = 0.0
         self._last_pending = 0
 
+        # 算子融合：首个将本节点融合进自身调度循环的上游节点名称
+        self.fused_into = None
+
+    def _init_extra_counter(self) -> None:
+        """初始化子类额外的绑定计数器，子类可覆写。"""
+
+    # ==== 副本 ====
+    def make_replica(self, name: str) -> TaskStage[T, R]:
+        """
+        创建与当前节点配置相同的副本，供任务图在一个逻辑节点后运行多个实例。
+
+        副本共享任务函数、执行模式、重试与 funnel / 事件客户端配置，但持有
+        各自的调度器、输入 / 输出队列、计数器与绑定计数器。绑定到当前节点的
+        方法型任务函数（如 ``TaskSplitter._split``）改为绑定到副本。
+
+        :param name: 副本的唯一名称
+        :return: 副本节点
+        """
+        replica = copy.copy(self)
+        replica.set_name(name)
+        func = self.func
+        if getattr(func, "__self__", None) is self:
+            replica.func = getattr(replica, func.__name__)
+        replica._init_components()
+        replica.set_retry_exceptions(*self.metrics.retry_exceptions)
+        replica._init_status()
+        replica._init_extra_counter()
+        return replica
+
     # ==== 绑定 ====
     def get_binding_counter(self, _downstream_name: str) -> Any:
         """
@@ -88,13 +123,82 @@ class TaskStage[T, R](TaskExecutor[T, R]):
         counter = pending_prev_binding.get_binding_counter(self.get_name())
         self.metrics.append_task_counter(counter)
 
+    def share_state(self, ctx: BaseContext, transport: str = "mp") -> None:
+        """
+        将计数器与输入队列迁移为跨进程版本，供 ``process`` 图模式在 fork 前调用。
+
+        迁移会解除与上游计数器的绑定，需由任务图在全部节点迁移后重新执行
+        :meth:`prev_binding`。子类持有额外绑定计数器时应覆写并一并迁移。
+
+        :param ctx: 多进程上下文
+        :param transport: 输入队列的跨进程传输方式，见 :meth:`TaskInQueue.share_queue`
+        """
+        self.metrics.share_counters(ctx)
+        self.task_queue.share_queue(ctx, transport)
+
+    # ==== 融合 ====
+    def fuse_next(self, stage: TaskStage[R, Any]) -> None:
+        """
+        将下游节点融合进当前节点的调度循环。
+
+        融合后当前节点的结果不再写入下游的输入队列，而是在当前节点的工作线程内
+        直接调用下游的任务函数，计数器、重试与失败记录仍归属下游节点。
+        下游节点可被它的多个上游融合；融合后它不再单独启动，需由任务图通过
+        :meth:`begin_fused` / :meth:`end_fused` 管理其生命周期。
+
+        :param stage: 当前节点输出队列中的下游节点
+        :raises ConfigurationError: 下游节点不是当前节点的输出目标
+        """
+        name = stage.get_name()
+        if name not in self.result_queue.get_target_names():
+            raise ConfigurationError(
+                f"cannot fuse {name} into {self.get_name()}: not a downstream stage"
+            )
+
+        channel = self.result_queue.get_channel(name)
+        self.result_queue.set_target_queue(name, InlineTarget(stage.dispatch, channel))
+        if stage.fused_into is None:
+            stage.fused_into = self.get_name()
+
+    def begin_fused(self) -> None:
+        """
+        融合节点的启动准备：重置运行期状态并记录启动日志，不启动调度循环。
+
+        需在驱动它的上游节点启动之前调用。
+        """
+        self.start_time = time.time()
+        self._prepare_start()
+
+    def run_queued(self) -> None:
+        """
+        在当前线程内执行启动前已注入输入队列的任务。
+
+        融合节点不再消费自身的输入队列，直接注入的任务（如 ``run`` 的初始任务
+        或从数据库恢复的任务）需在全部融合节点 :meth:`begin_fused` 之后由此执行。
+        """
+        for envelope in self.task_queue.drain():
+            self.dispatch.run_inline(envelope)
+
+    def end_fused(self, start_perf: float) -> list[Exception]:
+        """
+        融合节点的结束清理，需在驱动它的上游节点全部结束后调用。
+
+        :param start_perf: 启动时的时间戳
+        :return: 收集到的清理阶段异常列表
+        """
+        return self._finish_start(start_perf)
+
     # ==== 查询 ====
     def snapshot(self, interval: float) -> dict[str, Any]:
         """
         采集当前 stage 的运行时快照。
 
+        ``queue_wait`` 与 ``execution`` 分别为任务在输入队列中的等待耗时和
+        任务函数执行耗时的分布（见 :meth:`TaskMetrics.get_latency_stats`），
+        排队耗时远大于执行耗时的节点即为瓶颈。
+
         :param interval: 快照采集间隔（秒）
-        :return: 包含状态、计数、耗时估算等信息的快照字典
+        :return: 包含状态、计数、耗时估算与耗时分布等信息的快照字典
         """
         status = self.metrics.get_status()
         stage_counts = self.get_counts()
@@ -119,6 +223,7 @@ class TaskStage[T, R](TaskExecutor[T, R]):
             "elapsed_time": elapsed,
             "remaining_time": remaining,
             "task_avg_time": avg_time_str,
+            **self.metrics.get_latency_stats(),
         }
 
     # ==== 任务队列 ====
@@ -1,13 +1,14 @@
 # stage/core_stages.py
+import threading
 import time
 import warnings
 from collections.abc import Callable, Iterable
+from multiprocessing.context import BaseContext
 from typing import Any, cast
 
-from ..persistence import get_fallback_inlet, get_log_inlet
 from ..runtime import TaskEnvelope, TaskOutQueue
-from ..runtime.util_errors import InvalidOptionError
-from ..runtime.util_types import ValueWrapper
+from ..runtime.util_errors import ConfigurationError, InvalidOptionError
+from ..runtime.util_types import CTreeEvent, SharedValueWrapper, ValueWrapper
 from .core_stage import TaskStage
 
 
@@ -68,6 +69,11 @@ class TaskSplitter[TItem, RItem](TaskStage[Iterable[TItem], Iterable[RItem]]):
         """
         return self.split_counter
 
+    def share_state(self, ctx: BaseContext, transport: str = "mp") -> None:
+        """覆写父类方法，额外将 split 计数器迁移到共享内存。"""
+        super().share_state(ctx, transport)
+        self.split_counter = SharedValueWrapper(self.split_counter.value, ctx)
+
     def _update_split_counter(self, add_value: int) -> None:
         """
         更新 split 计数器
@@ -114,12 +120,12 @@ class TaskSplitter[TItem, RItem](TaskStage[Iterable[TItem], Iterable[RItem]]):
 
         split_count = self._put_split_result(result_list, task_id)
         self.metrics.add_success_count()
-        get_fallback_inlet().task_success(
+        self.funnel.fallback_inlet.task_success(
             task_id, result_list, persist=self.persist_result
         )
         self._update_split_counter(split_count)
 
-        get_log_inlet().split_success(
+        self.funnel.log_inlet.split_success(
             self.get_func_name(),
             self._get_repr(task),
             split_count,
@@ -154,14 +160,16 @@ class TaskSplitter[TItem, RItem](TaskStage[Iterable[TItem], Iterable[RItem]]):
                     parents=[split_id],
                     payload=self.get_summary(),
                 )
-                get_fallback_inlet().task_in(target_name, downstream_input_id, item)
+                self.funnel.fallback_inlet.task_in(
+                    target_name, downstream_input_id, item
+                )
                 downstream_envelope: TaskEnvelope[RItem] = TaskEnvelope(
                     item,
                     downstream_input_id,
                 )
                 result_queue.put_target(downstream_envelope, target_name)
 
-            get_log_inlet().split_trace(
+            self.funnel.log_inlet.split_trace(
                 self.get_func_name(),
                 idx + 1,
                 split_count,
@@ -178,9 +186,7 @@ class TaskRouter[T](TaskStage[T, tuple[str, T]]):
 
     route_counters: dict[str, ValueWrapper]
 
-    def __init__(
-        self, name: str, router: Callable[[T], str]
-    ):
+    def __init__(self, name: str, router: Callable[[T], str]):
         """
         初始化 TaskRouter
 
@@ -217,6 +223,14 @@ class TaskRouter[T](TaskStage[T, tuple[str, T]]):
         )
         return self.route_counters[downstream_name]
 
+    def share_state(self, ctx: BaseContext, transport: str = "mp") -> None:
+        """覆写父类方法，额外将各下游的路由计数器迁移到共享内存。"""
+        super().share_state(ctx, transport)
+        self.route_counters = {
+            name: SharedValueWrapper(counter.value, ctx)
+            for name, counter in self.route_counters.items()
+        }
+
     def _route(self, task: T) -> tuple[str, T]:
         """
         校验路由输入格式并提取目标任务
@@ -256,10 +270,12 @@ class TaskRouter[T](TaskStage[T, tuple[str, T]]):
             payload=self.get_summary(),
         )
         self.metrics.add_success_count()
-        get_fallback_inlet().task_success(task_id, task, persist=self.persist_result)
+        self.funnel.fallback_inlet.task_success(
+            task_id, task, persist=self.persist_result
+        )
         self._update_route_counter(target)
 
-        get_log_inlet().route_success(
+        self.funnel.log_inlet.route_success(
             self.get_func_name(),
             self._get_repr(task),
             target,
@@ -273,7 +289,7 @@ class TaskRouter[T](TaskStage[T, tuple[str, T]]):
             parents=[route_id],
             payload=self.get_summary(),
         )
-        get_fallback_inlet().task_in(target, downstream_input_id, task)
+        self.funnel.fallback_inlet.task_in(target, downstream_input_id, task)
         downstream_envelope: TaskEnvelope[T] = TaskEnvelope(
             task,
             downstream_input_id,
@@ -287,3 +303,290 @@ class TaskRouter[T](TaskStage[T, tuple[str, T]]):
         :param target: 目标 stage 的唯一名称
         """
         self.route_counters[target].add(1)
+
+
+# ==== 窗口归约器 ====
+class ReduceWindow[R]:
+    """归约窗口：累积值、已并入的任务 ID 与打开时刻。"""
+
+    acc: R | None
+    task_ids: list[int]
+    opened_at: float
+
+    def __init__(self, acc: R | None, opened_at: float) -> None:
+        """
+        :param acc: 初始累积值，为 None 时以首个任务作为初始值
+        :param opened_at: 窗口打开的 ``perf_counter`` 时刻
+        """
+        self.acc = acc
+        self.task_ids = []
+        self.opened_at = opened_at
+
+
+class TaskReducer[T, R](TaskStage[T, R]):
+    """TaskReducer: 将多个任务按窗口归约为一个结果，注入下游队列。
+
+    每个任务经 ``combine(acc, task)`` 并入所属窗口的累积值，窗口关闭时累积值
+    作为一个任务发往下游：
+
+    - ``window_size``：滚动计数窗口，并入该数量的任务后关闭
+    - ``window_time``：滚动时间窗口，收到首个任务该秒数后关闭；由后台线程按时
+      关闭，没有新任务到达时同样输出
+    - 两者同时设置时先满足者关闭窗口；都不设置时整个输入流归约为一个结果
+    - ``key``：按键分别开窗，输出 ``(key, acc)``；未设置时输出累积值本身
+
+    输入结束后、终止信号传给下游之前输出所有未关闭的窗口。执行模式固定为串行，
+    ``combine`` 无需加锁即可修改并返回累积值。窗口内的任务在窗口输出时才记为
+    已完成，中途退出时仍可由 fallback 恢复；归约结果记录为下游的输入，不单独
+    持久化。
+    """
+
+    window_counter: ValueWrapper
+    combine: Callable[[R, T], R]
+    initial: Callable[[], R] | None
+    window_size: int | None
+    window_time: float | None
+    key: Callable[[T], Any] | None
+    _windows: dict[Any, ReduceWindow[R]]
+    _window_lock: threading.Lock
+    _closer: threading.Thread | None
+    _closer_stop: threading.Event
+
+    def __init__(
+        self,
+        name: str,
+        combine: Callable[[R, T], R],
+        *,
+        initial: Callable[[], R] | None = None,
+        window_size: int | None = None,
+        window_time: float | None = None,
+        key: Callable[[T], Any] | None = None,
+    ):
+        """
+        初始化 TaskReducer
+
+        :param name: 节点名称
+        :param combine: 归约函数，接收当前累积值与新任务，返回新的累积值
+        :param initial: 初始累积值的工厂函数，默认以窗口内首个任务作为初始值
+        :param window_size: 每个窗口的任务数，默认不按数量关闭
+        :param window_time: 每个窗口的时长（秒），默认不按时间关闭
+        :param key: 分键函数，默认所有任务共用一个窗口
+        :raises ConfigurationError: window_size 小于 1 或 window_time 不为正数
+        """
+        if window_size is not None and window_size < 1:
+            raise ConfigurationError(f"window_size must be positive: {window_size}")
+        if window_time is not None and window_time <= 0:
+            raise ConfigurationError(f"window_time must be positive: {window_time}")
+
+        super().__init__(
+            name=name,
+            func=self._window_key,
+            execution_mode="serial",
+            max_retries=0,
+        )
+        self.combine = combine
+        self.initial = initial
+        self.window_size = window_size
+        self.window_time = window_time
+        self.key = key
+
+        self._init_extra_counter()
+
+    def _init_status(self) -> None:
+        """覆写父类方法，额外初始化窗口状态与时间窗口的关闭线程。"""
+        super()._init_status()
+        self._windows = {}
+        self._window_lock = threading.Lock()
+        self._closer: threading.Thread | None = None
+        self._closer_stop = threading.Event()
+
+    def _init_extra_counter(self) -> None:
+        """初始化窗口计数器，用于跟踪输出到下游的归约结果数"""
+        self.window_counter = ValueWrapper(0, self.metrics.lock)
+
+    def set_execution_mode(self, execution_mode: str) -> None:
+        """覆写父类方法，将执行模式固定为串行并提示不支持其他模式。"""
+        if execution_mode != "serial":
+            warnings.warn(
+                (
+                    "TaskReducer only accepts execution_mode='serial'. "
+                    f"Got {execution_mode!r}; it will remain 'serial'."
+                ),
+                stacklevel=2,
+            )
+        super().set_execution_mode("serial")
+
+    def get_binding_counter(self, _downstream_name: str) -> Any:
+        """
+        返回下游 stage 应绑定的计数器
+
+        :param _downstream_name: 下游 stage 的唯一名称
+        :return: 窗口计数器实例
+        """
+        return self.window_counter
+
+    def share_state(self, ctx: BaseContext, transport: str = "mp") -> None:
+        """覆写父类方法，额外将窗口计数器迁移到共享内存。"""
+        super().share_state(ctx, transport)
+        self.window_counter = SharedValueWrapper(self.window_counter.value, ctx)
+
+    def _window_key(self, task: T) -> Any:
+        """
+        计算任务所属窗口的键，分键函数抛出的异常按任务失败处理。
+
+        :param task: 任务对象
+        :return: 窗口键，未分键时为 None
+        """
+        return self.key(task) if self.key is not None else None
+
+    def process_task_success(
+        self,
+        task_envelope: TaskEnvelope[T],
+        result: R,
+        start_time: float,
+    ) -> None:
+        """
+        将任务并入所属窗口，窗口满时输出归约结果。
+
+        ``combine`` 抛出异常时该任务按失败处理，不计入窗口；并入窗口的任务
+        在窗口成功输出后才计为成功。
+
+        :param task_envelope: 完成的任务
+        :param result: 任务所属窗口的键
+        :param start_time: 任务开始时间
+        """
+        key = result
+        task = task_envelope.get_task()
+        with self._window_lock:
+            window = self._windows.get(key)
+            if window is None:
+                initial = self.initial() if self.initial is not None else None
+                window = ReduceWindow(initial, time.perf_counter())
+            if not window.task_ids and self.initial is None:
+                window.acc = cast(R, task)
+            else:
+                window.acc = self.combine(cast(R, window.acc), task)
+            window.task_ids.append(task_envelope.get_id())
+            self._windows[key] = window
+
+            window_size = self.window_size
+            if window_size is not None and len(window.task_ids) >= window_size:
+                self._close_window(key, self._windows.pop(key))
+
+        if self.window_time is not None and self._closer is None:
+            self._start_closer()
+
+    def flush_on_termination(self) -> None:
+        """停止关闭线程，输出所有未关闭的窗口。"""
+        self._stop_closer()
+        with self._window_lock:
+            windows, self._windows = self._windows, {}
+            for key, window in windows.items():
+                self._close_window(key, window)
+
+    def _close_window(self, key: Any, window: ReduceWindow[R]) -> None:
+        """
+        输出关闭的窗口，输出失败时窗口内的任务全部按失败处理（需持有窗口锁）
+
+        :param key: 窗口键
+        :param window: 关闭的窗口
+        """
+        try:
+            self._emit_window(key, window)
+        except Exception as exception:
+            self._fail_window(key, window, exception)
+
+    def _emit_window(self, key: Any, window: ReduceWindow[R]) -> None:
+        """
+        将窗口的归约结果发往下游，全部发出后再把窗口内的任务记为成功
+
+        :param key: 窗口键
+        :param window: 关闭的窗口
+        """
+        result_queue = cast(TaskOutQueue[Any], self.result_queue)
+        output = (key, window.acc) if self.key is not None else window.acc
+
+        window_id = self.ctree_client.emit(
+            CTreeEvent.TASK_REDUCE,
+            parents=window.task_ids,
+            payload=self.get_summary(),
+        )
+        for target_name in result_queue.get_target_names():
+            downstream_input_id = self.ctree_client.emit(
+                CTreeEvent.TASK_INPUT,
+                parents=[window_id],
+                payload=self.get_summary(),
+            )
+            self.funnel.fallback_inlet.task_in(target_name, downstream_input_id, output)
+            downstream_envelope: TaskEnvelope[Any] = TaskEnvelope(
+                output,
+                downstream_input_id,
+            )
+            result_queue.put_target(downstream_envelope, target_name)
+
+        for task_id in window.task_ids:
+            self.funnel.fallback_inlet.task_success(task_id, output, persist=False)
+        self.window_counter.add(1)
+
+        self.funnel.log_inlet.window_emit(
+            self.get_func_name(),
+            self._get_repr(key) if self.key is not None else "",
+            len(window.task_ids),
+            time.perf_counter() - window.opened_at,
+            window_id,
+        )
+        self.metrics.add_success_count(len(window.task_ids))
+
+    def _fail_window(
+        self, key: Any, window: ReduceWindow[R], exception: Exception
+    ) -> None:
+        """
+        将输出失败的窗口内的任务记为失败
+
+        :param key: 窗口键
+        :param window: 输出失败的窗口
+        :param exception: 输出时捕获的异常
+        """
+        self.metrics.add_fail_count(len(window.task_ids))
+
+        key_repr = self._get_repr(key) if self.key is not None else ""
+        for task_id in window.task_ids:
+            error_id = self.ctree_client.emit(
+                CTreeEvent.TASK_ERROR,
+                parents=[task_id],
+                payload=self.get_summary(),
+            )
+            self.funnel.fallback_inlet.task_fail(task_id, error_id, exception)
+            self.funnel.log_inlet.task_fail(
+                self.get_func_name(), key_repr, exception, task_id, error_id
+            )
+
+    # ==== 时间窗口 ====
+    def _start_closer(self) -> None:
+        """启动按时关闭窗口的后台线程。"""
+        self._closer_stop.clear()
+        self._closer = threading.Thread(
+            target=self._close_loop, name=f"{self.get_name()}-window", daemon=True
+        )
+        self._closer.start()
+
+    def _stop_closer(self) -> None:
+        """停止按时关闭窗口的后台线程。"""
+        if self._closer is None:
+            return
+        self._closer_stop.set()
+        self._closer.join()
+        self._closer = None
+
+    def _close_loop(self) -> None:
+        """后台线程主循环：等待到最早的窗口到期，输出所有已到期的窗口。"""
+        window_time = cast(float, self.window_time)
+        timeout = window_time
+        while not self._closer_stop.wait(timeout):
+            now = time.perf_counter()
+            with self._window_lock:
+                for key, window in list(self._windows.items()):
+                    if now - window.opened_at >= window_time:
+                        self._close_window(key, self._windows.pop(key))
+                deadlines = [w.opened_at + window_time for w in self._windows.values()]
+            timeout = max(0.001, min(deadlines) - now) if deadlines else window_time
@@ -9,6 +9,12 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
+@pytest.fixture(autouse=True)
+def isolate_workdir(tmp_path, monkeypatch):
+    """切换到临时工作目录，默认的 fallbacks/、logs/ 与 catalog 不写入仓库根目录。"""
+    monkeypatch.chdir(tmp_path)
+
+
 def wait_until(
     condition: Callable[[], bool],
     *,
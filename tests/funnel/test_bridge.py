@@ -0,0 +1,81 @@
+import multiprocessing
+
+import pytest
+
+from celestialflow.funnel.core_bridge import FunnelBridge
+from celestialflow.funnel.core_spout import BaseSpout
+from celestialflow.runtime.util_errors import RuntimeStateError
+
+pytestmark = pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(),
+    reason="funnel bridge tests rely on fork",
+)
+
+
+class RecordingSpout(BaseSpout):
+    def __init__(self):
+        """初始化记录投递顺序的测试用监听器。"""
+        super().__init__()
+        self.received = []
+
+    def _handle_record(self, record):
+        """记录收到的数据。"""
+        self.received.append(record)
+
+
+def _emit(bridge, channel, start, count):
+    """子进程入口：经桥接 spout 发送一段连续记录。"""
+    spout = bridge.make_spout(channel)
+    spout.start()
+    for i in range(start, start + count):
+        spout.put(i)
+    spout.stop()
+
+
+class TestFunnelBridge:
+    def test_records_from_child_processes_reach_parent_spouts(self):
+        """子进程经桥接器发送的记录应全部投递到父进程对应通道的 spout。"""
+        ctx = multiprocessing.get_context("fork")
+        target_a = RecordingSpout()
+        target_b = RecordingSpout()
+        target_a.start()
+        target_b.start()
+        bridge = FunnelBridge(ctx, {"a": target_a, "b": target_b})
+        bridge.start()
+
+        processes = [
+            ctx.Process(target=_emit, args=(bridge, "a", 0, 300)),
+            ctx.Process(target=_emit, args=(bridge, "b", 1000, 300)),
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        bridge.stop()
+        target_a.stop()
+        target_b.stop()
+
+        assert [p.exitcode for p in processes] == [0, 0]
+        assert target_a.received == list(range(300))
+        assert target_b.received == list(range(1000, 1300))
+
+    def test_records_are_delivered_in_sequence_order(self):
+        """乱序到达的批次应按全局序号重新排序后投递。"""
+        ctx = multiprocessing.get_context("fork")
+        target = RecordingSpout()
+        target.start()
+        bridge = FunnelBridge(ctx, {"a": target})
+        bridge.start()
+
+        bridge._queue.put(("a", [(2, "c"), (1, "b")]))
+        bridge._queue.put(("a", [(0, "a"), (3, "d")]))
+        bridge.stop()
+        target.stop()
+
+        assert target.received == ["a", "b", "c", "d"]
+
+    def test_unknown_channel(self):
+        """未注册的通道名应报错。"""
+        bridge = FunnelBridge(multiprocessing.get_context("fork"), {})
+        with pytest.raises(RuntimeStateError):
+            bridge.make_spout("missing")
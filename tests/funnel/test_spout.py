@@ -1,15 +1,19 @@
+import threading
+
 import pytest
 
 from celestialflow.funnel.core_inlet import BaseInlet
 from celestialflow.funnel.core_spout import BaseSpout
-from celestialflow.runtime.util_errors import CelestialFlowError
+from celestialflow.persistence import get_fallback_spout, get_log_spout
+from celestialflow.persistence.core_fallback import FallbackSpout
+from celestialflow.runtime.util_errors import CelestialFlowError, InvalidOptionError
 from tests.conftest import assert_stays_true, wait_until
 
 
 class MockSpout(BaseSpout):
-    def __init__(self):
+    def __init__(self, maxsize=0, overflow="block"):
         """初始化测试用监听器状态。"""
-        super().__init__()
+        super().__init__(maxsize, overflow)
         self.received = []
         self.before_called = False
         self.after_called = False
@@ -116,3 +120,155 @@ class TestBaseSpout:
         base = BaseSpout()
         with pytest.raises(CelestialFlowError, match='_handle_record must be implemented'):
             base._handle_record('anything')
+
+
+class GatedSpout(MockSpout):
+    def __init__(self, maxsize, overflow):
+        """初始化处理前需等待放行的监听器，用于制造积压。"""
+        super().__init__(maxsize, overflow)
+        self.gate = threading.Event()
+
+    def _handle_record(self, record):
+        """等待放行后再记录数据。"""
+        self.gate.wait(5)
+        super()._handle_record(record)
+
+
+class TestBoundedSpout:
+    def test_drop_newest_and_oldest(self):
+        """队列写满时 drop 策略应丢弃对应记录并计入统计。"""
+        newest = MockSpout(maxsize=2, overflow="drop_newest")
+        oldest = MockSpout(maxsize=2, overflow="drop_oldest")
+        for spout in (newest, oldest):
+            inlet = MockInlet().bind_spout(spout)
+            with pytest.warns(RuntimeWarning, match="dropping records") as record:
+                for i in range(4):
+                    inlet.send(i)
+            # 只在首次丢弃时警告一次
+            assert len(record) == 1
+            spout.start()
+            spout.stop()
+
+        assert newest.received == [0, 1]
+        assert oldest.received == [2, 3]
+        assert newest.get_dropped_count() == 2
+        stats = oldest.get_backlog_stats()
+        assert stats["dropped"] == 2
+        assert stats["pending"] == 0
+        assert stats["peak"] == 3
+
+    def test_spill_preserves_order(self):
+        """spill 策略下溢出记录应在队列清空后按原顺序处理。"""
+        spout = GatedSpout(maxsize=2, overflow="spill")
+        inlet = MockInlet().bind_spout(spout)
+        spout.start()
+        try:
+            for i in range(10):
+                inlet.send(i)
+            assert spout.get_backlog_stats()["spilled"] > 0
+            spout.gate.set()
+            wait_until(lambda: spout.get_pending_count() == 0)
+        finally:
+            spout.stop()
+
+        assert spout.received == list(range(10))
+        assert spout.get_peak_pending_count() == 10
+        assert spout.get_backlog_stats()["spilled"] == 0
+
+    def test_block_applies_backpressure(self):
+        """block 策略下队列写满时写入方应阻塞直到监听线程消费。"""
+        spout = GatedSpout(maxsize=1, overflow="block")
+        inlet = MockInlet().bind_spout(spout)
+        spout.start()
+        try:
+            inlet.send(0)
+            wait_until(lambda: spout._queue.empty())
+            inlet.send(1)
+
+            sender = threading.Thread(target=inlet.send, args=(2,))
+            sender.start()
+            assert_stays_true(lambda: sender.is_alive(), duration=0.2)
+
+            spout.gate.set()
+            sender.join(5)
+            assert not sender.is_alive()
+        finally:
+            spout.stop()
+
+        assert spout.received == [0, 1, 2]
+        assert spout.get_backlog_stats()["dropped"] == 0
+
+    def test_block_spills_when_not_running(self):
+        """block 策略下监听线程未运行时应溢出而不是永久阻塞写入方。"""
+        spout = MockSpout(maxsize=1, overflow="block")
+        inlet = MockInlet().bind_spout(spout)
+        for i in range(3):
+            inlet.send(i)
+        assert spout.get_backlog_stats()["spilled"] == 2
+
+        spout.start()
+        spout.stop()
+        assert spout.received == [0, 1, 2]
+
+    def test_global_spouts_unbounded_by_default(self):
+        """未配置时全局 fallback / 日志 spout 不设容量上限，不会丢弃记录。"""
+        for spout in (get_fallback_spout(), get_log_spout()):
+            stats = spout.get_backlog_stats()
+            assert stats["maxsize"] == 0
+            assert stats["overflow"] == "block"
+
+    def test_invalid_overflow(self):
+        """非法溢出策略应抛出 InvalidOptionError，fallback 不允许丢弃记录。"""
+        with pytest.raises(InvalidOptionError):
+            MockSpout(overflow="discard")
+        with pytest.raises(InvalidOptionError):
+            FallbackSpout(maxsize=10, overflow="drop_oldest")
+
+
+class BatchSpout(MockSpout):
+    def __init__(self):
+        """初始化记录批次划分的监听器。"""
+        super().__init__()
+        self.batches = []
+
+    def _handle_batch(self, records):
+        """记录每批收到的数据。"""
+        self.batches.append(list(records))
+        self.received.extend(records)
+
+
+class TestBatchSpout:
+    def test_handle_batch_drains_available_records(self):
+        """每次唤醒应整批取出已有记录，并受 max_batch_size 限制。"""
+        spout = BatchSpout()
+        spout.max_batch_size = 4
+        inlet = MockInlet().bind_spout(spout)
+        for i in range(10):
+            inlet.send(i)
+
+        spout.start()
+        spout.stop()
+
+        assert spout.received == list(range(10))
+        assert [len(batch) for batch in spout.batches] == [4, 4, 2]
+        assert spout.get_pending_count() == 0
+
+    def test_default_handle_batch_isolates_record_errors(self):
+        """默认批处理中单条记录失败不应影响同批其余记录。"""
+
+        class FlakySpout(MockSpout):
+            def _handle_record(self, record):
+                if record == "bad":
+                    raise ValueError("bad record")
+                super()._handle_record(record)
+
+        spout = FlakySpout()
+        inlet = MockInlet().bind_spout(spout)
+        for record in ("a", "bad", "b"):
+            inlet.send(record)
+
+        spout.start()
+        spout.stop()
+
+        assert spout.received == ["a", "b"]
+        assert spout.get_pending_count() == 0
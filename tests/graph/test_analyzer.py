@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+
+from celestialflow.graph.util_analyzer import analyze_bottlenecks
+from celestialflow.graph.util_graph import OrderGraph
+
+
+def _status(
+    tasks_input: int,
+    service_time: float,
+    max_workers: int = 1,
+    queue_wait: float = 0.0,
+    execution_mode: str = "thread",
+) -> dict[str, Any]:
+    """构造分析所需字段的节点快照。"""
+    return {
+        "execution_mode": execution_mode,
+        "max_workers": max_workers,
+        "tasks_input": tasks_input,
+        "tasks_processed": tasks_input,
+        "elapsed_time": 1.0,
+        "execution": {"mean": service_time},
+        "queue_wait": {"mean": queue_wait},
+    }
+
+
+class TestAnalyzeBottlenecks:
+    def test_chain_bottleneck_and_speedup(self):
+        """线性链中服务需求最大的节点为瓶颈，增加并发的收益受下一个瓶颈限制。"""
+        graph = OrderGraph.from_edges({"a": ["b"], "b": ["c"]})
+        report = analyze_bottlenecks(
+            graph,
+            {
+                "a": _status(100, 0.001),
+                "b": _status(100, 0.04, max_workers=2),
+                "c": _status(100, 0.005),
+            },
+        )
+
+        assert report["bottlenecks"] == ["b"]
+        assert report["max_throughput"] == pytest.approx(50.0)
+        stages = report["stages"]
+        assert stages["b"]["demand"] == pytest.approx(0.02)
+        assert stages["b"]["speedup"] == pytest.approx(1.5)
+        assert stages["b"]["max_speedup"] == pytest.approx(4.0)
+        assert stages["a"]["speedup"] == 1.0
+
+    def test_fan_out_counts_visits(self):
+        """扇出使下游的访问次数大于 1，据此放大服务需求。"""
+        graph = OrderGraph.from_edges({"split": ["work"]})
+        report = analyze_bottlenecks(
+            graph,
+            {"split": _status(10, 0.01), "work": _status(100, 0.002)},
+        )
+
+        assert report["stages"]["work"]["visits"] == 10
+        assert report["bottlenecks"] == ["work"]
+
+    def test_serial_stage_counts_one_worker(self):
+        """'serial' 节点无论 max_workers 如何都只有 1 个并发。"""
+        graph = OrderGraph.from_edges({}, ["s"])
+        report = analyze_bottlenecks(
+            graph, {"s": _status(10, 0.01, max_workers=8, execution_mode="serial")}
+        )
+        assert report["stages"]["s"]["workers"] == 1
+        assert report["stages"]["s"]["max_speedup"] is None
+
+    def test_serial_replicas_count_as_workers(self):
+        """'serial' 节点的副本各提供 1 个并发。"""
+        graph = OrderGraph.from_edges({}, ["s"])
+        status = _status(10, 0.01, max_workers=8, execution_mode="serial")
+        status["replicas"] = 3
+        report = analyze_bottlenecks(graph, {"s": status})
+        assert report["stages"]["s"]["workers"] == 3
+
+    def test_critical_path_on_dag(self):
+        """关键路径取平均耗时之和最大的路径。"""
+        graph = OrderGraph.from_edges(
+            {"a": ["fast", "slow"], "fast": ["z"], "slow": ["z"]}
+        )
+        report = analyze_bottlenecks(
+            graph,
+            {
+                "a": _status(10, 0.01),
+                "fast": _status(10, 0.001),
+                "slow": _status(10, 0.01, queue_wait=0.05),
+                "z": _status(20, 0.01),
+            },
+        )
+
+        path = report["critical_path"]
+        assert path["stages"] == ["a", "slow", "z"]
+        assert path["latency"] == pytest.approx(0.08)
+        assert path["cycles"] == []
+
+    def test_critical_path_through_cycle(self):
+        """含环的图在凝聚图上求关键路径，并标出路径上的环。"""
+        graph = OrderGraph.from_edges({"in": ["x"], "x": ["y"], "y": ["x", "out"]})
+        report = analyze_bottlenecks(
+            graph,
+            {
+                "in": _status(10, 0.01),
+                "x": _status(30, 0.01),
+                "y": _status(30, 0.01),
+                "out": _status(10, 0.01),
+            },
+        )
+
+        path = report["critical_path"]
+        assert path["stages"] == ["in", "x", "y", "out"]
+        assert path["cycles"] == [["x", "y"]]
+        assert report["stages"]["x"]["visits"] == 3
+        assert report["bottlenecks"] == ["x", "y"]
+
+    def test_no_samples(self):
+        """没有快照时不判定瓶颈。"""
+        graph = OrderGraph.from_edges({"a": ["b"]})
+        report = analyze_bottlenecks(graph, {})
+
+        assert report["bottlenecks"] == []
+        assert report["max_throughput"] == 0.0
+        assert report["stages"]["a"]["speedup"] == 1.0
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import pytest
+
+from celestialflow.graph.util_budget import (
+    allocate_worker_budget,
+    estimate_worker_demand,
+)
+
+
+def _stat(
+    arrival_rate: float,
+    service_time: float,
+    queue_depth: float = 0,
+    workers: float = 1,
+) -> dict[str, float]:
+    return {
+        "arrival_rate": arrival_rate,
+        "service_time": service_time,
+        "queue_depth": queue_depth,
+        "workers": workers,
+    }
+
+
+class TestEstimateWorkerDemand:
+    """estimate_worker_demand — Little 定律估算并发需求。"""
+
+    def test_steady_state(self):
+        """无积压时需求为到达速率 x 执行耗时。"""
+        assert estimate_worker_demand(100, 0.05, 0, 1.0) == pytest.approx(5.0)
+
+    def test_backlog_adds_demand(self):
+        """积压任务需在 horizon 内消化，额外增加需求。"""
+        assert estimate_worker_demand(0, 0.1, 20, 2.0) == pytest.approx(1.0)
+
+    def test_zero_horizon_ignores_backlog(self):
+        """horizon 为 0 时不计积压。"""
+        assert estimate_worker_demand(10, 0.1, 50, 0) == pytest.approx(1.0)
+
+
+class TestAllocateWorkerBudget:
+    """allocate_worker_budget — 在总预算内分配各节点的并发数。"""
+
+    def test_within_budget(self):
+        """需求总和不超出预算时按需求向上取整。"""
+        result = allocate_worker_budget(
+            {"fast": _stat(100, 0.001), "slow": _stat(100, 0.035)}, 16, 1.0
+        )
+        assert result["fast"]["workers"] == 1
+        assert result["slow"]["workers"] == 4
+        assert result["slow"]["reason"].startswith("little's law")
+
+    def test_scaled_to_budget(self):
+        """需求超出预算时按比例缩减，总和不超过预算，每个节点至少 1 个。"""
+        stats = {
+            "a": _stat(100, 0.2),
+            "b": _stat(100, 0.1),
+            "c": _stat(1, 0.001),
+        }
+        result = allocate_worker_budget(stats, 10, 1.0)
+
+        workers = {name: entry["workers"] for name, entry in result.items()}
+        assert sum(workers.values()) == 10
+        assert workers["c"] == 1
+        assert workers["a"] > workers["b"] > 1
+        assert "scaled to budget 10" in result["a"]["reason"]
+        assert "scaled" not in result["c"]["reason"]
+
+    def test_no_samples_keeps_workers(self):
+        """尚无执行样本的节点保留当前并发数。"""
+        result = allocate_worker_budget({"s": _stat(0, 0, workers=3)}, 8, 1.0)
+        assert result["s"]["workers"] == 3
+        assert result["s"]["reason"] == "no samples yet, keep configured workers"
+
+    def test_more_stages_than_budget(self):
+        """节点数多于预算时每个节点仍分得 1 个。"""
+        stats = {name: _stat(100, 0.1) for name in ("a", "b", "c")}
+        result = allocate_worker_budget(stats, 2, 1.0)
+        assert [entry["workers"] for entry in result.values()] == [1, 1, 1]
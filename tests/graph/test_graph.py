@@ -1,3 +1,8 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+
 import pytest
 
 from celestialflow import (
@@ -5,14 +10,28 @@ from celestialflow import (
     TaskCross,
     TaskGraph,
     TaskGrid,
+    TaskSplitter,
     TaskStage,
 )
-from celestialflow.persistence.util_sqlite import append_records
+from celestialflow.persistence import FunnelContext, get_default_funnel
+from celestialflow.persistence.util_sqlite import append_records, load_records
+from celestialflow.runtime.core_backend import (
+    BrokerQueueBackend,
+    DequeQueueBackend,
+    LocalBroker,
+    SocketQueueBackend,
+)
+from celestialflow.runtime.core_envelope import TaskEnvelope
+from celestialflow.runtime.core_ring import SharedRingQueue
 from celestialflow.runtime.util_errors import (
+    ConfigurationError,
+    DuplicateNodeError,
     InvalidOptionError,
     NodeNotFoundError,
+    RuntimeStateError,
 )
 from celestialflow.runtime.util_event import LocalEventClient
+from celestialflow.runtime.util_types import StageStatus
 
 
 # =========================
@@ -338,6 +357,31 @@ class TestTaskGraphBasic:
         assert stage1.get_counts()["tasks_succeeded"] == 1
         assert stage2.get_counts()["tasks_succeeded"] == 1
 
+    def test_graph_restore_db_streams_into_bounded_queues(self, tmp_path):
+        """thread 图模式下 restore_db 应边读边注入，有界队列不会阻塞启动。"""
+        sqlite_path = tmp_path / "fallback.sqlite3"
+        records = [
+            {
+                "event_id": i,
+                "stage": "s1" if i <= 40 else "s2",
+                "status": "pending",
+                "task_json": i,
+            }
+            for i in range(1, 61)
+        ]
+        assert append_records(sqlite_path, records) == 60
+
+        stage1 = TaskStage("s1", add_one, execution_mode="serial", max_queue_size=2)
+        stage2 = TaskStage("s2", double, execution_mode="serial", max_queue_size=2)
+
+        graph = TaskGraph("test_graph_restore_db_streams", graph_mode="thread")
+        graph.set_stages(stages=[stage1, stage2])
+        graph.connect([stage1], [stage2])
+        graph.restore_db(sqlite_path, chunk_size=7, decode_workers=2)
+
+        assert stage1.get_counts()["tasks_succeeded"] == 40
+        assert stage2.get_counts()["tasks_succeeded"] == 60
+
     def test_start_raises_exception_group_after_finish(self, monkeypatch):
         """同步 start 应在 finish 后统一抛出收集到的异常。"""
         graph = TaskGraph("test_start_raises_exception_group_after_finish")
@@ -586,6 +630,22 @@ class TestTaskGraphAnalysis:
         assert s3.get_name() in layers[2]
 
 
+    def test_bottleneck_analysis(self):
+        """运行后按状态快照识别瓶颈节点并给出关键路径。"""
+        s1 = TaskStage("s1", add_one)
+        s2 = TaskStage("s2", slow_identity)
+        graph = TaskGraph("test_bottleneck_analysis")
+        graph.set_stages(stages=[s1, s2])
+        graph.connect([s1], [s2])
+
+        graph.run({"s1": range(20)})
+
+        report = graph.get_graph_analysis()["bottleneck"]
+        assert report["bottlenecks"] == ["s2"]
+        assert report["critical_path"]["stages"] == ["s1", "s2"]
+        assert report["stages"]["s2"]["speedup"] > 1
+
+
 class TestTaskGraphRuntimeSnapshot:
     def test_collect_runtime_snapshot_tolerates_not_started_stage(self):
         """Reporter 在节点尚未启动时采集快照也不应因缺少 start_time 崩溃。"""
@@ -969,3 +1029,951 @@ class TestCyclicGraph:
         for stage_name in cycle_names:
             assert stage_name in layers[cycle_layer]
         assert s4.get_name() in layers[cycle_layer + 1]
+
+
+# =========================
+# Funnel 上下文测试
+# =========================
+class TestTaskGraphFunnel:
+    def test_default_funnel_shared_by_stages(self):
+        """未显式设置时，任务图与节点应使用默认 funnel 上下文。"""
+        stage = TaskStage("s1", add_one)
+        graph = TaskGraph("test_default_funnel")
+        graph.set_stages(stages=[stage])
+
+        assert graph.funnel is get_default_funnel()
+        assert stage.funnel is get_default_funnel()
+
+    def test_set_funnel_propagates_to_stages(self):
+        """set_funnel 应同步到已添加与之后添加的节点。"""
+        funnel = FunnelContext("propagate")
+        stage1 = TaskStage("s1", add_one)
+        stage2 = TaskStage("s2", double)
+        graph = TaskGraph("test_set_funnel")
+        graph.set_stages(stages=[stage1])
+        graph.set_funnel(funnel)
+        graph.set_stages(stages=[stage2])
+
+        assert stage1.funnel is funnel
+        assert stage2.funnel is funnel
+
+    def test_concurrent_graphs_use_separate_fallbacks(self, tmp_path, monkeypatch):
+        """同一进程内并发运行的两个任务图应写入各自的 fallback 文件。"""
+        monkeypatch.chdir(tmp_path)
+        graphs = []
+        for name in ("graph_a", "graph_b"):
+            stage = TaskStage(f"{name}_stage", add_offset_10, max_retries=0)
+            graph = TaskGraph(name, graph_mode="thread")
+            graph.set_funnel(FunnelContext(name))
+            graph.set_stages(stages=[stage])
+            graphs.append(graph)
+
+        errors = []
+
+        def run(graph, tasks):
+            try:
+                graph.run({f"{graph.name}_stage": tasks})
+            except Exception as exception:
+                errors.append(exception)
+
+        threads = [
+            threading.Thread(target=run, args=(graphs[0], [31, 32, 1])),
+            threading.Thread(target=run, args=(graphs[1], [33, 2])),
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        path_a, path_b = (graph.get_fallback_path() for graph in graphs)
+        assert path_a != path_b
+        assert sorted(r["task_json"] for r in load_records(str(path_a))) == [31, 32]
+        assert [r["task_json"] for r in load_records(str(path_b))] == [33]
+
+
+# =========================
+# process 图模式测试
+# =========================
+def raise_on_five(x: int) -> int:
+    """测试用函数，输入为 5 时抛错。"""
+    if x == 5:
+        raise ValueError("five")
+    return x + 1
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(),
+    reason="graph_mode='process' requires fork",
+)
+class TestTaskGraphProcess:
+    def test_process_chain_counts_and_fallback(self, tmp_path, monkeypatch):
+        """跨进程运行的链式任务图，计数、结果与失败记录应回传到父进程。"""
+        monkeypatch.chdir(tmp_path)
+        stage1 = TaskStage(
+            "s1", raise_on_five, execution_mode="thread", max_workers=4, max_retries=0
+        )
+        stage2 = TaskStage("s2", double, persist_result=True)
+        graph = TaskGraph("test_process_chain", graph_mode="process")
+        graph.set_stages(stages=[stage1, stage2])
+        graph.connect([stage1], [stage2])
+
+        graph.run({"s1": range(200)})
+
+        assert stage1.get_counts()["tasks_succeeded"] == 199
+        assert stage1.get_counts()["tasks_failed"] == 1
+        assert stage2.get_counts()["tasks_input"] == 199
+        assert stage2.get_counts()["tasks_succeeded"] == 199
+        assert graph.get_status_snapshot()["status"]["s2"]["tasks_pending"] == 0
+
+        # 下游的晋升操作不应先于上游写入的 pending 记录落盘。
+        pairs = stage2.get_success_pairs()
+        assert sorted(result for _, result in pairs) == sorted(
+            (x + 1) * 2 for x in range(200) if x != 5
+        )
+        assert [(task, str(error)) for task, error in stage1.get_error_pairs()] == [
+            (5, "ValueError(five)")
+        ]
+        path = graph.get_fallback_path()
+        assert load_records(str(path), status="pending") == []
+        event_ids = [r["event_id"] for r in load_records(str(path), status="success")]
+        assert len(event_ids) == len(set(event_ids))
+
+    def test_process_groups_share_process(self, tmp_path, monkeypatch):
+        """同组节点运行在同一子进程内，未分组节点各自独占进程。"""
+        monkeypatch.chdir(tmp_path)
+        source = TaskStage("src", add_one)
+        sink_a = TaskStage("SinkA", double)
+        sink_b = TaskStage("SinkB", to_str)
+        graph = TaskGraph("test_process_groups", graph_mode="process")
+        graph.set_stages(stages=[source, sink_a, sink_b])
+        graph.connect([source], [sink_a, sink_b])
+        graph.set_process_groups([["SinkA", "SinkB"]])
+
+        groups = [
+            [stage.get_name() for stage in group]
+            for group in graph._get_process_groups()
+        ]
+        assert groups == [["SinkA", "SinkB"], ["src"]]
+
+        graph.run({"src": [1, 2, 3]})
+
+        assert sink_a.get_counts()["tasks_succeeded"] == 3
+        assert sink_b.get_counts()["tasks_succeeded"] == 3
+
+    def test_process_groups_with_replicas(self, tmp_path, monkeypatch):
+        """分组中的被复制节点展开为全部实例，每个实例都在该组进程内运行。"""
+        monkeypatch.chdir(tmp_path)
+        source = TaskStage("src", add_one)
+        sink = TaskStage("sink", double)
+        graph = TaskGraph("test_process_group_replicas", graph_mode="process")
+        graph.set_stages(stages=[source, sink])
+        graph.connect([source], [sink])
+        graph.replicate(sink, 3)
+        graph.set_process_groups([["sink"]])
+
+        groups = graph._get_process_groups()
+        assert [len(group) for group in groups] == [3, 1]
+
+        graph.run({"src": range(30)})
+
+        status = graph.get_status_snapshot()["status"]["sink"]
+        assert status["tasks_succeeded"] == 30
+        assert status["tasks_pending"] == 0
+
+    def test_invalid_process_groups(self):
+        """分组中包含未知或重复节点时应报错。"""
+        graph = TaskGraph("test_invalid_process_groups", graph_mode="process")
+        graph.set_stages(stages=[TaskStage("s1", add_one), TaskStage("s2", double)])
+
+        with pytest.raises(NodeNotFoundError):
+            graph.set_process_groups([["missing"]])
+        with pytest.raises(DuplicateNodeError):
+            graph.set_process_groups([["s1"], ["s1", "s2"]])
+
+    def test_process_chain_shm_ring_edge(self, tmp_path, monkeypatch):
+        """shm_ring 边以共享内存环承载下游输入队列，结果与普通队列一致。"""
+        monkeypatch.chdir(tmp_path)
+        stage1 = TaskStage("s1", add_one)
+        stage2 = TaskStage("s2", double, persist_result=True)
+        stage3 = TaskStage("s3", to_str)
+        graph = TaskGraph("test_process_shm_ring", graph_mode="process")
+        graph.set_stages(stages=[stage1, stage2, stage3])
+        graph.connect([stage1], [stage2], transport="shm_ring")
+        graph.connect([stage2], [stage3])
+
+        graph.run({"s1": range(500)})
+
+        assert isinstance(stage2.task_queue.queue, SharedRingQueue)
+        assert not isinstance(stage3.task_queue.queue, SharedRingQueue)
+        assert stage3.get_counts()["tasks_succeeded"] == 500
+        assert sorted(result for _, result in stage2.get_success_pairs()) == [
+            (x + 1) * 2 for x in range(500)
+        ]
+
+    def test_invalid_edge_transport(self):
+        """不支持的边传输方式应报错，且不留下半建立的边。"""
+        graph = TaskGraph("test_invalid_edge_transport", graph_mode="process")
+        stage1, stage2 = TaskStage("s1", add_one), TaskStage("s2", double)
+        graph.set_stages(stages=[stage1, stage2])
+
+        with pytest.raises(InvalidOptionError):
+            graph.connect([stage1], [stage2], transport="pipe")
+        assert graph.out_edges["s1"] == []
+
+
+class TestTaskGraphQueueBackend:
+    def test_thread_chain_with_mixed_backends(self):
+        """每条边换用不同后端，节点代码不变、结果一致。"""
+        broker = LocalBroker()
+        s1 = TaskStage("s1", add_one)
+        s2 = TaskStage("s2", double)
+        s3 = TaskStage("s3", add_one)
+        s4 = TaskStage("s4", to_str, persist_result=True)
+        graph = TaskGraph("test_mixed_backends", graph_mode="thread")
+        graph.set_stages(stages=[s1, s2, s3, s4])
+        graph.connect([s1], [s2], transport="deque")
+        graph.connect([s2], [s3], transport="socket")
+        graph.connect([s3], [s4], transport=BrokerQueueBackend(broker, "s4"))
+
+        assert isinstance(s2.task_queue.queue, DequeQueueBackend)
+        assert isinstance(s3.task_queue.queue, SocketQueueBackend)
+        assert isinstance(s4.task_queue.queue, BrokerQueueBackend)
+
+        graph.run({"s1": range(50)})
+
+        assert s4.get_counts()["tasks_succeeded"] == 50
+        assert sorted(result for _, result in s4.get_success_pairs()) == sorted(
+            str((x + 1) * 2 + 1) for x in range(50)
+        )
+        assert broker.pending("s4") == 0
+
+    def test_conflicting_transports(self):
+        """同一下游节点的入边选择不同后端时报错，默认后端不冲突。"""
+        a, b, c = TaskStage("a", add_one), TaskStage("b", add_one), TaskStage("c", double)
+        graph = TaskGraph("test_conflicting_transports", graph_mode="thread")
+        graph.set_stages(stages=[a, b, c])
+        graph.connect([a], [c], transport="deque")
+        graph.connect([b], [c])
+
+        with pytest.raises(ConfigurationError, match="conflicting transports"):
+            graph.connect([b], [c], transport="socket")
+
+    def test_existing_items_migrate_on_switch(self):
+        """切换后端时已注入的任务按顺序迁移。"""
+        a, b = TaskStage("a", add_one), TaskStage("b", double)
+        graph = TaskGraph("test_backend_migrate", graph_mode="thread")
+        graph.set_stages(stages=[a, b])
+        b.task_queue.put(TaskEnvelope(1, id=1))
+        graph.connect([a], [b], transport="deque")
+
+        assert b.task_queue.queue.qsize() == 1
+        assert b.task_queue.get().get_task() == 1
+
+    @pytest.mark.skipif(
+        "fork" not in multiprocessing.get_all_start_methods(),
+        reason="requires the fork start method",
+    )
+    def test_process_mode_socket_backend(self, tmp_path, monkeypatch):
+        """process 模式下 socket 边可跨进程使用。"""
+        monkeypatch.chdir(tmp_path)
+        s1, s2 = TaskStage("s1", add_one), TaskStage("s2", double)
+        graph = TaskGraph("test_process_socket", graph_mode="process")
+        graph.set_stages(stages=[s1, s2])
+        graph.connect([s1], [s2], transport="socket")
+
+        graph.run({"s1": range(100)})
+        assert s2.get_counts()["tasks_succeeded"] == 100
+
+    @pytest.mark.skipif(
+        "fork" not in multiprocessing.get_all_start_methods(),
+        reason="requires the fork start method",
+    )
+    def test_process_mode_rejects_local_backend(self, tmp_path, monkeypatch):
+        """process 模式下进程内后端无法跨进程共享，应报错。"""
+        monkeypatch.chdir(tmp_path)
+        s3, s4 = TaskStage("s3", add_one), TaskStage("s4", double)
+        graph = TaskGraph("test_process_deque", graph_mode="process")
+        graph.set_stages(stages=[s3, s4])
+        graph.connect([s3], [s4], transport="deque")
+
+        with pytest.raises(ExceptionGroup) as exc_info:
+            graph.run({"s3": range(3)})
+        assert exc_info.group_contains(ConfigurationError, depth=None)
+
+
+class TestTaskGraphBatchedEdges:
+    @pytest.mark.parametrize("graph_mode", ["serial", "thread"])
+    def test_batched_chain(self, graph_mode):
+        """批量边不改变结果与终止语义。"""
+        s1 = TaskStage("s1", add_one, execution_mode="thread", max_workers=4)
+        s2 = TaskStage("s2", double, persist_result=True)
+        s3 = TaskStage("s3", to_str)
+        graph = TaskGraph("test_batched_chain", graph_mode=graph_mode)
+        graph.set_stages(stages=[s1, s2, s3])
+        graph.connect([s1], [s2], batch_size=16)
+        graph.connect([s2], [s3], batch_size=7, batch_delay=None)
+
+        graph.run({"s1": range(100)})
+
+        assert s3.get_counts()["tasks_succeeded"] == 100
+        assert sorted(result for _, result in s2.get_success_pairs()) == [
+            (x + 1) * 2 for x in range(100)
+        ]
+
+    @pytest.mark.skipif(
+        "fork" not in multiprocessing.get_all_start_methods(),
+        reason="requires the fork start method",
+    )
+    def test_batched_process_edge(self, tmp_path, monkeypatch):
+        """process 模式下批次整体跨进程传递。"""
+        monkeypatch.chdir(tmp_path)
+        s1, s2 = TaskStage("s1", add_one), TaskStage("s2", double)
+        graph = TaskGraph("test_batched_process", graph_mode="process")
+        graph.set_stages(stages=[s1, s2])
+        graph.connect([s1], [s2], transport="shm_ring", batch_size=32)
+
+        graph.run({"s1": range(200)})
+
+        assert s2.get_counts()["tasks_succeeded"] == 200
+
+    def test_invalid_batch_options(self):
+        """批量参数不合法时报错，且不留下半建立的边。"""
+        s1, s2 = TaskStage("s1", add_one), TaskStage("s2", double)
+        graph = TaskGraph("test_invalid_batch", graph_mode="thread")
+        graph.set_stages(stages=[s1, s2])
+
+        with pytest.raises(ConfigurationError):
+            graph.connect([s1], [s2], batch_size=0)
+        assert graph.out_edges["s1"] == []
+
+
+
+def slow_identity(x: int) -> int:
+    """测试用函数，模拟处理较慢的下游。"""
+    time.sleep(0.002)
+    return x
+
+
+class TestTaskGraphEdgeCapacity:
+    def test_capacity_reports_backpressure(self):
+        """慢下游的入边额度耗尽时阻塞上游，阻塞时间按边记入状态快照。"""
+        s1, s2 = TaskStage("s1", add_one), TaskStage("s2", double)
+        sink = TaskStage("sink", slow_identity)
+        graph = TaskGraph("test_edge_capacity", graph_mode="thread")
+        graph.set_stages(stages=[s1, s2, sink])
+        graph.connect([s1, s2], [sink], capacity=4)
+
+        graph.run({"s1": range(50), "s2": range(50)})
+
+        assert sink.get_counts()["tasks_succeeded"] == 100
+        edges = graph.get_status_snapshot()["edges"]
+        assert set(edges) == {"s1->sink", "s2->sink"}
+        for stats in edges.values():
+            assert stats["capacity"] == 4
+            assert stats["depth"] == 0
+        assert sum(stats["credit_blocked_time"] for stats in edges.values()) > 0
+
+    def test_snapshot_reports_latency_and_depth(self):
+        """快照区分排队与执行耗时，并记录每条边的最高积压。"""
+        s1 = TaskStage("s1", add_one, execution_mode="thread", max_workers=4)
+        sink = TaskStage("sink", slow_identity)
+        graph = TaskGraph("test_edge_latency", graph_mode="thread")
+        graph.set_stages(stages=[s1, sink])
+        graph.connect([s1], [sink])
+
+        graph.run({"s1": range(50)})
+
+        status = graph.get_status_snapshot()["status"]
+        assert status["s1"]["execution"]["count"] == 50
+        assert status["sink"]["queue_wait"]["count"] == 50
+        assert status["sink"]["execution"]["p50"] >= 0.001
+        # 慢下游的任务排队时间远大于执行时间
+        assert status["sink"]["queue_wait"]["max"] > status["sink"]["execution"]["max"]
+
+        edge = graph.get_status_snapshot()["edges"]["s1->sink"]
+        assert edge["depth"] == 0
+        assert edge["high_water"] > 1
+
+    def test_capacity_rejected_in_serial_mode(self):
+        """serial 模式下上游结束前下游不会运行，限制容量的边应直接报错。"""
+        s1, s2 = TaskStage("s1", add_one), TaskStage("s2", double)
+        graph = TaskGraph("test_edge_capacity_serial", graph_mode="serial")
+        graph.set_stages(stages=[s1, s2])
+        graph.connect([s1], [s2], capacity=4)
+
+        with pytest.raises(ExceptionGroup) as exc_info:
+            graph.run({"s1": range(10)})
+        assert exc_info.group_contains(ConfigurationError, match="capacity")
+
+    def test_capacity_with_batched_edge(self):
+        """容量与批量同时开启时结果不变，额度全部归还。"""
+        s1, s2 = TaskStage("s1", add_one), TaskStage("s2", double)
+        graph = TaskGraph("test_edge_capacity_batched", graph_mode="thread")
+        graph.set_stages(stages=[s1, s2])
+        graph.connect([s1], [s2], batch_size=8, capacity=16)
+
+        graph.run({"s1": range(200)})
+
+        assert s2.get_counts()["tasks_succeeded"] == 200
+        assert graph.get_status_snapshot()["edges"]["s1->s2"]["depth"] == 0
+
+    @pytest.mark.skipif(
+        "fork" not in multiprocessing.get_all_start_methods(),
+        reason="requires the fork start method",
+    )
+    def test_capacity_process_edge(self, tmp_path, monkeypatch):
+        """process 模式下额度与阻塞统计跨进程共享。"""
+        monkeypatch.chdir(tmp_path)
+        s1, s2 = TaskStage("s1", add_one), TaskStage("s2", slow_identity)
+        graph = TaskGraph("test_edge_capacity_process", graph_mode="process")
+        graph.set_stages(stages=[s1, s2])
+        graph.connect([s1], [s2], capacity=2)
+
+        graph.run({"s1": range(100)})
+
+        assert s2.get_counts()["tasks_succeeded"] == 100
+        stats = graph.get_status_snapshot()["edges"]["s1->s2"]
+        assert stats["depth"] == 0
+        assert stats["blocked_count"] > 0
+
+    def test_invalid_capacity(self):
+        """容量为负数或小于批大小时报错，且不留下半建立的边。"""
+        s1, s2 = TaskStage("s1", add_one), TaskStage("s2", double)
+        graph = TaskGraph("test_invalid_capacity", graph_mode="thread")
+        graph.set_stages(stages=[s1, s2])
+
+        with pytest.raises(ConfigurationError, match="capacity"):
+            graph.connect([s1], [s2], capacity=-1)
+        with pytest.raises(ConfigurationError, match="capacity"):
+            graph.connect([s1], [s2], batch_size=8, capacity=4)
+        assert graph.out_edges["s1"] == []
+
+def halve(x: int) -> int:
+    """测试用函数，成对地产生重复结果。"""
+    return x // 2
+
+
+class TestTaskGraphFusion:
+    @pytest.mark.parametrize("graph_mode", ["serial", "thread", "async"])
+    @pytest.mark.parametrize("execution_mode", ["serial", "thread"])
+    def test_fused_chain_results(self, graph_mode, execution_mode):
+        """融合链的结果、计数与失败归属与未融合时一致。"""
+        stages = [
+            TaskStage("s1", add_one, execution_mode=execution_mode),
+            TaskStage("s2", double, execution_mode=execution_mode),
+            TaskStage("s3", add_offset_10, execution_mode=execution_mode),
+            TaskStage("s4", to_str, execution_mode=execution_mode),
+        ]
+        chain = TaskChain("test_fused_chain", stages, graph_mode=graph_mode)
+        chain.set_fusion()
+
+        if graph_mode == "async":
+            asyncio.run(chain.run_async({"s1": range(20)}))
+        else:
+            chain.run({"s1": range(20)})
+
+        assert chain.fused_chains == [["s1", "s2", "s3", "s4"]]
+        counts = {stage.get_name(): stage.get_counts() for stage in stages}
+        assert counts["s1"]["tasks_succeeded"] == 20
+        assert counts["s2"]["tasks_succeeded"] == 20
+        # (x + 1) * 2 > 30 即 x >= 15 时 s3 失败，失败记在 s3 上
+        assert counts["s3"]["tasks_succeeded"] == 15
+        assert counts["s3"]["tasks_failed"] == 5
+        assert counts["s4"]["tasks_input"] == 15
+        assert counts["s4"]["tasks_succeeded"] == 15
+        assert all(
+            stage.metrics.get_status() == StageStatus.STOPPED for stage in stages
+        )
+
+    def test_fusion_is_opt_in(self):
+        """未开启融合时不做任何合并。"""
+        s1, s2 = TaskStage("s1", add_one), TaskStage("s2", double)
+        chain = TaskChain("test_fusion_off", [s1, s2])
+
+        chain.run({"s1": range(5)})
+
+        assert chain.fused_chains == []
+        assert s2.fused_into is None
+
+    def test_fusion_boundaries(self):
+        """分叉、汇合、执行模式不同与批量边都会切断融合链。"""
+        a = TaskStage("a", add_one)
+        b = TaskStage("b", add_one)
+        c = TaskStage("c", add_one)
+        d = TaskStage("d", add_one, execution_mode="thread")
+        e = TaskStage("e", add_one, execution_mode="thread")
+        f = TaskStage("f", add_one, execution_mode="thread")
+        g = TaskStage("g", add_one)
+        h = TaskStage("h", add_one)
+        graph = TaskGraph("test_fusion_boundaries", graph_mode="thread")
+        graph.set_stages(stages=[a, b, c, d, e, f, g, h])
+        graph.connect([a], [b])
+        graph.connect([b], [c, g])
+        graph.connect([c], [d])
+        graph.connect([d], [e])
+        graph.connect([e], [f], batch_size=4)
+        graph.connect([g], [h], capacity=4)
+        graph.set_fusion()
+
+        assert graph.get_structure_graph()["fused_chains"] == [["a", "b"], ["d", "e"]]
+
+        graph.run({"a": range(10)})
+        assert f.get_counts()["tasks_succeeded"] == 10
+        assert h.get_counts()["tasks_succeeded"] == 10
+
+    def test_structure_list_marks_fused_stages(self):
+        """结构列表标记融合进链首的节点。"""
+        s1, s2, s3 = (TaskStage(f"s{i}", add_one) for i in range(1, 4))
+        chain = TaskChain("test_fusion_structure", [s1, s2, s3])
+        chain.set_fusion()
+
+        lines = chain.get_structure_list()
+
+        assert "[Fused" not in lines[1]
+        assert "s2::add_one (E:serial, W:" in lines[2] and "[Fused:s1]" in lines[2]
+        assert "[Fused:s1]" in lines[3]
+
+    def test_fused_chain_duplicate_check(self):
+        """链内节点的去重检查照常生效，重复任务记在该节点上。"""
+        s1 = TaskStage("s1", halve, execution_mode="thread", max_workers=4)
+        s2 = TaskStage(
+            "s2", add_one, execution_mode="thread", enable_duplicate_check=True
+        )
+        s3 = TaskStage("s3", add_one, execution_mode="thread")
+        chain = TaskChain("test_fusion_duplicate", [s1, s2, s3])
+        chain.set_fusion()
+
+        chain.run({"s1": range(20)})
+
+        assert s2.get_counts()["tasks_duplicated"] == 10
+        assert s3.get_counts()["tasks_succeeded"] == 10
+
+
+class TestTaskGraphInline:
+    def test_results_stream_depth_first(self):
+        """每个输入的结果先流经全部下游，再处理下一个输入。"""
+        events: list[tuple[str, int]] = []
+
+        def record(name):
+            def func(x: int) -> int:
+                events.append((name, x))
+                return x
+
+            return func
+
+        stages = [TaskStage(f"s{i}", record(f"s{i}")) for i in range(1, 4)]
+        chain = TaskChain("test_inline_stream", stages, graph_mode="inline")
+
+        chain.run({"s1": range(3)})
+
+        assert events == [(f"s{i}", x) for x in range(3) for i in range(1, 4)]
+        assert chain.inline_stages == ["s2", "s3"]
+        assert all(
+            stage.metrics.get_status() == StageStatus.STOPPED for stage in stages
+        )
+
+    def test_diamond_merges_termination(self):
+        """分叉与汇合的节点同样就地执行，集齐全部上游的终止信号后结束。"""
+        a = TaskStage("a", add_one)
+        b = TaskStage("b", double)
+        c = TaskStage("c", add_offset_10)
+        d = TaskStage("d", to_str, persist_result=True)
+        graph = TaskGraph("test_inline_diamond", graph_mode="inline")
+        graph.set_stages(stages=[a, b, c, d])
+        graph.connect([a], [b, c])
+        graph.connect([b, c], [d])
+
+        graph.run({"a": range(40)})
+
+        assert graph.inline_stages == ["b", "c", "d"]
+        assert b.get_counts()["tasks_succeeded"] == 40
+        # a 的结果 x + 1 > 30 即 x >= 30 时 c 失败
+        assert c.get_counts()["tasks_failed"] == 10
+        assert d.get_counts()["tasks_succeeded"] == 70
+        assert d.metrics.get_status() == StageStatus.STOPPED
+
+    def test_non_serial_stage_runs_separately(self):
+        """执行模式不是 serial 的节点及其下游仍单独启动。"""
+        s1 = TaskStage("s1", add_one)
+        s2 = TaskStage("s2", double, execution_mode="thread")
+        s3 = TaskStage("s3", to_str)
+        chain = TaskChain("test_inline_mixed", [s1, s2, s3], graph_mode="inline")
+
+        chain.run({"s1": range(10)})
+
+        assert chain.inline_stages == []
+        assert s3.get_counts()["tasks_succeeded"] == 10
+
+    def test_queued_tasks_of_inline_stage(self):
+        """启动前直接注入就地执行节点的任务同样会被执行。"""
+        s1, s2 = TaskStage("s1", add_one), TaskStage("s2", double)
+        chain = TaskChain("test_inline_queued", [s1, s2], graph_mode="inline")
+
+        chain.run({"s1": range(5), "s2": range(100, 103)})
+
+        assert s2.get_counts()["tasks_succeeded"] == 8
+
+    def test_structure_list_marks_inline_stages(self):
+        """结构列表标记就地执行的节点。"""
+        s1, s2 = TaskStage("s1", add_one), TaskStage("s2", double)
+        chain = TaskChain("test_inline_structure", [s1, s2], graph_mode="inline")
+
+        lines = chain.get_structure_list()
+
+        assert "[Inline]" not in lines[1]
+        assert "[Inline]" in lines[2]
+
+
+class TestTaskGraphLayered:
+    @staticmethod
+    def _tracked(active: list[int], peak: list[int], lock: threading.Lock):
+        """构造记录同时运行的任务数峰值的慢函数。"""
+
+        def func(x: int) -> int:
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+            return x
+
+        return func
+
+    def test_same_level_runs_concurrently(self):
+        """同层节点并发运行，下一层在整层结束后才启动。"""
+        active, peak, lock = [0], [0], threading.Lock()
+        func = self._tracked(active, peak, lock)
+        head = TaskStage("head", add_one)
+        wide = [TaskStage(f"w{i}", func) for i in range(4)]
+        tail = TaskStage("tail", add_one)
+        graph = TaskCross("test_layered_cross", [[head], wide, [tail]], "layered")
+
+        graph.run({"head": range(3)})
+
+        assert peak[0] == 4
+        assert tail.get_counts()["tasks_succeeded"] == 12
+        assert tail.start_time >= max(stage.start_time for stage in wide)
+
+    def test_worker_budget_limits_concurrency(self):
+        """工作线程预算限制同时运行的节点数。"""
+        active, peak, lock = [0], [0], threading.Lock()
+        func = self._tracked(active, peak, lock)
+        head = TaskStage("head", add_one)
+        wide = [TaskStage(f"w{i}", func) for i in range(4)]
+        graph = TaskCross("test_layered_budget", [[head], wide], "layered")
+        graph.set_worker_budget(2)
+
+        graph.run({"head": range(3)})
+
+        assert peak[0] == 2
+        assert all(stage.get_counts()["tasks_succeeded"] == 3 for stage in wide)
+
+    def test_cycle_starts_together_within_budget(self):
+        """同一强连通分量的节点一起启动，预算不足时也不会互相等待而卡死。"""
+        s1 = TaskStage("s1", add_one)
+        s2 = TaskStage("s2", double)
+        graph = TaskGraph("test_layered_cycle", graph_mode="layered")
+        graph.set_stages(stages=[s1, s2])
+        graph.connect([s1], [s2])
+        graph.connect([s2], [s1])
+        graph.set_worker_budget(1)
+
+        graph.run({"s1": range(3)})
+
+        assert s1.metrics.get_status() == StageStatus.STOPPED
+        assert s2.metrics.get_status() == StageStatus.STOPPED
+
+    def test_invalid_worker_budget(self):
+        """预算为负数时报错。"""
+        graph = TaskGraph("test_layered_invalid", graph_mode="layered")
+        with pytest.raises(ConfigurationError, match="worker budget"):
+            graph.set_worker_budget(-1)
+
+    def test_capacity_across_levels_rejected(self):
+        """跨层且限制容量的边在下层启动前无法归还额度，应直接报错。"""
+        s1, s2 = TaskStage("s1", add_one), TaskStage("s2", double)
+        graph = TaskGraph("test_layered_capacity", graph_mode="layered")
+        graph.set_stages(stages=[s1, s2])
+        graph.connect([s1], [s2], capacity=4)
+
+        with pytest.raises(ExceptionGroup) as exc_info:
+            graph.run({"s1": range(10)})
+        assert exc_info.group_contains(ConfigurationError, match="capacity")
+
+
+class TestTaskGraphWorkerRebalance:
+    def test_slow_stage_gets_more_workers(self):
+        """按 Little 定律把预算分给执行更慢的节点，总和不超过预算。"""
+        fast = TaskStage("fast", add_one, execution_mode="thread", max_workers=1)
+        slow = TaskStage("slow", slow_identity, execution_mode="thread", max_workers=1)
+        graph = TaskGraph("test_rebalance")
+        graph.set_stages(stages=[fast, slow])
+        graph.connect([fast], [slow])
+        graph.set_worker_budget(8, rebalance_interval=0.05)
+
+        graph.run({"fast": range(100)})
+
+        workers = graph.get_status_snapshot()["workers"]
+        allocations = workers["allocations"]
+        assert workers["budget"] == 8
+        assert sum(entry["workers"] for entry in allocations.values()) <= 8
+        assert slow.max_workers > fast.max_workers
+        assert allocations["slow"]["reason"].startswith("little's law")
+        assert slow.get_counts()["tasks_succeeded"] == 100
+
+    def test_fixed_stages_reduce_budget(self):
+        """非 thread 节点占用固定名额，不参与分配。"""
+        s1 = TaskStage("s1", add_one)
+        s2 = TaskStage("s2", double, execution_mode="thread", max_workers=2)
+        graph = TaskGraph("test_rebalance_fixed")
+        graph.set_stages(stages=[s1, s2])
+        graph.connect([s1], [s2])
+        graph.set_worker_budget(4, rebalance_interval=0.05)
+
+        graph.run({"s1": range(10)})
+
+        assert graph.worker_optimizer is not None
+        assert graph.worker_optimizer.budget == 3
+        assert list(graph.get_status_snapshot()["workers"]["allocations"]) == ["s2"]
+
+    def test_rebalance_requires_budget(self):
+        """开启重新分配时预算必须为正数。"""
+        graph = TaskGraph("test_rebalance_invalid")
+        with pytest.raises(ConfigurationError, match="positive budget"):
+            graph.set_worker_budget(0, rebalance_interval=1.0)
+
+
+class TestTaskGraphReplicate:
+    @pytest.mark.parametrize("graph_mode", ["serial", "thread", "async", "process"])
+    def test_replicated_stage_results(self, graph_mode):
+        """副本分担被复制节点的任务，下游收到全部结果并等待所有实例结束。"""
+        s1 = TaskStage("s1", add_one)
+        s2 = TaskStage("s2", double)
+        s3 = TaskStage("s3", to_str)
+        chain = TaskChain("test_replicate", [s1, s2, s3], graph_mode=graph_mode)
+        chain.replicate(s2, 3)
+
+        if graph_mode == "async":
+            asyncio.run(chain.run_async({"s1": range(30)}))
+        else:
+            chain.run({"s1": range(30)})
+
+        members = [s2, *chain.replica_dict["s2"]]
+        assert [stage.get_name() for stage in members] == ["s2", "s2#1", "s2#2"]
+        assert sum(stage.get_counts()["tasks_succeeded"] for stage in members) == 30
+        assert s3.get_counts()["tasks_succeeded"] == 30
+
+        status = chain.get_status_snapshot()["status"]
+        assert list(status) == ["s1", "s2", "s3"]
+        assert status["s2"]["replicas"] == 3
+        assert status["s2"]["tasks_input"] == 30
+        assert status["s2"]["tasks_succeeded"] == 30
+        assert status["s3"]["tasks_input"] == 30
+        assert chain.get_status_snapshot()["edges"]["s2->s3"]["depth"] == 0
+
+    def test_round_robin_splits_evenly(self):
+        """round_robin 依次轮流分配，直接注入的任务同样轮流分配。"""
+        s1 = TaskStage("s1", add_one)
+        s2 = TaskStage("s2", double)
+        graph = TaskGraph("test_replicate_round_robin", graph_mode="thread")
+        graph.set_stages(stages=[s1, s2])
+        graph.connect([s1], [s2])
+        graph.replicate(s1, 2)
+        graph.replicate(s2, 3)
+
+        graph.run({"s1": range(12)})
+
+        s1_members = [s1, *graph.replica_dict["s1"]]
+        s2_members = [s2, *graph.replica_dict["s2"]]
+        assert [m.get_counts()["tasks_input"] for m in s1_members] == [6, 6]
+        # 每个上游实例各自轮流，6 个结果分给 3 个实例各 2 个
+        assert [m.get_counts()["tasks_input"] for m in s2_members] == [4, 4, 4]
+
+    def test_least_queued_balance(self):
+        """least_queued 按实例积压分配，全部任务都被处理。"""
+        s1 = TaskStage("s1", add_one)
+        s2 = TaskStage("s2", slow_identity)
+        graph = TaskGraph("test_replicate_least_queued", graph_mode="thread")
+        graph.set_stages(stages=[s1, s2])
+        graph.connect([s1], [s2])
+        graph.replicate(s2, 2, balance="least_queued")
+
+        graph.run({"s1": range(40)})
+
+        status = graph.get_status_snapshot()["status"]["s2"]
+        assert status["tasks_succeeded"] == 40
+        assert status["replicas"] == 2
+
+    def test_replicated_splitter(self):
+        """固定串行的拆分节点同样可以复制，下游计数覆盖全部拆分结果。"""
+        splitter = TaskSplitter("split")
+        sink = TaskStage("sink", add_one)
+        graph = TaskGraph("test_replicate_splitter", graph_mode="thread")
+        graph.set_stages(stages=[splitter, sink])
+        graph.connect([splitter], [sink])
+        graph.replicate(splitter, 2)
+
+        graph.run({"split": [(1, 2, 3)] * 10})
+
+        status = graph.get_status_snapshot()["status"]
+        assert status["split"]["tasks_succeeded"] == 10
+        assert status["sink"]["tasks_input"] == 30
+        assert status["sink"]["tasks_succeeded"] == 30
+
+    def test_restore_db_into_replicated_stage(self, tmp_path):
+        """thread 图模式恢复任务前先完成副本接线，注入的任务都计入逻辑节点。"""
+        sqlite_path = tmp_path / "fallback.sqlite3"
+        records = [
+            {"event_id": i, "stage": "s1", "status": "pending", "task_json": i}
+            for i in range(1, 31)
+        ]
+        assert append_records(sqlite_path, records) == 30
+
+        s1 = TaskStage("s1", add_one, max_queue_size=2)
+        s2 = TaskStage("s2", double)
+        graph = TaskGraph("test_replicate_restore_db", graph_mode="thread")
+        graph.set_stages(stages=[s1, s2])
+        graph.connect([s1], [s2])
+        graph.replicate(s1, 3)
+        graph.restore_db(sqlite_path, chunk_size=4)
+
+        status = graph.get_status_snapshot()["status"]
+        assert status["s1"]["tasks_input"] == 30
+        assert status["s1"]["tasks_succeeded"] == 30
+        assert status["s2"]["tasks_input"] == 30
+        assert status["s2"]["tasks_succeeded"] == 30
+
+    @pytest.mark.filterwarnings(
+        "ignore::pytest.PytestUnhandledThreadExceptionWarning"
+    )
+    def test_restore_db_stops_feeding_when_stage_dies(self, tmp_path):
+        """节点中途异常退出后，注入线程不再阻塞在有界队列上，restore_db 正常结束。"""
+        sqlite_path = tmp_path / "fallback.sqlite3"
+        records = [
+            {"event_id": i, "stage": "s1", "status": "pending", "task_json": i}
+            for i in range(1, 201)
+        ]
+        assert append_records(sqlite_path, records) == 200
+
+        s1 = TaskStage("s1", add_one, max_queue_size=2)
+        graph = TaskGraph("test_restore_db_stage_dies", graph_mode="thread")
+        graph.set_stages(stages=[s1])
+
+        queue_get = s1.task_queue.get
+        gets = 0
+
+        def dying_get():
+            nonlocal gets
+            gets += 1
+            if gets > 5:
+                raise RuntimeError("stage died")
+            return queue_get()
+
+        s1.task_queue.get = dying_get
+
+        errors: list[BaseException] = []
+
+        def restore():
+            try:
+                graph.restore_db(sqlite_path, chunk_size=10)
+            except BaseException as exception:
+                errors.append(exception)
+
+        runner = threading.Thread(target=restore, daemon=True)
+        runner.start()
+        runner.join(timeout=10)
+        assert not runner.is_alive()
+        assert not errors or isinstance(errors[0], ExceptionGroup)
+        # 节点退出后注入线程停止取块，剩余记录不再被读取
+        assert gets == 6
+
+    def test_structure_marks_replicas(self):
+        """结构输出在逻辑节点上记录实例总数。"""
+        s1, s2 = TaskStage("s1", add_one), TaskStage("s2", double)
+        chain = TaskChain("test_replicate_structure", [s1, s2])
+        chain.replicate(s2, 4)
+
+        structure = chain.get_structure_graph()
+        assert structure["replicas"] == {"s2": 4}
+        assert structure["nodes"]["s2"]["replicas"] == 4
+        assert list(structure["nodes"]) == ["s1", "s2"]
+        assert any("[Replicas:4]" in line for line in chain.get_structure_list())
+
+        chain.replicate(s2, 1)
+        assert chain.get_structure_graph()["replicas"] == {}
+
+    def test_replicate_validation(self):
+        """非法的节点、实例数与负载均衡策略都会报错。"""
+        s1, s2 = TaskStage("s1", add_one), TaskStage("s2", double)
+        chain = TaskChain("test_replicate_invalid", [s1])
+
+        with pytest.raises(NodeNotFoundError):
+            chain.replicate(s2, 2)
+        with pytest.raises(ConfigurationError, match="replica count"):
+            chain.replicate(s1, 0)
+        with pytest.raises(InvalidOptionError):
+            chain.replicate(s1, 2, balance="random")
+
+        chain.run({"s1": range(3)})
+        with pytest.raises(RuntimeStateError):
+            chain.replicate(s1, 2)
+
+    def test_replicate_by_partition_key(self):
+        """设置了分区键的节点默认按键分配，同一个键只由一个实例处理。"""
+        owners: dict[int, set[str]] = {}
+        lock = threading.Lock()
+
+        def record(x: int) -> int:
+            name = threading.current_thread().name
+            with lock:
+                owners.setdefault(x % 7, set()).add(name)
+            return x
+
+        s1 = TaskStage("s1", add_one, execution_mode="thread", max_workers=4)
+        s2 = TaskStage("s2", record, partition_key=lambda x: x % 7)
+        graph = TaskGraph("test_replicate_partition", graph_mode="thread")
+        graph.set_stages(stages=[s1, s2])
+        graph.connect([s1], [s2])
+        graph.replicate(s1, 2)
+        graph.replicate(s2, 3)
+
+        graph.run({"s1": range(70), "s2": range(100, 170)})
+
+        assert graph.replica_balance["s2"] == "key"
+        status = graph.get_status_snapshot()["status"]["s2"]
+        assert status["tasks_succeeded"] == 140
+        # 'thread' 图模式下各实例在以节点名命名的线程中执行
+        assert all(len(names) == 1 for names in owners.values())
+
+    def test_replicate_partition_key_error_fails_task(self):
+        """分区键函数抛出异常的任务记为失败，不再按轮转分给某个实例。"""
+
+        def key(x: int) -> int:
+            if x % 10 == 0:
+                raise ValueError("bad key")
+            return x % 7
+
+        s1 = TaskStage("s1", add_one, execution_mode="thread", max_workers=2)
+        s2 = TaskStage("s2", add_one, partition_key=key)
+        graph = TaskGraph("test_replicate_partition_error", graph_mode="thread")
+        graph.set_stages(stages=[s1, s2])
+        # 限制容量的边上失败的信封同样需要归还额度，否则在第 2 次失败后阻塞
+        graph.connect([s1], [s2], capacity=2)
+        graph.replicate(s2, 3)
+
+        # s1 输出 1..40，其中 10/20/30/40 分区失败；直接注入的 100/110 同样失败
+        graph.run({"s1": range(40), "s2": [100, 101, 110]})
+
+        status = graph.get_status_snapshot()["status"]["s2"]
+        assert status["tasks_input"] == 43
+        assert status["tasks_failed"] == 6
+        assert status["tasks_succeeded"] == 37
+
+    def test_replicate_key_requires_partition_key(self):
+        """未设置分区键的节点不能使用 'key' 策略。"""
+        s1 = TaskStage("s1", add_one)
+        chain = TaskChain("test_replicate_key_invalid", [s1])
+        with pytest.raises(ConfigurationError, match="partition_key"):
+            chain.replicate(s1, 2, balance="key")
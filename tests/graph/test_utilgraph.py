@@ -1,6 +1,11 @@
 from __future__ import annotations
 
-from celestialflow.graph.util_graph import OrderGraph, compute_node_levels, source_nodes
+from celestialflow.graph.util_graph import (
+    OrderGraph,
+    compute_node_levels,
+    linear_chains,
+    source_nodes,
+)
 
 
 def _make_graph(edges: dict[str, list[str]]) -> OrderGraph:
@@ -117,3 +122,32 @@ class TestFindSourceNodes:
         )
         sources = source_nodes(graph)
         assert sources == ["Center"]
+
+
+# ====================
+# TestLinearChains
+# ====================
+class TestLinearChains:
+    def test_linear(self):
+        """单入单出的线性链整体融合"""
+        graph = _make_graph({"A": ["B"], "B": ["C"], "C": []})
+        assert linear_chains(graph, lambda u, v: True) == [["A", "B", "C"]]
+
+    def test_branch_and_merge_break_chain(self):
+        """分叉与汇合处切断链"""
+        graph = _make_graph(
+            {"A": ["B"], "B": ["C", "D"], "C": ["E"], "D": ["E"], "E": ["F"], "F": []}
+        )
+        chains = linear_chains(graph, lambda u, v: True)
+        assert sorted(chains) == [["A", "B"], ["E", "F"]]
+
+    def test_predicate_breaks_chain(self):
+        """谓词拒绝的边切断链"""
+        graph = _make_graph({"A": ["B"], "B": ["C"], "C": ["D"], "D": []})
+        chains = linear_chains(graph, lambda u, v: (u, v) != ("B", "C"))
+        assert sorted(chains) == [["A", "B"], ["C", "D"]]
+
+    def test_pure_cycle_not_fused(self):
+        """纯环上没有链首，不做融合"""
+        graph = _make_graph({"A": ["B"], "B": ["C"], "C": ["A"]})
+        assert linear_chains(graph, lambda u, v: True) == []
@@ -0,0 +1,144 @@
+import pytest
+
+from celestialflow.persistence.core_fallback import FallbackInlet, FallbackSpout
+from celestialflow.persistence.util_catalog import (
+    list_catalog_files,
+    query_catalog_records,
+    rebuild_catalog,
+    register_fallback_file,
+)
+from celestialflow.persistence.util_sqlite import append_records
+
+
+def _failed(event_id, ts, stage="s1", error_type="ValueError"):
+    return {
+        "event_id": event_id,
+        "ts": ts,
+        "stage": stage,
+        "status": "failed",
+        "error_type": error_type,
+        "error_message": f"bad {event_id}",
+        "task_json": {"value": event_id},
+    }
+
+
+def _make_db(root, name, records):
+    db_path = root / "2026-01-01" / f"fallback({name}).sqlite3"
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    append_records(db_path, records)
+    return db_path
+
+
+class TestFallbackCatalog:
+    def test_list_prunes_by_stage_and_time(self, tmp_path):
+        """catalog 应仅依据汇总信息筛选出可能命中的文件。"""
+        catalog = tmp_path / "catalog.sqlite3"
+        db_a = _make_db(tmp_path, "a", [_failed(1, 100.0), _failed(2, 200.0)])
+        db_b = _make_db(tmp_path, "b", [_failed(3, 300.0, stage="s2")])
+        register_fallback_file(db_a, "g@1", catalog)
+        register_fallback_file(db_b, "g@2", catalog)
+
+        files = list_catalog_files(stage="s1", catalog_path=catalog)
+        assert [f["path"] for f in files] == [str(db_a.resolve())]
+        assert files[0]["graph_id"] == "g@1"
+        assert files[0]["count"] == 2
+
+        assert list_catalog_files(since=250.0, catalog_path=catalog)[0]["graph_id"] == "g@2"
+        assert list_catalog_files(until=50.0, catalog_path=catalog) == []
+        assert len(list_catalog_files(status="failed", catalog_path=catalog)) == 2
+
+    def test_query_merges_and_paginates(self, tmp_path):
+        """跨文件查询结果应按时间归并，并正确分页与标注来源。"""
+        catalog = tmp_path / "catalog.sqlite3"
+        db_a = _make_db(tmp_path, "a", [_failed(1, 1.0), _failed(2, 3.0)])
+        db_b = _make_db(tmp_path, "b", [_failed(3, 2.0), _failed(4, 4.0)])
+        _make_db(tmp_path, "c", [_failed(5, 5.0, stage="other")])
+        rebuild_catalog(tmp_path, catalog)
+
+        page1, cursor = query_catalog_records("s1", page_size=3, catalog_path=catalog)
+        assert [item["event_id"] for item in page1] == [4, 2, 3]
+        assert page1[0]["db_path"] == str(db_b.resolve())
+        assert cursor is not None
+
+        page2, cursor = query_catalog_records(
+            "s1", cursor=cursor, page_size=3, catalog_path=catalog
+        )
+        assert [item["event_id"] for item in page2] == [1]
+        assert page2[0]["db_path"] == str(db_a.resolve())
+        assert cursor is None
+
+        items, _ = query_catalog_records(
+            "s1", since=2.0, until=3.0, sort_order="oldest", catalog_path=catalog
+        )
+        assert [item["event_id"] for item in items] == [3, 2]
+
+    @pytest.mark.parametrize("sort_order", ["newest", "oldest"])
+    def test_query_cursor_walks_ties_across_files(self, tmp_path, sort_order):
+        """跨文件游标在时间戳相同时按路径与 id 续读，无重复、无遗漏。"""
+        catalog = tmp_path / "catalog.sqlite3"
+        _make_db(tmp_path, "a", [_failed(i, float(i // 4)) for i in range(1, 11)])
+        _make_db(tmp_path, "b", [_failed(i, float(i // 4)) for i in range(11, 21)])
+        rebuild_catalog(tmp_path, catalog)
+
+        seen, cursor = [], None
+        while True:
+            items, cursor = query_catalog_records(
+                "s1",
+                cursor=cursor,
+                page_size=3,
+                sort_order=sort_order,
+                catalog_path=catalog,
+            )
+            seen.extend((item["ts"], item["db_path"], item["id"]) for item in items)
+            if cursor is None:
+                break
+
+        assert len(seen) == 20
+        assert seen == sorted(seen, reverse=sort_order == "newest")
+
+    def test_query_rejects_invalid_cursor(self, tmp_path):
+        """非本函数生成的游标应报错。"""
+        catalog = tmp_path / "catalog.sqlite3"
+        _make_db(tmp_path, "a", [_failed(1, 1.0)])
+        rebuild_catalog(tmp_path, catalog)
+
+        with pytest.raises(ValueError, match="invalid catalog cursor"):
+            query_catalog_records("s1", cursor="not-a-cursor", catalog_path=catalog)
+
+    def test_rebuild_drops_missing_files(self, tmp_path):
+        """重建 catalog 时应移除已删除的文件并保留已有 graph_id。"""
+        catalog = tmp_path / "catalog.sqlite3"
+        db_a = _make_db(tmp_path, "a", [_failed(1, 1.0)])
+        db_b = _make_db(tmp_path, "b", [_failed(2, 2.0)])
+        register_fallback_file(db_a, "g@1", catalog)
+        register_fallback_file(db_b, "g@2", catalog)
+
+        db_b.unlink()
+        assert rebuild_catalog(tmp_path, catalog) == 1
+
+        files = list_catalog_files(catalog_path=catalog)
+        assert [(f["path"], f["graph_id"]) for f in files] == [
+            (str(db_a.resolve()), "g@1")
+        ]
+
+    def test_spout_registers_on_stop(self, tmp_path, monkeypatch):
+        """FallbackSpout 停止时应把本次文件登记到 catalog。"""
+        monkeypatch.chdir(tmp_path)
+
+        spout = FallbackSpout()
+        inlet = FallbackInlet().bind_spout(spout)
+
+        spout.start()
+        spout.set_graph_id("demo@1")
+        try:
+            inlet.task_in("s1", event_id=1, task="data1")
+            inlet.task_fail(event_id=1, error_id=2, error=ValueError("oops"))
+        finally:
+            spout.stop()
+
+        items, cursor = query_catalog_records(
+            "s1", catalog_path=tmp_path / "fallbacks" / "catalog.sqlite3"
+        )
+        assert cursor is None
+        assert [item["task_json"] for item in items] == ["data1"]
+        assert items[0]["graph_id"] == "demo@1"
@@ -0,0 +1,96 @@
+from dataclasses import dataclass
+
+import pytest
+
+from celestialflow.persistence.core_fallback import FallbackInlet, FallbackSpout
+from celestialflow.persistence.util_codec import (
+    decode_payload,
+    encode_payload,
+    get_codec,
+)
+from celestialflow.persistence.util_sqlite import (
+    load_records,
+    load_tasks_grouped_by_stage,
+)
+from celestialflow.runtime.util_errors import InvalidOptionError
+
+
+@dataclass
+class Point:
+    x: int
+    y: int
+
+
+class TestPayloadCodec:
+    def test_json_stays_text(self):
+        """默认 json 编解码器应保持历史 TEXT 格式。"""
+        encoded = encode_payload({"a": [1, 2]})
+        assert encoded == '{"a": [1, 2]}'
+        assert decode_payload(encoded) == {"a": [1, 2]}
+
+    def test_json_zlib_threshold(self):
+        """json-zlib 仅在超过阈值时压缩为 BLOB。"""
+        codec = get_codec("json-zlib")
+        assert isinstance(codec.encode("short"), str)
+
+        payload = ["x" * 64] * 64
+        encoded = codec.encode(payload)
+        assert isinstance(encoded, bytes)
+        assert len(encoded) < len(str(payload))
+        assert decode_payload(encoded) == payload
+
+    def test_json_zlib_threshold_counts_bytes(self):
+        """压缩阈值按 UTF-8 编码后的字节数计算。"""
+        codec = get_codec("json-zlib")
+        # 400 个汉字约 1200 字节，字符数低于阈值但字节数超过阈值
+        payload = "汉" * 400
+        assert isinstance(codec.encode(payload), bytes)
+
+    def test_pickle_prepare_snapshots_value(self):
+        """pickle 编解码器在 prepare 时序列化，之后的修改不影响落盘内容。"""
+        codec = get_codec("pickle")
+        value = {"items": [1]}
+        prepared = codec.prepare(value)
+        value["items"].append(2)
+        assert decode_payload(codec.encode(prepared)) == {"items": [1]}
+
+    def test_pickle_is_lossless(self):
+        """pickle 编解码器应无损还原任意对象。"""
+        codec = get_codec("pickle")
+        value = (Point(1, 2), {3, 4}, b"raw")
+        assert decode_payload(codec.encode(codec.prepare(value))) == value
+
+    def test_msgpack_roundtrip(self):
+        """msgpack 编解码器应能往返 JSON 友好结构。"""
+        _ = pytest.importorskip("msgpack")
+        codec = get_codec("msgpack")
+        value = {"a": [1, 2.5, None, "s"]}
+        assert decode_payload(codec.encode(codec.prepare(value))) == value
+
+    def test_unknown_codec(self):
+        """未注册的编解码器名称应抛出 InvalidOptionError。"""
+        with pytest.raises(InvalidOptionError):
+            FallbackSpout(codec="yaml")
+        with pytest.raises(ValueError):
+            decode_payload(b"\xffdata")
+
+    @pytest.mark.parametrize("engine", ["sqlite", "segment"])
+    def test_pickle_codec_restores_dataclass(self, tmp_path, monkeypatch, engine):
+        """pickle 编解码器下 restore 读回的任务应保持原类型。"""
+        monkeypatch.chdir(tmp_path)
+        spout = FallbackSpout(engine=engine, codec="pickle")
+        inlet = FallbackInlet().bind_spout(spout)
+
+        spout.start()
+        try:
+            inlet.task_in("s1", event_id=1, task=Point(1, 2))
+            inlet.task_fail(event_id=1, error_id=2, error=ValueError("bad"))
+            inlet.task_in("s2", event_id=3, task=Point(3, 4))
+            inlet.task_success(event_id=3, result=Point(5, 6), persist=True)
+        finally:
+            spout.stop()
+
+        grouped = load_tasks_grouped_by_stage(str(spout.db_path))
+        assert grouped["s1"][0]["task_json"] == Point(1, 2)
+        assert load_records(str(spout.db_path))[0]["task_json"] == Point(1, 2)
+        assert spout.get_task_result_pairs("s2") == [(Point(3, 4), Point(5, 6))]
@@ -45,14 +45,19 @@ class TestFailPersistence:
                 ORDER BY id ASC
                 """
             ).fetchall()
+            error_rows = conn.execute(
+                "SELECT stage, error_type, message, count FROM errors"
+            ).fetchall()
         finally:
             conn.close()
 
         assert [row[0] for row in rows] == [21, 2]
+        # 与归并样本相同的错误消息只保存在 errors 表中。
         assert [row[2:] for row in rows] == [
-            ("s1", "failed", "ValueError", "oops", '"data1"', 'null'),
+            ("s1", "failed", "ValueError", "", '"data1"', 'null'),
             ("s2", "success", "", "", '"data2"', '"ok2"'),
         ]
+        assert error_rows == [("s1", "ValueError", "oops", 1)]
         assert rows[0][1] > 0
         assert rows[1][1] > 0
 
@@ -0,0 +1,204 @@
+import os
+import time
+
+import pytest
+
+from celestialflow.persistence import FunnelContext, funnel_scope
+from celestialflow.persistence.core_maintenance import (
+    MaintenancePolicy,
+    MaintenanceWorker,
+    run_maintenance,
+)
+from celestialflow.persistence.util_catalog import (
+    list_catalog_files,
+    register_fallback_file,
+)
+from celestialflow.persistence.util_sqlite import (
+    append_records,
+    connect_db,
+    load_records,
+)
+from celestialflow.runtime.util_errors import ConfigurationError
+from tests.conftest import wait_until
+
+_DAY = 24 * 60 * 60
+
+
+def _make_db(root, name, event_ids, stage="s1", age_days=1.0):
+    db_path = root / "fallbacks" / "2026-01-01" / f"fallback({name}).sqlite3"
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    append_records(
+        db_path,
+        [
+            {
+                "event_id": event_id,
+                "ts": float(event_id),
+                "stage": stage,
+                "status": "failed",
+                "error_type": "ValueError",
+                "error_message": f"bad {event_id}",
+                "task_json": {"value": event_id},
+            }
+            for event_id in event_ids
+        ],
+    )
+    _set_age(db_path, age_days)
+    return db_path
+
+
+def _set_age(path, age_days):
+    mtime = time.time() - age_days * _DAY
+    os.utime(path, (mtime, mtime))
+    for suffix in ("-wal", "-shm"):
+        sidecar = path.with_name(path.name + suffix)
+        if sidecar.exists():
+            os.utime(sidecar, (mtime, mtime))
+
+
+def _policy(**kwargs):
+    values = {
+        "max_age_days": None,
+        "archive_after_days": None,
+        "merge_below_kb": None,
+        "min_idle_seconds": 60,
+    }
+    values.update(kwargs)
+    return MaintenancePolicy(**values)
+
+
+class TestMaintenance:
+    def test_compact_reclaims_deleted_pages(self, tmp_path):
+        """压实应回收 pending 记录删除后残留的空闲页，并保持文件年龄。"""
+        db_path = _make_db(tmp_path, "a", [1])
+        conn = connect_db(db_path)
+        try:
+            _ = conn.executemany(
+                "INSERT INTO records (event_id, ts, stage, status, task_json) "
+                "VALUES (?, 0, 's1', 'pending', ?)",
+                [(i, "x" * 512) for i in range(100, 2100)],
+            )
+            conn.commit()
+            _ = conn.execute("DELETE FROM records WHERE status = 'pending'")
+            conn.commit()
+        finally:
+            conn.close()
+        _set_age(db_path, 1.0)
+        mtime = db_path.stat().st_mtime
+
+        stats = run_maintenance(
+            tmp_path / "fallbacks", tmp_path / "logs", _policy()
+        )
+
+        assert stats["compacted"] == 1
+        assert stats["reclaimed_bytes"] > 512 * 1000
+        assert db_path.stat().st_mtime == pytest.approx(mtime)
+        assert [r["event_id"] for r in load_records(str(db_path))] == [1]
+
+    def test_merge_small_files(self, tmp_path):
+        """同一日期目录下的小文件应合并，冲突的 event_id 应整体平移。"""
+        catalog = tmp_path / "fallbacks" / "catalog.sqlite3"
+        db_a = _make_db(tmp_path, "a", [1, 2])
+        db_b = _make_db(tmp_path, "b", [2, 3])
+        register_fallback_file(db_a, "g@1", catalog)
+        register_fallback_file(db_b, "g@2", catalog)
+        _set_age(db_a, 1.0)
+        _set_age(db_b, 1.0)
+
+        stats = run_maintenance(
+            tmp_path / "fallbacks", tmp_path / "logs", _policy(merge_below_kb=1024)
+        )
+
+        assert stats["merged"] == 1
+        assert not db_b.exists()
+        records = load_records(str(db_a))
+        assert sorted(r["event_id"] for r in records) == [1, 2, 3, 4]
+        assert sorted(r["error_message"] for r in records) == [
+            "bad 1",
+            "bad 2",
+            "bad 2",
+            "bad 3",
+        ]
+
+        files = list_catalog_files(catalog_path=catalog)
+        assert [(f["path"], f["graph_id"], f["count"]) for f in files] == [
+            (str(db_a.resolve()), "g@1,g@2", 4)
+        ]
+        assert list_catalog_files(graph_id="g@2", catalog_path=catalog)
+
+    def test_archive_and_delete_by_age(self, tmp_path):
+        """超过归档天数的文件应 gzip 归档，超过保留天数的文件应删除。"""
+        old = _make_db(tmp_path, "old", [1], age_days=40)
+        warm = _make_db(tmp_path, "warm", [2], age_days=10)
+        fresh = _make_db(tmp_path, "fresh", [3], age_days=0)
+
+        log_dir = tmp_path / "logs"
+        log_dir.mkdir()
+        old_log = log_dir / "task_logger(2026-01-01).log"
+        _ = old_log.write_text("line\n" * 100, encoding="utf-8")
+        _set_age(old_log, 10)
+
+        stats = run_maintenance(
+            tmp_path / "fallbacks",
+            log_dir,
+            _policy(max_age_days=30, archive_after_days=7),
+        )
+
+        assert stats["deleted"] == 1
+        assert stats["archived"] == 2
+        assert not old.exists()
+        assert not warm.exists()
+        assert warm.with_name(warm.name + ".gz").exists()
+        assert old_log.with_name(old_log.name + ".gz").exists()
+        # 最近修改的文件视为活跃，不做任何处理。
+        assert fresh.exists()
+
+    def test_skips_files_of_running_contexts(self, tmp_path):
+        """任一运行中的 funnel 上下文正在写入的文件都不应被删除。"""
+        funnel = FunnelContext("maintenance")
+        with funnel_scope(funnel):
+            db_path = funnel.fallback_spout.db_path
+            assert db_path is not None
+            _set_age(db_path, 40)
+
+            stats = run_maintenance(
+                tmp_path / "fallbacks", tmp_path / "logs", _policy(max_age_days=30)
+            )
+
+            assert stats["deleted"] == 0
+            assert db_path.exists()
+
+    def test_size_cap_deletes_oldest(self, tmp_path):
+        """超过总大小上限时应从最旧的文件开始删除。"""
+        oldest = _make_db(tmp_path, "a", [1], age_days=3)
+        newest = _make_db(tmp_path, "b", [2], age_days=1)
+
+        _ = run_maintenance(
+            tmp_path / "fallbacks",
+            tmp_path / "logs",
+            _policy(max_total_mb=(newest.stat().st_size + 1) / (1024 * 1024)),
+        )
+
+        assert not oldest.exists()
+        assert newest.exists()
+
+    def test_worker_runs_in_background(self, tmp_path):
+        """后台维护线程启动后应立即执行一轮维护。"""
+        old = _make_db(tmp_path, "old", [1], age_days=40)
+        worker = MaintenanceWorker(
+            interval=60,
+            fallback_root=tmp_path / "fallbacks",
+            log_root=tmp_path / "logs",
+            policy=_policy(max_age_days=30),
+        )
+        worker.start()
+        try:
+            wait_until(lambda: not old.exists())
+        finally:
+            worker.stop()
+
+    def test_invalid_policy(self):
+        """非法维护策略应抛出 ConfigurationError。"""
+        with pytest.raises(ConfigurationError):
+            MaintenancePolicy(max_age_days=-1)
+        with pytest.raises(ConfigurationError):
+            MaintenancePolicy(max_age_days=7, archive_after_days=7)
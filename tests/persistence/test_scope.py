@@ -6,7 +6,9 @@ from queue import Empty
 import pytest
 
 from celestialflow.persistence import (
+    FunnelContext,
     funnel_scope,
+    get_default_funnel,
     get_fallback_inlet,
     get_fallback_spout,
     get_log_inlet,
@@ -134,18 +136,93 @@ class TestFunnelScope:
         assert get_log_spout()._thread is None
         assert get_fallback_spout()._thread is None
 
-    def test_funnel_scope_does_not_claim_nested_reuse(
+    def test_funnel_scope_nested_reuse(
         self, tmp_path, monkeypatch: pytest.MonkeyPatch
     ) -> None:
-        """当前 `funnel_scope()` 为单层作用域，不验证嵌套复用语义。"""
+        """嵌套的 `funnel_scope()` 应复用同一组 spout，仅最外层退出时停止。"""
         monkeypatch.chdir(tmp_path)
 
         with funnel_scope():
-            get_log_inlet().start_graph("scope_graph", ["single layer"])
-            wait_until(
-                lambda: get_log_spout().log_path is not None,
-                message="timeout waiting for log scope to initialize",
-            )
+            outer_log_thread = get_log_spout()._thread
+            with funnel_scope():
+                assert get_log_spout()._thread is outer_log_thread
+                assert get_default_funnel().get_depth() == 2
 
+            assert get_log_spout()._thread is outer_log_thread
+            assert outer_log_thread is not None
+            assert outer_log_thread.is_alive()
+
+        assert get_default_funnel().get_depth() == 0
         assert get_log_spout()._thread is None
         assert get_fallback_spout()._thread is None
+
+
+class TestFunnelContext:
+    def test_default_funnel_wraps_global_spouts(self) -> None:
+        """默认上下文应包装全局 spout 与 inlet 单例。"""
+        funnel = get_default_funnel()
+
+        assert funnel.fallback_spout is get_fallback_spout()
+        assert funnel.fallback_inlet is get_fallback_inlet()
+        assert funnel.log_spout is get_log_spout()
+        assert funnel.log_inlet is get_log_inlet()
+
+    def test_independent_contexts_write_separate_files(
+        self, tmp_path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """两个独立上下文应各自启停 spout，并写入互不相同的文件。"""
+        monkeypatch.chdir(tmp_path)
+        funnel_a = FunnelContext("graph/a")
+        funnel_b = FunnelContext("graph b")
+
+        with funnel_scope(funnel_a):
+            with funnel_scope(funnel_b):
+                funnel_a.fallback_inlet.task_in("stage_a", event_id=1, task="a")
+                funnel_b.fallback_inlet.task_in("stage_b", event_id=1, task="b")
+                funnel_a.log_inlet.start_graph("graph_a", ["from a"])
+                funnel_b.log_inlet.start_graph("graph_b", ["from b"])
+            assert funnel_b.fallback_spout._thread is None
+            assert funnel_a.fallback_spout.is_running()
+            assert get_fallback_spout()._thread is None
+
+        path_a = funnel_a.fallback_spout.db_path
+        path_b = funnel_b.fallback_spout.db_path
+        assert path_a is not None and path_b is not None
+        assert path_a != path_b
+        assert path_a.name.endswith("@graph_a).sqlite3")
+        assert path_b.name.endswith("@graph_b).sqlite3")
+
+        for path, stage in ((path_a, "stage_a"), (path_b, "stage_b")):
+            conn = sqlite3.connect(path)
+            try:
+                rows = conn.execute("SELECT stage FROM records").fetchall()
+            finally:
+                conn.close()
+            assert rows == [(stage,)]
+
+        log_a = funnel_a.log_spout.log_path
+        log_b = funnel_b.log_spout.log_path
+        assert log_a is not None and log_b is not None
+        assert log_a != log_b
+        assert "from a" in log_a.read_text(encoding="utf-8")
+        assert "from a" not in log_b.read_text(encoding="utf-8")
+
+    def test_unnamed_contexts_use_distinct_files(
+        self, tmp_path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """未命名上下文以上下文编号区分文件，日志与 fallback 文件互不相同。"""
+        monkeypatch.chdir(tmp_path)
+        funnel_a = FunnelContext()
+        funnel_b = FunnelContext()
+        assert funnel_a.context_id != funnel_b.context_id
+
+        with funnel_scope(funnel_a), funnel_scope(funnel_b):
+            path_a = funnel_a.fallback_spout.db_path
+            path_b = funnel_b.fallback_spout.db_path
+            log_a = funnel_a.log_spout.log_path
+            log_b = funnel_b.log_spout.log_path
+
+        assert path_a is not None and path_b is not None
+        assert path_a != path_b
+        assert path_a.name.endswith(f"@ctx{funnel_a.context_id}).sqlite3")
+        assert log_a != log_b
@@ -0,0 +1,125 @@
+import sqlite3
+
+import pytest
+
+from celestialflow.persistence.core_fallback import FallbackInlet, FallbackSpout
+from celestialflow.persistence.util_segment import (
+    SegmentLog,
+    compact_segment_dir,
+    iter_segment_records,
+)
+from celestialflow.persistence.util_sqlite import load_records
+from celestialflow.runtime.util_errors import InvalidOptionError
+from tests.conftest import wait_until
+
+
+def _insert_op(event_id, stage="s1", task="data"):
+    return {
+        "__op__": "insert",
+        "record": {
+            "event_id": event_id,
+            "ts": 1.0,
+            "stage": stage,
+            "status": "pending",
+            "task_json": task,
+        },
+    }
+
+
+class TestSegmentEngine:
+    def test_segment_engine_matches_sqlite_engine(self, tmp_path, monkeypatch):
+        """segment 引擎压实后的 records 表应与 sqlite 引擎一致。"""
+        monkeypatch.chdir(tmp_path)
+
+        spout = FallbackSpout(engine="segment")
+        inlet = FallbackInlet().bind_spout(spout)
+
+        spout.start()
+        try:
+            inlet.task_in("s1", event_id=1, task="data1")
+            inlet.task_retry(event_id=1, retry_id=11)
+            inlet.task_fail(event_id=11, error_id=21, error=ValueError("oops"))
+
+            inlet.task_in("s2", event_id=2, task="data2")
+            inlet.task_success(event_id=2, result="ok2", persist=True)
+
+            inlet.task_in("s3", event_id=3, task="data3")
+            inlet.task_duplicate(event_id=3)
+        finally:
+            spout.stop()
+
+        assert spout.db_path is not None
+        assert not spout.db_path.with_suffix(".segments").exists()
+
+        assert spout.get_task_error_pairs("s1") == [("data1", ("ValueError", "oops"))]
+        assert spout.get_task_result_pairs("s2") == [("data2", "ok2")]
+
+        conn = sqlite3.connect(spout.db_path)
+        try:
+            rows = conn.execute(
+                "SELECT event_id, stage, status FROM records ORDER BY id ASC"
+            ).fetchall()
+        finally:
+            conn.close()
+        assert rows == [(21, "s1", "failed"), (2, "s2", "success")]
+
+    def test_background_compaction(self, tmp_path):
+        """后台线程应按时间封存并压实分段，运行期间即可读到记录。"""
+        db_path = tmp_path / "fallback.sqlite3"
+        log = SegmentLog(tmp_path / "segments", db_path, compact_interval=0.05)
+        log.open()
+        try:
+            log.append(_insert_op(1))
+            log.append(_insert_op(2))
+            wait_until(lambda: len(load_records(str(db_path), "pending")) == 2)
+        finally:
+            log.close()
+        assert not (tmp_path / "segments").exists()
+
+    def test_rotation_by_size(self, tmp_path):
+        """超过分段大小上限时应切换到新分段。"""
+        segment_dir = tmp_path / "segments"
+        log = SegmentLog(
+            segment_dir,
+            tmp_path / "fallback.sqlite3",
+            segment_max_bytes=1,
+            compact_interval=60,
+        )
+        log.open()
+        try:
+            for event_id in range(3):
+                log.append(_insert_op(event_id))
+            assert log.get_sealed_count() == 3
+            assert sorted(p.name for p in segment_dir.iterdir()) == [
+                "segment-00000001.log",
+                "segment-00000002.log",
+                "segment-00000003.log",
+            ]
+        finally:
+            log.close()
+        assert len(load_records(str(tmp_path / "fallback.sqlite3"), "pending")) == 3
+
+    def test_recover_truncated_segment(self, tmp_path):
+        """恢复时应回放残留分段并忽略末尾半帧。"""
+        segment_dir = tmp_path / "segments"
+        db_path = tmp_path / "fallback.sqlite3"
+        segment_dir.mkdir()
+        log = SegmentLog(segment_dir, db_path)
+        log.append(_insert_op(1))
+        log.append(_insert_op(2))
+
+        # 模拟进程崩溃：不经 close 直接截断最后一帧。
+        segment_path = segment_dir / "segment-00000001.log"
+        data = segment_path.read_bytes()
+        log._file.close()
+        segment_path.write_bytes(data[:-3])
+
+        assert [r["record"]["event_id"] for r in iter_segment_records(segment_path)] == [1]
+        assert compact_segment_dir(segment_dir, db_path) == 1
+        assert [r["event_id"] for r in load_records(str(db_path), "pending")] == [1]
+        assert not segment_dir.exists()
+
+    def test_invalid_engine(self):
+        """非法引擎名称应抛出 InvalidOptionError。"""
+        with pytest.raises(InvalidOptionError):
+            FallbackSpout(engine="rocksdb")
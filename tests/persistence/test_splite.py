@@ -1,21 +1,30 @@
 import json
+import sqlite3
 
 import pytest
 
 from celestialflow.persistence.util_sqlite import (
+    SCHEMA_VERSION,
     append_records,
+    apply_fallback_ops,
     clear_records,
+    close_read_connections,
     connect_db,
     delete_record_by_event_id,
+    fingerprint_error_message,
     get_max_event_id_in_fail,
     insert_record,
+    iter_stage_task_chunks,
     load_records,
     load_records_after_event_id_in_fail,
     load_task_error_records,
     load_task_result_records,
     normalize_record,
+    query_error_groups,
     query_error_type_counts,
     query_records,
+    query_records_by_cursor,
+    read_connection,
     promote_record_to_failed_by_event_id,
     promote_record_to_success_by_event_id,
     update_record_event_id_by_event_id,
@@ -88,6 +97,8 @@ class TestSpliteUtils:
         assert "records" in table_names
         assert "idx_records_event_id" in index_names
         assert "idx_records_status_id" in index_names
+        assert "idx_records_stage_status_id" in index_names
+        assert "idx_records_status_ts_id" in index_names
         assert any(row[1] == "idx_records_event_id" and row[2] == 1 for row in index_list)
         assert [row[1] for row in result_info] == [
             "id",
@@ -99,6 +110,9 @@ class TestSpliteUtils:
             "error_message",
             "task_json",
             "result_json",
+            "error_ref",
+            "error_prefix",
+            "error_suffix",
         ]
         assert any(row[1] == "result_json" for row in result_info)
 
@@ -507,3 +521,341 @@ class TestSpliteUtils:
         assert updated is True
         pairs = load_task_result_records(sqlite_path, "s8")
         assert pairs == [({"value": 8}, {"ok": True, "value": [1, 2, 3]})]
+
+    @pytest.mark.parametrize("decode_workers", [0, 2])
+    def test_iter_stage_task_chunks(self, sqlite_path, decode_workers):
+        """测试按 stage 分块流式读取任务，并按错误类型过滤 failed 记录。"""
+        records = [
+            {
+                "event_id": i,
+                "stage": "s1" if i % 2 else "s2",
+                "status": "pending" if i % 3 == 0 else "failed",
+                "error_type": "ValueError" if i % 4 == 1 else "TypeError",
+                "task_json": i,
+            }
+            for i in range(1, 21)
+        ]
+        assert append_records(sqlite_path, records) == 20
+
+        chunks = list(
+            iter_stage_task_chunks(
+                sqlite_path, "s1", chunk_size=3, decode_workers=decode_workers
+            )
+        )
+        assert [len(chunk) for chunk in chunks] == [3, 3, 3, 1]
+        assert [task for chunk in chunks for task in chunk] == list(range(1, 21, 2))
+
+        filtered = iter_stage_task_chunks(
+            sqlite_path,
+            "s1",
+            error_types={"ValueError"},
+            decode_workers=decode_workers,
+        )
+        # 仅保留 ValueError 的 failed 记录以及全部 pending 记录。
+        assert [task for chunk in filtered for task in chunk] == [1, 3, 5, 9, 13, 15, 17]
+        assert list(iter_stage_task_chunks(sqlite_path, "s1", statuses=())) == []
+
+    def test_read_connection_is_cached_and_read_only(self, sqlite_path, sample_errors):
+        """测试只读连接按路径复用、不可写，且能看到其他连接的新写入。"""
+        connect_db(sqlite_path).close()
+        with read_connection(sqlite_path) as first:
+            pass
+        with read_connection(sqlite_path) as second:
+            assert second is first
+            with pytest.raises(sqlite3.OperationalError, match="readonly"):
+                second.execute("DELETE FROM records")
+
+        assert load_records(sqlite_path) == []
+        assert append_records(sqlite_path, sample_errors) == 3
+        assert len(load_records(sqlite_path)) == 3
+
+        close_read_connections(sqlite_path)
+        with pytest.raises(sqlite3.ProgrammingError):
+            first.execute("SELECT 1")
+        with read_connection(sqlite_path) as reopened:
+            assert reopened is not first
+
+    def test_read_missing_db_does_not_create_file(self, tmp_path):
+        """测试读取不存在的数据库返回空结果，且不会创建文件或目录。"""
+        missing = tmp_path / "absent" / "fallback.sqlite3"
+
+        assert load_records(missing) == []
+        assert list(iter_stage_task_chunks(missing, "s1")) == []
+        assert not missing.parent.exists()
+
+    def test_read_does_not_write_current_schema(self, sqlite_path, sample_errors):
+        """测试表结构已是最新版本时，首次读取不会修改数据库文件。"""
+        assert append_records(sqlite_path, sample_errors) == 3
+        close_read_connections(sqlite_path)
+        before = sqlite_path.stat().st_mtime_ns
+
+        assert len(load_records(sqlite_path)) == 3
+        assert sqlite_path.stat().st_mtime_ns == before
+
+    def test_fts_index_tracks_failed_records(self, sqlite_path, sample_errors):
+        """测试 FTS 索引随 failed 记录的晋升、删除同步，并与 LIKE 结果一致。"""
+        assert append_records(sqlite_path, sample_errors) == 3
+        conn = connect_db(sqlite_path)
+        try:
+            assert insert_record(
+                conn,
+                {
+                    "event_id": 9,
+                    "stage": "s1",
+                    "status": "pending",
+                    "task_json": "pending boom",
+                    "ts": 9.0,
+                },
+            )
+            conn.commit()
+            # 外部内容表的 COUNT 会读 records，改为统计 docsize 影子表。
+            fts_count = conn.execute(
+                "SELECT COUNT(*) FROM records_fts_docsize"
+            ).fetchone()[0]
+            assert fts_count == 3
+
+            promote_record_to_failed_by_event_id(
+                conn, 9, 10, ts=10.0, error_type="KeyError", error_message="BOOM again"
+            )
+            delete_record_by_event_id(conn, 2)
+            conn.commit()
+        finally:
+            conn.close()
+
+        def search(keyword):
+            _, _, items = query_records(sqlite_path, 1, 10, "", keyword, "oldest")
+            return [item["event_id"] for item in items]
+
+        assert search("boom") == [10]
+        assert search("TaskOne") == [1]
+        assert search("ty") == [3]  # 少于 3 个字符时回退 LIKE
+        assert search('"quoted') == []
+
+    def test_fts_backfill_on_migration(self, sqlite_path, sample_errors):
+        """测试旧版本数据库首次连接时会回填 FTS 索引。"""
+        assert append_records(sqlite_path, sample_errors) == 3
+        conn = connect_db(sqlite_path)
+        try:
+            conn.execute("DROP TABLE records_fts")
+            conn.execute("PRAGMA user_version = 0")
+            conn.commit()
+        finally:
+            conn.close()
+        close_read_connections(sqlite_path)
+
+        conn = connect_db(sqlite_path)
+        try:
+            assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+            fts_count = conn.execute(
+                "SELECT COUNT(*) FROM records_fts_docsize"
+            ).fetchone()[0]
+            assert fts_count == 3
+        finally:
+            conn.close()
+
+    def test_fts_index_excludes_task_payload(self, sqlite_path, sample_errors):
+        """测试 FTS 索引只收录错误字段，任务文本仍可通过关键词匹配。"""
+        assert append_records(sqlite_path, sample_errors) == 3
+        conn = connect_db(sqlite_path)
+        try:
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(records_fts)")]
+            assert columns == ["error_type", "error_message"]
+        finally:
+            conn.close()
+
+        _, _, items = query_records(sqlite_path, 1, 10, "", "PlainTask", "oldest")
+        assert [item["event_id"] for item in items] == [3]
+
+    @pytest.mark.parametrize("sort_order", ["newest", "oldest"])
+    def test_query_records_by_cursor(self, sqlite_path, sort_order):
+        """测试 (ts, id) 游标分页能无重复、无遗漏地遍历全部记录。"""
+        records = [
+            {
+                "event_id": i,
+                "stage": "s1",
+                "status": "failed",
+                "error_type": "ValueError",
+                "task_json": i,
+                "ts": float(i // 3),  # 制造相同 ts，验证按 id 打破平局
+            }
+            for i in range(10)
+        ]
+        assert append_records(sqlite_path, records) == 10
+
+        seen = []
+        cursor = None
+        while True:
+            items, cursor = query_records_by_cursor(
+                sqlite_path, 4, sort_order=sort_order, cursor=cursor
+            )
+            seen.extend(item["event_id"] for item in items)
+            if cursor is None:
+                break
+
+        expected = list(range(10))
+        assert seen == (expected if sort_order == "oldest" else expected[::-1])
+
+    def test_fingerprint_error_message(self):
+        """测试错误指纹会忽略数字、十六进制地址与引号内字符串。"""
+        fp = fingerprint_error_message
+        assert fp("timeout after 30s on 10.0.0.1") == fp("timeout after 5s on 10.0.0.2")
+        assert fp("bad key 'user-1'") == fp('bad key "other"')
+        assert fp("object at 0x7f00") == fp("object at 0xdead")
+        assert fp("connection refused") != fp("connection reset")
+
+    def test_failure_storm_is_interned(self, sqlite_path):
+        """测试同类失败归并为一行 errors，计数随记录删除与清空同步。"""
+        records = [
+            {
+                "event_id": i,
+                "stage": "s1" if i < 8 else "s2",
+                "status": "pending",
+                "task_json": i,
+                "ts": float(i),
+            }
+            for i in range(10)
+        ]
+        assert append_records(sqlite_path, records) == 10
+
+        conn = connect_db(sqlite_path)
+        try:
+            for i in range(10):
+                promote_record_to_failed_by_event_id(
+                    conn,
+                    i,
+                    100 + i,
+                    ts=float(i),
+                    error_type="TimeoutError",
+                    error_message=f"request {i % 2} timed out",
+                )
+            delete_record_by_event_id(conn, 100)
+            conn.commit()
+            stored = conn.execute(
+                "SELECT error_message FROM records ORDER BY id"
+            ).fetchall()
+        finally:
+            conn.close()
+
+        # 只保存与样本不同的片段，读取时补回原文。
+        assert [row[0] for row in stored].count("") == 4
+        assert {row[0] for row in stored} == {"", "1"}
+        assert [r["error_message"] for r in load_records(sqlite_path)][:2] == [
+            "request 1 timed out",
+            "request 0 timed out",
+        ]
+
+        assert query_error_type_counts(sqlite_path) == [
+            {"error_type": "TimeoutError", "count": 9}
+        ]
+        assert query_error_type_counts(sqlite_path, node="s2") == [
+            {"error_type": "TimeoutError", "count": 2}
+        ]
+        groups = query_error_groups(sqlite_path)
+        assert [(g["stage"], g["count"]) for g in groups] == [("s1", 7), ("s2", 2)]
+        assert groups[0]["message"] == "request 0 timed out"
+        assert (groups[0]["first_ts"], groups[0]["last_ts"]) == (0.0, 7.0)
+
+        _, _, items = query_records(sqlite_path, 1, 20, "", "request 1", "oldest")
+        assert [item["event_id"] for item in items] == [101, 103, 105, 107, 109]
+
+        clear_records(sqlite_path)
+        assert query_error_type_counts(sqlite_path) == []
+
+    def test_apply_fallback_ops_batches_failures(self, sqlite_path):
+        """测试整批应用时连续失败合并归并，链式晋升与冲突操作按顺序逐条处理。"""
+        records = [
+            {"event_id": i, "stage": "s1", "status": "pending", "task_json": i}
+            for i in range(6)
+        ]
+        assert append_records(sqlite_path, records) == 6
+
+        def promote(event_id, error_id, message):
+            return {
+                "__op__": "promote_failed",
+                "event_id": event_id,
+                "error_id": error_id,
+                "ts": float(error_id),
+                "error_type": "KeyError",
+                "error_message": message,
+            }
+
+        ops = [
+            promote(0, 10, "missing key 'a' in row 0"),
+            promote(1, 11, "missing key 'b' in row 1"),
+            promote(10, 20, "missing key 'c' in row 10"),  # 链式晋升另起一段
+            promote(2, 20, "missing key 'd' in row 2"),  # 新事件 ID 冲突
+            promote(3, 23, "missing key 'e' in row 3"),
+            {"__op__": "delete", "event_id": 4},
+            promote(99, 199, "missing key 'f' in row 99"),  # 记录不存在
+        ]
+        conn = connect_db(sqlite_path)
+        try:
+            assert apply_fallback_ops(conn, ops) == 5
+            conn.commit()
+            counts = conn.execute("SELECT count FROM errors").fetchall()
+        finally:
+            conn.close()
+
+        # 冲突的一段回滚后逐条重放，出错的操作不会留下归并计数
+        assert [row[0] for row in counts] == [3]
+        failed = {r["event_id"]: r["error_message"] for r in load_records(sqlite_path)}
+        assert failed == {
+            11: "missing key 'b' in row 1",
+            20: "missing key 'c' in row 10",
+            23: "missing key 'e' in row 3",
+        }
+        pending = load_records(sqlite_path, status="pending")
+        assert [r["event_id"] for r in pending] == [2, 5]
+
+    def test_error_delta_migration(self, sqlite_path):
+        """测试 v3 数据库中省略为空串的消息在迁移后仍能补回原文。"""
+        records = [
+            {
+                "event_id": i,
+                "stage": "s1",
+                "status": "failed",
+                "task_json": i,
+                "error_type": "ValueError",
+                "error_message": message,
+            }
+            for i, message in enumerate(["bad 1", "bad 1", "bad 2"])
+        ]
+        assert append_records(sqlite_path, records) == 3
+        conn = connect_db(sqlite_path)
+        try:
+            conn.execute("DROP TRIGGER records_fts_au")
+            conn.execute(
+                "UPDATE records SET error_prefix = NULL, error_suffix = NULL, "
+                "error_message = CASE WHEN event_id = 2 THEN 'bad 2' ELSE '' END"
+            )
+            conn.execute("PRAGMA user_version = 3")
+            conn.commit()
+        finally:
+            conn.close()
+        close_read_connections(sqlite_path)
+
+        messages = [r["error_message"] for r in load_records(sqlite_path)]
+        assert messages == ["bad 1", "bad 1", "bad 2"]
+        _, _, items = query_records(sqlite_path, 1, 10, "", "bad 2", "oldest")
+        assert [item["event_id"] for item in items] == [2]
+
+    def test_error_interning_migration(self, sqlite_path, sample_errors):
+        """测试旧版本数据库中的失败记录在迁移时被归并。"""
+        assert append_records(sqlite_path, sample_errors) == 3
+        conn = connect_db(sqlite_path)
+        try:
+            conn.execute("UPDATE records SET error_ref = NULL")
+            conn.execute("UPDATE records SET error_message = 'bad value' WHERE id = 1")
+            conn.execute("DELETE FROM errors")
+            conn.execute("PRAGMA user_version = 1")
+            conn.commit()
+        finally:
+            conn.close()
+        close_read_connections(sqlite_path)
+
+        assert query_error_type_counts(sqlite_path) == [
+            {"error_type": "RuntimeError", "count": 1},
+            {"error_type": "TypeError", "count": 1},
+            {"error_type": "ValueError", "count": 1},
+        ]
+        assert load_records(sqlite_path)[0]["error_message"] == "bad value"
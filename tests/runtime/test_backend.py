@@ -0,0 +1,190 @@
+import hashlib
+import hmac
+import multiprocessing
+import pickle
+import queue
+import socket
+import struct
+
+import pytest
+
+from celestialflow.runtime.core_backend import (
+    BrokerQueueBackend,
+    LocalBroker,
+    QueueBackend,
+    SocketQueueBackend,
+)
+from celestialflow.runtime.core_envelope import TaskEnvelope
+from celestialflow.runtime.core_queue import VALID_QUEUE_BACKENDS, make_queue_backend
+from celestialflow.runtime.core_ring import SharedRingQueue
+from celestialflow.runtime.util_errors import InvalidOptionError
+from celestialflow.runtime.util_types import TerminationSignal
+
+fork_only = pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(),
+    reason="requires the fork start method",
+)
+
+
+@pytest.fixture(params=VALID_QUEUE_BACKENDS)
+def backend(request):
+    """按名称构造每一种后端，测试结束后释放资源。"""
+    backend = make_queue_backend(request.param, topic="test")
+    yield backend
+    backend.close()
+    if isinstance(backend, SharedRingQueue):
+        backend.unlink()
+
+
+def _produce(backend, start: int, count: int) -> None:
+    for i in range(start, start + count):
+        backend.put(TaskEnvelope(i, id=i))
+
+
+class TestQueueBackendContract:
+    def test_base_requires_core_methods(self):
+        """未实现 put / get / qsize 的后端不能实例化"""
+
+        class PutOnly(QueueBackend[int]):
+            def put(self, item, block=True, timeout=None):
+                pass
+
+        with pytest.raises(TypeError):
+            PutOnly()
+
+    def test_put_and_get_in_order(self, backend):
+        """单个写入方的记录按写入顺序读出，终止信号作为普通记录传递"""
+        backend.put(TaskEnvelope("a", id=1))
+        backend.put(TerminationSignal(_id=2, source="up"))
+
+        envelope = backend.get(timeout=5)
+        signal = backend.get(timeout=5)
+        assert envelope.get_task() == "a"
+        assert isinstance(signal, TerminationSignal)
+        assert signal.id == 2
+
+    def test_put_many_and_get_many(self, backend):
+        """批量读取至少返回一条，至多 max_count 条，且保持顺序"""
+        backend.put_many(list(range(5)))
+
+        items: list[int] = []
+        while len(items) < 5:
+            batch = backend.get_many(3, timeout=5)
+            assert 1 <= len(batch) <= 3
+            items.extend(batch)
+        assert items == [0, 1, 2, 3, 4]
+
+    def test_get_empty(self, backend):
+        """非阻塞或超时读取空后端时抛出 Empty"""
+        with pytest.raises(queue.Empty):
+            backend.get(block=False)
+        with pytest.raises(queue.Empty):
+            backend.get(timeout=0.01)
+
+    def test_qsize(self, backend):
+        """写入并被读取端接收后，qsize 反映积压数量"""
+        backend.put("x")
+        assert backend.get(timeout=5) == "x"
+        assert backend.qsize() == 0
+        assert backend.empty()
+
+
+class TestMakeQueueBackend:
+    def test_invalid_name(self):
+        """不支持的后端名称应报错"""
+        with pytest.raises(InvalidOptionError):
+            make_queue_backend("pipe")
+
+    def test_process_safe_flags(self):
+        """只有可跨 fork 共享的后端标记为 process_safe"""
+        flags = {}
+        for name in VALID_QUEUE_BACKENDS:
+            backend = make_queue_backend(name)
+            flags[name] = backend.process_safe
+            backend.close()
+            if isinstance(backend, SharedRingQueue):
+                backend.unlink()
+        assert flags == {
+            "queue": False,
+            "deque": False,
+            "mp": True,
+            "shm_ring": True,
+            "socket": True,
+            "broker": False,
+        }
+
+
+class TestBrokerQueueBackend:
+    def test_topics_are_isolated(self):
+        """同一 broker 的不同主题互不干扰"""
+        broker = LocalBroker()
+        first = BrokerQueueBackend(broker, "first")
+        second = BrokerQueueBackend(broker, "second")
+
+        first.put(1)
+        second.put(2)
+        assert broker.pending("first") == 1
+        assert second.get(block=False) == 2
+        assert first.get(block=False) == 1
+
+
+class TestSocketQueueBackend:
+    @fork_only
+    def test_multi_producer_across_processes(self):
+        """多个 fork 子进程各自建立连接写入，单个写入方内保持顺序"""
+        ctx = multiprocessing.get_context("fork")
+        backend = SocketQueueBackend()
+        try:
+            producers = [
+                ctx.Process(target=_produce, args=(backend, start, 300))
+                for start in (0, 1000)
+            ]
+            for process in producers:
+                process.start()
+
+            received = [backend.get(timeout=10) for _ in range(600)]
+            for process in producers:
+                process.join()
+
+            ids = [envelope.get_id() for envelope in received]
+            assert [i for i in ids if i < 1000] == list(range(300))
+            assert [i for i in ids if i >= 1000] == list(range(1000, 1300))
+        finally:
+            backend.close()
+
+    def test_rejects_frames_with_wrong_key(self):
+        """密钥不符的帧不被反序列化，发送方连接随即被断开"""
+        backend = SocketQueueBackend(authkey=b"secret")
+        try:
+            backend.put("trusted")
+            assert backend.get(timeout=5) == "trusted"
+
+            payload = pickle.dumps("forged")
+            tag = hmac.digest(b"other", payload, hashlib.sha256)
+            with socket.create_connection(backend.address) as conn:
+                conn.sendall(struct.pack("<I", len(payload)) + tag + payload)
+                conn.settimeout(5)
+                assert conn.recv(1) == b""
+
+            with pytest.raises(queue.Empty):
+                backend.get(timeout=0.2)
+        finally:
+            backend.close()
+
+    def test_rejects_oversized_frames(self):
+        """首部声明的长度超过上限时不读取负载，直接断开连接"""
+        backend = SocketQueueBackend(max_frame_size=1024)
+        try:
+            backend._ensure_receiver()
+            header = struct.pack("<I", 1 << 30) + bytes(hashlib.sha256().digest_size)
+            with socket.create_connection(backend.address) as conn:
+                conn.sendall(header)
+                conn.settimeout(5)
+                assert conn.recv(1) == b""
+
+            with pytest.raises(ValueError, match="socket frame too large"):
+                backend.put("x" * 2048)
+            backend.put("ok")
+            assert backend.get(timeout=5) == "ok"
+        finally:
+            backend.close()
@@ -1,6 +1,8 @@
+import pickle
+
 import pytest
 
-from celestialflow.runtime.core_envelope import TaskEnvelope
+from celestialflow.runtime.core_envelope import TaskBatch, TaskEnvelope
 from celestialflow.runtime.util_hash import object_to_hash
 
 
@@ -64,6 +66,30 @@ class TestTaskEnvelope:
         with pytest.raises(AttributeError):
             envelope.extra_attr = 123
 
+    def test_mark_enqueued_and_pickle_roundtrip(self):
+        """入队时刻与来源随信封一起跨进程传递"""
+        envelope = TaskEnvelope("x", id=1)
+        assert envelope.get_enqueue_ts() == 0.0
+        assert envelope.get_source() is None
+
+        envelope.mark_enqueued("up")
+        restored = pickle.loads(pickle.dumps(envelope))
+        assert restored.get_task() == "x"
+        assert restored.get_id() == 1
+        assert restored.get_source() == "up"
+        assert restored.get_enqueue_ts() == envelope.get_enqueue_ts() > 0
+
+
+class TestTaskBatch:
+    def test_len_and_pickle_roundtrip(self):
+        """批次保留信封顺序，且可整体 pickle 以便跨进程传递"""
+        batch = TaskBatch([TaskEnvelope("a", id=1), TaskEnvelope("b", id=2)])
+        restored = pickle.loads(pickle.dumps(batch))
+
+        assert len(restored) == 2
+        assert [e.get_task() for e in restored.envelopes] == ["a", "b"]
+        assert [e.get_id() for e in restored.envelopes] == [1, 2]
+
 
 class TestObjectToHash:
     def test_returns_bytes(self):
@@ -1,4 +1,12 @@
-from celestialflow.runtime.util_hash import make_hashable, object_to_hash
+import pytest
+
+from celestialflow.runtime.util_errors import ConfigurationError
+from celestialflow.runtime.util_hash import (
+    ConsistentHashRing,
+    key_to_int,
+    make_hashable,
+    object_to_hash,
+)
 
 
 class TestUtilHash:
@@ -142,6 +150,37 @@ class TestUtilHash:
         assert object_to_hash(v1) == object_to_hash(v1)
 
 
+
+class TestConsistentHashRing:
+    def test_key_to_int_stable(self):
+        """等值的键映射为相同的整数，结构化的键先规整再哈希。"""
+        assert key_to_int("user-1") == key_to_int("user-1")
+        assert key_to_int(["a", 1]) == key_to_int(("a", 1))
+        assert key_to_int("user-1") != key_to_int("user-2")
+
+    def test_slots_are_balanced(self):
+        """键在各槽位之间大致均匀分布。"""
+        ring = ConsistentHashRing(4)
+        counts = [0] * 4
+        for i in range(8000):
+            counts[ring.get_slot(f"key-{i}")] += 1
+        assert all(1200 < count < 2800 for count in counts)
+
+    def test_adding_slot_moves_few_keys(self):
+        """槽位数由 4 增加到 5 时，只有少部分键改变归属。"""
+        ring4, ring5 = ConsistentHashRing(4), ConsistentHashRing(5)
+        keys = [f"key-{i}" for i in range(4000)]
+        moved = [k for k in keys if ring4.get_slot(k) != ring5.get_slot(k)]
+        assert len(moved) < len(keys) * 0.35
+        # 改变归属的键都进入了新槽位
+        assert all(ring5.get_slot(k) == 4 for k in moved)
+
+    def test_invalid_slots(self):
+        """槽位数必须为正数。"""
+        with pytest.raises(ConfigurationError):
+            ConsistentHashRing(0)
+
+
 # ============================================================
 # 运行方式:
 #   python -m pytest tests/utils/test_utils_hash.py -v
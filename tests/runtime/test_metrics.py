@@ -114,3 +114,20 @@ class TestTaskMetricsRetryExceptions:
         metrics.set_retry_exceptions(ValueError, RuntimeError)
         assert ValueError in metrics.retry_exceptions
         assert RuntimeError in metrics.retry_exceptions
+
+
+class TestTaskMetricsLatency:
+    def test_latency_stats(self):
+        """排队与执行耗时分别记录，重置计数器时一并清空"""
+        metrics = TaskMetrics()
+        metrics.observe_queue_wait(0.5)
+        metrics.observe_execution(0.01)
+        metrics.observe_execution(0.03)
+
+        stats = metrics.get_latency_stats()
+        assert stats["queue_wait"]["count"] == 1
+        assert stats["execution"]["count"] == 2
+        assert stats["execution"]["max"] == 0.03
+
+        metrics.reset_counter()
+        assert metrics.get_latency_stats()["execution"]["count"] == 0
@@ -1,10 +1,21 @@
+import multiprocessing
 import queue
+import threading
+import time
 
 import pytest
 
-from celestialflow.runtime.core_envelope import TaskEnvelope
-from celestialflow.runtime.core_queue import TaskInQueue, TaskOutQueue
+from celestialflow.runtime.core_envelope import TaskBatch, TaskEnvelope
+from celestialflow.runtime.core_queue import (
+    EdgeChannel,
+    ReplicaTarget,
+    TaskInQueue,
+    TaskOutQueue,
+)
+from celestialflow.runtime.core_ring import SharedRingQueue
 from celestialflow.runtime.util_errors import (
+    ConfigurationError,
+    InvalidOptionError,
     DuplicateNodeError,
     UnknownNodeError,
 )
@@ -72,6 +83,51 @@ class TestTaskInQueue:
         assert remaining[1].get_task() == "b"
         assert in_queue.queue.empty()
 
+    def test_share_queue_shm_ring_migrates_items(self):
+        """迁移到共享内存环时保留已入队条目的顺序，且重复迁移无副作用"""
+        in_queue = TaskInQueue(out_name="test")
+        in_queue.add_source_name("up")
+        in_queue.put(TaskEnvelope("a", id=1))
+        in_queue.put(TerminationSignal(_id=5, source="up"))
+
+        in_queue.share_queue(multiprocessing.get_context(), transport="shm_ring")
+        ring = in_queue.queue
+        in_queue.share_queue(multiprocessing.get_context(), transport="mp")
+        try:
+            assert isinstance(in_queue.queue, SharedRingQueue)
+            assert in_queue.queue is ring
+            assert in_queue.get().get_task() == "a"
+            assert in_queue.get().ids == [5]
+        finally:
+            ring.close()
+            in_queue.release_queue()
+
+    def test_get_unpacks_batch_in_order(self):
+        """批次在 get 中透明拆开，批内信封先于其后的终止信号返回"""
+        in_queue = TaskInQueue(out_name="test")
+        in_queue.add_source_name("up")
+        in_queue.put(TaskBatch([TaskEnvelope("a", id=1), TaskEnvelope("b", id=2)]))
+        in_queue.put(TerminationSignal(_id=9, source="up"))
+
+        assert in_queue.get().get_task() == "a"
+        assert in_queue.get().get_task() == "b"
+        assert in_queue.get().ids == [9]
+
+    def test_drain_unpacks_batches(self):
+        """drain 返回已拆开和尚未拆开的批内信封"""
+        in_queue = TaskInQueue(out_name="test")
+        in_queue.put(TaskBatch([TaskEnvelope("a", id=1), TaskEnvelope("b", id=2)]))
+        in_queue.put(TaskBatch([TaskEnvelope("c", id=3)]))
+        assert in_queue.get().get_task() == "a"
+
+        assert [e.get_task() for e in in_queue.drain()] == ["b", "c"]
+
+    def test_share_queue_invalid_transport(self):
+        """不支持的传输方式应报错"""
+        in_queue = TaskInQueue(out_name="test")
+        with pytest.raises(InvalidOptionError):
+            in_queue.share_queue(multiprocessing.get_context(), transport="pipe")
+
 
 class TestTaskOutQueue:
     def test_put_broadcasts_to_all(self):
@@ -124,3 +180,313 @@ class TestTaskOutQueue:
         out_queue.add_queue(q1, "a")
         with pytest.raises(DuplicateNodeError, match="duplicate queue target name"):
             out_queue.add_queue(queue.Queue(), name="a")
+
+    def test_batched_target_flushes_on_size_and_termination(self):
+        """批量通道攒满即整批入队，终止信号前刷新剩余批次"""
+        in_queue = TaskInQueue(out_name="dst")
+        in_queue.add_source_name("src")
+        out_queue = TaskOutQueue(in_name="src")
+        out_queue.add_queue(in_queue, "dst", batch_size=3, batch_delay=None)
+
+        for i in range(7):
+            out_queue.put(TaskEnvelope(i, id=i))
+        assert in_queue.queue.qsize() == 2
+
+        out_queue.put(TerminationSignal(_id=100, source="src"))
+        assert in_queue.queue.qsize() == 4
+
+        results = [in_queue.get() for _ in range(8)]
+        assert [r.get_task() for r in results[:7]] == list(range(7))
+        assert results[7].ids == [100]
+
+    def test_batched_target_flushes_after_delay(self):
+        """未攒满的批次在 batch_delay 后由刷新线程入队"""
+        q = queue.Queue()
+        out_queue = TaskOutQueue(in_name="src")
+        out_queue.add_queue(q, "dst", batch_size=100, batch_delay=0.01)
+
+        out_queue.put(TaskEnvelope("x", id=1))
+        batch = q.get(timeout=5)
+        assert isinstance(batch, TaskBatch)
+        assert [e.get_task() for e in batch.envelopes] == ["x"]
+
+    def test_flush_without_delay(self):
+        """batch_delay 为 None 时只在显式刷新或攒满时入队"""
+        q = queue.Queue()
+        out_queue = TaskOutQueue(in_name="src")
+        out_queue.add_queue(q, "dst", batch_size=100, batch_delay=None)
+        out_queue.add_queue(queue.Queue(), "plain")
+
+        out_queue.put(TaskEnvelope("x", id=1))
+        assert q.empty()
+        out_queue.flush()
+        assert len(q.get_nowait()) == 1
+
+    def test_invalid_batch_options(self):
+        """批量参数不合法时报错"""
+        out_queue = TaskOutQueue(in_name="src")
+        with pytest.raises(ConfigurationError, match="batch_size"):
+            out_queue.add_queue(queue.Queue(), "a", batch_size=0)
+        with pytest.raises(ConfigurationError, match="batch_delay"):
+            out_queue.add_queue(queue.Queue(), "a", batch_size=2, batch_delay=0)
+
+
+class TestEdgeChannel:
+    def _connect(self, capacity, maxsize=0, batch_size=1):
+        in_queue = TaskInQueue(out_name="dst", maxsize=maxsize)
+        in_queue.add_source_name("src")
+        out_queue = TaskOutQueue(in_name="src")
+        channel = out_queue.add_queue(
+            in_queue, "dst", batch_size=batch_size, batch_delay=None, capacity=capacity
+        )
+        in_queue.bind_channel(channel)
+        return in_queue, out_queue, channel
+
+    def test_capacity_limits_depth(self):
+        """额度耗尽时上游阻塞，下游取出后归还额度并记录等待时间"""
+        in_queue, out_queue, channel = self._connect(capacity=2)
+        out_queue.put(TaskEnvelope(0, id=0))
+        out_queue.put(TaskEnvelope(1, id=1))
+        assert channel.snapshot()["depth"] == 2
+
+        producer = threading.Thread(target=out_queue.put, args=(TaskEnvelope(2, id=2),))
+        producer.start()
+        time.sleep(0.05)
+        assert producer.is_alive()
+
+        assert in_queue.get().get_task() == 0
+        producer.join(timeout=5)
+        assert not producer.is_alive()
+
+        stats = channel.snapshot()
+        assert stats["depth"] == 2
+        assert stats["blocked_count"] == 1
+        assert stats["credit_blocked_time"] >= 0.04
+        assert stats["queue_blocked_time"] == 0
+        assert [in_queue.get().get_task() for _ in range(2)] == [1, 2]
+        assert channel.snapshot()["depth"] == 0
+
+    def test_channels_are_independent(self):
+        """同一下游的两条入边各自持有额度，一条耗尽不影响另一条"""
+        in_queue = TaskInQueue(out_name="dst")
+        fast = TaskOutQueue(in_name="fast")
+        slow = TaskOutQueue(in_name="slow")
+        for out_queue in (fast, slow):
+            in_queue.add_source_name(out_queue.in_name)
+            in_queue.bind_channel(out_queue.add_queue(in_queue, "dst", capacity=1))
+
+        fast.put(TaskEnvelope("f", id=1))
+        slow.put(TaskEnvelope("s", id=2))
+        assert fast.get_channel("dst").snapshot()["depth"] == 1
+        assert slow.get_channel("dst").snapshot()["depth"] == 1
+
+        assert in_queue.get().get_task() == "f"
+        assert fast.get_channel("dst").snapshot()["depth"] == 0
+        assert slow.get_channel("dst").snapshot()["depth"] == 1
+
+    def test_batched_channel_releases_per_batch(self):
+        """批次写入下游时计入积压，取出后按信封数扣减；暂存的信封只占用额度"""
+        in_queue, out_queue, channel = self._connect(capacity=3, batch_size=2)
+        for i in range(3):
+            out_queue.put(TaskEnvelope(i, id=i))
+        assert channel.snapshot()["depth"] == 2
+
+        # 额度已被两条在途、一条暂存的信封占满
+        producer = threading.Thread(target=out_queue.put, args=(TaskEnvelope(3, id=3),))
+        producer.start()
+        time.sleep(0.05)
+        assert producer.is_alive()
+
+        assert in_queue.get().get_task() == 0
+        producer.join(timeout=5)
+        assert not producer.is_alive()
+        stats = channel.snapshot()
+        assert stats["depth"] == 2
+        assert stats["high_water"] == 2
+
+    def test_uncapped_channel_tracks_depth(self):
+        """不限制容量的通道同样统计当前积压与最高积压，并记录信封的入队来源"""
+        in_queue, out_queue, channel = self._connect(capacity=0)
+        for i in range(5):
+            out_queue.put(TaskEnvelope(i, id=i))
+        assert channel.snapshot()["depth"] == 5
+
+        envelope = in_queue.get()
+        assert envelope.get_source() == "src"
+        assert envelope.get_enqueue_ts() > 0
+        assert in_queue.drain()
+        stats = channel.snapshot()
+        assert stats["depth"] == 0
+        assert stats["high_water"] == 5
+
+    def test_full_queue_wait_recorded(self):
+        """下游有界队列已满时，等待时间计入 queue_blocked_time"""
+        in_queue, out_queue, channel = self._connect(capacity=0, maxsize=1)
+        out_queue.put(TaskEnvelope(0, id=0))
+
+        producer = threading.Thread(target=out_queue.put, args=(TaskEnvelope(1, id=1),))
+        producer.start()
+        time.sleep(0.05)
+        assert in_queue.get().get_task() == 0
+        producer.join(timeout=5)
+
+        stats = channel.snapshot()
+        assert stats["blocked_count"] == 1
+        assert stats["queue_blocked_time"] >= 0.04
+        assert stats["credit_blocked_time"] == 0
+
+    def test_invalid_capacity(self):
+        """容量为负数或小于批大小时报错"""
+        with pytest.raises(ConfigurationError, match="capacity"):
+            EdgeChannel("src", "dst", capacity=-1)
+        out_queue = TaskOutQueue(in_name="src")
+        with pytest.raises(ConfigurationError, match="capacity"):
+            out_queue.add_queue(queue.Queue(), "a", batch_size=4, capacity=2)
+
+    def test_shared_channel_across_processes(self):
+        """迁移后的积压统计可在 fork 子进程中更新并在父进程中读取"""
+        if "fork" not in multiprocessing.get_all_start_methods():
+            pytest.skip("requires the fork start method")
+        ctx = multiprocessing.get_context("fork")
+        channel = EdgeChannel("src", "dst", capacity=3)
+        channel.share_state(ctx)
+
+        process = ctx.Process(target=channel.add_depth, args=(2,))
+        process.start()
+        process.join(timeout=10)
+        assert channel.snapshot()["depth"] == 2
+        channel.release(2)
+        stats = channel.snapshot()
+        assert stats["depth"] == 0
+        assert stats["high_water"] == 2
+
+
+class TestReplicaTarget:
+    def _members(self, n):
+        members = [TaskInQueue(out_name=f"dst#{i}") for i in range(n)]
+        for member in members:
+            member.add_source_name("src")
+        return members
+
+    def test_round_robin(self):
+        """依次轮流分发，计数器记录各副本分到的信封数"""
+        members = self._members(3)
+        target = ReplicaTarget(members)
+        for i in range(7):
+            target.put(TaskEnvelope(i, id=i))
+
+        assert [member.queue.qsize() for member in members] == [3, 2, 2]
+        assert [counter.value for counter in target.counters] == [3, 2, 2]
+        assert members[1].get().get_task() == 1
+
+    def test_least_queued(self):
+        """分给积压最少的副本，批次按信封数计数"""
+        members = self._members(2)
+        members[0].put(TaskEnvelope("backlog", id=0))
+        target = ReplicaTarget(members, balance="least_queued")
+
+        target.put(TaskBatch([TaskEnvelope(1, id=1), TaskEnvelope(2, id=2)]))
+        assert [counter.value for counter in target.counters] == [0, 2]
+
+        _ = members[0].get()
+        target.put(TaskEnvelope(3, id=3))
+        assert [counter.value for counter in target.counters] == [1, 2]
+
+    def test_termination_broadcast(self):
+        """终止信号发给全部副本"""
+        members = self._members(2)
+        target = ReplicaTarget(members)
+        target.put(TerminationSignal(_id=5, source="src"))
+
+        for member in members:
+            result = member.get()
+            assert isinstance(result, TerminationIdPool)
+            assert result.ids == [5]
+        assert [counter.value for counter in target.counters] == [0, 0]
+
+    def test_key_affinity(self):
+        """同一个键进入同一个副本且保持顺序，批次按副本拆分"""
+        members = self._members(3)
+        target = ReplicaTarget(
+            members, balance="key", partition_key=lambda task: task[0]
+        )
+        tasks = [(f"k{i % 5}", i) for i in range(30)]
+        target.put(TaskBatch([TaskEnvelope(t, id=i) for i, t in enumerate(tasks[:10])]))
+        for i, task in enumerate(tasks[10:], start=10):
+            target.put(TaskEnvelope(task, id=i))
+
+        owners: dict[str, set[int]] = {}
+        received: dict[str, list[int]] = {}
+        for index, member in enumerate(members):
+            for item in member.drain():
+                key, seq = item.get_task()
+                owners.setdefault(key, set()).add(index)
+                received.setdefault(key, []).append(seq)
+        assert all(len(indexes) == 1 for indexes in owners.values())
+        assert all(seqs == sorted(seqs) for seqs in received.values())
+        assert sum(counter.value for counter in target.counters) == 30
+
+    def test_key_error_counts_as_failure(self):
+        """分区键函数抛出异常的信封不进入副本，计入首个副本后交给失败处理"""
+        failed: list[tuple[int, str]] = []
+        members = self._members(2)
+        target = ReplicaTarget(
+            members,
+            balance="key",
+            partition_key=lambda task: task["key"],
+            on_key_error=lambda envelope, exc: failed.append(
+                (envelope.get_id(), type(exc).__name__)
+            ),
+        )
+        target.put(TaskEnvelope({}, id=1))
+        target.put(TaskBatch([TaskEnvelope({"key": 1}, id=2), TaskEnvelope({}, id=3)]))
+
+        assert failed == [(1, "KeyError"), (3, "KeyError")]
+        assert sum(counter.value for counter in target.counters) == 3
+        assert sum(len(member.drain()) for member in members) == 1
+
+    def test_key_error_returns_edge_credit(self):
+        """分区键失败的信封归还边额度与积压，限制容量的边不会被占满"""
+        members = self._members(2)
+        failed: list[int] = []
+        target = ReplicaTarget(
+            members,
+            balance="key",
+            partition_key=lambda task: task["key"],
+            on_key_error=lambda envelope, exc: failed.append(envelope.get_id()),
+        )
+        out_queue = TaskOutQueue(in_name="src")
+        channel = out_queue.add_queue(target, "dst", capacity=2)
+        for member in members:
+            member.bind_channel(channel)
+
+        producer = threading.Thread(
+            target=lambda: [out_queue.put(TaskEnvelope({}, id=i)) for i in range(5)],
+            daemon=True,
+        )
+        producer.start()
+        producer.join(timeout=5)
+        assert not producer.is_alive()
+        assert failed == [0, 1, 2, 3, 4]
+        assert channel.snapshot()["depth"] == 0
+
+        out_queue.put(TaskEnvelope({"key": 1}, id=5))
+        assert channel.snapshot()["depth"] == 1
+
+    def test_key_error_without_handler_raises(self):
+        """未设置失败处理函数时分区键的异常向写入方抛出"""
+        target = ReplicaTarget(
+            self._members(2), balance="key", partition_key=lambda task: task["key"]
+        )
+        with pytest.raises(KeyError):
+            target.put(TaskEnvelope({}, id=1))
+
+    def test_key_requires_partition_key(self):
+        """'key' 策略必须提供分区键函数"""
+        with pytest.raises(ConfigurationError, match="partition_key"):
+            ReplicaTarget(self._members(2), balance="key")
+
+    def test_invalid_balance(self):
+        """不支持的负载均衡策略应报错"""
+        with pytest.raises(InvalidOptionError):
+            ReplicaTarget(self._members(2), balance="random")
@@ -0,0 +1,120 @@
+import multiprocessing
+import queue
+import threading
+import time
+
+import pytest
+
+from celestialflow.runtime.core_envelope import TaskEnvelope
+from celestialflow.runtime.core_ring import SharedRingQueue
+from celestialflow.runtime.util_types import TerminationSignal
+
+fork_only = pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(),
+    reason="requires the fork start method",
+)
+
+
+@pytest.fixture
+def ring():
+    """构造一个小容量的环形队列，测试结束后释放共享内存。"""
+    ring = SharedRingQueue(multiprocessing.get_context(), slot_count=4, slot_size=64)
+    yield ring
+    ring.close()
+    ring.unlink()
+
+
+def _produce(ring: SharedRingQueue, start: int, count: int) -> None:
+    for i in range(start, start + count):
+        ring.put(TaskEnvelope(f"item-{i}", id=i))
+    ring.put(TerminationSignal(_id=start, source=f"producer-{start}"))
+
+
+class TestSharedRingQueue:
+    def test_put_and_get(self, ring):
+        """任务信封与终止信号都以普通帧往返"""
+        ring.put(TaskEnvelope("hello", id=1))
+        ring.put(TerminationSignal(_id=7, source="up"))
+
+        envelope = ring.get()
+        signal = ring.get()
+        assert envelope.get_task() == "hello"
+        assert envelope.get_id() == 1
+        assert isinstance(signal, TerminationSignal)
+        assert signal.id == 7
+        assert signal.source == "up"
+
+    def test_multi_slot_frame_wraps_around(self, ring):
+        """超过单槽容量的帧跨越多个槽位，并在环尾回绕"""
+        for round_ in range(5):
+            payload = "x" * (100 + round_)
+            ring.put(payload)
+            assert ring.get() == payload
+
+    def test_get_nowait_empty(self, ring):
+        """环为空时非阻塞读取抛出 Empty"""
+        with pytest.raises(queue.Empty):
+            ring.get_nowait()
+
+    def test_put_nowait_full(self, ring):
+        """空槽位不足时非阻塞写入抛出 Full，且不占用槽位"""
+        ring.put("x" * 150)
+        with pytest.raises(queue.Full):
+            ring.put_nowait("y" * 150)
+
+        assert ring.get() == "x" * 150
+        ring.put_nowait("y" * 150)
+        assert ring.get() == "y" * 150
+
+    def test_put_timeout_covers_whole_frame(self, ring):
+        """多槽位帧共享一个截止时间，不会对每个槽位各等一次 timeout"""
+        ring.put("a")
+        ring.put("x" * 150)
+        threading.Timer(0.2, ring.get).start()
+
+        started = time.monotonic()
+        with pytest.raises(queue.Full):
+            ring.put("z" * 200, timeout=0.3)
+        assert time.monotonic() - started < 0.45
+
+        assert ring.get() == "x" * 150
+
+    def test_frame_too_large(self, ring):
+        """单帧超过整个环的容量时拒绝写入"""
+        with pytest.raises(ValueError, match="ring frame too large"):
+            ring.put("x" * 1024)
+
+    def test_invalid_slot_size(self):
+        """槽位需能容纳帧首部"""
+        with pytest.raises(ValueError, match="slot_size"):
+            SharedRingQueue(multiprocessing.get_context(), slot_size=4)
+
+    @fork_only
+    def test_multi_producer_across_processes(self):
+        """多个 fork 子进程写入，父进程按各生产者的写入顺序读出全部记录"""
+        ctx = multiprocessing.get_context("fork")
+        ring = SharedRingQueue(ctx, slot_count=8, slot_size=64)
+        try:
+            producers = [
+                ctx.Process(target=_produce, args=(ring, start, 200))
+                for start in (0, 1000)
+            ]
+            for process in producers:
+                process.start()
+
+            tasks: dict[int, list[int]] = {0: [], 1000: []}
+            signals = 0
+            while signals < len(producers):
+                item = ring.get(timeout=10)
+                if isinstance(item, TerminationSignal):
+                    signals += 1
+                    continue
+                tasks[item.get_id() // 1000 * 1000].append(item.get_id())
+
+            for process in producers:
+                process.join()
+            assert tasks[0] == list(range(200))
+            assert tasks[1000] == list(range(1000, 1200))
+        finally:
+            ring.close()
+            ring.unlink()
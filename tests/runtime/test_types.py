@@ -1,11 +1,16 @@
 from __future__ import annotations
 
+import multiprocessing
 import threading
 from dataclasses import FrozenInstanceError
 
+import pytest
+
 from celestialflow.runtime.util_types import (
     CTreeEvent,
+    LatencyHistogram,
     NoOpContext,
+    SharedValueWrapper,
     StageStatus,
     SumCounter,
     TerminationIdPool,
@@ -202,6 +207,81 @@ class TestUtilTypes:
         """枚举成员数量"""
         assert len(StageStatus) == 3
 
+    # ---- SharedValueWrapper ----
+
+    def test_shared_value_wrapper_visible_across_fork(self):
+        """共享计数器在子进程中的修改应对父进程可见。"""
+        if "fork" not in multiprocessing.get_all_start_methods():
+            return
+        ctx = multiprocessing.get_context("fork")
+        counter = SharedValueWrapper(5, ctx)
+        total = SumCounter()
+        total.append_counter(counter)
+
+        process = ctx.Process(target=counter.add, args=(3,))
+        process.start()
+        process.join()
+
+        assert counter.get() == 8
+        assert total.get() == 8
+        counter.reset()
+        assert counter.value == 0
+
+    # ---- LatencyHistogram ----
+
+    def test_latency_histogram_empty(self):
+        """无观测时各项汇总均为 0。"""
+        summary = LatencyHistogram().snapshot()
+        assert summary == {
+            "count": 0,
+            "mean": 0.0,
+            "p50": 0.0,
+            "p90": 0.0,
+            "p99": 0.0,
+            "max": 0.0,
+        }
+
+    def test_latency_histogram_quantiles(self):
+        """分位数按桶上界估算，误差在 2 倍以内且不超过最大值。"""
+        histogram = LatencyHistogram()
+        for _ in range(90):
+            histogram.observe(0.001)
+        for _ in range(10):
+            histogram.observe(0.5)
+
+        summary = histogram.snapshot()
+        assert summary["count"] == 100
+        assert summary["mean"] == pytest.approx((90 * 0.001 + 10 * 0.5) / 100)
+        assert 0.001 <= summary["p50"] < 0.002
+        assert 0.001 <= summary["p90"] < 0.002
+        assert 0.5 <= summary["p99"] <= summary["max"] == 0.5
+
+        histogram.reset()
+        assert histogram.snapshot()["count"] == 0
+
+    def test_latency_histogram_overflow(self):
+        """超出最大桶上界的观测计入溢出桶，分位数取最大值。"""
+        histogram = LatencyHistogram()
+        histogram.observe(1000.0)
+        assert histogram.snapshot()["p50"] == 1000.0
+
+    def test_latency_histogram_shared_across_fork(self):
+        """迁移到共享内存后，子进程中的观测应对父进程可见。"""
+        if "fork" not in multiprocessing.get_all_start_methods():
+            return
+        ctx = multiprocessing.get_context("fork")
+        histogram = LatencyHistogram()
+        histogram.observe(0.01)
+        histogram.share(ctx)
+
+        process = ctx.Process(target=histogram.observe, args=(0.02,))
+        process.start()
+        process.join()
+
+        summary = histogram.snapshot()
+        assert summary["count"] == 2
+        assert summary["max"] == 0.02
+
     # ---- CTreeEvent ----
 
     def test_ctree_event_task_values(self):
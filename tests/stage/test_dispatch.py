@@ -443,14 +443,7 @@ class TestWorkerCrashKeepsTerminationSignal:
         observer = _CrashOnFailObserver()
         executor.metrics.add_observer(observer)
         recording = _RecordingLogInlet()
-        monkeypatch.setattr(
-            "celestialflow.stage.core_executor.get_log_inlet",
-            lambda: recording,
-        )
-        monkeypatch.setattr(
-            "celestialflow.stage.core_dispatch.get_log_inlet",
-            lambda: recording,
-        )
+        monkeypatch.setattr(executor.funnel, "log_inlet", recording)
         dispatch = TaskDispatch(executor, executor.func, max_workers=1)
 
         _put(executor, 42)
@@ -479,14 +472,7 @@ class TestWorkerCrashKeepsTerminationSignal:
             name="crash_retry",
         )
         recording = _CrashRetryLogInlet()
-        monkeypatch.setattr(
-            "celestialflow.stage.core_executor.get_log_inlet",
-            lambda: recording,
-        )
-        monkeypatch.setattr(
-            "celestialflow.stage.core_dispatch.get_log_inlet",
-            lambda: recording,
-        )
+        monkeypatch.setattr(executor.funnel, "log_inlet", recording)
         dispatch = TaskDispatch(executor, executor.func, max_workers=1)
 
         _put(executor, 42)
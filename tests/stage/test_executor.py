@@ -1,3 +1,6 @@
+import asyncio
+import threading
+import time
 from pathlib import Path
 from typing import Any
 
@@ -181,6 +184,88 @@ class TestExecutorAsync:
         await executor.run_async(tasks)
 
 
+class TestExecutorPartition:
+    @staticmethod
+    def _make_recorder():
+        """构造记录每个键的执行顺序与执行线程的任务函数。"""
+        lock = threading.Lock()
+        seen: dict[str, list[int]] = {}
+        threads: dict[str, set[int]] = {}
+
+        def record(task: tuple[str, int]) -> int:
+            key, seq = task
+            time.sleep(0.001)
+            with lock:
+                seen.setdefault(key, []).append(seq)
+                threads.setdefault(key, set()).add(threading.get_ident())
+            return seq
+
+        return record, seen, threads
+
+    def test_thread_partition_preserves_key_order(self):
+        """同一个键的任务由同一个工作线程按到达顺序执行"""
+        record, seen, threads = self._make_recorder()
+        executor = TaskExecutor(
+            "PartitionThread",
+            record,
+            execution_mode="thread",
+            max_workers=4,
+            partition_key=lambda task: task[0],
+        )
+        tasks = [(f"k{i % 6}", i) for i in range(120)]
+        executor.run(tasks)
+
+        assert executor.get_counts()["tasks_succeeded"] == 120
+        for i in range(6):
+            assert seen[f"k{i}"] == list(range(i, 120, 6))
+            assert len(threads[f"k{i}"]) == 1
+
+    @pytest.mark.asyncio
+    async def test_async_partition_preserves_key_order(self):
+        """异步模式下同一个键的任务按到达顺序执行"""
+        seen: dict[str, list[int]] = {}
+
+        async def record(task: tuple[str, int]) -> int:
+            key, seq = task
+            await asyncio.sleep(0.001 * (seq % 3))
+            seen.setdefault(key, []).append(seq)
+            return seq
+
+        executor = TaskExecutor(
+            "PartitionAsync",
+            record,
+            execution_mode="async",
+            max_workers=3,
+            partition_key=lambda task: task[0],
+        )
+        await executor.run_async([(f"k{i % 4}", i) for i in range(40)])
+
+        assert executor.get_counts()["tasks_succeeded"] == 40
+        for i in range(4):
+            assert seen[f"k{i}"] == list(range(i, 40, 4))
+
+    def test_partition_key_error_counts_as_failure(self):
+        """分区键函数抛出异常的任务按失败处理"""
+
+        def key_of(task: int) -> int:
+            if task < 0:
+                raise ValueError("no key")
+            return task
+
+        executor = TaskExecutor(
+            "PartitionKeyError",
+            add_one,
+            execution_mode="thread",
+            max_workers=2,
+            partition_key=key_of,
+        )
+        executor.run([1, -1, 2])
+
+        counts = executor.get_counts()
+        assert counts["tasks_succeeded"] == 2
+        assert counts["tasks_failed"] == 1
+
+
 class TestExecutorDuplicateCheck:
     def test_duplicate_check_disabled_by_default(self):
         """测试默认配置下不会启用重复检查。"""
@@ -420,6 +505,19 @@ class TestExecutorConfig:
         with pytest.raises(InvalidOptionError):
             TaskExecutor("AddOneInvalidMode", add_one, execution_mode="invalid")
 
+    def test_set_max_workers(self):
+        """测试调整同时处理数量，非正数报配置错误"""
+        executor = TaskExecutor("AddOneWorkers", add_one, execution_mode="thread")
+        executor.set_max_workers(3, pool_size=8)
+        assert executor.max_workers == 3
+        assert executor.dispatch.max_workers == 3
+        assert executor.dispatch.pool_size == 8
+        executor.run([1, 2, 3])
+        assert executor.get_counts()["tasks_succeeded"] == 3
+
+        with pytest.raises(ConfigurationError):
+            executor.set_max_workers(0)
+
     def test_get_summary(self):
         """测试获取执行器状态摘要信息"""
         executor = TaskExecutor("AddOneSummary", add_one, execution_mode="serial")
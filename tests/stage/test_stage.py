@@ -80,6 +80,20 @@ class TestTaskStageConfig:
         prev_stage.metrics.add_success_count(1)
         assert current_stage.metrics.get_task_count() == 3
 
+    def test_make_replica_has_own_state(self):
+        """测试副本沿用配置，但持有独立的队列与计数器"""
+        stage = TaskStage("Origin", add_one, execution_mode="thread", max_workers=3)
+        stage.metrics.add_success_count(2)
+
+        replica = stage.make_replica("Origin#1")
+        assert replica.get_name() == "Origin#1"
+        assert replica.execution_mode == "thread"
+        assert replica.max_workers == 3
+        assert replica.func is stage.func
+        assert replica.task_queue is not stage.task_queue
+        assert replica.result_queue is not stage.result_queue
+        assert replica.metrics.success_counter.value == 0
+
 
 class TestTaskStageStartErrors:
     def test_start_raises_exception_group_after_finish(self, monkeypatch):
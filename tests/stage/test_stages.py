@@ -1,7 +1,17 @@
+import time
+
 import pytest
 
-from celestialflow import TaskGraph, TaskRouter, TaskSplitter, TaskStage
-from celestialflow.runtime.util_errors import InvalidOptionError
+from celestialflow import (
+    TaskChain,
+    TaskGraph,
+    TaskReducer,
+    TaskRouter,
+    TaskSplitter,
+    TaskStage,
+)
+from celestialflow.runtime import TaskEnvelope, TaskOutQueue
+from celestialflow.runtime.util_errors import ConfigurationError, InvalidOptionError
 
 
 class TestTaskSplitter:
@@ -130,3 +140,139 @@ class TestTaskRouter:
         router.set_execution_mode("thread")
 
         assert counter.get_lock() is lock
+
+
+def add(acc, x):
+    """测试用累加函数。"""
+    return acc + x
+
+
+def append(acc, x):
+    """测试用收集函数。"""
+    acc.append(x)
+    return acc
+
+
+class TestTaskReducer:
+    @staticmethod
+    def _run_chain(reducer, tasks, graph_mode="serial"):
+        """构造 reducer -> sink 链并运行，返回 sink 节点与收到的结果。"""
+        received = []
+
+        def sink(x):
+            received.append(x)
+            return x
+
+        sink_stage = TaskStage("sink", sink)
+        chain = TaskChain(
+            f"test_reducer_{graph_mode}", [reducer, sink_stage], graph_mode=graph_mode
+        )
+        chain.run({reducer.get_name(): tasks})
+        return sink_stage, received
+
+    def test_reducer_init(self):
+        """测试 TaskReducer 的初始配置：应为串行模式且不重试"""
+        reducer = TaskReducer("R", add, window_size=3)
+        assert reducer.execution_mode == "serial"
+        assert reducer.max_retries == 0
+        assert reducer.window_counter.get() == 0
+
+        with pytest.warns(UserWarning, match="TaskReducer only accepts"):
+            reducer.set_execution_mode("thread")
+        assert reducer.execution_mode == "serial"
+
+    def test_reducer_invalid_window(self):
+        """测试窗口大小与时长必须为正数"""
+        with pytest.raises(ConfigurationError, match="window_size"):
+            TaskReducer("R", add, window_size=0)
+        with pytest.raises(ConfigurationError, match="window_time"):
+            TaskReducer("R", add, window_time=0)
+
+    @pytest.mark.parametrize("graph_mode", ["serial", "thread", "process"])
+    def test_count_window(self, graph_mode):
+        """测试计数窗口：每满 window_size 个任务输出一次，结束时输出剩余窗口"""
+        reducer = TaskReducer("R", add, window_size=3)
+        sink, _ = self._run_chain(reducer, range(1, 11), graph_mode)
+
+        assert reducer.get_counts()["tasks_succeeded"] == 10
+        assert reducer.window_counter.get() == 4
+        assert sink.get_counts()["tasks_input"] == 4
+        assert sink.get_counts()["tasks_succeeded"] == 4
+
+    def test_count_window_results(self):
+        """测试计数窗口的归约结果与顺序"""
+        reducer = TaskReducer("R", add, window_size=3)
+        _, received = self._run_chain(reducer, range(1, 11))
+        assert received == [6, 15, 24, 10]
+
+    def test_keyed_window_with_initial(self):
+        """测试按键开窗：各键独立计数，输出 (key, acc)"""
+        reducer = TaskReducer(
+            "R", append, initial=list, window_size=2, key=lambda x: x % 2
+        )
+        _, received = self._run_chain(reducer, range(7))
+        assert received == [(0, [0, 2]), (1, [1, 3]), (0, [4, 6]), (1, [5])]
+
+    def test_global_window(self):
+        """测试未设置窗口时整个输入流归约为一个结果"""
+        reducer = TaskReducer("R", add)
+        _, received = self._run_chain(reducer, range(100))
+        assert received == [4950]
+
+    def test_time_window(self):
+        """测试时间窗口：到期的窗口在没有新任务时也会按时输出"""
+        received = []
+
+        def slow(x):
+            time.sleep(0.02)
+            return x
+
+        def sink(batch):
+            received.append(batch)
+            return batch
+
+        source = TaskStage("source", slow)
+        reducer = TaskReducer("R", append, initial=list, window_time=0.05)
+        sink_stage = TaskStage("sink", sink)
+        chain = TaskChain(
+            "test_reducer_time", [source, reducer, sink_stage], graph_mode="thread"
+        )
+        chain.run({"source": range(10)})
+
+        assert len(received) >= 2
+        assert [x for batch in received for x in batch] == list(range(10))
+        assert sink_stage.get_counts()["tasks_input"] == len(received)
+
+    def test_combine_error_counts_as_failure(self):
+        """测试归约函数抛出异常的任务按失败处理，不计入窗口"""
+
+        def checked_add(acc, x):
+            if x < 0:
+                raise ValueError("negative")
+            return acc + x
+
+        reducer = TaskReducer("R", checked_add, initial=int)
+        _, received = self._run_chain(reducer, [1, -1, 2])
+
+        assert received == [3]
+        assert reducer.get_counts()["tasks_failed"] == 1
+
+    def test_emit_error_fails_window(self, monkeypatch):
+        """测试窗口输出失败时窗口内的任务只计为失败，不计为成功"""
+
+        put_target = TaskOutQueue.put_target
+
+        def broken_put(self, item, target_name):
+            if isinstance(item, TaskEnvelope):
+                raise OSError("downstream closed")
+            put_target(self, item, target_name)
+
+        monkeypatch.setattr(TaskOutQueue, "put_target", broken_put)
+        reducer = TaskReducer("R", add, window_size=3)
+        _, received = self._run_chain(reducer, range(1, 11))
+
+        counts = reducer.get_counts()
+        assert counts["tasks_succeeded"] == 0
+        assert counts["tasks_failed"] == 10
+        assert reducer.window_counter.get() == 0
+        assert received == []